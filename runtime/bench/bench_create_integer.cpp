@@ -0,0 +1,79 @@
+// Throughput of boxed integer allocation through MXCreateInteger.
+//
+// Build with cmake -DMXS_RUNTIME_BENCH=ON and run bin/bench_create_integer
+// [iterations] [max_threads].  Configure once with -DMXS_TRACK_OBJECTS=ON and
+// once with OFF to compare the debug registry against release builds.
+#include "allocator.hpp"
+#include "numeric.hpp"
+#include "object.h"
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <thread>
+#include <vector>
+
+namespace {
+    // Added to values that must bypass the small-integer cache
+    constexpr long HEAP_BASE = 1L << 20;
+
+    // Each integer is released before the next one is created
+    void create_and_release(long iterations) {
+        for (long i = 0; i < iterations; ++i) {
+            mxs_runtime::MXObject *obj = MXCreateInteger(HEAP_BASE + i);
+            increase_ref(obj);
+            decrease_ref(obj);
+        }
+    }
+
+    // Loop-counter-sized values, served from the small-integer cache
+    void create_small_and_release(long iterations) {
+        for (long i = 0; i < iterations; ++i) {
+            mxs_runtime::MXObject *obj = MXCreateInteger(i & 1023);
+            increase_ref(obj);
+            decrease_ref(obj);
+        }
+    }
+
+    // BURST integers are alive at once, as when a list is built and dropped
+    constexpr long BURST = 1024;
+
+    void create_burst_and_release(long iterations) {
+        std::vector<mxs_runtime::MXObject *> live(BURST);
+        for (long i = 0; i < iterations; i += BURST) {
+            for (long j = 0; j < BURST; ++j) {
+                live[j] = MXCreateInteger(HEAP_BASE + i + j);
+                increase_ref(live[j]);
+            }
+            for (mxs_runtime::MXObject *obj : live) { decrease_ref(obj); }
+        }
+    }
+
+    auto run(void (*workload)(long), long iterations, unsigned threads) -> double {
+        auto start = std::chrono::steady_clock::now();
+        std::vector<std::thread> workers;
+        for (unsigned t = 0; t < threads; ++t) { workers.emplace_back(workload, iterations); }
+        for (std::thread &worker : workers) { worker.join(); }
+        std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+        return static_cast<double>(iterations) * threads / elapsed.count();
+    }
+}// namespace
+
+auto main(int argc, char **argv) -> int {
+    long iterations = argc > 1 ? std::atol(argv[1]) : 2000000;
+    unsigned max_threads = argc > 2 ? static_cast<unsigned>(std::atoi(argv[2])) : 4;
+    std::printf("object tracking: %s\n", mxs_allocator_tracks_objects() ? "on" : "off");
+    std::printf("small integer cache: [%d, %d]\n", MXS_SMALL_INT_MIN, MXS_SMALL_INT_MAX);
+    std::printf("| threads | one at a time (Mops/s) | bursts of %ld (Mops/s) "
+                "| values 0..1023 (Mops/s) |\n",
+                BURST);
+    std::printf("|--------:|-----------------------:|-----------------------:"
+                "|------------------------:|\n");
+    create_burst_and_release(iterations / 10);// warm up
+    for (unsigned threads = 1; threads <= max_threads; threads *= 2) {
+        double single = run(create_and_release, iterations, threads) / 1e6;
+        double burst = run(create_burst_and_release, iterations, threads) / 1e6;
+        double small = run(create_small_and_release, iterations, threads) / 1e6;
+        std::printf("| %7u | %22.2f | %22.2f | %23.2f |\n", threads, single, burst, small);
+    }
+    return 0;
+}
@@ -0,0 +1,79 @@
+// Pause times of the cycle collector and the cost it adds to releasing lists.
+//
+// Build with cmake -DMXS_RUNTIME_BENCH=ON and run
+// bin/bench_cycle_collector [rings] [ring length].  Each ring is a chain of
+// lists whose last list points back to the first, every list also holding
+// one integer; the rings are dropped and mxs_gc_collect() reclaims them.
+#include "allocator.hpp"
+#include "container.hpp"
+#include "cycle.hpp"
+#include "numeric.hpp"
+#include "object.h"
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+
+namespace {
+    constexpr long HEAP_BASE = 1L << 20;
+
+    auto ns_since(std::chrono::steady_clock::time_point start) -> double {
+        std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+        return elapsed.count() * 1e9;
+    }
+
+    void drop_rings(long rings, long length) {
+        for (long r = 0; r < rings; ++r) {
+            mxs_runtime::MXList *first = MXCreateList();
+            mxs_runtime::MXList *prev = first;
+            for (long i = 0; i < length; ++i) {
+                prev->append(*MXCreateInteger(HEAP_BASE + i));
+                if (i + 1 == length) { break; }
+                mxs_runtime::MXList *next = MXCreateList();
+                prev->append(*next);
+                decrease_ref(next);
+                prev = next;
+            }
+            prev->append(*first);
+            decrease_ref(first);
+        }
+    }
+
+    // Retain and release of a list that stays alive: each release buffers it
+    auto list_release_ns(long iterations) -> double {
+        mxs_runtime::MXList *list = MXCreateList();
+        auto start = std::chrono::steady_clock::now();
+        for (long i = 0; i < iterations; ++i) {
+            increase_ref(list);
+            decrease_ref(list);
+        }
+        double ns = ns_since(start) / static_cast<double>(iterations);
+        decrease_ref(list);
+        return ns;
+    }
+}// namespace
+
+auto main(int argc, char **argv) -> int {
+    long rings = argc > 1 ? std::atol(argv[1]) : 1000;
+    long length = argc > 2 ? std::atol(argv[2]) : 10;
+    if (!mxs_gc_enabled()) {
+        std::printf("runtime built without the cycle collector\n");
+        return 0;
+    }
+    std::printf("retain + release of a live list: %.2f ns\n\n", list_release_ns(10000000));
+
+    mxs_gc_set_threshold(0);
+    std::size_t live = mxs_allocator_live_count();
+    drop_rings(rings, length);
+    std::printf("leaked before collecting: %zu objects\n", mxs_allocator_live_count() - live);
+    mxs_runtime::MXCycleStats before;
+    mxs_gc_stats(&before);
+    std::size_t freed = mxs_gc_collect();
+    mxs_runtime::MXCycleStats after;
+    mxs_gc_stats(&after);
+    std::printf("| rings | lists freed | bytes freed | pause (ms) | ns/list |\n");
+    std::printf("|------:|------------:|------------:|-----------:|--------:|\n");
+    std::printf("| %5ld | %11zu | %11zu | %10.3f | %7.1f |\n", rings, freed,
+                after.bytes_freed - before.bytes_freed, static_cast<double>(after.last_ns) / 1e6,
+                static_cast<double>(after.last_ns) / static_cast<double>(freed ? freed : 1));
+    return mxs_allocator_live_count() == live ? 0 : 1;
+}
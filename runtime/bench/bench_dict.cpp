@@ -0,0 +1,153 @@
+// MXDict against std::unordered_map with the same hash_code() and equals().
+//
+// Build with cmake -DMXS_RUNTIME_BENCH=ON and run bin/bench_dict [count]
+// [rounds].  Inserts ``count`` keys, then looks each of them up ``rounds``
+// times in insertion order and misses as often with equal-valued keys that
+// are not in the table.  Integer keys are boxed outside the small-integer
+// cache; string keys are "key-<n>" and are looked up through new string
+// objects, so every hit runs equals().  Reports nanoseconds per operation
+// and the table's own bytes per entry (the unordered_map figure assumes
+// libstdc++ nodes and buckets).
+#include "container.hpp"
+#include "numeric.hpp"
+#include "object.h"
+#include "string.hpp"
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+namespace {
+    using mxs_runtime::MXObject;
+
+    constexpr long HEAP_BASE = 1L << 20;
+
+    struct Hash {
+        auto operator()(const MXObject *obj) const -> std::size_t { return obj->hash_code(); }
+    };
+    struct Equal {
+        auto operator()(const MXObject *a, const MXObject *b) const -> bool {
+            return const_cast<MXObject *>(a)->equals(*b);
+        }
+    };
+    using StdMap = std::unordered_map<MXObject *, MXObject *, Hash, Equal>;
+
+    struct Result {
+        double insert_ns;
+        double hit_ns;
+        double miss_ns;
+        double bytes_per_entry;
+    };
+
+    auto ns_since(std::chrono::steady_clock::time_point start) -> double {
+        return std::chrono::duration<double, std::nano>(std::chrono::steady_clock::now() - start)
+                .count();
+    }
+
+    // ``keys`` are inserted, ``probes`` equal them and ``misses`` are absent
+    struct Keys {
+        std::vector<MXObject *> keys, probes, misses;
+    };
+
+    // MXCreateInteger returns unreferenced objects, MXCreateString owned ones
+    auto owned_integer(long value) -> MXObject * {
+        MXObject *obj = MXCreateInteger(value);
+        increase_ref(obj);
+        return obj;
+    }
+
+    auto integer_keys(long count) -> Keys {
+        Keys k;
+        for (long i = 0; i < count; ++i) {
+            k.keys.push_back(owned_integer(HEAP_BASE + i));
+            k.probes.push_back(owned_integer(HEAP_BASE + i));
+            k.misses.push_back(owned_integer(HEAP_BASE + count + i));
+        }
+        return k;
+    }
+
+    auto string_keys(long count) -> Keys {
+        Keys k;
+        for (long i = 0; i < count; ++i) {
+            std::string key = "key-" + std::to_string(i);
+            k.keys.push_back(MXCreateString(key.c_str()));
+            k.probes.push_back(MXCreateString(key.c_str()));
+            k.misses.push_back(MXCreateString(("absent-" + std::to_string(i)).c_str()));
+        }
+        return k;
+    }
+
+    auto run_dict(const Keys &k, long rounds) -> Result {
+        auto *dict = MXCreateDict();
+        auto start = std::chrono::steady_clock::now();
+        for (MXObject *key : k.keys) { dict->set(*key, *key); }
+        double insert = ns_since(start) / static_cast<double>(k.keys.size());
+        std::size_t found = 0;
+        start = std::chrono::steady_clock::now();
+        for (long r = 0; r < rounds; ++r) {
+            for (MXObject *key : k.probes) { found += dict->get(*key) != nullptr; }
+        }
+        double hit = ns_since(start) / static_cast<double>(rounds * k.probes.size());
+        start = std::chrono::steady_clock::now();
+        for (long r = 0; r < rounds; ++r) {
+            for (MXObject *key : k.misses) { found += dict->get(*key) != nullptr; }
+        }
+        double miss = ns_since(start) / static_cast<double>(rounds * k.misses.size());
+        if (found != rounds * k.probes.size()) { std::fprintf(stderr, "MXDict lookup failed\n"); }
+        double bytes = static_cast<double>(dict->slot_count() * sizeof(std::int32_t)
+                                           + dict->entries().capacity()
+                                                     * sizeof(mxs_runtime::MXDict::Entry))
+                       / static_cast<double>(k.keys.size());
+        decrease_ref(dict);
+        return { insert, hit, miss, bytes };
+    }
+
+    auto run_std(const Keys &k, long rounds) -> Result {
+        StdMap map;
+        auto start = std::chrono::steady_clock::now();
+        for (MXObject *key : k.keys) { map.emplace(key, key); }
+        double insert = ns_since(start) / static_cast<double>(k.keys.size());
+        std::size_t found = 0;
+        start = std::chrono::steady_clock::now();
+        for (long r = 0; r < rounds; ++r) {
+            for (MXObject *key : k.probes) { found += map.find(key) != map.end(); }
+        }
+        double hit = ns_since(start) / static_cast<double>(rounds * k.probes.size());
+        start = std::chrono::steady_clock::now();
+        for (long r = 0; r < rounds; ++r) {
+            for (MXObject *key : k.misses) { found += map.find(key) != map.end(); }
+        }
+        double miss = ns_since(start) / static_cast<double>(rounds * k.misses.size());
+        if (found != rounds * k.probes.size()) { std::fprintf(stderr, "unordered_map lookup failed\n"); }
+        // A node holds the next pointer, the pair and the cached hash
+        double bytes = static_cast<double>(map.size() * (sizeof(void *) * 3 + sizeof(std::size_t))
+                                           + map.bucket_count() * sizeof(void *))
+                       / static_cast<double>(map.size());
+        return { insert, hit, miss, bytes };
+    }
+
+    void report(const char *name, const char *table, const Result &r) {
+        std::printf("| %-7s | %-13s | %11.1f | %8.1f | %9.1f | %15.1f |\n", name, table, r.insert_ns,
+                    r.hit_ns, r.miss_ns, r.bytes_per_entry);
+    }
+}// namespace
+
+auto main(int argc, char **argv) -> int {
+    long count = argc > 1 ? std::atol(argv[1]) : 100000;
+    long rounds = argc > 2 ? std::atol(argv[2]) : 10;
+
+    std::printf("%ld keys, %ld lookup rounds\n\n", count, rounds);
+    std::printf("| keys    | table         | insert (ns) | hit (ns) | miss (ns) | bytes per entry |\n");
+    std::printf("|:--------|:--------------|------------:|---------:|----------:|----------------:|\n");
+    for (const char *name : { "integer", "string" }) {
+        Keys k = std::string(name) == "integer" ? integer_keys(count) : string_keys(count);
+        report(name, "MXDict", run_dict(k, rounds));
+        report(name, "unordered_map", run_std(k, rounds));
+        for (auto *keys : { &k.keys, &k.probes, &k.misses }) {
+            for (MXObject *key : *keys) { decrease_ref(key); }
+        }
+    }
+    return 0;
+}
@@ -0,0 +1,155 @@
+// Lists of boxed integers against specialised lists of raw int64 values.
+//
+// Build with cmake -DMXS_RUNTIME_BENCH=ON and run bin/bench_list_kernels
+// [count] [rounds].  Builds the same integers as a boxed list and as a
+// specialised one and reports the bytes per element, then times each bulk
+// operation three ways: element by element through the boxed operators, as
+// compiled code without the bulk operations would, through the bulk
+// operation on the boxed list, and through it on the specialised list.
+#include "allocator.hpp"
+#include "container.hpp"
+#include "numeric.hpp"
+#include "object.h"
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <functional>
+#include <vector>
+
+namespace {
+    using mxs_runtime::MXList;
+    using mxs_runtime::MXObject;
+
+    // Added to values that must bypass the small-integer cache
+    constexpr long HEAP_BASE = 1L << 20;
+
+    auto bytes_in_use() -> std::size_t {
+        mxs_runtime::MXAllocatorStats out{};
+        mxs_allocator_stats(&out);
+        return out.bytes_in_use + out.large_bytes;
+    }
+
+    // Best time of ``rounds`` runs of ``body``, in milliseconds
+    auto best_ms(long rounds, const std::function<void()> &body) -> double {
+        double best = 1e300;
+        for (long r = 0; r < rounds; ++r) {
+            auto start = std::chrono::steady_clock::now();
+            body();
+            auto elapsed = std::chrono::duration<double, std::milli>(
+                    std::chrono::steady_clock::now() - start);
+            best = std::min(best, elapsed.count());
+        }
+        return best;
+    }
+
+    // Releases a result the way compiled code does: unreferenced objects die
+    void drop(MXObject *obj) {
+        increase_ref(obj);
+        decrease_ref(obj);
+    }
+
+    // ``acc op element`` over the boxed elements, one object per step
+    auto fold(const MXList &list, MXObject *(*op)(MXObject *, MXObject *)) -> MXObject * {
+        MXObject *acc = MXCreateInteger(0);
+        increase_ref(acc);
+        for (MXObject *elem : list.elements) {
+            MXObject *next = op(acc, elem);
+            increase_ref(next);
+            decrease_ref(acc);
+            acc = next;
+        }
+        return acc;
+    }
+
+    // ``op`` on each element pair into a new boxed list
+    auto zip(const MXList &left, const MXList &right, MXObject *factor,
+             MXObject *(*op)(MXObject *, MXObject *)) -> MXObject * {
+        MXList *result = MXCreateList();
+        result->elements.reserve(left.elements.size());
+        for (std::size_t i = 0; i < left.elements.size(); ++i) {
+            MXObject *value = op(left.elements[i], factor ? factor : right.elements[i]);
+            result->append(*value);
+        }
+        return result;
+    }
+
+    // ``boxed`` is negative for operations that have no bulk form on a boxed list
+    void report(const char *name, double per_element, double boxed, double raw) {
+        char bulk[32] = "n/a";
+        if (boxed >= 0) { std::snprintf(bulk, sizeof bulk, "%.2f", boxed); }
+        std::printf("| %-16s | %16.2f | %16s | %22.2f | %7.1fx |\n", name, per_element, bulk, raw,
+                    per_element / raw);
+    }
+}// namespace
+
+auto main(int argc, char **argv) -> int {
+    long count = argc > 1 ? std::atol(argv[1]) : 1000000;
+    long rounds = argc > 2 ? std::atol(argv[2]) : 5;
+
+    std::size_t before = bytes_in_use();
+    MXList *boxed = MXCreateList();
+    boxed->elements.reserve(static_cast<std::size_t>(count));
+    for (long i = 0; i < count; ++i) { boxed->append(*MXCreateInteger(HEAP_BASE + i)); }
+    double boxed_bytes = static_cast<double>(bytes_in_use() - before
+                                             + boxed->elements.capacity() * sizeof(MXObject *))
+                         / static_cast<double>(count);
+
+    std::vector<mxs_runtime::inner_integer> values(static_cast<std::size_t>(count));
+    for (long i = 0; i < count; ++i) { values[static_cast<std::size_t>(i)] = HEAP_BASE + i; }
+    before = bytes_in_use();
+    MXList *raw = MXCreateIntegerList(values.data(), values.size());
+    double raw_bytes = static_cast<double>(bytes_in_use() - before
+                                           + raw->integers.capacity() * sizeof(values[0]))
+                       / static_cast<double>(count);
+
+    std::printf("%ld integers, best of %ld rounds\n\n", count, rounds);
+    std::printf("| storage     | bytes per element |\n|:------------|------------------:|\n");
+    std::printf("| boxed       | %17.1f |\n| specialised | %17.1f |\n\n", boxed_bytes, raw_bytes);
+
+    MXObject *three = MXCreateInteger(3);
+    MXObject *four = MXCreateInteger(4);
+    std::printf("| operation        | per element (ms) | bulk, boxed (ms) | bulk, specialised (ms) | speed-up |\n");
+    std::printf("|:-----------------|-----------------:|-----------------:|-----------------------:|---------:|\n");
+    report("sum",
+           best_ms(rounds, [&] { decrease_ref(fold(*boxed, mxs_op_add)); }),
+           best_ms(rounds, [&] { drop(boxed->sum()); }),
+           best_ms(rounds, [&] { drop(raw->sum()); }));
+    report("max",
+           best_ms(rounds,
+                   [&] {
+                       const MXObject *yes = &mxs_runtime::MX_TRUE;
+                       MXObject *best = boxed->elements[0];
+                       for (MXObject *elem : boxed->elements) {
+                           if (mxs_op_gt(elem, best) == yes) { best = elem; }
+                       }
+                   }),
+           best_ms(rounds, [&] { drop(boxed->max()); }),
+           best_ms(rounds, [&] { drop(raw->max()); }));
+    report("elementwise add",
+           best_ms(rounds, [&] { decrease_ref(zip(*boxed, *boxed, nullptr, mxs_op_add)); }),
+           best_ms(rounds, [&] { drop(boxed->add_elementwise(*boxed)); }),
+           best_ms(rounds, [&] { drop(raw->add_elementwise(*raw)); }));
+    report("scale by 3",
+           best_ms(rounds, [&] { decrease_ref(zip(*boxed, *boxed, three, mxs_op_mul)); }),
+           best_ms(rounds, [&] { drop(boxed->scale(*three)); }),
+           best_ms(rounds, [&] { drop(raw->scale(*three)); }));
+    // Repeating and concatenating a boxed list copy references; repeating a
+    // list of numbers, boxed or not, fills raw storage
+    report("repeat 4 times",
+           best_ms(rounds,
+                   [&] {
+                       MXList *result = MXCreateList();
+                       for (int r = 0; r < 4; ++r) { result->extend(*boxed); }
+                       decrease_ref(result);
+                   }),
+           best_ms(rounds, [&] { drop(boxed->op_mul(*four)); }),
+           best_ms(rounds, [&] { drop(raw->op_mul(*four)); }));
+    report("concatenate",
+           best_ms(rounds, [&] { drop(boxed->op_add(*boxed)); }),
+           -1,
+           best_ms(rounds, [&] { drop(raw->op_add(*raw)); }));
+
+    decrease_ref(boxed);
+    decrease_ref(raw);
+    return 0;
+}
@@ -0,0 +1,58 @@
+// Memory taken by a list of boxed integers.
+//
+// Build with cmake -DMXS_RUNTIME_BENCH=ON and run bin/bench_list_memory
+// [count].  Reports the per-integer cost from the allocator's statistics and
+// the growth of the resident set while the list is alive.
+#include "allocator.hpp"
+#include "container.hpp"
+#include "numeric.hpp"
+#include "object.h"
+#include <cstdio>
+#include <cstdlib>
+#include <sys/resource.h>
+
+namespace {
+    // Added to values that must bypass the small-integer cache
+    constexpr long HEAP_BASE = 1L << 20;
+
+    auto max_rss_bytes() -> long {
+        rusage usage{};
+        getrusage(RUSAGE_SELF, &usage);
+        return usage.ru_maxrss * 1024L;
+    }
+
+    auto stats() -> mxs_runtime::MXAllocatorStats {
+        mxs_runtime::MXAllocatorStats out{};
+        mxs_allocator_stats(&out);
+        return out;
+    }
+}// namespace
+
+auto main(int argc, char **argv) -> int {
+    long count = argc > 1 ? std::atol(argv[1]) : 1000000;
+    std::printf("sizeof(MXObject) = %zu, sizeof(MXInteger) = %zu\n",
+                sizeof(mxs_runtime::MXObject), sizeof(mxs_runtime::MXInteger));
+
+    long rss_before = max_rss_bytes();
+    mxs_runtime::MXAllocatorStats before = stats();
+    auto *list = new mxs_runtime::MXList();
+    list->elements.reserve(static_cast<std::size_t>(count));
+    for (long i = 0; i < count; ++i) { list->append(*MXCreateInteger(HEAP_BASE + i)); }
+    mxs_runtime::MXAllocatorStats after = stats();
+    long rss_after = max_rss_bytes();
+
+    auto per_int = [count](std::size_t a, std::size_t b) {
+        return static_cast<double>(a - b) / static_cast<double>(count);
+    };
+    std::printf("| integers | requested (B/int) | in use (B/int) | reserved (B/int) "
+                "| RSS growth (B/int) |\n");
+    std::printf("|---------:|------------------:|---------------:|-----------------:"
+                "|-------------------:|\n");
+    std::printf("| %8ld | %17.1f | %14.1f | %16.1f | %18.1f |\n", count,
+                per_int(after.bytes_requested, before.bytes_requested),
+                per_int(after.bytes_in_use, before.bytes_in_use),
+                per_int(after.bytes_reserved, before.bytes_reserved),
+                static_cast<double>(rss_after - rss_before) / static_cast<double>(count));
+    delete list;
+    return 0;
+}
@@ -0,0 +1,67 @@
+// Throughput of the mxs_op_* entry points on boxed numbers.
+//
+// Build with cmake -DMXS_RUNTIME_BENCH=ON and run bin/bench_numeric_dispatch
+// [iterations].  Each row times one pair of operand types.
+#include "numeric.hpp"
+#include "object.h"
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+
+namespace {
+    // Outside the small-integer cache, so results are allocated
+    constexpr long HEAP_BASE = 1L << 20;
+
+    // + and *, whose results are allocated and released as compiled code would
+    auto arithmetic(mxs_runtime::MXObject *left, mxs_runtime::MXObject *right) -> void {
+        mxs_runtime::MXObject *results[] = { mxs_op_add(left, right), mxs_op_mul(left, right) };
+        for (mxs_runtime::MXObject *result : results) {
+            increase_ref(result);
+            decrease_ref(result);
+        }
+    }
+
+    // < and !=, which return the boolean singletons and so only dispatch
+    auto comparison(mxs_runtime::MXObject *left, mxs_runtime::MXObject *right) -> void {
+        mxs_op_lt(left, right);
+        mxs_op_ne(left, right);
+    }
+
+    auto run(void (*workload)(mxs_runtime::MXObject *, mxs_runtime::MXObject *),
+             mxs_runtime::MXObject *left, mxs_runtime::MXObject *right, long iterations)
+            -> double {
+        auto start = std::chrono::steady_clock::now();
+        for (long i = 0; i < iterations; ++i) { workload(left, right); }
+        std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+        return elapsed.count() * 1e9 / static_cast<double>(iterations * 2);
+    }
+}// namespace
+
+auto main(int argc, char **argv) -> int {
+    long iterations = argc > 1 ? std::atol(argv[1]) : 2000000;
+    mxs_runtime::MXObject *integer = MXCreateInteger(HEAP_BASE);
+    mxs_runtime::MXObject *real = MXCreateFloat(1.5);
+    increase_ref(integer);
+    increase_ref(real);
+    struct Row {
+        const char *name;
+        mxs_runtime::MXObject *left;
+        mxs_runtime::MXObject *right;
+    } rows[] = {
+        { "int, int", integer, integer },
+        { "int, float", integer, real },
+        { "float, int", real, integer },
+        { "float, float", real, real },
+    };
+    run(arithmetic, integer, real, iterations / 10);// warm up
+    std::printf("| operands     | + and * (ns/op) | < and != (ns/op) |\n");
+    std::printf("|:-------------|----------------:|-----------------:|\n");
+    for (const Row &row : rows) {
+        double arith = run(arithmetic, row.left, row.right, iterations);
+        double compare = run(comparison, row.left, row.right, iterations);
+        std::printf("| %-12s | %15.2f | %16.2f |\n", row.name, arith, compare);
+    }
+    decrease_ref(integer);
+    decrease_ref(real);
+    return 0;
+}
@@ -0,0 +1,149 @@
+// Cost of retain and release in the configured reference counting mode, and
+// a stress test for the thread-safe modes.
+//
+// Build with cmake -DMXS_RUNTIME_BENCH=ON -DMXS_REFCOUNT=plain|atomic|biased
+// and run bin/bench_refcount [iterations] [threads].  The single-threaded
+// rows compare the modes; the stress test, skipped by plain builds, has
+// several threads retain and release the same objects and exits with status
+// 1 if any object is freed early or leaked.
+#include "allocator.hpp"
+#include "numeric.hpp"
+#include "object.h"
+#include "refcount.hpp"
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <thread>
+#include <vector>
+
+namespace {
+    // Outside the small-integer cache, so every integer is allocated
+    constexpr long HEAP_BASE = 1L << 20;
+
+    // Objects kept alive at once by the bulk and stress workloads
+    constexpr long LIVE = 1024;
+
+    template<class F>
+    auto ns_per_op(F &&workload, long ops) -> double {
+        auto start = std::chrono::steady_clock::now();
+        workload();
+        std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+        return elapsed.count() * 1e9 / static_cast<double>(ops);
+    }
+
+    // One retain and one release of an object that stays alive
+    auto retain_release(long iterations) -> double {
+        mxs_runtime::MXObject *obj = MXCreateInteger(HEAP_BASE);
+        increase_ref(obj);
+        double ns = ns_per_op(
+                [&] {
+                    for (long i = 0; i < iterations; ++i) {
+                        increase_ref(obj);
+                        decrease_ref(obj);
+                    }
+                },
+                iterations);
+        decrease_ref(obj);
+        return ns;
+    }
+
+    // LIVE objects retained, then released, as when a list is copied
+    auto bulk(long iterations) -> double {
+        std::vector<mxs_runtime::MXObject *> live(LIVE);
+        for (long j = 0; j < LIVE; ++j) {
+            live[j] = MXCreateInteger(HEAP_BASE + j);
+            increase_ref(live[j]);
+        }
+        long rounds = iterations / LIVE;
+        double ns = ns_per_op(
+                [&] {
+                    for (long i = 0; i < rounds; ++i) {
+                        for (mxs_runtime::MXObject *obj : live) { increase_ref(obj); }
+                        for (mxs_runtime::MXObject *obj : live) { decrease_ref(obj); }
+                    }
+                },
+                rounds * LIVE);
+        for (mxs_runtime::MXObject *obj : live) { decrease_ref(obj); }
+        return ns;
+    }
+
+    // A fresh integer retained and released, which frees it
+    auto create_release(long iterations) -> double {
+        return ns_per_op(
+                [&] {
+                    for (long i = 0; i < iterations; ++i) {
+                        mxs_runtime::MXObject *obj = MXCreateInteger(HEAP_BASE + i);
+                        increase_ref(obj);
+                        decrease_ref(obj);
+                    }
+                },
+                iterations);
+    }
+
+    auto stress(long iterations, unsigned threads) -> bool {
+        std::size_t before = mxs_allocator_live_count();
+        std::vector<mxs_runtime::MXObject *> shared(LIVE);
+        for (long j = 0; j < LIVE; ++j) {
+            shared[j] = MXCreateInteger(HEAP_BASE + j);
+            increase_ref(shared[j]);
+        }
+        // Integers each worker creates and the main thread releases
+        std::vector<std::vector<mxs_runtime::MXObject *>> handed(threads);
+        auto start = std::chrono::steady_clock::now();
+        std::vector<std::thread> workers;
+        for (unsigned t = 0; t < threads; ++t) {
+            workers.emplace_back([&, t] {
+                long rounds = iterations / LIVE;
+                for (long i = 0; i < rounds; ++i) {
+                    for (mxs_runtime::MXObject *obj : shared) { increase_ref(obj); }
+                    for (mxs_runtime::MXObject *obj : shared) { decrease_ref(obj); }
+                }
+                for (long j = 0; j < LIVE; ++j) {
+                    handed[t].push_back(MXCreateInteger(HEAP_BASE + j));
+                    increase_ref(handed[t].back());
+                }
+            });
+        }
+        for (std::thread &worker : workers) { worker.join(); }
+        std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+        mxs_refcount_merge();
+        bool ok = mxs_allocator_live_count() == before + LIVE * (1 + threads);
+        for (mxs_runtime::MXObject *obj : shared) {
+            ok = ok && std::strcmp(mxs_get_object_type_name(obj), "Integer") == 0;
+        }
+        for (auto &objects : handed) {
+            for (mxs_runtime::MXObject *obj : objects) { decrease_ref(obj); }
+        }
+        for (mxs_runtime::MXObject *obj : shared) { decrease_ref(obj); }
+        mxs_refcount_merge();
+        ok = ok && mxs_allocator_live_count() == before;
+        double ops = static_cast<double>(iterations / LIVE * LIVE * 2) * threads;
+        std::printf("| %7u | %22.2f | %6s |\n", threads, ops / elapsed.count() / 1e6,
+                    ok ? "ok" : "FAILED");
+        return ok;
+    }
+}// namespace
+
+auto main(int argc, char **argv) -> int {
+    long iterations = argc > 1 ? std::atol(argv[1]) : 20000000;
+    unsigned max_threads = argc > 2 ? static_cast<unsigned>(std::atoi(argv[2])) : 8;
+    std::printf("reference counting: %s\n\n", mxs_runtime_refcount_mode());
+    create_release(iterations / 10);// warm up
+    std::printf("| single thread                | ns/op |\n");
+    std::printf("|:-----------------------------|------:|\n");
+    std::printf("| retain + release, one object | %5.2f |\n", retain_release(iterations));
+    std::printf("| retain + release, %4ld live  | %5.2f |\n", LIVE, bulk(iterations));
+    std::printf("| create + retain + release    | %5.2f |\n", create_release(iterations / 4));
+    if (mxs_runtime::refcount::MODE == MXS_REFCOUNT_PLAIN) {
+        std::printf("\nstress test skipped: plain reference counts are not thread-safe\n");
+        return 0;
+    }
+    std::printf("\n| threads | retain/release (Mops/s) | result |\n");
+    std::printf("|--------:|-----------------------:|-------:|\n");
+    bool ok = true;
+    for (unsigned threads = 1; threads <= max_threads; threads *= 2) {
+        ok = stress(iterations / 4, threads) && ok;
+    }
+    return ok ? 0 : 1;
+}
@@ -0,0 +1,75 @@
+// Pause caused by dropping a large object graph, freed at once or through the
+// deferred-release queue.
+//
+// Build with cmake -DMXS_RUNTIME_BENCH=ON and run
+// bin/bench_release_latency [lists] [length] [budget ns].  The graph is one
+// list holding ``lists`` lists of ``length`` integers each.  With deferral
+// the drop only runs for the budget, and the rest is freed by repeated
+// budgeted drains, as a program would at its safe points.
+#include "allocator.hpp"
+#include "container.hpp"
+#include "numeric.hpp"
+#include "object.h"
+#include "release.hpp"
+#include <algorithm>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+
+namespace {
+    constexpr long HEAP_BASE = 1L << 20;
+
+    auto build(long lists, long length) -> mxs_runtime::MXList * {
+        mxs_runtime::MXList *outer = MXCreateList();
+        for (long i = 0; i < lists; ++i) {
+            mxs_runtime::MXList *inner = MXCreateList();
+            for (long j = 0; j < length; ++j) { inner->append(*MXCreateInteger(HEAP_BASE + j)); }
+            outer->append(*inner);
+            decrease_ref(inner);
+        }
+        return outer;
+    }
+
+    auto ms_since(std::chrono::steady_clock::time_point start) -> double {
+        std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+        return elapsed.count() * 1e3;
+    }
+}// namespace
+
+auto main(int argc, char **argv) -> int {
+    long lists = argc > 1 ? std::atol(argv[1]) : 1000;
+    long length = argc > 2 ? std::atol(argv[2]) : 1000;
+    std::uint64_t budget = argc > 3 ? std::strtoull(argv[3], nullptr, 10) : 100000;
+    std::size_t live = mxs_allocator_live_count();
+
+    mxs_release_configure(0, budget);
+    mxs_runtime::MXList *graph = build(lists, length);
+    auto start = std::chrono::steady_clock::now();
+    decrease_ref(graph);
+    double immediate = ms_since(start);
+
+    mxs_release_configure(std::min(lists, length), budget);
+    graph = build(lists, length);
+    start = std::chrono::steady_clock::now();
+    decrease_ref(graph);
+    double drop = ms_since(start);
+    double longest = drop;
+    double total = drop;
+    long drains = 0;
+    while (mxs_release_pending() > 0) {
+        start = std::chrono::steady_clock::now();
+        mxs_release_drain(budget);
+        double pause = ms_since(start);
+        longest = std::max(longest, pause);
+        total += pause;
+        ++drains;
+    }
+
+    std::printf("%ld lists of %ld integers, budget %llu ns\n\n", lists, length,
+                static_cast<unsigned long long>(budget));
+    std::printf("| release   | longest pause (ms) | total (ms) | drains |\n");
+    std::printf("|:----------|-------------------:|-----------:|-------:|\n");
+    std::printf("| immediate | %18.3f | %10.3f | %6d |\n", immediate, immediate, 0);
+    std::printf("| deferred  | %18.3f | %10.3f | %6ld |\n", longest, total, drains);
+    return mxs_allocator_live_count() == live ? 0 : 1;
+}
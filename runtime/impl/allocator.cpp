@@ -1,31 +1,349 @@
 #include "allocator.hpp"
 #include "object.h"
+#include <array>
+#include <atomic>
+#include <cstdint>
+#include <iterator>
 #include <cstdio>
+#include <mutex>
+#include <new>
+#include <pthread.h>
+#include <vector>
+#if MXS_TRACK_OBJECTS
+#include <unordered_set>
+#endif
 
 namespace mxs_runtime {
 
+    namespace {
+        // Counters of one thread.  Only that thread writes them, so relaxed
+        // accesses are enough; objects freed by another thread make its
+        // counters negative and the sums stay right.
+        struct alignas(64) ThreadStats {
+            std::atomic<std::int64_t> live{ 0 };
+            std::atomic<std::int64_t> bytes_in_use{ 0 };
+            std::atomic<std::int64_t> bytes_requested{ 0 };
+            std::atomic<std::int64_t> large_objects{ 0 };
+            std::atomic<std::int64_t> large_bytes{ 0 };
+        };
+
+        void bump(std::atomic<std::int64_t> &counter, std::int64_t delta) {
+            counter.store(counter.load(std::memory_order_relaxed) + delta,
+                          std::memory_order_relaxed);
+        }
+
+        constexpr std::atomic<std::int64_t> ThreadStats::*STAT_FIELDS[] = {
+                &ThreadStats::live,          &ThreadStats::bytes_in_use,
+                &ThreadStats::bytes_requested, &ThreadStats::large_objects,
+                &ThreadStats::large_bytes,
+        };
+
+        struct FreeBlock {
+            FreeBlock *next;
+        };
+
+        // Free blocks of one size class shared by all threads
+        struct alignas(64) CentralPool {
+            std::mutex mtx;
+            FreeBlock *free = nullptr;
+            // Unused tail of the newest slab
+            char *bump = nullptr;
+            char *bump_end = nullptr;
+        };
+
+#if MXS_TRACK_OBJECTS
+        struct alignas(64) Shard {
+            std::mutex mtx;
+            std::unordered_set<MXObject *> objects;
+        };
+#endif
+
+        // Created on first use and never destroyed, so static objects of every
+        // translation unit can be created and destroyed in any order.
+        struct State {
+            std::mutex stats_mtx;
+            std::vector<ThreadStats *> threads;
+            // Counters of exited threads
+            ThreadStats retired;
+            std::array<CentralPool, Allocator::SIZE_CLASS_COUNT> pools;
+            std::atomic<std::size_t> slabs{ 0 };
+#if MXS_TRACK_OBJECTS
+            std::array<Shard, Allocator::SHARD_COUNT> shards;
+
+            auto shard_of(MXObject *obj) -> Shard & {
+                auto addr = reinterpret_cast<std::uintptr_t>(obj);
+                return shards[((addr >> 4) ^ (addr >> 12)) % Allocator::SHARD_COUNT];
+            }
+#endif
+        };
+
+        auto state() -> State & {
+            static State *instance = new State();
+            return *instance;
+        }
+
+        constexpr auto class_size(std::size_t index) -> std::size_t {
+            return (index + 1) * Allocator::SIZE_CLASS_STEP;
+        }
+
+        // Takes ``wanted`` blocks from the central pool, carving new slabs as
+        // needed, and returns them as a list.
+        auto take_batch(std::size_t index, std::size_t wanted) -> FreeBlock * {
+            State &s = state();
+            CentralPool &pool = s.pools[index];
+            const std::size_t size = class_size(index);
+            std::lock_guard<std::mutex> lock(pool.mtx);
+            FreeBlock *head = nullptr;
+            std::size_t taken = 0;
+            for (; taken < wanted && pool.free; ++taken) {
+                FreeBlock *block = pool.free;
+                pool.free = block->next;
+                block->next = head;
+                head = block;
+            }
+            for (; taken < wanted; ++taken) {
+                if (static_cast<std::size_t>(pool.bump_end - pool.bump) < size) {
+                    pool.bump = static_cast<char *>(
+                            ::operator new(Allocator::SLAB_SIZE, std::align_val_t{ 64 }));
+                    pool.bump_end = pool.bump + Allocator::SLAB_SIZE;
+                    s.slabs.fetch_add(1, std::memory_order_relaxed);
+                }
+                auto *block = reinterpret_cast<FreeBlock *>(pool.bump);
+                pool.bump += size;
+                block->next = head;
+                head = block;
+            }
+            return head;
+        }
+
+        void give_back(std::size_t index, FreeBlock *first, FreeBlock *last) {
+            CentralPool &pool = state().pools[index];
+            std::lock_guard<std::mutex> lock(pool.mtx);
+            last->next = pool.free;
+            pool.free = first;
+        }
+
+        // Free lists and counters of one thread, kept in a single constant
+        // initialised thread_local so the fast paths need one TLS lookup.  It
+        // is trivially destructible and stays usable while thread_local and
+        // static destructors run; flush_thread_cache hands its blocks back
+        // when the thread exits.
+        struct ThreadCache {
+            FreeBlock *head[Allocator::SIZE_CLASS_COUNT];
+            std::uint32_t count[Allocator::SIZE_CLASS_COUNT];
+            ThreadStats stats;
+            bool attached;// stats listed in State::threads
+            bool flushed; // the thread is exiting, bypass the cache
+        };
+        constinit thread_local ThreadCache thread_cache{};
+
+        void flush_thread_cache(void *arg) {
+            auto &cache = *static_cast<ThreadCache *>(arg);
+            for (std::size_t index = 0; index < Allocator::SIZE_CLASS_COUNT; ++index) {
+                FreeBlock *first = cache.head[index];
+                if (!first) continue;
+                FreeBlock *last = first;
+                while (last->next) { last = last->next; }
+                give_back(index, first, last);
+                cache.head[index] = nullptr;
+                cache.count[index] = 0;
+            }
+            State &s = state();
+            std::lock_guard<std::mutex> lock(s.stats_mtx);
+            for (auto field : STAT_FIELDS) {
+                bump(s.retired.*field, (cache.stats.*field).load(std::memory_order_relaxed));
+            }
+            std::erase(s.threads, &cache.stats);
+            cache.flushed = true;
+        }
+
+        // A pthread key rather than a thread_local with a destructor: the
+        // latter makes every thread_local access in this file check an
+        // initialisation guard.
+        auto exit_key() -> pthread_key_t {
+            static pthread_key_t key = [] {
+                pthread_key_t created;
+                pthread_key_create(&created, flush_thread_cache);
+                return created;
+            }();
+            return key;
+        }
+
+        [[gnu::noinline]] void attach_thread(ThreadCache &cache) {
+            cache.attached = true;
+            pthread_setspecific(exit_key(), &cache);
+            State &s = state();
+            std::lock_guard<std::mutex> lock(s.stats_mtx);
+            s.threads.push_back(&cache.stats);
+        }
+
+        inline auto local_cache() -> ThreadCache & {
+            ThreadCache *cache = &thread_cache;
+            // GCC recomputes the address of a thread_local at every use;
+            // hiding where the pointer came from makes it compute it once.
+            asm("" : "+r"(cache));
+            if (!cache->attached) [[unlikely]] { attach_thread(*cache); }
+            return *cache;
+        }
+
+        void record(ThreadCache &cache, std::atomic<std::int64_t> ThreadStats::*field,
+                    std::int64_t delta) {
+            if (!cache.flushed) [[likely]] {
+                bump(cache.stats.*field, delta);
+                return;
+            }
+            State &s = state();
+            std::lock_guard<std::mutex> lock(s.stats_mtx);
+            bump(s.retired.*field, delta);
+        }
+
+        // Moves BATCH_SIZE blocks from the thread cache to the central pool
+        void release_batch(ThreadCache &cache, std::size_t index) {
+            FreeBlock *first = cache.head[index];
+            FreeBlock *last = first;
+            for (std::size_t i = 1; i < Allocator::BATCH_SIZE; ++i) { last = last->next; }
+            cache.head[index] = last->next;
+            cache.count[index] -= Allocator::BATCH_SIZE;
+            give_back(index, first, last);
+        }
+    }// namespace
+
     static Allocator allocator_instance;
     MXS_API Allocator &MX_ALLOCATOR = allocator_instance;
 
+    void *Allocator::allocate(std::size_t size) {
+        ThreadCache &cache = local_cache();
+        if (size == 0) size = 1;
+        if (size > MAX_SMALL_SIZE) {
+            record(cache, &ThreadStats::large_objects, 1);
+            record(cache, &ThreadStats::large_bytes, static_cast<std::int64_t>(size));
+            return ::operator new(size);
+        }
+        const std::size_t index = (size - 1) / SIZE_CLASS_STEP;
+        FreeBlock *block = cache.head[index];
+        if (block) {
+            cache.head[index] = block->next;
+            --cache.count[index];
+        } else if (cache.flushed) {
+            block = take_batch(index, 1);
+        } else {
+            block = take_batch(index, BATCH_SIZE);
+            cache.head[index] = block->next;
+            cache.count[index] = BATCH_SIZE - 1;
+        }
+        record(cache, &ThreadStats::bytes_in_use, static_cast<std::int64_t>(class_size(index)));
+        record(cache, &ThreadStats::bytes_requested, static_cast<std::int64_t>(size));
+        return block;
+    }
+
+    void Allocator::deallocate(void *ptr, std::size_t size) {
+        if (!ptr) return;
+        ThreadCache &cache = local_cache();
+        if (size == 0) size = 1;
+        if (size > MAX_SMALL_SIZE) {
+            record(cache, &ThreadStats::large_objects, -1);
+            record(cache, &ThreadStats::large_bytes, -static_cast<std::int64_t>(size));
+            ::operator delete(ptr);
+            return;
+        }
+        const std::size_t index = (size - 1) / SIZE_CLASS_STEP;
+        record(cache, &ThreadStats::bytes_in_use, -static_cast<std::int64_t>(class_size(index)));
+        record(cache, &ThreadStats::bytes_requested, -static_cast<std::int64_t>(size));
+        auto *block = static_cast<FreeBlock *>(ptr);
+        if (cache.flushed) {
+            give_back(index, block, block);
+            return;
+        }
+        block->next = cache.head[index];
+        cache.head[index] = block;
+        if (++cache.count[index] > 2 * BATCH_SIZE) { release_batch(cache, index); }
+    }
+
+    auto Allocator::stats() -> MXAllocatorStats {
+        State &s = state();
+        std::int64_t totals[std::size(STAT_FIELDS)] = {};
+        {
+            std::lock_guard<std::mutex> lock(s.stats_mtx);
+            for (std::size_t i = 0; i < std::size(STAT_FIELDS); ++i) {
+                totals[i] = (s.retired.*STAT_FIELDS[i]).load(std::memory_order_relaxed);
+                for (ThreadStats *thread : s.threads) {
+                    totals[i] += (thread->*STAT_FIELDS[i]).load(std::memory_order_relaxed);
+                }
+            }
+        }
+        auto total = [&](auto field) -> std::size_t {
+            for (std::size_t i = 0; i < std::size(STAT_FIELDS); ++i) {
+                if (STAT_FIELDS[i] == field) {
+                    return totals[i] > 0 ? static_cast<std::size_t>(totals[i]) : 0;
+                }
+            }
+            return 0;
+        };
+        MXAllocatorStats result{};
+        result.slabs = s.slabs.load(std::memory_order_relaxed);
+        result.bytes_reserved = result.slabs * SLAB_SIZE;
+        result.bytes_in_use = total(&ThreadStats::bytes_in_use);
+        result.bytes_requested = total(&ThreadStats::bytes_requested);
+        result.large_objects = total(&ThreadStats::large_objects);
+        result.large_bytes = total(&ThreadStats::large_bytes);
+        result.fragmentation =
+                result.bytes_reserved == 0
+                        ? 0.0
+                        : 1.0 - static_cast<double>(result.bytes_requested) /
+                                        static_cast<double>(result.bytes_reserved);
+        return result;
+    }
+
     void Allocator::registerObject(MXObject *obj) {
         if (!obj) return;
-        std::lock_guard<std::mutex> lock(mtx);
-        objects.insert(obj);
+        record(local_cache(), &ThreadStats::live, 1);
+#if MXS_TRACK_OBJECTS
+        Shard &shard = state().shard_of(obj);
+        std::lock_guard<std::mutex> lock(shard.mtx);
+        shard.objects.insert(obj);
+#endif
     }
 
     void Allocator::unregisterObject(MXObject *obj) {
         if (!obj) return;
-        std::lock_guard<std::mutex> lock(mtx);
-        objects.erase(obj);
+        record(local_cache(), &ThreadStats::live, -1);
+#if MXS_TRACK_OBJECTS
+        Shard &shard = state().shard_of(obj);
+        std::lock_guard<std::mutex> lock(shard.mtx);
+        shard.objects.erase(obj);
+#endif
     }
 
     void Allocator::dump_stats() {
-        std::lock_guard<std::mutex> lock(mtx);
-        printf("Live objects: %zu\n", objects.size());
-        for (MXObject *obj : objects) {
-            const char *type = obj ? obj->get_type_name() : "<null>";
-            printf("  %p (%s)\n", (void *) obj, type);
+        MXAllocatorStats s = stats();
+        printf("Live objects: %zu\n", live_count());
+        printf("Slabs: %zu (%zu bytes), in use: %zu bytes, requested: %zu bytes, "
+               "fragmentation: %.1f%%\n",
+               s.slabs, s.bytes_reserved, s.bytes_in_use, s.bytes_requested,
+               s.fragmentation * 100.0);
+        printf("Large objects: %zu (%zu bytes)\n", s.large_objects, s.large_bytes);
+#if MXS_TRACK_OBJECTS
+        // Merge the shards, locking one at a time
+        for (Shard &shard : state().shards) {
+            std::lock_guard<std::mutex> lock(shard.mtx);
+            for (MXObject *obj : shard.objects) {
+                printf("  %p (%s)\n", (void *) obj, obj->get_type_name());
+            }
+        }
+#else
+        printf("  (object tracking is off, build with -DMXS_TRACK_OBJECTS=ON to "
+               "list objects)\n");
+#endif
+    }
+
+    auto Allocator::live_count() -> std::size_t {
+        State &s = state();
+        std::lock_guard<std::mutex> lock(s.stats_mtx);
+        std::int64_t total = s.retired.live.load(std::memory_order_relaxed);
+        for (ThreadStats *thread : s.threads) {
+            total += thread->live.load(std::memory_order_relaxed);
         }
+        return total > 0 ? static_cast<std::size_t>(total) : 0;
     }
 
 }// namespace mxs_runtime
@@ -33,3 +351,15 @@ namespace mxs_runtime {
 extern "C" MXS_API void mxs_allocator_dump_stats() {
     mxs_runtime::MX_ALLOCATOR.dump_stats();
 }
+
+extern "C" MXS_API auto mxs_allocator_live_count() -> std::size_t {
+    return mxs_runtime::MX_ALLOCATOR.live_count();
+}
+
+extern "C" MXS_API auto mxs_allocator_tracks_objects() -> bool {
+    return mxs_runtime::Allocator::tracks_objects();
+}
+
+extern "C" MXS_API void mxs_allocator_stats(mxs_runtime::MXAllocatorStats *out) {
+    if (out) { *out = mxs_runtime::MX_ALLOCATOR.stats(); }
+}
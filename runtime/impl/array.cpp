@@ -0,0 +1,286 @@
+#include "array.hpp"
+#include "nil.hpp"
+#include "numeric.hpp"
+#include "tagged.hpp"
+#include <algorithm>
+#include <new>
+#include <string>
+
+namespace {
+    inline mxs_runtime::MXError *check_array(mxs_runtime::MXObject *obj) {
+        // A tagged value has no header to read the type from
+        if (!obj || mxs_runtime::tagged::is_tagged(obj)
+            || obj->get_type_info() != &mxs_runtime::g_array_type_info) {
+            return new mxs_runtime::MXError("TypeError", "Argument must be an Array.");
+        }
+        return nullptr;
+    }
+
+    // check_array() for the typed accessors, which also need the element type
+    inline mxs_runtime::MXError *check_array(mxs_runtime::MXObject *obj,
+                                             mxs_runtime::ArrayElement element) {
+        if (auto *err = check_array(obj)) return err;
+        if (static_cast<mxs_runtime::MXArray *>(obj)->element != element) {
+            return new mxs_runtime::MXError("TypeError",
+                                            element == mxs_runtime::ArrayElement::Integer
+                                                    ? "Array elements are not Integers."
+                                                    : "Array elements are not Floats.");
+        }
+        return nullptr;
+    }
+}// namespace
+
+namespace mxs_runtime {
+
+    const MXTypeInfo g_array_type_info{ "Array", nullptr };
+
+    namespace {
+        auto nil() -> MXObject * {
+            return const_cast<MXObject *>(reinterpret_cast<const MXObject *>(mxs_get_nil()));
+        }
+
+        auto is_integer(const MXObject &obj) -> bool {
+            return obj.get_type_info() == &g_integer_type_info;
+        }
+
+        auto is_float(const MXObject &obj) -> bool {
+            return obj.get_type_info() == &g_float_type_info;
+        }
+
+        // Rounded up to whole cache lines, so no other object shares the last
+        auto buffer_bytes(inner_integer length) -> std::size_t {
+            std::size_t bytes = static_cast<std::size_t>(length) * sizeof(inner_integer);
+            return (bytes + MXArray::ALIGNMENT - 1) / MXArray::ALIGNMENT * MXArray::ALIGNMENT;
+        }
+
+        auto allocate(inner_integer length) -> void * {
+            std::size_t bytes = buffer_bytes(length);
+            if (bytes == 0) { return nullptr; }
+            void *data = ::operator new(bytes, std::align_val_t{ MXArray::ALIGNMENT });
+            std::fill_n(static_cast<unsigned char *>(data), bytes, 0);
+            return data;
+        }
+
+        // The element index ``index`` stands for, or an error
+        auto position(const MXObject &index, inner_integer length, std::size_t &out) -> MXError * {
+            if (!is_integer(index)) {
+                return new MXError("TypeError", "Array index must be an Integer.");
+            }
+            inner_integer i = static_cast<const MXInteger &>(index).value;
+            if (i < 0 || i >= length) {
+                return new MXError("IndexError", "Array index " + std::to_string(i)
+                                                         + " out of range for length "
+                                                         + std::to_string(length));
+            }
+            out = static_cast<std::size_t>(i);
+            return nullptr;
+        }
+
+        auto integer_of(const MXObject &obj) -> inner_integer {
+            return static_cast<const MXInteger &>(obj).value;
+        }
+
+        auto float_of(const MXObject &obj) -> inner_float {
+            return is_integer(obj) ? static_cast<inner_float>(integer_of(obj))
+                                   : static_cast<const MXFloat &>(obj).value;
+        }
+
+        // Whether ``value`` can be stored in an array of ``element``
+        auto accepts(ArrayElement element, const MXObject &value) -> bool {
+            return is_integer(value) || (element == ArrayElement::Float && is_float(value));
+        }
+
+        auto value_error(ArrayElement element) -> MXError * {
+            return new MXError("TypeError", element == ArrayElement::Integer
+                                                    ? "Array value must be an Integer."
+                                                    : "Array value must be a Float or an Integer.");
+        }
+    }// namespace
+
+    MXArray::MXArray(ArrayElement element, inner_integer length)
+        : MXObject(&g_array_type_info, false), data(allocate(length)), length(length),
+          element(element) {
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Winvalid-offsetof"
+        static_assert(offsetof(MXArray, data) == DATA_OFFSET);
+        static_assert(offsetof(MXArray, length) == LENGTH_OFFSET);
+        static_assert(offsetof(MXArray, element) == ELEMENT_OFFSET);
+#pragma GCC diagnostic pop
+        static_assert(sizeof(inner_integer) == sizeof(inner_float));
+    }
+
+    MXArray::~MXArray() {
+        if (data) { ::operator delete(data, std::align_val_t{ ALIGNMENT }); }
+    }
+
+    auto MXArray::repr() const -> inner_string {
+        inner_string out = "[";
+        for (inner_integer i = 0; i < length; ++i) {
+            if (i) { out += ", "; }
+            out += element == ArrayElement::Integer ? MXInteger(integers()[i]).repr()
+                                                    : MXFloat(floats()[i]).repr();
+        }
+        return out + "]";
+    }
+
+    auto MXArray::get(const MXObject &index) const -> MXObject * {
+        std::size_t i;
+        if (auto *err = position(index, length, i)) return err;
+        if (element == ArrayElement::Integer) { return MXCreateInteger(integers()[i]); }
+        return MXCreateFloat(floats()[i]);
+    }
+
+    auto MXArray::set(const MXObject &index, const MXObject &value) -> MXObject * {
+        std::size_t i;
+        if (auto *err = position(index, length, i)) return err;
+        if (!accepts(element, value)) return value_error(element);
+        if (element == ArrayElement::Integer) {
+            integers()[i] = integer_of(value);
+        } else {
+            floats()[i] = float_of(value);
+        }
+        return nil();
+    }
+
+    auto MXArray::fill(const MXObject &value) -> MXObject * {
+        if (!accepts(element, value)) return value_error(element);
+        if (element == ArrayElement::Integer) {
+            std::fill_n(integers(), length, integer_of(value));
+        } else {
+            std::fill_n(floats(), length, float_of(value));
+        }
+        return nil();
+    }
+
+}// namespace mxs_runtime
+
+using mxs_runtime::ArrayElement;
+using mxs_runtime::MXArray;
+using mxs_runtime::MXObject;
+
+namespace {
+    auto typed_get(MXObject *array, MXObject *index_value, ArrayElement element) -> MXObject * {
+        mxs_runtime::tagged::Arg index(index_value);
+        if (auto *err = check_array(array, element)) return err;
+        return mxs_runtime::tagged::encode(static_cast<MXArray *>(array)->get(*index.get()));
+    }
+
+    auto typed_set(MXObject *array, MXObject *index_value, MXObject *item, ArrayElement element)
+            -> MXObject * {
+        mxs_runtime::tagged::Arg index(index_value);
+        mxs_runtime::tagged::Arg value(item);
+        if (auto *err = check_array(array, element)) return err;
+        return mxs_runtime::tagged::encode(
+                static_cast<MXArray *>(array)->set(*index.get(), *value.get()));
+    }
+
+    // The unchecked accessors still decode tagged arguments, which compiled
+    // code passes when it calls them instead of inlining them
+    auto unchecked_index(MXObject *index_value) -> std::size_t {
+        mxs_runtime::tagged::Arg index(index_value);
+        return static_cast<std::size_t>(static_cast<mxs_runtime::MXInteger *>(index.get())->value);
+    }
+}// namespace
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+MXS_API MXArray *MXCreateArray(std::uint8_t element, mxs_runtime::inner_integer length) {
+    auto *obj = new MXArray(static_cast<ArrayElement>(element), length);
+    obj->increase_ref();
+    return obj;
+}
+
+MXS_API MXObject *array_make(MXObject *length_value, MXObject *fill_value) {
+    mxs_runtime::tagged::Arg length(length_value);
+    mxs_runtime::tagged::Arg fill(fill_value);
+    if (!mxs_runtime::is_integer(*length.get())) {
+        return new mxs_runtime::MXError("TypeError", "Array length must be an Integer.");
+    }
+    mxs_runtime::inner_integer n = static_cast<mxs_runtime::MXInteger *>(length.get())->value;
+    if (n < 0) { return new mxs_runtime::MXError("ValueError", "Array length must not be negative."); }
+    ArrayElement element;
+    if (mxs_runtime::is_integer(*fill.get())) {
+        element = ArrayElement::Integer;
+    } else if (mxs_runtime::is_float(*fill.get())) {
+        element = ArrayElement::Float;
+    } else {
+        return new mxs_runtime::MXError("TypeError", "Array fill must be an Integer or a Float.");
+    }
+    MXArray *array = MXCreateArray(static_cast<std::uint8_t>(element), n);
+    array->fill(*fill.get());
+    return array;
+}
+
+MXS_API MXObject *array_length(MXObject *array) {
+    if (auto *err = check_array(array)) return err;
+    return mxs_runtime::tagged::make_int(static_cast<MXArray *>(array)->length);
+}
+
+MXS_API MXObject *array_get(MXObject *array, MXObject *index_value) {
+    mxs_runtime::tagged::Arg index(index_value);
+    if (auto *err = check_array(array)) return err;
+    return mxs_runtime::tagged::encode(static_cast<MXArray *>(array)->get(*index.get()));
+}
+
+MXS_API MXObject *array_set(MXObject *array, MXObject *index_value, MXObject *item) {
+    mxs_runtime::tagged::Arg index(index_value);
+    mxs_runtime::tagged::Arg value(item);
+    if (auto *err = check_array(array)) return err;
+    return mxs_runtime::tagged::encode(
+            static_cast<MXArray *>(array)->set(*index.get(), *value.get()));
+}
+
+MXS_API MXObject *array_fill(MXObject *array, MXObject *item) {
+    mxs_runtime::tagged::Arg value(item);
+    if (auto *err = check_array(array)) return err;
+    return mxs_runtime::tagged::encode(static_cast<MXArray *>(array)->fill(*value.get()));
+}
+
+MXS_API MXObject *array_get_int(MXObject *array, MXObject *index) {
+    return typed_get(array, index, ArrayElement::Integer);
+}
+
+MXS_API MXObject *array_get_float(MXObject *array, MXObject *index) {
+    return typed_get(array, index, ArrayElement::Float);
+}
+
+MXS_API MXObject *array_set_int(MXObject *array, MXObject *index, MXObject *value) {
+    return typed_set(array, index, value, ArrayElement::Integer);
+}
+
+MXS_API MXObject *array_set_float(MXObject *array, MXObject *index, MXObject *value) {
+    return typed_set(array, index, value, ArrayElement::Float);
+}
+
+MXS_API MXObject *array_get_int_unchecked(MXObject *array, MXObject *index) {
+    auto *a = static_cast<MXArray *>(array);
+    return mxs_runtime::tagged::make_int(a->integers()[unchecked_index(index)]);
+}
+
+MXS_API MXObject *array_get_float_unchecked(MXObject *array, MXObject *index) {
+    auto *a = static_cast<MXArray *>(array);
+    return MXCreateFloat(a->floats()[unchecked_index(index)]);
+}
+
+MXS_API MXObject *array_set_int_unchecked(MXObject *array, MXObject *index, MXObject *item) {
+    mxs_runtime::tagged::Arg value(item);
+    auto *a = static_cast<MXArray *>(array);
+    a->integers()[unchecked_index(index)] = static_cast<mxs_runtime::MXInteger *>(value.get())->value;
+    return mxs_runtime::tagged::encode(mxs_runtime::nil());
+}
+
+MXS_API MXObject *array_set_float_unchecked(MXObject *array, MXObject *index, MXObject *item) {
+    mxs_runtime::tagged::Arg value(item);
+    auto *a = static_cast<MXArray *>(array);
+    a->floats()[unchecked_index(index)] = mxs_runtime::float_of(*value.get());
+    return mxs_runtime::tagged::encode(mxs_runtime::nil());
+}
+
+const std::uint16_t mxs_array_type_id = mxs_runtime::g_array_type_info.id;
+const std::size_t mxs_array_data_offset = MXArray::DATA_OFFSET;
+const std::size_t mxs_array_length_offset = MXArray::LENGTH_OFFSET;
+const std::size_t mxs_array_element_offset = MXArray::ELEMENT_OFFSET;
+#ifdef __cplusplus
+}
+#endif
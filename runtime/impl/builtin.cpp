@@ -1,28 +1,31 @@
 #include "builtin.hpp"
+#include "tagged.hpp"
 #include <cstdio>
 #include <string>
 
 using namespace mxs_runtime;
 
-extern "C" MXS_API MXObject *printf_wrapper(MXObject *format_obj, MXObject *packed_obj) {
-    auto *fmt = dynamic_cast<MXString *>(format_obj);
+extern "C" MXS_API MXObject *printf_wrapper(MXObject *format_value, MXObject *packed_obj) {
+    tagged::Arg format_obj(format_value);
+    MXObject *fmt = format_obj.get();
     auto *argv = dynamic_cast<MXFFICallArgv *>(packed_obj);
-    if (!fmt || !argv) {
+    if (!fmt || fmt->get_type_info() != &g_string_type_info || !argv) {
         return new MXError("TypeError", "expected String and FFICallArgv");
     }
 
-    std::string out = fmt->value;
+    std::string out = static_cast<MXString *>(fmt)->value;
     for (MXObject *elem : argv->args) {
         out += " ";
-        if (auto *s = dynamic_cast<MXString *>(elem)) {
-            out += s->value;
-        } else if (auto *i = dynamic_cast<MXInteger *>(elem)) {
-            out += std::to_string(i->value);
-        } else if (auto *f = dynamic_cast<MXFloat *>(elem)) {
-            out += std::to_string(f->value);
-        } else if (auto *b = dynamic_cast<MXBoolean *>(elem)) {
-            out += b->value ? "true" : "false";
-        } else if (dynamic_cast<MXNil *>(elem)) {
+        const MXTypeInfo *type = elem->get_type_info();
+        if (type == &g_string_type_info) {
+            out += static_cast<MXString *>(elem)->value;
+        } else if (type == &g_integer_type_info) {
+            out += std::to_string(static_cast<MXInteger *>(elem)->value);
+        } else if (type == &g_float_type_info) {
+            out += std::to_string(static_cast<MXFloat *>(elem)->value);
+        } else if (elem == &MX_TRUE || elem == &MX_FALSE) {
+            out += elem == &MX_TRUE ? "true" : "false";
+        } else if (elem == &MX_NIL) {
             out += "nil";
         } else {
             out += elem->repr();
@@ -31,6 +34,6 @@ extern "C" MXS_API MXObject *printf_wrapper(MXObject *format_obj, MXObject *pack
 
     int printed = std::printf("%s", out.c_str());
     std::fflush(stdout);
-    return MXCreateInteger(static_cast<inner_integer>(printed));
+    return tagged::make_int(static_cast<inner_integer>(printed));
 }
 
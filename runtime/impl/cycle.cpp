@@ -0,0 +1,209 @@
+#include "cycle.hpp"
+#include "allocator.hpp"
+#include "object.h"
+#include "tagged.hpp"
+#include <chrono>
+#include <cstdio>
+#include <mutex>
+#include <unordered_map>
+#include <unordered_set>
+#include <vector>
+
+#if MXS_CYCLE_COLLECTOR
+
+namespace mxs_runtime::cycle {
+    namespace {
+        // Created on first use and never destroyed, like the allocator's
+        // state, so objects can be freed while static destructors run
+        struct Buffer {
+            std::mutex mtx;
+            std::unordered_set<MXObject *> candidates;
+            std::size_t threshold = DEFAULT_THRESHOLD;
+            bool collecting = false;
+            MXCycleStats stats{};
+        };
+
+        auto buffer() -> Buffer & {
+            static auto *instance = new Buffer();
+            return *instance;
+        }
+
+        auto allocated_bytes() -> std::size_t {
+            MXAllocatorStats s = MX_ALLOCATOR.stats();
+            return s.bytes_in_use + s.large_bytes;
+        }
+
+        // Tracked objects another object refers to; the rest cannot lead
+        // back into a cycle
+        template<class F>
+        void for_each_tracked(MXObject *obj, F &&f) {
+            obj->visit_references([&](MXObject *child) {
+                if (!tagged::is_tagged(child) && child->holds_references()) { f(child); }
+            });
+        }
+
+        // Trial deletion over the objects reachable from ``roots``; returns
+        // those only referenced from among themselves
+        auto find_garbage(const std::vector<MXObject *> &roots) -> std::vector<MXObject *> {
+            // Each object's count minus the references held by the others
+            std::unordered_map<MXObject *, std::int64_t> external;
+            std::vector<MXObject *> order;
+            std::vector<MXObject *> stack(roots);
+            while (!stack.empty()) {
+                MXObject *obj = stack.back();
+                stack.pop_back();
+                if (!external.emplace(obj, static_cast<std::int64_t>(obj->get_ref_count())).second) {
+                    continue;
+                }
+                order.push_back(obj);
+                for_each_tracked(obj, [&](MXObject *child) { stack.push_back(child); });
+            }
+            for (MXObject *obj : order) {
+                for_each_tracked(obj, [&](MXObject *child) { --external[child]; });
+            }
+
+            // Whatever an externally referenced object reaches is alive
+            for (MXObject *obj : order) {
+                if (external[obj] > 0) { stack.push_back(obj); }
+            }
+            while (!stack.empty()) {
+                MXObject *obj = stack.back();
+                stack.pop_back();
+                for_each_tracked(obj, [&](MXObject *child) {
+                    std::int64_t &count = external[child];
+                    if (count <= 0) {
+                        count = 1;
+                        stack.push_back(child);
+                    }
+                });
+            }
+
+            std::vector<MXObject *> garbage;
+            for (MXObject *obj : order) {
+                if (external[obj] <= 0) { garbage.push_back(obj); }
+            }
+            return garbage;
+        }
+
+        // Holding every object keeps all of them alive while they drop their
+        // references to each other; the last release then frees each one
+        void free_garbage(const std::vector<MXObject *> &garbage) {
+            for (MXObject *obj : garbage) { obj->increase_ref(); }
+            for (MXObject *obj : garbage) { obj->clear_references(); }
+            for (MXObject *obj : garbage) { ::decrease_ref(obj); }
+        }
+    }// namespace
+
+    void possible_root(MXObject *obj) {
+        Buffer &b = buffer();
+        std::lock_guard<std::mutex> lock(b.mtx);
+        b.candidates.insert(obj);
+    }
+
+    void forget(MXObject *obj) {
+        Buffer &b = buffer();
+        std::lock_guard<std::mutex> lock(b.mtx);
+        b.candidates.erase(obj);
+    }
+
+    void maybe_collect() {
+        Buffer &b = buffer();
+        std::size_t limit;
+        {
+            std::lock_guard<std::mutex> lock(b.mtx);
+            if (b.threshold == 0 || b.collecting || b.candidates.size() < b.threshold) {
+                return;
+            }
+            limit = b.threshold;
+        }
+        collect(limit);
+    }
+
+    // The buffer's lock is not held while objects are freed: their
+    // destructors release what they held, which buffers or forgets objects
+    auto collect(std::size_t limit) -> std::size_t {
+        Buffer &b = buffer();
+        std::vector<MXObject *> roots;
+        {
+            std::lock_guard<std::mutex> lock(b.mtx);
+            if (b.collecting) { return 0; }
+            b.collecting = true;
+            auto it = b.candidates.begin();
+            while (it != b.candidates.end() && roots.size() < limit) {
+                roots.push_back(*it);
+                it = b.candidates.erase(it);
+            }
+        }
+        auto start = std::chrono::steady_clock::now();
+        std::size_t bytes_before = allocated_bytes();
+        std::vector<MXObject *> garbage = find_garbage(roots);
+        free_garbage(garbage);
+        std::size_t bytes_after = allocated_bytes();
+        auto ns = static_cast<std::uint64_t>(
+                std::chrono::duration_cast<std::chrono::nanoseconds>(
+                        std::chrono::steady_clock::now() - start)
+                        .count());
+
+        std::lock_guard<std::mutex> lock(b.mtx);
+        b.collecting = false;
+        b.stats.collections += 1;
+        b.stats.candidates += roots.size();
+        b.stats.objects_freed += garbage.size();
+        // Other threads may have allocated in the meantime
+        b.stats.bytes_freed += bytes_before > bytes_after ? bytes_before - bytes_after : 0;
+        b.stats.total_ns += ns;
+        b.stats.last_ns = ns;
+        return garbage.size();
+    }
+
+}// namespace mxs_runtime::cycle
+
+extern "C" MXS_API bool mxs_gc_enabled() { return true; }
+
+extern "C" MXS_API std::size_t mxs_gc_collect() {
+    return mxs_runtime::cycle::collect(SIZE_MAX);
+}
+
+extern "C" MXS_API void mxs_gc_set_threshold(std::size_t threshold) {
+    auto &b = mxs_runtime::cycle::buffer();
+    std::lock_guard<std::mutex> lock(b.mtx);
+    b.threshold = threshold;
+}
+
+extern "C" MXS_API void mxs_gc_stats(mxs_runtime::MXCycleStats *out) {
+    if (!out) { return; }
+    auto &b = mxs_runtime::cycle::buffer();
+    std::lock_guard<std::mutex> lock(b.mtx);
+    *out = b.stats;
+    out->buffered = b.candidates.size();
+    out->threshold = b.threshold;
+}
+
+#else
+
+extern "C" MXS_API bool mxs_gc_enabled() { return false; }
+
+extern "C" MXS_API std::size_t mxs_gc_collect() { return 0; }
+
+extern "C" MXS_API void mxs_gc_set_threshold(std::size_t) {}
+
+extern "C" MXS_API void mxs_gc_stats(mxs_runtime::MXCycleStats *out) {
+    if (out) { *out = mxs_runtime::MXCycleStats{}; }
+}
+
+#endif
+
+extern "C" MXS_API void mxs_gc_dump_stats() {
+    if (!mxs_gc_enabled()) {
+        printf("Cycle collector: off (build with -DMXS_CYCLE_COLLECTOR=ON and "
+               "-DMXS_REFCOUNT=plain)\n");
+        return;
+    }
+    mxs_runtime::MXCycleStats s;
+    mxs_gc_stats(&s);
+    printf("Cycle collector: %zu collections, %.3f ms (last %.3f ms)\n", s.collections,
+           static_cast<double>(s.total_ns) / 1e6, static_cast<double>(s.last_ns) / 1e6);
+    printf("  candidates examined: %zu, buffered: %zu, threshold: %zu\n", s.candidates,
+           s.buffered, s.threshold);
+    printf("  freed: %zu objects in cycles, %zu bytes\n", s.objects_freed, s.bytes_freed);
+}
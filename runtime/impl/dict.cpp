@@ -0,0 +1,254 @@
+#include "allocator.hpp"
+#include "boolean.hpp"
+#include "container.hpp"
+#include "nil.hpp"
+#include "release.hpp"
+#include "tagged.hpp"
+#include "typeinfo.h"
+#include <bit>
+
+namespace {
+    // Whether ``obj`` is a dict; a tagged value has no header to read
+    inline bool is_dict(mxs_runtime::MXObject *obj) {
+        return obj && !mxs_runtime::tagged::is_tagged(obj)
+               && obj->get_type_info() == &mxs_runtime::g_dict_type_info;
+    }
+
+    inline mxs_runtime::MXError *check_dict(mxs_runtime::MXObject *obj) {
+        if (!is_dict(obj)) {
+            return new mxs_runtime::MXError("TypeError", "Argument must be a Dict.");
+        }
+        return nullptr;
+    }
+
+    inline mxs_runtime::MXObject *nil() {
+        return const_cast<mxs_runtime::MXObject *>(
+                reinterpret_cast<const mxs_runtime::MXObject *>(mxs_get_nil()));
+    }
+}// namespace
+
+namespace mxs_runtime {
+
+    const MXTypeInfo g_dict_type_info{ "Dict", nullptr };
+
+    MXDict::MXDict(bool is_static) : MXContainer(&g_dict_type_info, is_static) {
+        hold_references();
+    }
+
+    // Like a list, a large dict leaves its references to the deferred-release
+    // queue
+    MXDict::~MXDict() {
+        std::vector<MXObject *> held = take_references();
+        if (release::should_defer(held.size())) {
+            release::defer(held.data(), held.data() + held.size());
+            return;
+        }
+        for (MXObject *obj : held) { ::decrease_ref(obj); }
+    }
+
+    void MXDict::visit_references(const std::function<void(MXObject *)> &visit) {
+        for (const Entry &entry : items) {
+            if (!entry.key) { continue; }
+            visit(entry.key);
+            visit(entry.value);
+        }
+    }
+
+    void MXDict::clear_references() {
+        for (MXObject *obj : take_references()) { ::decrease_ref(obj); }
+    }
+
+    auto MXDict::take_references() -> std::vector<MXObject *> {
+        std::vector<MXObject *> held;
+        held.reserve(used * 2);
+        for (const Entry &entry : items) {
+            if (!entry.key) { continue; }
+            held.push_back(entry.key);
+            held.push_back(entry.value);
+        }
+        items.clear();
+        slots.clear();
+        used = 0;
+        return held;
+    }
+
+    auto MXDict::length() const -> std::size_t { return used; }
+
+    auto MXDict::contains(const MXObject &key) const -> bool { return get(key) != nullptr; }
+
+    auto MXDict::lookup(const MXObject &key, hash_code_type hash, std::size_t &insert_at) const
+            -> std::size_t {
+        insert_at = NO_SLOT;
+        if (slots.empty()) { return NO_SLOT; }
+        std::size_t mask = slots.size() - 1;
+        std::size_t i = hash & mask;
+        hash_code_type perturb = hash;
+        while (true) {
+            std::int32_t index = slots[i];
+            if (index == EMPTY) {
+                if (insert_at == NO_SLOT) { insert_at = i; }
+                return NO_SLOT;
+            }
+            if (index == REMOVED) {
+                if (insert_at == NO_SLOT) { insert_at = i; }
+            } else {
+                const Entry &entry = items[static_cast<std::size_t>(index)];
+                if (entry.key == &key || (entry.hash == hash && entry.key->equals(key))) {
+                    return i;
+                }
+            }
+            // Every bit of the hash takes part once perturb has shifted out
+            perturb >>= PERTURB_SHIFT;
+            i = (i * 5 + perturb + 1) & mask;
+        }
+    }
+
+    // Keeps at most two thirds of the slots in use, counting removed entries,
+    // so every probe sequence reaches an empty slot
+    void MXDict::rebuild(std::size_t min_used) {
+        if (used != items.size()) {
+            std::erase_if(items, [](const Entry &entry) { return entry.key == nullptr; });
+        }
+        std::size_t size = std::bit_ceil(std::max(MIN_SLOTS, min_used * 3));
+        slots.assign(size, EMPTY);
+        std::size_t mask = size - 1;
+        for (std::size_t index = 0; index < items.size(); ++index) {
+            hash_code_type hash = items[index].hash;
+            std::size_t i = hash & mask;
+            hash_code_type perturb = hash;
+            while (slots[i] != EMPTY) {
+                perturb >>= PERTURB_SHIFT;
+                i = (i * 5 + perturb + 1) & mask;
+            }
+            slots[i] = static_cast<std::int32_t>(index);
+        }
+    }
+
+    // lookup() without tracking where to insert, for reads
+    auto MXDict::get(const MXObject &key) const -> MXObject * {
+        if (slots.empty()) { return nullptr; }
+        hash_code_type hash = key.hash_code();
+        std::size_t mask = slots.size() - 1;
+        std::size_t i = hash & mask;
+        hash_code_type perturb = hash;
+        while (true) {
+            std::int32_t index = slots[i];
+            if (index == EMPTY) { return nullptr; }
+            if (index != REMOVED) {
+                const Entry &entry = items[static_cast<std::size_t>(index)];
+                if (entry.key == &key || (entry.hash == hash && entry.key->equals(key))) {
+                    return entry.value;
+                }
+            }
+            perturb >>= PERTURB_SHIFT;
+            i = (i * 5 + perturb + 1) & mask;
+        }
+    }
+
+    void MXDict::set(MXObject &key, MXObject &value) {
+        hash_code_type hash = key.hash_code();
+        std::size_t insert_at;
+        std::size_t slot = lookup(key, hash, insert_at);
+        ::increase_ref(&value);
+        if (slot != NO_SLOT) {
+            Entry &entry = items[static_cast<std::size_t>(slots[slot])];
+            MXObject *old = entry.value;
+            entry.value = &value;
+            ::decrease_ref(old);
+            return;
+        }
+        if ((items.size() + 1) * 3 > slots.size() * 2) {
+            rebuild(used + 1);
+            lookup(key, hash, insert_at);
+        }
+        ::increase_ref(&key);
+        slots[insert_at] = static_cast<std::int32_t>(items.size());
+        items.push_back(Entry{ hash, &key, &value });
+        ++used;
+    }
+
+    auto MXDict::erase(const MXObject &key) -> bool {
+        std::size_t insert_at;
+        std::size_t slot = lookup(key, key.hash_code(), insert_at);
+        if (slot == NO_SLOT) { return false; }
+        Entry &entry = items[static_cast<std::size_t>(slots[slot])];
+        MXObject *old_key = entry.key;
+        MXObject *old_value = entry.value;
+        slots[slot] = REMOVED;
+        entry.key = nullptr;
+        entry.value = nullptr;
+        --used;
+        ::decrease_ref(old_key);
+        ::decrease_ref(old_value);
+        return true;
+    }
+
+    auto MXDict::op_getitem(const MXObject &key) const -> MXObject * {
+        MXObject *value = get(key);
+        if (!value) { return new MXError("KeyError", key.repr()); }
+        return value;
+    }
+
+    auto MXDict::op_setitem(MXObject &key, MXObject &value) -> MXObject * {
+        set(key, value);
+        return nil();
+    }
+
+    auto MXDict::op_delitem(const MXObject &key) -> MXObject * {
+        if (!erase(key)) { return new MXError("KeyError", key.repr()); }
+        return nil();
+    }
+
+}// namespace mxs_runtime
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+MXS_API mxs_runtime::MXDict *MXCreateDict() {
+    auto *obj = new mxs_runtime::MXDict(false);
+    obj->increase_ref();
+    return obj;
+}
+
+MXS_API mxs_runtime::MXObject *dict_getitem(mxs_runtime::MXObject *dict,
+                                            mxs_runtime::MXObject *key_value) {
+    mxs_runtime::tagged::Arg key(key_value);
+    if (auto *err = check_dict(dict)) return err;
+    auto *d = static_cast<mxs_runtime::MXDict *>(dict);
+    return mxs_runtime::tagged::encode(d->op_getitem(*key.get()));
+}
+
+MXS_API mxs_runtime::MXObject *dict_setitem(mxs_runtime::MXObject *dict,
+                                            mxs_runtime::MXObject *key_value,
+                                            mxs_runtime::MXObject *item) {
+    mxs_runtime::tagged::Arg key(key_value);
+    mxs_runtime::tagged::Arg value(item);
+    if (auto *err = check_dict(dict)) return err;
+    auto *d = static_cast<mxs_runtime::MXDict *>(dict);
+    return mxs_runtime::tagged::encode(d->op_setitem(*key.get(), *value.get()));
+}
+
+MXS_API mxs_runtime::MXObject *dict_delitem(mxs_runtime::MXObject *dict,
+                                            mxs_runtime::MXObject *key_value) {
+    mxs_runtime::tagged::Arg key(key_value);
+    if (auto *err = check_dict(dict)) return err;
+    auto *d = static_cast<mxs_runtime::MXDict *>(dict);
+    return mxs_runtime::tagged::encode(d->op_delitem(*key.get()));
+}
+
+MXS_API mxs_runtime::MXObject *dict_contains(mxs_runtime::MXObject *dict,
+                                             mxs_runtime::MXObject *key_value) {
+    mxs_runtime::tagged::Arg key(key_value);
+    if (auto *err = check_dict(dict)) return err;
+    auto *d = static_cast<mxs_runtime::MXDict *>(dict);
+    auto *result = d->contains(*key.get()) ? &mxs_runtime::MX_TRUE : &mxs_runtime::MX_FALSE;
+    return mxs_runtime::tagged::encode(const_cast<mxs_runtime::MXBoolean *>(result));
+}
+
+MXS_API std::size_t dict_length(mxs_runtime::MXObject *dict) {
+    if (!is_dict(dict)) return 0;
+    return static_cast<mxs_runtime::MXDict *>(dict)->length();
+}
+#ifdef __cplusplus
+}
+#endif
@@ -0,0 +1,83 @@
+#include "dispatch.hpp"
+#include "tagged.hpp"
+#include <atomic>
+#include <memory>
+#include <mutex>
+#include <vector>
+
+namespace mxs_runtime {
+
+    // Constant-initialised, so types may register during static initialisation
+    MXS_API BinaryOpEntry mxs_binary_op_table[BINARY_OP_COUNT][DISPATCH_TYPES][DISPATCH_TYPES] = {};
+
+    namespace {
+        std::mutex sites_mutex;
+        std::vector<std::unique_ptr<InlineCacheSite>> &sites() {
+            static auto *instance = new std::vector<std::unique_ptr<InlineCacheSite>>();
+            return *instance;
+        }
+    }// namespace
+
+    auto register_binary_op(BinaryOp op, const MXTypeInfo &left, const MXTypeInfo &right,
+                            BinaryOpFn fn) -> bool {
+        if (left.id >= DISPATCH_TYPES || right.id >= DISPATCH_TYPES) { return false; }
+        mxs_binary_op_table[static_cast<std::size_t>(op)][left.id][right.id] = {
+            binary_op_key(left.id, right.id), fn
+        };
+        return true;
+    }
+
+    auto apply_binary_op(BinaryOp op, MXObject &left, const MXObject &right) -> MXObject * {
+        if (BinaryOpFn fn = find_binary_op(op, left, right)) { return fn(left, right); }
+        switch (op) {
+            case BinaryOp::Add: return left.op_add(right);
+            case BinaryOp::Sub: return left.op_sub(right);
+            case BinaryOp::Mul: return left.op_mul(right);
+            case BinaryOp::Div: return left.op_div(right);
+            case BinaryOp::Eq: return left.op_eq(right);
+            case BinaryOp::Ne: return left.op_ne(right);
+            case BinaryOp::Lt: return left.op_lt(right);
+            case BinaryOp::Le: return left.op_le(right);
+            case BinaryOp::Gt: return left.op_gt(right);
+            case BinaryOp::Ge: return left.op_ge(right);
+        }
+        return new MXError("TypeError", "unknown operator");
+    }
+
+}// namespace mxs_runtime
+
+extern "C" MXS_API void mxs_inline_cache_update(mxs_runtime::BinaryOpCache *cache,
+                                                std::uint32_t op, mxs_runtime::MXObject *left,
+                                                mxs_runtime::MXObject *right, const char *site) {
+    using namespace mxs_runtime;
+    if (site) {
+        if (!cache->site) {
+            std::lock_guard<std::mutex> lock(sites_mutex);
+            if (!cache->site) {
+                sites().push_back(std::make_unique<InlineCacheSite>(InlineCacheSite{ 0, 0, site }));
+                cache->site = sites().back().get();
+            }
+        }
+        ++cache->site->misses;
+    }
+    if (!left || !right || tagged::is_tagged(left) || tagged::is_tagged(right)) { return; }
+    if (op >= BINARY_OP_COUNT) { return; }
+    std::size_t l = left->get_type_id();
+    std::size_t r = right->get_type_id();
+    if (l >= DISPATCH_TYPES || r >= DISPATCH_TYPES) { return; }
+    const BinaryOpEntry *entry = &mxs_binary_op_table[op][l][r];
+    if (!entry->fn) { return; }
+    // Compiled code loads the entry with acquire ordering
+    std::atomic_ref<const BinaryOpEntry *>(cache->entry).store(entry, std::memory_order_release);
+}
+
+extern "C" MXS_API std::size_t mxs_inline_cache_stats(mxs_runtime::MXInlineCacheStats *out,
+                                                      std::size_t capacity) {
+    using namespace mxs_runtime;
+    std::lock_guard<std::mutex> lock(sites_mutex);
+    const auto &all = sites();
+    for (std::size_t i = 0; i < all.size() && i < capacity; ++i) {
+        out[i] = { all[i]->name.c_str(), all[i]->hits, all[i]->misses };
+    }
+    return all.size();
+}
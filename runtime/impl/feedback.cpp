@@ -0,0 +1,54 @@
+#include "feedback.hpp"
+#include "numeric.hpp"
+#include "tagged.hpp"
+#include <memory>
+#include <mutex>
+#include <vector>
+
+namespace mxs_runtime {
+
+    namespace {
+        std::mutex records_mutex;
+        std::vector<std::unique_ptr<TypeFeedbackRecord>> &records() {
+            static auto *instance = new std::vector<std::unique_ptr<TypeFeedbackRecord>>();
+            return *instance;
+        }
+
+        auto type_of(MXObject *value) -> const MXTypeInfo * {
+            if (tagged::is_int(value)) { return &g_integer_type_info; }
+            // Only integers allocate when decoded
+            bool allocated = false;
+            return tagged::decode(value, allocated)->get_type_info();
+        }
+    }// namespace
+
+}// namespace mxs_runtime
+
+extern "C" MXS_API void mxs_type_feedback_record(mxs_runtime::TypeFeedbackSlot *slot,
+                                                 mxs_runtime::MXObject *value,
+                                                 const char *name) {
+    using namespace mxs_runtime;
+    if (!value) { return; }
+    const MXTypeInfo *type = type_of(value);
+    std::lock_guard<std::mutex> lock(records_mutex);
+    TypeFeedbackRecord *record = slot->record;
+    if (!record) {
+        records().push_back(std::make_unique<TypeFeedbackRecord>(
+                TypeFeedbackRecord{ name ? name : "?", type, false, 0 }));
+        record = slot->record = records().back().get();
+    }
+    record->polymorphic = record->polymorphic || record->type != type;
+    ++record->samples;
+}
+
+extern "C" MXS_API std::size_t mxs_type_feedback(mxs_runtime::MXTypeFeedback *out,
+                                                 std::size_t capacity) {
+    using namespace mxs_runtime;
+    std::lock_guard<std::mutex> lock(records_mutex);
+    const auto &all = records();
+    for (std::size_t i = 0; i < all.size() && i < capacity; ++i) {
+        const char *type = all[i]->polymorphic ? nullptr : all[i]->type->inner_string.c_str();
+        out[i] = { all[i]->name.c_str(), type, all[i]->samples };
+    }
+    return all.size();
+}
@@ -2,6 +2,7 @@
 #include "container.hpp"
 #include "numeric.hpp"
 #include "string.hpp"
+#include "tagged.hpp"
 #include <string>
 
 // This file contains C++ wrappers for FFI functions, such as modern_print_wrapper.
@@ -18,5 +19,5 @@ extern "C" MXS_API auto modern_print_wrapper(mxs_runtime::MXObject *packed_argv)
     }
     std::printf("%s", out.c_str());
     std::fflush(stdout);
-    return MXCreateInteger(static_cast<inner_integer>(argv->args.size()));
+    return tagged::make_int(static_cast<inner_integer>(argv->args.size()));
 }
@@ -5,6 +5,7 @@
 #include "numeric.hpp"
 #include "object.h"
 #include "string.hpp"
+#include "tagged.hpp"
 #include <cstddef>
 #include <cstdio>
 #include <iostream>
@@ -28,19 +29,21 @@ namespace mxs_runtime {
     auto type_of(const MXObject &obj) -> inner_string { return obj.get_type_name(); }
 }
 
-extern "C" auto mxs_print_object_ext(mxs_runtime::MXObject *obj,
-                                     mxs_runtime::MXObject *end)
+extern "C" auto mxs_print_object_ext(mxs_runtime::MXObject *value,
+                                     mxs_runtime::MXObject *end_value)
         -> mxs_runtime::MXObject * {
+    mxs_runtime::tagged::Arg obj(value);
+    mxs_runtime::tagged::Arg end(end_value);
     if (!obj) {
         return new mxs_runtime::MXError("TypeError", "Object argument is null.");
     }
-    if (end && std::string(end->get_type_name()) != "String") {
+    if (end && end->get_type_info() != &mxs_runtime::g_string_type_info) {
         return new mxs_runtime::MXError("TypeError", "end must be a String.");
     }
     auto text = obj->repr();
-    auto *end_str = end ? static_cast<mxs_runtime::MXString *>(end) : nullptr;
+    auto *end_str = end ? static_cast<mxs_runtime::MXString *>(end.get()) : nullptr;
     auto suffix = end_str ? end_str->value : mxs_runtime::inner_string{};
     std::print("{}{}", text, suffix);
-    return const_cast<mxs_runtime::MXObject *>(
-            reinterpret_cast<const mxs_runtime::MXObject *>(mxs_get_nil()));
+    return mxs_runtime::tagged::encode(const_cast<mxs_runtime::MXObject *>(
+            reinterpret_cast<const mxs_runtime::MXObject *>(mxs_get_nil())));
 }
@@ -2,19 +2,25 @@
 #include "allocator.hpp"
 #include "nil.hpp"
 #include "numeric.hpp"
+#include "release.hpp"
+#include "tagged.hpp"
 #include "typeinfo.h"
-#include <string>
+#include <algorithm>
+#include <span>
+#include <type_traits>
 
 namespace {
+    // A tagged value has no header to read the type from
     inline mxs_runtime::MXError *check_list(mxs_runtime::MXObject *obj) {
-        if (!obj || std::string(obj->get_type_name()) != "List") {
+        if (!obj || mxs_runtime::tagged::is_tagged(obj)
+            || obj->get_type_info() != &mxs_runtime::g_list_type_info) {
             return new mxs_runtime::MXError("TypeError", "Argument must be a List.");
         }
         return nullptr;
     }
 
     inline mxs_runtime::MXError *check_int(mxs_runtime::MXObject *obj) {
-        if (!obj || std::string(obj->get_type_name()) != "Integer") {
+        if (!obj || obj->get_type_info() != &mxs_runtime::g_integer_type_info) {
             return new mxs_runtime::MXError("TypeError", "Argument must be an Integer.");
         }
         return nullptr;
@@ -23,17 +29,300 @@ namespace {
 
 namespace mxs_runtime {
 
-    static const MXTypeInfo g_list_type_info{"List", nullptr};
+    const MXTypeInfo g_list_type_info{"List", nullptr};
 
-    MXList::MXList(bool is_static) : MXContainer(&g_list_type_info, is_static) {}
+    namespace {
+        auto nil() -> MXObject * {
+            return const_cast<MXObject *>(reinterpret_cast<const MXObject *>(mxs_get_nil()));
+        }
+
+        auto is_integer(const MXObject &obj) -> bool {
+            return obj.get_type_info() == &g_integer_type_info;
+        }
+
+        auto is_float(const MXObject &obj) -> bool {
+            return obj.get_type_info() == &g_float_type_info;
+        }
+
+        auto integer_value(const MXObject &obj) -> inner_integer {
+            return static_cast<const MXInteger &>(obj).value;
+        }
+
+        auto float_value(const MXObject &obj) -> inner_float {
+            return static_cast<const MXFloat &>(obj).value;
+        }
+
+        // Frees a vector's buffer, which clear() keeps
+        template<typename T>
+        void discard(std::vector<T> &values) {
+            std::vector<T>().swap(values);
+        }
+
+        // Appends ``from``, which may be ``to`` itself
+        template<typename T>
+        void append_copy(std::vector<T> &to, const std::vector<T> &from) {
+            std::size_t size = to.size();
+            std::size_t count = from.size();
+            to.resize(size + count);
+            std::copy_n(from.data(), count, to.data() + size);
+        }
+
+        // Drops one reference to each object, through the deferred-release
+        // queue when there are many
+        void release_all(std::vector<MXObject *> &held) {
+            if (release::should_defer(held.size())) {
+                release::defer(held.data(), held.data() + held.size());
+                return;
+            }
+            for (MXObject *obj : held) { ::decrease_ref(obj); }
+        }
+
+        // Integers if every element is an Integer, Floats if every one is a
+        // Float, Boxed for any other mix and for no elements
+        auto uniform_storage(const std::vector<MXObject *> &elements) -> ListStorage {
+            if (elements.empty()) { return ListStorage::Boxed; }
+            const MXTypeInfo *type = elements.front()->get_type_info();
+            for (MXObject *elem : elements) {
+                if (elem->get_type_info() != type) { return ListStorage::Boxed; }
+            }
+            if (type == &g_integer_type_info) { return ListStorage::Integers; }
+            if (type == &g_float_type_info) { return ListStorage::Floats; }
+            return ListStorage::Boxed;
+        }
+
+        // The values of boxed Integers or Floats, as the Number type says
+        template<typename Number>
+        auto raw_values(const std::vector<MXObject *> &elements)
+                -> std::vector<std::remove_const_t<decltype(Number::value)>> {
+            std::vector<std::remove_const_t<decltype(Number::value)>> values;
+            values.reserve(elements.size());
+            for (MXObject *elem : elements) { values.push_back(static_cast<Number *>(elem)->value); }
+            return values;
+        }
+
+        template<typename T>
+        void repeat(std::vector<T> &out, const std::vector<T> &values, inner_integer count) {
+            out.reserve(values.size() * static_cast<std::size_t>(count));
+            for (inner_integer i = 0; i < count; ++i) { out.insert(out.end(), values.begin(), values.end()); }
+        }
+
+        // The elements of a list as raw numbers of one kind: a view of a
+        // specialised list's buffer, or a converted copy of a boxed list's
+        struct Numbers {
+            ListStorage kind = ListStorage::Integers;
+            std::span<const inner_integer> integers;
+            std::span<const inner_float> floats;
+            std::vector<inner_integer> integer_copy;
+            std::vector<inner_float> float_copy;
+
+            Numbers() = default;
+            Numbers(const Numbers &) = delete;
+            auto operator=(const Numbers &) -> Numbers & = delete;
+
+            auto size() const -> std::size_t {
+                return kind == ListStorage::Integers ? integers.size() : floats.size();
+            }
+
+            // Converts integers to floats, for mixing them with floats
+            void widen() {
+                if (kind == ListStorage::Floats) { return; }
+                float_copy.assign(integers.begin(), integers.end());
+                floats = float_copy;
+                kind = ListStorage::Floats;
+            }
+        };
+
+        // False if a boxed list holds anything but Integers and Floats;
+        // Integers mixed with Floats are read as Floats
+        auto read_numbers(const MXList &list, Numbers &out) -> bool {
+            if (list.storage == ListStorage::Integers) {
+                out.kind = ListStorage::Integers;
+                out.integers = list.integers;
+                return true;
+            }
+            if (list.storage == ListStorage::Floats) {
+                out.kind = ListStorage::Floats;
+                out.floats = list.floats;
+                return true;
+            }
+            bool any_float = false;
+            for (MXObject *elem : list.elements) {
+                if (is_float(*elem)) {
+                    any_float = true;
+                } else if (!is_integer(*elem)) {
+                    return false;
+                }
+            }
+            if (!any_float) {
+                out.integer_copy = raw_values<MXInteger>(list.elements);
+                out.integers = out.integer_copy;
+                out.kind = ListStorage::Integers;
+                return true;
+            }
+            out.float_copy.reserve(list.elements.size());
+            for (MXObject *elem : list.elements) {
+                out.float_copy.push_back(is_float(*elem) ? float_value(*elem)
+                                                         : static_cast<inner_float>(integer_value(*elem)));
+            }
+            out.floats = out.float_copy;
+            out.kind = ListStorage::Floats;
+            return true;
+        }
+
+        auto not_numbers() -> MXObject * {
+            return new MXError("TypeError", "List elements must be numbers");
+        }
 
-    MXList::~MXList() {
-        for (MXObject *elem : elements) { ::decrease_ref(elem); }
+        // The kernels below are plain loops over contiguous buffers, which the
+        // compiler vectorises.  A sum keeps eight partial sums: one running
+        // total of floats could not be reordered into vector lanes.
+        template<typename T>
+        auto sum_of(std::span<const T> values) -> T {
+            constexpr std::size_t LANES = 8;
+            T lanes[LANES] = {};
+            std::size_t i = 0;
+            for (; i + LANES <= values.size(); i += LANES) {
+                for (std::size_t j = 0; j < LANES; ++j) { lanes[j] += values[i + j]; }
+            }
+            T total = 0;
+            for (T lane : lanes) { total += lane; }
+            for (; i < values.size(); ++i) { total += values[i]; }
+            return total;
+        }
+
+        template<typename T>
+        auto min_of(std::span<const T> values) -> T {
+            T best = values[0];
+            for (T value : values) { best = value < best ? value : best; }
+            return best;
+        }
+
+        template<typename T>
+        auto max_of(std::span<const T> values) -> T {
+            T best = values[0];
+            for (T value : values) { best = value > best ? value : best; }
+            return best;
+        }
+
+        template<typename T>
+        void add_into(std::vector<T> &out, std::span<const T> left, std::span<const T> right) {
+            out.resize(left.size());
+            T *dst = out.data();
+            for (std::size_t i = 0; i < left.size(); ++i) { dst[i] = left[i] + right[i]; }
+        }
+
+        template<typename T>
+        void scale_into(std::vector<T> &out, std::span<const T> values, T factor) {
+            out.resize(values.size());
+            T *dst = out.data();
+            for (std::size_t i = 0; i < values.size(); ++i) { dst[i] = values[i] * factor; }
+        }
+    }// namespace
+
+    MXList::MXList(bool is_static) : MXContainer(&g_list_type_info, is_static) {
+        hold_references();
     }
 
-    auto MXList::length() const -> std::size_t { return elements.size(); }
+    // A large list hands its elements to the deferred-release queue rather
+    // than freeing everything they reach now
+    MXList::~MXList() { release_all(elements); }
+
+    void MXList::visit_references(const std::function<void(MXObject *)> &visit) {
+        for (MXObject *elem : elements) { visit(elem); }
+    }
+
+    void MXList::clear_references() {
+        std::vector<MXObject *> held;
+        held.swap(elements);
+        for (MXObject *elem : held) { ::decrease_ref(elem); }
+    }
+
+    auto MXList::length() const -> std::size_t {
+        switch (storage) {
+            case ListStorage::Integers:
+                return integers.size();
+            case ListStorage::Floats:
+                return floats.size();
+            case ListStorage::Boxed:
+                break;
+        }
+        return elements.size();
+    }
+
+    auto MXList::item(std::size_t i) const -> MXObject * {
+        switch (storage) {
+            case ListStorage::Integers:
+                return MXCreateInteger(integers[i]);
+            case ListStorage::Floats:
+                return MXCreateFloat(floats[i]);
+            case ListStorage::Boxed:
+                break;
+        }
+        return elements[i];
+    }
+
+    auto MXList::retain_item(std::size_t i) const -> MXObject * {
+        MXObject *obj = item(i);
+        ::increase_ref(obj);
+        return obj;
+    }
+
+    void MXList::box() {
+        if (storage == ListStorage::Boxed) { return; }
+        std::vector<MXObject *> boxed;
+        boxed.reserve(length());
+        for (std::size_t i = 0; i < length(); ++i) { boxed.push_back(retain_item(i)); }
+        elements.swap(boxed);
+        discard(integers);
+        discard(floats);
+        storage = ListStorage::Boxed;
+    }
+
+    auto MXList::specialize() -> bool {
+        if (storage != ListStorage::Boxed) { return true; }
+        ListStorage kind = uniform_storage(elements);
+        if (kind == ListStorage::Integers) {
+            integers = raw_values<MXInteger>(elements);
+        } else if (kind == ListStorage::Floats) {
+            floats = raw_values<MXFloat>(elements);
+        } else {
+            return false;
+        }
+        std::vector<MXObject *> held;
+        held.swap(elements);
+        storage = kind;
+        release_all(held);
+        return true;
+    }
+
+    auto MXList::stores_raw(const MXObject &value) const -> bool {
+        return (storage == ListStorage::Integers && is_integer(value))
+               || (storage == ListStorage::Floats && is_float(value));
+    }
+
+    auto MXList::find_raw(const MXObject &value) const -> std::size_t {
+        auto position = [this](auto first, auto last, auto pred) {
+            return static_cast<std::size_t>(std::find_if(first, last, pred) - first);
+        };
+        if (!is_integer(value) && !is_float(value)) { return length(); }
+        // Integers and Floats of the same value are equal
+        inner_float number = is_float(value) ? float_value(value)
+                                             : static_cast<inner_float>(integer_value(value));
+        if (storage == ListStorage::Integers) {
+            if (is_integer(value)) {
+                inner_integer wanted = integer_value(value);
+                return position(integers.begin(), integers.end(),
+                                [wanted](inner_integer v) { return v == wanted; });
+            }
+            return position(integers.begin(), integers.end(), [number](inner_integer v) {
+                return static_cast<inner_float>(v) == number;
+            });
+        }
+        return position(floats.begin(), floats.end(), [number](inner_float v) { return v == number; });
+    }
 
     auto MXList::contains(const MXObject &obj) const -> bool {
+        if (storage != ListStorage::Boxed) { return find_raw(obj) < length(); }
         for (MXObject *e : elements) {
             if (e->equals(&obj)) return true;
         }
@@ -43,13 +332,32 @@ namespace mxs_runtime {
     auto MXList::append(MXObject &value) -> MXObject * { return op_append(value); }
 
     auto MXList::op_append(MXObject &value) -> MXObject * {
+        if (stores_raw(value)) {
+            if (storage == ListStorage::Integers) {
+                integers.push_back(integer_value(value));
+            } else {
+                floats.push_back(float_value(value));
+            }
+            return nil();
+        }
+        box();
         ::increase_ref(&value);
         elements.push_back(&value);
-        return const_cast<MXObject *>(reinterpret_cast<const MXObject *>(mxs_get_nil()));
+        return nil();
     }
 
+    // The caller receives the list's reference to the element
     auto MXList::pop() -> MXObject * {
-        if (elements.empty()) { return new MXError("IndexError", "pop from empty list"); }
+        if (length() == 0) { return new MXError("IndexError", "pop from empty list"); }
+        if (storage != ListStorage::Boxed) {
+            MXObject *obj = retain_item(length() - 1);
+            if (storage == ListStorage::Integers) {
+                integers.pop_back();
+            } else {
+                floats.pop_back();
+            }
+            return obj;
+        }
         MXObject *obj = elements.back();
         ::increase_ref(obj);
         elements.pop_back();
@@ -58,94 +366,244 @@ namespace mxs_runtime {
     }
 
     auto MXList::extend(const MXList &other) -> MXObject * {
-        for (MXObject *elem : other.elements) {
-            ::increase_ref(elem);
-            elements.push_back(elem);
+        if (other.length() == 0) { return nil(); }
+        // An empty boxed list takes on the storage of what it is extended with
+        if (storage == ListStorage::Boxed && elements.empty()) { storage = other.storage; }
+        if (storage != ListStorage::Boxed && storage == other.storage) {
+            if (storage == ListStorage::Integers) {
+                append_copy(integers, other.integers);
+            } else {
+                append_copy(floats, other.floats);
+            }
+            return nil();
         }
-        return const_cast<MXObject *>(reinterpret_cast<const MXObject *>(mxs_get_nil()));
+        box();
+        std::size_t count = other.length();
+        elements.reserve(elements.size() + count);
+        for (std::size_t i = 0; i < count; ++i) { elements.push_back(other.retain_item(i)); }
+        return nil();
     }
 
     auto MXList::index_of(const MXObject &value) const -> MXObject * {
+        if (storage != ListStorage::Boxed) {
+            std::size_t i = find_raw(value);
+            if (i < length()) { return MXCreateInteger(static_cast<inner_integer>(i)); }
+            return nil();
+        }
         for (std::size_t i = 0; i < elements.size(); ++i) {
             if (elements[i]->equals(&value)) {
                 return MXCreateInteger(static_cast<inner_integer>(i));
             }
         }
-        return const_cast<MXObject *>(reinterpret_cast<const MXObject *>(mxs_get_nil()));
+        return nil();
     }
 
     auto MXList::insert(inner_integer index, MXObject &value) -> MXObject * {
-        if (index < 0 || index > static_cast<inner_integer>(elements.size())) {
+        if (index < 0 || index > static_cast<inner_integer>(length())) {
             return new MXError("IndexError", "list index out of range");
         }
+        if (stores_raw(value)) {
+            if (storage == ListStorage::Integers) {
+                integers.insert(integers.begin() + index, integer_value(value));
+            } else {
+                floats.insert(floats.begin() + index, float_value(value));
+            }
+            return nil();
+        }
+        box();
         ::increase_ref(&value);
         elements.insert(elements.begin() + index, &value);
-        return const_cast<MXObject *>(reinterpret_cast<const MXObject *>(mxs_get_nil()));
+        return nil();
     }
 
     auto MXList::remove(const MXObject &value) -> MXObject * {
+        if (storage != ListStorage::Boxed) {
+            std::size_t i = find_raw(value);
+            if (i == length()) { return new MXError("ValueError", "value not found in list"); }
+            if (storage == ListStorage::Integers) {
+                integers.erase(integers.begin() + static_cast<std::ptrdiff_t>(i));
+            } else {
+                floats.erase(floats.begin() + static_cast<std::ptrdiff_t>(i));
+            }
+            return nil();
+        }
         for (auto it = elements.begin(); it != elements.end(); ++it) {
             if ((*it)->equals(&value)) {
                 MXObject *old = *it;
                 elements.erase(it);
                 ::decrease_ref(old);
-                return const_cast<MXObject *>(reinterpret_cast<const MXObject *>(mxs_get_nil()));
+                return nil();
             }
         }
         return new MXError("ValueError", "value not found in list");
     }
 
+    auto MXList::sum() const -> MXObject * {
+        Numbers numbers;
+        if (!read_numbers(*this, numbers)) { return not_numbers(); }
+        if (numbers.kind == ListStorage::Integers) { return MXCreateInteger(sum_of(numbers.integers)); }
+        return MXCreateFloat(sum_of(numbers.floats));
+    }
+
+    auto MXList::min() const -> MXObject * {
+        Numbers numbers;
+        if (!read_numbers(*this, numbers)) { return not_numbers(); }
+        if (numbers.size() == 0) { return new MXError("ValueError", "min() of empty list"); }
+        if (numbers.kind == ListStorage::Integers) { return MXCreateInteger(min_of(numbers.integers)); }
+        return MXCreateFloat(min_of(numbers.floats));
+    }
+
+    auto MXList::max() const -> MXObject * {
+        Numbers numbers;
+        if (!read_numbers(*this, numbers)) { return not_numbers(); }
+        if (numbers.size() == 0) { return new MXError("ValueError", "max() of empty list"); }
+        if (numbers.kind == ListStorage::Integers) { return MXCreateInteger(max_of(numbers.integers)); }
+        return MXCreateFloat(max_of(numbers.floats));
+    }
+
+    auto MXList::add_elementwise(const MXList &other) const -> MXObject * {
+        Numbers left;
+        Numbers right;
+        if (!read_numbers(*this, left) || !read_numbers(other, right)) { return not_numbers(); }
+        if (left.size() != right.size()) {
+            return new MXError("ValueError", "lists differ in length");
+        }
+        auto *result = new MXList(false);
+        if (left.kind == ListStorage::Integers && right.kind == ListStorage::Integers) {
+            result->storage = ListStorage::Integers;
+            add_into(result->integers, left.integers, right.integers);
+            return result;
+        }
+        left.widen();
+        right.widen();
+        result->storage = ListStorage::Floats;
+        add_into(result->floats, left.floats, right.floats);
+        return result;
+    }
+
+    auto MXList::scale(const MXObject &factor) const -> MXObject * {
+        if (!is_integer(factor) && !is_float(factor)) {
+            return new MXError("TypeError", "can't scale List by non-number");
+        }
+        Numbers numbers;
+        if (!read_numbers(*this, numbers)) { return not_numbers(); }
+        auto *result = new MXList(false);
+        if (numbers.kind == ListStorage::Integers && is_integer(factor)) {
+            result->storage = ListStorage::Integers;
+            scale_into(result->integers, numbers.integers, integer_value(factor));
+            return result;
+        }
+        numbers.widen();
+        inner_float by = is_float(factor) ? float_value(factor)
+                                          : static_cast<inner_float>(integer_value(factor));
+        result->storage = ListStorage::Floats;
+        scale_into(result->floats, numbers.floats, by);
+        return result;
+    }
+
+    auto MXList::fill(MXObject &value) -> MXObject * {
+        std::size_t count = length();
+        std::vector<MXObject *> held;
+        held.swap(elements);
+        discard(integers);
+        discard(floats);
+        if (is_integer(value)) {
+            storage = ListStorage::Integers;
+            integers.assign(count, integer_value(value));
+        } else if (is_float(value)) {
+            storage = ListStorage::Floats;
+            floats.assign(count, float_value(value));
+        } else {
+            storage = ListStorage::Boxed;
+            elements.assign(count, &value);
+            for (std::size_t i = 0; i < count; ++i) { ::increase_ref(&value); }
+        }
+        release_all(held);
+        return nil();
+    }
+
     auto MXList::op_getitem(const MXObject &key) const -> MXObject * {
-        if (std::string(key.get_type_name()) != "Integer") {
+        if (key.get_type_info() != &g_integer_type_info) {
             return new MXError("TypeError", "index must be int");
         }
         auto idx = static_cast<const MXInteger &>(key).value;
-        if (idx < 0 || static_cast<std::size_t>(idx) >= elements.size()) {
+        if (idx < 0 || static_cast<std::size_t>(idx) >= length()) {
             return new MXError("IndexError", "list index out of range");
         }
-        return elements[static_cast<std::size_t>(idx)];
+        return item(static_cast<std::size_t>(idx));
     }
 
     auto MXList::op_setitem(const MXObject &key, MXObject &value) -> MXObject * {
-        if (std::string(key.get_type_name()) != "Integer") {
+        if (key.get_type_info() != &g_integer_type_info) {
             return new MXError("TypeError", "index must be int");
         }
         auto idx = static_cast<const MXInteger &>(key).value;
-        if (idx < 0 || static_cast<std::size_t>(idx) >= elements.size()) {
+        if (idx < 0 || static_cast<std::size_t>(idx) >= length()) {
             return new MXError("IndexError", "list assignment index out of range");
         }
         std::size_t i = static_cast<std::size_t>(idx);
+        if (stores_raw(value)) {
+            if (storage == ListStorage::Integers) {
+                integers[i] = integer_value(value);
+            } else {
+                floats[i] = float_value(value);
+            }
+            return nil();
+        }
+        box();
         MXObject *old = elements[i];
         ::increase_ref(&value);
         elements[i] = &value;
         ::decrease_ref(old);
-        return const_cast<MXObject *>(reinterpret_cast<const MXObject *>(mxs_get_nil()));
+        return nil();
     }
 
     auto MXList::op_add(const MXObject &other) -> MXObject * {
-        if (std::string(other.get_type_name()) != "List") {
+        if (other.get_type_info() != &g_list_type_info) {
             return new MXError("TypeError", "can only concatenate List to List");
         }
         const auto &r = static_cast<const MXList &>(other);
         MXList *result = new MXList(false);
-        for (MXObject *e : elements) {
-            ::increase_ref(e);
-            result->elements.push_back(e);
-        }
-        for (MXObject *e : r.elements) {
-            ::increase_ref(e);
-            result->elements.push_back(e);
+        if (storage != ListStorage::Boxed && storage == r.storage) {
+            result->storage = storage;
+            if (storage == ListStorage::Integers) {
+                append_copy(result->integers, integers);
+                append_copy(result->integers, r.integers);
+            } else {
+                append_copy(result->floats, floats);
+                append_copy(result->floats, r.floats);
+            }
+            return result;
         }
+        result->elements.reserve(length() + r.length());
+        for (std::size_t i = 0; i < length(); ++i) { result->elements.push_back(retain_item(i)); }
+        for (std::size_t i = 0; i < r.length(); ++i) { result->elements.push_back(r.retain_item(i)); }
         return result;
     }
 
+    // Repeating a list of Integers only, or Floats only, gives a specialised
+    // list whatever the storage of this one
     auto MXList::op_mul(const MXObject &other) -> MXObject * {
-        if (other.type_info != &g_integer_type_info) {
+        if (other.get_type_info() != &g_integer_type_info) {
             return new MXError("TypeError", "can't multiply List by non-int");
         }
         inner_integer count = static_cast<const MXInteger &>(other).value;
         MXList *result = new MXList(false);
         if (count <= 0) { return result; }
+        ListStorage kind = storage == ListStorage::Boxed ? uniform_storage(elements) : storage;
+        if (kind == ListStorage::Integers) {
+            result->storage = kind;
+            repeat(result->integers,
+                   storage == ListStorage::Boxed ? raw_values<MXInteger>(elements) : integers, count);
+            return result;
+        }
+        if (kind == ListStorage::Floats) {
+            result->storage = kind;
+            repeat(result->floats,
+                   storage == ListStorage::Boxed ? raw_values<MXFloat>(elements) : floats, count);
+            return result;
+        }
+        result->elements.reserve(elements.size() * static_cast<std::size_t>(count));
         for (inner_integer i = 0; i < count; ++i) {
             for (MXObject *e : elements) {
                 ::increase_ref(e);
@@ -166,45 +624,145 @@ MXS_API mxs_runtime::MXList *MXCreateList() {
     return obj;
 }
 
+MXS_API mxs_runtime::MXList *MXCreateIntegerList(const mxs_runtime::inner_integer *values,
+                                                 std::size_t count) {
+    auto *obj = new mxs_runtime::MXList(false);
+    obj->storage = mxs_runtime::ListStorage::Integers;
+    obj->integers.assign(values, values + count);
+    obj->increase_ref();
+    return obj;
+}
+
+MXS_API mxs_runtime::MXList *MXCreateFloatList(const mxs_runtime::inner_float *values,
+                                               std::size_t count) {
+    auto *obj = new mxs_runtime::MXList(false);
+    obj->storage = mxs_runtime::ListStorage::Floats;
+    obj->floats.assign(values, values + count);
+    obj->increase_ref();
+    return obj;
+}
+
 MXS_API mxs_runtime::MXObject *list_getitem(mxs_runtime::MXObject *list,
-                                            mxs_runtime::MXObject *index) {
+                                            mxs_runtime::MXObject *index_value) {
+    mxs_runtime::tagged::Arg index(index_value);
     if (auto *err = check_list(list)) return err;
     if (auto *err = check_int(index)) return err;
     auto *l = static_cast<mxs_runtime::MXList *>(list);
-    return l->op_getitem(*index);
+    return mxs_runtime::tagged::encode(l->op_getitem(*index.get()));
 }
 
 MXS_API mxs_runtime::MXObject *list_setitem(mxs_runtime::MXObject *list,
-                                            mxs_runtime::MXObject *index,
-                                            mxs_runtime::MXObject *value) {
+                                            mxs_runtime::MXObject *index_value,
+                                            mxs_runtime::MXObject *item) {
+    mxs_runtime::tagged::Arg index(index_value);
+    mxs_runtime::tagged::Arg value(item);
     if (auto *err = check_list(list)) return err;
     if (auto *err = check_int(index)) return err;
     auto *l = static_cast<mxs_runtime::MXList *>(list);
-    return l->op_setitem(*index, *value);
+    return mxs_runtime::tagged::encode(l->op_setitem(*index.get(), *value.get()));
 }
 
 MXS_API mxs_runtime::MXObject *list_append(mxs_runtime::MXObject *list,
-                                           mxs_runtime::MXObject *value) {
+                                           mxs_runtime::MXObject *item) {
+    mxs_runtime::tagged::Arg value(item);
     if (auto *err = check_list(list)) return err;
     auto *l = static_cast<mxs_runtime::MXList *>(list);
-    return l->op_append(*value);
+    return mxs_runtime::tagged::encode(l->op_append(*value.get()));
+}
+
+MXS_API std::size_t list_length(mxs_runtime::MXObject *list) {
+    if (!list || mxs_runtime::tagged::is_tagged(list)
+        || list->get_type_info() != &mxs_runtime::g_list_type_info)
+        return 0;
+    return static_cast<mxs_runtime::MXList *>(list)->length();
+}
+
+MXS_API const char *list_storage(mxs_runtime::MXObject *list) {
+    if (!list || mxs_runtime::tagged::is_tagged(list)
+        || list->get_type_info() != &mxs_runtime::g_list_type_info)
+        return nullptr;
+    switch (static_cast<mxs_runtime::MXList *>(list)->storage) {
+        case mxs_runtime::ListStorage::Integers:
+            return "int";
+        case mxs_runtime::ListStorage::Floats:
+            return "float";
+        case mxs_runtime::ListStorage::Boxed:
+            break;
+    }
+    return "boxed";
+}
+
+MXS_API mxs_runtime::MXObject *list_specialize(mxs_runtime::MXObject *list) {
+    if (auto *err = check_list(list)) return err;
+    bool specialized = static_cast<mxs_runtime::MXList *>(list)->specialize();
+    auto *result = specialized ? &mxs_runtime::MX_TRUE : &mxs_runtime::MX_FALSE;
+    return mxs_runtime::tagged::encode(const_cast<mxs_runtime::MXBoolean *>(result));
+}
+
+MXS_API mxs_runtime::MXObject *list_sum(mxs_runtime::MXObject *list) {
+    if (auto *err = check_list(list)) return err;
+    return mxs_runtime::tagged::encode(static_cast<mxs_runtime::MXList *>(list)->sum());
+}
+
+MXS_API mxs_runtime::MXObject *list_min(mxs_runtime::MXObject *list) {
+    if (auto *err = check_list(list)) return err;
+    return mxs_runtime::tagged::encode(static_cast<mxs_runtime::MXList *>(list)->min());
+}
+
+MXS_API mxs_runtime::MXObject *list_max(mxs_runtime::MXObject *list) {
+    if (auto *err = check_list(list)) return err;
+    return mxs_runtime::tagged::encode(static_cast<mxs_runtime::MXList *>(list)->max());
+}
+
+MXS_API mxs_runtime::MXObject *list_add_elementwise(mxs_runtime::MXObject *left,
+                                                    mxs_runtime::MXObject *right) {
+    if (auto *err = check_list(left)) return err;
+    if (auto *err = check_list(right)) return err;
+    auto *l = static_cast<mxs_runtime::MXList *>(left);
+    return l->add_elementwise(*static_cast<mxs_runtime::MXList *>(right));
+}
+
+MXS_API mxs_runtime::MXObject *list_scale(mxs_runtime::MXObject *list,
+                                          mxs_runtime::MXObject *factor_value) {
+    mxs_runtime::tagged::Arg factor(factor_value);
+    if (auto *err = check_list(list)) return err;
+    return static_cast<mxs_runtime::MXList *>(list)->scale(*factor.get());
+}
+
+MXS_API mxs_runtime::MXObject *list_fill(mxs_runtime::MXObject *list,
+                                         mxs_runtime::MXObject *item) {
+    mxs_runtime::tagged::Arg value(item);
+    if (auto *err = check_list(list)) return err;
+    auto *l = static_cast<mxs_runtime::MXList *>(list);
+    return mxs_runtime::tagged::encode(l->fill(*value.get()));
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_getitem(mxs_runtime::MXObject *container,
-                                              mxs_runtime::MXObject *key) {
+                                              mxs_runtime::MXObject *key_value) {
+    if (container && !mxs_runtime::tagged::is_tagged(container)
+        && container->get_type_info() == &mxs_runtime::g_dict_type_info) {
+        return dict_getitem(container, key_value);
+    }
+    mxs_runtime::tagged::Arg key(key_value);
     if (auto *err = check_list(container)) return err;
     if (auto *err = check_int(key)) return err;
     auto *l = static_cast<mxs_runtime::MXList *>(container);
-    return l->op_getitem(*key);
+    return mxs_runtime::tagged::encode(l->op_getitem(*key.get()));
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_setitem(mxs_runtime::MXObject *container,
-                                              mxs_runtime::MXObject *key,
-                                              mxs_runtime::MXObject *value) {
+                                              mxs_runtime::MXObject *key_value,
+                                              mxs_runtime::MXObject *item) {
+    if (container && !mxs_runtime::tagged::is_tagged(container)
+        && container->get_type_info() == &mxs_runtime::g_dict_type_info) {
+        return dict_setitem(container, key_value, item);
+    }
+    mxs_runtime::tagged::Arg key(key_value);
+    mxs_runtime::tagged::Arg value(item);
     if (auto *err = check_list(container)) return err;
     if (auto *err = check_int(key)) return err;
     auto *l = static_cast<mxs_runtime::MXList *>(container);
-    return l->op_setitem(*key, *value);
+    return mxs_runtime::tagged::encode(l->op_setitem(*key.get(), *value.get()));
 }
 #ifdef __cplusplus
 }
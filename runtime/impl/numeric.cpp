@@ -1,160 +1,193 @@
 #include "numeric.hpp"
 #include "allocator.hpp"
+#include "dispatch.hpp"
+#include "tagged.hpp"
 #include "typeinfo.h"
+#include <bit>
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
 #include <format>
+#include <new>
 #include <string>
+#include <type_traits>
+#include <utility>
 
 namespace mxs_runtime {
 
 
     static const MXTypeInfo g_numeric_type_info{ "Numeric", nullptr };
     MXS_API const MXTypeInfo g_integer_type_info{ "Integer", &g_numeric_type_info };
-    static const MXTypeInfo g_float_type_info{ "Float", &g_numeric_type_info };
+    const MXTypeInfo g_float_type_info{ "Float", &g_numeric_type_info };
+
+    namespace {
+        constexpr inner_integer SMALL_INT_MIN = MXS_SMALL_INT_MIN;
+        constexpr inner_integer SMALL_INT_MAX = MXS_SMALL_INT_MAX;
+        constexpr std::size_t SMALL_INT_COUNT =
+                SMALL_INT_MAX >= SMALL_INT_MIN
+                        ? static_cast<std::size_t>(SMALL_INT_MAX - SMALL_INT_MIN + 1)
+                        : 0;
+
+        // Immortal integers returned by MXCreateInteger.  They are built when
+        // the runtime is loaded (after g_integer_type_info, defined above) and
+        // never destroyed, so code running during shutdown can still use them.
+        alignas(MXInteger) unsigned char
+                small_int_storage[(SMALL_INT_COUNT > 0 ? SMALL_INT_COUNT : 1) * sizeof(MXInteger)];
+
+        auto small_int(inner_integer value) -> MXInteger * {
+            auto index = static_cast<std::size_t>(value - SMALL_INT_MIN);
+            return reinterpret_cast<MXInteger *>(small_int_storage) + index;
+        }
+
+        [[maybe_unused]] const bool small_ints_ready = [] {
+            for (std::size_t i = 0; i < SMALL_INT_COUNT; ++i) {
+                auto value = SMALL_INT_MIN + static_cast<inner_integer>(i);
+                ::new (small_int(value)) MXInteger(value, true);
+            }
+            return true;
+        }();
+    }// namespace
 
     MXNumeric::MXNumeric(const MXTypeInfo *info, bool is_static)
         : MXObject(info, is_static) { }
 
-    MXInteger::MXInteger(inner_integer v)
-        : MXNumeric(&g_integer_type_info, false), value(v) { }
+    MXInteger::MXInteger(inner_integer v, bool is_static)
+        : MXNumeric(&g_integer_type_info, is_static), value(v) {
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Winvalid-offsetof"
+        static_assert(offsetof(MXInteger, value) == VALUE_OFFSET);
+#pragma GCC diagnostic pop
+    }
 
     auto MXInteger::to_string() const -> inner_string { return std::format("{}", value); }
 
-    MXFloat::MXFloat(inner_float v) : MXNumeric(&g_float_type_info, false), value(v) { }
+    MXFloat::MXFloat(inner_float v) : MXNumeric(&g_float_type_info, false), value(v) {
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Winvalid-offsetof"
+        static_assert(offsetof(MXFloat, value) == VALUE_OFFSET);
+#pragma GCC diagnostic pop
+    }
 
     auto MXFloat::to_string() const -> inner_string { return std::format("{}", value); }
 
+    namespace {
+        auto make_number(inner_integer value) -> MXObject * { return MXCreateInteger(value); }
+        auto make_number(inner_float value) -> MXObject * { return MXCreateFloat(value); }
+
+        auto make_boolean(bool value) -> MXObject * {
+            return const_cast<MXBoolean *>(value ? &MX_TRUE : &MX_FALSE);
+        }
+
+        // ``op`` on an L and an R; mixed operands are computed as floats
+        template<typename L, typename R, BinaryOp op>
+        auto numeric_op(MXObject &left, const MXObject &right) -> MXObject * {
+            using Value = std::conditional_t<
+                    std::is_same_v<L, MXInteger> && std::is_same_v<R, MXInteger>, inner_integer,
+                    inner_float>;
+            auto a = static_cast<Value>(static_cast<const L &>(left).value);
+            auto b = static_cast<Value>(static_cast<const R &>(right).value);
+            if constexpr (op == BinaryOp::Add) {
+                return make_number(a + b);
+            } else if constexpr (op == BinaryOp::Sub) {
+                return make_number(a - b);
+            } else if constexpr (op == BinaryOp::Mul) {
+                return make_number(a * b);
+            } else if constexpr (op == BinaryOp::Div) {
+                if (b == 0) return new MXError("ZeroDivisionError");
+                return make_number(a / b);
+            } else if constexpr (op == BinaryOp::Eq) {
+                return make_boolean(a == b);
+            } else if constexpr (op == BinaryOp::Ne) {
+                return make_boolean(a != b);
+            } else if constexpr (op == BinaryOp::Lt) {
+                return make_boolean(a < b);
+            } else if constexpr (op == BinaryOp::Le) {
+                return make_boolean(a <= b);
+            } else if constexpr (op == BinaryOp::Gt) {
+                return make_boolean(a > b);
+            } else {
+                return make_boolean(a >= b);
+            }
+        }
+
+        template<typename L, typename R, std::size_t... ops>
+        void register_numeric_ops(const MXTypeInfo &left, const MXTypeInfo &right,
+                                  std::index_sequence<ops...>) {
+            (register_binary_op(static_cast<BinaryOp>(ops), left, right,
+                                numeric_op<L, R, static_cast<BinaryOp>(ops)>),
+             ...);
+        }
+
+        // Runs after the type infos above are constructed
+        [[maybe_unused]] const bool numeric_ops_ready = [] {
+            constexpr auto all = std::make_index_sequence<BINARY_OP_COUNT>{};
+            register_numeric_ops<MXInteger, MXInteger>(g_integer_type_info, g_integer_type_info, all);
+            register_numeric_ops<MXInteger, MXFloat>(g_integer_type_info, g_float_type_info, all);
+            register_numeric_ops<MXFloat, MXInteger>(g_float_type_info, g_integer_type_info, all);
+            register_numeric_ops<MXFloat, MXFloat>(g_float_type_info, g_float_type_info, all);
+            return true;
+        }();
+
+        // The virtual operators of numbers share the table's implementations
+        auto numeric(BinaryOp op, const char *symbol, MXObject &self, const MXObject &other)
+                -> MXObject * {
+            if (BinaryOpFn fn = find_binary_op(op, self, other)) { return fn(self, other); }
+            return new MXError(std::format("TypeError: unsupported '{}' operands", symbol));
+        }
+    }// namespace
+
     auto MXInteger::op_add(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return MXCreateInteger(value + r.value);
-        }
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return MXCreateFloat(static_cast<inner_float>(value) + r.value);
-        }
-        return new MXError("TypeError: unsupported '+' operands");
+        return numeric(BinaryOp::Add, "+", *this, other);
     }
 
     auto MXInteger::op_sub(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return MXCreateInteger(value - r.value);
-        }
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return MXCreateFloat(static_cast<inner_float>(value) - r.value);
-        }
-        return new MXError("TypeError: unsupported '-' operands");
+        return numeric(BinaryOp::Sub, "-", *this, other);
     }
 
     auto MXInteger::op_mul(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return MXCreateInteger(value * r.value);
-        }
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return MXCreateFloat(static_cast<inner_float>(value) * r.value);
-        }
-        return new MXError("TypeError: unsupported '*' operands");
+        return numeric(BinaryOp::Mul, "*", *this, other);
     }
 
     auto MXInteger::op_div(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            if (r.value == 0) return new MXError("ZeroDivisionError");
-            return MXCreateInteger(value / r.value);
+        return numeric(BinaryOp::Div, "/", *this, other);
+    }
+
+    auto MXInteger::equals(const MXObject &other) -> inner_boolean {
+        if (other.get_type_info() == &g_integer_type_info) {
+            return value == static_cast<const MXInteger &>(other).value;
         }
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            if (r.value == 0.0) return new MXError("ZeroDivisionError");
-            return MXCreateFloat(static_cast<inner_float>(value) / r.value);
+        if (other.get_type_info() == &g_float_type_info) {
+            return static_cast<inner_float>(value) == static_cast<const MXFloat &>(other).value;
         }
-        return new MXError("TypeError: unsupported '/' operands");
+        return false;
+    }
+
+    auto MXInteger::hash_code() const -> hash_code_type {
+        return static_cast<hash_code_type>(value);
     }
 
     auto MXInteger::op_eq(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return r.value == value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                    : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return static_cast<inner_float>(value) == r.value
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '==' operands");
+        return numeric(BinaryOp::Eq, "==", *this, other);
     }
 
     auto MXInteger::op_ne(const MXObject &other) -> MXObject * {
-        auto *res = op_eq(other);
-        if (auto *b = dynamic_cast<MXBoolean *>(res)) {
-            return b->value ? const_cast<MXBoolean *>(&MX_FALSE)
-                            : const_cast<MXBoolean *>(&MX_TRUE);
-        }
-        return res;
+        return numeric(BinaryOp::Ne, "!=", *this, other);
     }
 
     auto MXInteger::op_lt(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return value < r.value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                   : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return static_cast<inner_float>(value) < r.value
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '<' operands");
+        return numeric(BinaryOp::Lt, "<", *this, other);
     }
 
     auto MXInteger::op_le(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return value <= r.value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                    : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return static_cast<inner_float>(value) <= r.value
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '<=' operands");
+        return numeric(BinaryOp::Le, "<=", *this, other);
     }
 
     auto MXInteger::op_gt(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return value > r.value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                   : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return static_cast<inner_float>(value) > r.value
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '>' operands");
+        return numeric(BinaryOp::Gt, ">", *this, other);
     }
 
     auto MXInteger::op_ge(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return value >= r.value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                    : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return static_cast<inner_float>(value) >= r.value
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '>=' operands");
+        return numeric(BinaryOp::Ge, ">=", *this, other);
     }
 
     auto MXInteger::op_is(const MXObject &other) -> MXObject * {
@@ -162,137 +195,62 @@ namespace mxs_runtime {
     }
 
     auto MXFloat::op_add(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return MXCreateFloat(value + r.value);
-        }
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return MXCreateFloat(value + static_cast<inner_float>(r.value));
-        }
-        return new MXError("TypeError: unsupported '+' operands");
+        return numeric(BinaryOp::Add, "+", *this, other);
     }
 
     auto MXFloat::op_sub(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return MXCreateFloat(value - r.value);
-        }
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return MXCreateFloat(value - static_cast<inner_float>(r.value));
-        }
-        return new MXError("TypeError: unsupported '-' operands");
+        return numeric(BinaryOp::Sub, "-", *this, other);
     }
 
     auto MXFloat::op_mul(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return MXCreateFloat(value * r.value);
-        }
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return MXCreateFloat(value * static_cast<inner_float>(r.value));
-        }
-        return new MXError("TypeError: unsupported '*' operands");
+        return numeric(BinaryOp::Mul, "*", *this, other);
     }
 
     auto MXFloat::op_div(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            if (r.value == 0.0) return new MXError("ZeroDivisionError");
-            return MXCreateFloat(value / r.value);
+        return numeric(BinaryOp::Div, "/", *this, other);
+    }
+
+    auto MXFloat::equals(const MXObject &other) -> inner_boolean {
+        if (other.get_type_info() == &g_float_type_info) {
+            return value == static_cast<const MXFloat &>(other).value;
         }
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            if (r.value == 0) return new MXError("ZeroDivisionError");
-            return MXCreateFloat(value / static_cast<inner_float>(r.value));
+        if (other.get_type_info() == &g_integer_type_info) {
+            return value == static_cast<inner_float>(static_cast<const MXInteger &>(other).value);
         }
-        return new MXError("TypeError: unsupported '/' operands");
+        return false;
     }
 
-    auto MXFloat::op_eq(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return r.value == value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                    : const_cast<MXBoolean *>(&MX_FALSE);
+    auto MXFloat::hash_code() const -> hash_code_type {
+        // 2^63 is the first double above every int64
+        constexpr inner_float LIMIT = 9223372036854775808.0;
+        if (value >= -LIMIT && value < LIMIT && value == std::trunc(value)) {
+            return static_cast<hash_code_type>(static_cast<inner_integer>(value));
         }
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return value == static_cast<inner_float>(r.value)
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '==' operands");
+        return std::bit_cast<hash_code_type>(value);
+    }
+
+    auto MXFloat::op_eq(const MXObject &other) -> MXObject * {
+        return numeric(BinaryOp::Eq, "==", *this, other);
     }
 
     auto MXFloat::op_ne(const MXObject &other) -> MXObject * {
-        auto *res = op_eq(other);
-        if (auto *b = dynamic_cast<MXBoolean *>(res)) {
-            return b->value ? const_cast<MXBoolean *>(&MX_FALSE)
-                            : const_cast<MXBoolean *>(&MX_TRUE);
-        }
-        return res;
+        return numeric(BinaryOp::Ne, "!=", *this, other);
     }
 
     auto MXFloat::op_lt(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return value < r.value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                   : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return value < static_cast<inner_float>(r.value)
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '<' operands");
+        return numeric(BinaryOp::Lt, "<", *this, other);
     }
 
     auto MXFloat::op_le(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return value <= r.value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                    : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return value <= static_cast<inner_float>(r.value)
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '<=' operands");
+        return numeric(BinaryOp::Le, "<=", *this, other);
     }
 
     auto MXFloat::op_gt(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return value > r.value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                   : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return value > static_cast<inner_float>(r.value)
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '>' operands");
+        return numeric(BinaryOp::Gt, ">", *this, other);
     }
 
     auto MXFloat::op_ge(const MXObject &other) -> MXObject * {
-        if (other.type_info == &g_float_type_info) {
-            const auto &r = static_cast<const MXFloat &>(other);
-            return value >= r.value ? const_cast<MXBoolean *>(&MX_TRUE)
-                                    : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        if (other.type_info == &g_integer_type_info) {
-            const auto &r = static_cast<const MXInteger &>(other);
-            return value >= static_cast<inner_float>(r.value)
-                           ? const_cast<MXBoolean *>(&MX_TRUE)
-                           : const_cast<MXBoolean *>(&MX_FALSE);
-        }
-        return new MXError("TypeError: unsupported '>=' operands");
+        return numeric(BinaryOp::Ge, ">=", *this, other);
     }
 
     auto MXFloat::op_is(const MXObject &other) -> MXObject * {
@@ -301,89 +259,150 @@ namespace mxs_runtime {
 
 }// namespace mxs_runtime
 
+namespace {
+    using mxs_runtime::BinaryOp;
+    using mxs_runtime::inner_integer;
+    using mxs_runtime::MXObject;
+    namespace tagged = mxs_runtime::tagged;
+
+    // Applies ``op`` to the real objects behind two operands that may be
+    // tagged and encodes its result for compiled code
+    auto dispatch(MXObject *left, MXObject *right, BinaryOp op) -> MXObject * {
+        if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
+        tagged::Arg l(left);
+        tagged::Arg r(right);
+        return tagged::encode(mxs_runtime::apply_binary_op(op, *l.get(), *r.get()));
+    }
+
+    auto both_ints(MXObject *left, MXObject *right) -> bool {
+        return tagged::is_int(left) && tagged::is_int(right);
+    }
+
+    // Tagged operands are 63-bit, so sums and differences fit in 64 bits;
+    // products wrap like MXInteger::op_mul
+    auto wrapping_mul(inner_integer a, inner_integer b) -> inner_integer {
+        return static_cast<inner_integer>(static_cast<std::uint64_t>(a) *
+                                          static_cast<std::uint64_t>(b));
+    }
+}// namespace
+
 #ifdef __cplusplus
 extern "C" {
 #endif
 
+// Initialised after the type infos they copy, which are defined above
+const std::uint16_t mxs_integer_type_id = mxs_runtime::g_integer_type_info.id;
+const std::uint16_t mxs_float_type_id = mxs_runtime::g_float_type_info.id;
+const std::size_t mxs_numeric_value_offset = mxs_runtime::MXNumeric::VALUE_OFFSET;
+const mxs_runtime::inner_integer mxs_small_int_min = MXS_SMALL_INT_MIN;
+const mxs_runtime::inner_integer mxs_small_int_max = MXS_SMALL_INT_MAX;
+
 MXS_API mxs_runtime::MXObject *mxs_op_add(mxs_runtime::MXObject *left,
                                           mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_add(*right);
+    if (both_ints(left, right)) {
+        return tagged::make_int(tagged::int_value(left) + tagged::int_value(right));
+    }
+    return dispatch(left, right, BinaryOp::Add);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_sub(mxs_runtime::MXObject *left,
                                           mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_sub(*right);
+    if (both_ints(left, right)) {
+        return tagged::make_int(tagged::int_value(left) - tagged::int_value(right));
+    }
+    return dispatch(left, right, BinaryOp::Sub);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_mul(mxs_runtime::MXObject *left,
                                           mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_mul(*right);
+    if (both_ints(left, right)) {
+        return tagged::make_int(wrapping_mul(tagged::int_value(left), tagged::int_value(right)));
+    }
+    return dispatch(left, right, BinaryOp::Mul);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_div(mxs_runtime::MXObject *left,
                                           mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_div(*right);
+    // Division by zero takes the slow path, which reports the error
+    if (both_ints(left, right) && tagged::int_value(right) != 0) {
+        return tagged::make_int(tagged::int_value(left) / tagged::int_value(right));
+    }
+    return dispatch(left, right, BinaryOp::Div);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_eq(mxs_runtime::MXObject *left,
                                          mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_eq(*right);
+    if (both_ints(left, right)) { return tagged::from_bool(left == right); }
+    return dispatch(left, right, BinaryOp::Eq);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_ne(mxs_runtime::MXObject *left,
                                          mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_ne(*right);
+    if (both_ints(left, right)) { return tagged::from_bool(left != right); }
+    return dispatch(left, right, BinaryOp::Ne);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_lt(mxs_runtime::MXObject *left,
                                          mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_lt(*right);
+    if (both_ints(left, right)) {
+        return tagged::from_bool(tagged::int_value(left) < tagged::int_value(right));
+    }
+    return dispatch(left, right, BinaryOp::Lt);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_le(mxs_runtime::MXObject *left,
                                          mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_le(*right);
+    if (both_ints(left, right)) {
+        return tagged::from_bool(tagged::int_value(left) <= tagged::int_value(right));
+    }
+    return dispatch(left, right, BinaryOp::Le);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_gt(mxs_runtime::MXObject *left,
                                          mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_gt(*right);
+    if (both_ints(left, right)) {
+        return tagged::from_bool(tagged::int_value(left) > tagged::int_value(right));
+    }
+    return dispatch(left, right, BinaryOp::Gt);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_ge(mxs_runtime::MXObject *left,
                                          mxs_runtime::MXObject *right) {
-    if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_ge(*right);
+    if (both_ints(left, right)) {
+        return tagged::from_bool(tagged::int_value(left) >= tagged::int_value(right));
+    }
+    return dispatch(left, right, BinaryOp::Ge);
 }
 
 MXS_API mxs_runtime::MXObject *mxs_op_is(mxs_runtime::MXObject *left,
                                          mxs_runtime::MXObject *right) {
+    // Equal tags are the same value
+    if (tagged::is_tagged(left) && left == right) { return tagged::from_bool(true); }
     if (!left || !right) return new mxs_runtime::MXError("TypeError", "Invalid operand");
-    return left->op_is(*right);
+    tagged::Arg l(left);
+    tagged::Arg r(right);
+    return tagged::encode(l->op_is(*r.get()));
 }
 
 
 MXS_API mxs_runtime::MXObject *mxs_int_absolute(mxs_runtime::MXObject *integer_obj) {
     using namespace mxs_runtime;
-    if (!integer_obj || integer_obj->type_info != &g_integer_type_info) {
+    if (tagged::is_int(integer_obj)) {
+        auto val = tagged::int_value(integer_obj);
+        return tagged::make_int(val < 0 ? -val : val);
+    }
+    if (!integer_obj || integer_obj->get_type_info() != &g_integer_type_info) {
         return new MXError("TypeError", "Argument must be an Integer.");
     }
     auto val = static_cast<MXInteger *>(integer_obj)->value;
     if (val < 0) val = -val;
-    return MXCreateInteger(val);
+    return tagged::encode(MXCreateInteger(val));
 }
 
 auto MXCreateInteger(mxs_runtime::inner_integer value) -> mxs_runtime::MXInteger * {
-    auto *obj = new mxs_runtime::MXInteger(value);
+    using namespace mxs_runtime;
+    if (value >= SMALL_INT_MIN && value <= SMALL_INT_MAX) { return small_int(value); }
+    auto *obj = new MXInteger(value);
     return obj;
 }
 
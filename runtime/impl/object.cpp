@@ -2,6 +2,9 @@
 #include "_typedef.hpp"
 #include "allocator.hpp"
 #include "boolean.hpp"
+#include "cycle.hpp"
+#include "release.hpp"
+#include "tagged.hpp"
 #include "typeinfo.h"
 #include <cstddef>
 #include <cstring>
@@ -11,46 +14,92 @@ namespace mxs_runtime {
     static const MXTypeInfo OBJECT_TYPE_INFO{ "object", nullptr };
     static const MXTypeInfo FFICALLARGV_TYPE_INFO{ "FFICallArgv", nullptr };
 
-    MXObject::MXObject(const MXTypeInfo *info, bool is_static)
-        : type_info(info), _is_static(is_static) {
-        MX_ALLOCATOR.registerObject(this);
+    auto MXObject::operator new(std::size_t size) -> void * {
+        return MX_ALLOCATOR.allocate(size);
     }
 
-    MXObject::~MXObject() { MX_ALLOCATOR.unregisterObject(this); }
+    void MXObject::operator delete(void *ptr, std::size_t size) {
+        MX_ALLOCATOR.deallocate(ptr, size);
+    }
 
+    // Immortal objects are not counted as live objects
+    MXObject::MXObject(const MXTypeInfo *info, bool is_static)
+        : type_id(info->id), flags(is_static ? STATIC_FLAG : 0) {
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Winvalid-offsetof"
+        static_assert(offsetof(MXObject, type_id) == TYPE_ID_OFFSET);
+#pragma GCC diagnostic pop
+#if MXS_REFCOUNT_MODE == MXS_REFCOUNT_BIASED
+        init_owner();
+#endif
+        if (!is_static) { MX_ALLOCATOR.registerObject(this); }
+    }
+
+    MXObject::~MXObject() {
+#if MXS_CYCLE_COLLECTOR
+        if (holds_references()) { cycle::forget(this); }
+#endif
+        if (!is_static()) { MX_ALLOCATOR.unregisterObject(this); }
+    }
 
-    MXObject::MXObject(const MXObject &other)
-        : type_info(other.type_info), _is_static(other._is_static) { }
 
-    auto MXObject::increase_ref() -> refer_count_type { return ++ref_cnt; }
+    MXObject::MXObject(const MXObject &other) : type_id(other.type_id), flags(other.flags) {
+#if MXS_REFCOUNT_MODE == MXS_REFCOUNT_BIASED
+        init_owner();
+#endif
+        if (!is_static()) { MX_ALLOCATOR.registerObject(this); }
+    }
 
-    auto MXObject::decrease_ref() -> refer_count_type {
-        if (ref_cnt > 0) { --ref_cnt; }
-        return ref_cnt;
+    // Deferred releases drain and cycle collections run here rather than
+    // when a release queues or buffers an object: no destructor is half-way
+    // through releasing what an object held
+    void MXObject::hold_references() {
+        if (is_static()) { return; }
+        flags |= HOLDS_REFERENCES_FLAG;
+        release::drain_pending();
+#if MXS_CYCLE_COLLECTOR
+        cycle::maybe_collect();
+#endif
     }
 
+    void MXObject::visit_references(const std::function<void(MXObject *)> &) {}
+
+    void MXObject::clear_references() {}
+
     auto MXObject::get_type_name() const -> const char * {
-        return type_info->inner_string.c_str();
+        return get_type_info()->inner_string.c_str();
     }
 
     auto MXObject::equals(const MXObject &other) -> inner_boolean {
         return this == &other;
     }
 
-    auto MXObject::equals(const MXObject *other) -> inner_boolean {
-        return this == other;
-    }
-
-    auto MXObject::hash_code() -> hash_code_type {
+    auto MXObject::hash_code() const -> hash_code_type {
         return reinterpret_cast<hash_code_type>(this);
     }
 
-    auto MXObject::repr() const -> inner_string { return type_info->inner_string; }
+    auto MXObject::repr() const -> inner_string { return get_type_info()->inner_string; }
     static const MXTypeInfo g_mxerror_type_info{ "Error", nullptr };
     MXError::MXError() : MXObject(&g_mxerror_type_info, false) { }
 
+    MXError::MXError(inner_string msg)
+        : MXError("Error", std::move(msg), false) { }
+
+    MXError::MXError(inner_string error_type, inner_string msg)
+        : MXError(std::move(error_type), std::move(msg), false) { }
+
+    MXError::MXError(inner_string error_type, inner_string msg, MXObject *olter)
+        : MXObject(&g_mxerror_type_info, false), msg(std::move(msg)), panic(false),
+          MXErroType(std::move(error_type)), alternative(olter) { }
+
+    MXError::MXError(inner_string error_type, inner_string msg, inner_boolean panic)
+        : MXObject(&g_mxerror_type_info, false), msg(std::move(msg)), panic(panic),
+          MXErroType(std::move(error_type)), alternative(nullptr) { }
+
     MXFFICallArgv::MXFFICallArgv(std::vector<MXObject *> &&arg_list)
-        : MXObject(&FFICALLARGV_TYPE_INFO, false), args(std::move(arg_list)) { }
+        : MXObject(&FFICALLARGV_TYPE_INFO, false), args(std::move(arg_list)) {
+        hold_references();
+    }
 
     MXFFICallArgv::~MXFFICallArgv() {
         for (MXObject *obj : args) {
@@ -58,6 +107,20 @@ namespace mxs_runtime {
         }
     }
 
+    void MXFFICallArgv::visit_references(const std::function<void(MXObject *)> &visit) {
+        for (MXObject *obj : args) {
+            if (obj) { visit(obj); }
+        }
+    }
+
+    void MXFFICallArgv::clear_references() {
+        std::vector<MXObject *> held;
+        held.swap(args);
+        for (MXObject *obj : held) {
+            if (obj) { ::decrease_ref(obj); }
+        }
+    }
+
     auto MXError::repr() const -> inner_string {
         return inner_string("An MXError occurred.");
     }
@@ -118,36 +181,55 @@ void delete_mx_object(mxs_runtime::MXObject *obj) { delete obj; }
 
 std::size_t increase_ref(mxs_runtime::MXObject *obj) {
     if (!obj) return 0;
+    // Tagged values are immortal like static objects
+    if (mxs_runtime::tagged::is_tagged(obj)) return mxs_runtime::MXObject::IMMORTAL_REF_COUNT;
     return obj->increase_ref();
 }
 
 std::size_t decrease_ref(mxs_runtime::MXObject *obj) {
     if (!obj) return 0;
+    if (mxs_runtime::tagged::is_tagged(obj)) return mxs_runtime::MXObject::IMMORTAL_REF_COUNT;
     std::size_t cnt = obj->decrease_ref();
-    if (cnt == 0) { delete obj; }
+    if (cnt == 0) {
+        delete obj;
+#if MXS_CYCLE_COLLECTOR
+    } else if (obj->holds_references()) {
+        // Still referenced, possibly only by a cycle through itself
+        mxs_runtime::cycle::possible_root(obj);
+#endif
+    }
     return cnt;
 }
 
-const char *mxs_get_object_type_name(mxs_runtime::MXObject *obj) {
-    if (!obj) return nullptr;
+MXS_API void mxs_release_temp(mxs_runtime::MXObject *obj) {
+    if (!obj || mxs_runtime::tagged::is_tagged(obj) || obj->is_static()) return;
+    decrease_ref(obj);
+}
+
+const char *mxs_get_object_type_name(mxs_runtime::MXObject *value) {
+    if (!value) return nullptr;
+    mxs_runtime::tagged::Arg obj(value);
     return obj->get_type_name();
 }
 
-std::size_t mx_object_repr_length(mxs_runtime::MXObject *obj) {
-    if (!obj) return 0;
+std::size_t mx_object_repr_length(mxs_runtime::MXObject *value) {
+    if (!value) return 0;
+    mxs_runtime::tagged::Arg obj(value);
     return obj->repr().length();
 }
 
-void mx_object_repr(mxs_runtime::MXObject *obj, char *buffer, std::size_t buffer_size) {
-    if (!obj || !buffer || buffer_size == 0) return;
+void mx_object_repr(mxs_runtime::MXObject *value, char *buffer, std::size_t buffer_size) {
+    if (!value || !buffer || buffer_size == 0) return;
+    mxs_runtime::tagged::Arg obj(value);
     std::string repr = obj->repr();
     std::strncpy(buffer, repr.c_str(), buffer_size - 1);
     buffer[buffer_size - 1] = '\0';
 }
 
-MXS_API bool mxs_is_instance(mxs_runtime::MXObject *obj,
+MXS_API bool mxs_is_instance(mxs_runtime::MXObject *value,
                              const mxs_runtime::MXTypeInfo *target_type_info) {
-    if (!obj || !target_type_info) return false;
+    if (!value || !target_type_info) return false;
+    mxs_runtime::tagged::Arg obj(value);
     const mxs_runtime::MXTypeInfo *cur = obj->get_type_info();
     while (cur) {
         if (cur == target_type_info) return true;
@@ -161,7 +243,8 @@ MXS_API mxs_runtime::MXObject *MXCreateFFICallArgv(mxs_runtime::MXObject **args,
     std::vector<mxs_runtime::MXObject *> vec;
     vec.reserve(count);
     for (std::size_t i = 0; i < count; ++i) {
-        mxs_runtime::MXObject *obj = args[i];
+        // Wrappers see real objects; the argv keeps boxed integers alive
+        mxs_runtime::tagged::Arg obj(args[i]);
         if (obj) { increase_ref(obj); }
         vec.push_back(obj);
     }
@@ -0,0 +1,273 @@
+#include "refcount.hpp"
+#include "object.h"
+#include <atomic>
+#include <mutex>
+#include <pthread.h>
+#include <unordered_map>
+#include <vector>
+
+namespace mxs_runtime {
+
+#if MXS_REFCOUNT_MODE == MXS_REFCOUNT_BIASED
+
+    namespace refcount {
+        namespace {
+            // Id of threads that have unregistered while exiting.  It owns no
+            // objects: those such a thread still creates start out merged.
+            constexpr std::uint32_t EXITED = UINT32_MAX;
+
+            // One thread's id and the objects other threads queued for it.
+            // Other threads reach it through the registry while the thread
+            // is alive.
+            struct ThreadState {
+                std::uint32_t id;
+                std::atomic<bool> pending;
+                std::vector<MXObject *> *queue;// guarded by Registry::mtx
+            };
+            // Every retain and release compares the owner with self.id.  The
+            // initial-exec model makes that one %fs-relative load instead of
+            // a TLS descriptor call; the few bytes fit in the static TLS
+            // space glibc keeps for libraries loaded with dlopen.
+            [[gnu::tls_model("initial-exec")]] constinit thread_local ThreadState self{
+                NO_OWNER, false, nullptr
+            };
+
+            // Created on first use and never destroyed, so objects can be
+            // released while static destructors run
+            struct Registry {
+                std::mutex mtx;
+                std::uint32_t next_id = NO_OWNER + 1;
+                std::unordered_map<std::uint32_t, ThreadState *> owners;
+            };
+
+            auto registry() -> Registry & {
+                static auto *instance = new Registry();
+                return *instance;
+            }
+
+            auto merge_all(const std::vector<MXObject *> &objects) -> std::size_t {
+                std::size_t freed = 0;
+                for (MXObject *obj : objects) {
+                    if (obj->merge_into_shared()) {
+                        delete obj;
+                        ++freed;
+                    }
+                }
+                return freed;
+            }
+
+            // Unregisters the thread when it exits.  Objects it still owns
+            // keep its id, which is never reused; threads that later queue
+            // them find no owner and merge them themselves, and so does this
+            // thread from now on.
+            void unregister_thread(void *arg) {
+                auto &state = *static_cast<ThreadState *>(arg);
+                std::vector<MXObject *> objects;
+                {
+                    Registry &r = registry();
+                    std::lock_guard<std::mutex> lock(r.mtx);
+                    r.owners.erase(state.id);
+                    objects.swap(*state.queue);
+                }
+                delete state.queue;
+                state.queue = nullptr;
+                state.id = EXITED;
+                merge_all(objects);
+            }
+
+            // A pthread key rather than a thread_local with a destructor, for
+            // the reason given in allocator.cpp
+            auto exit_key() -> pthread_key_t {
+                static pthread_key_t key = [] {
+                    pthread_key_t created;
+                    pthread_key_create(&created, unregister_thread);
+                    return created;
+                }();
+                return key;
+            }
+
+            [[gnu::noinline]] void register_thread(ThreadState &state) {
+                state.queue = new std::vector<MXObject *>();
+                pthread_setspecific(exit_key(), &state);
+                Registry &r = registry();
+                std::lock_guard<std::mutex> lock(r.mtx);
+                state.id = r.next_id++;
+                r.owners.emplace(state.id, &state);
+            }
+
+            // Id of the calling thread, never NO_OWNER
+            inline auto current_thread() -> std::uint32_t {
+                if (self.id == NO_OWNER) [[unlikely]] { register_thread(self); }
+                return self.id;
+            }
+
+            // Queues ``obj`` for its owner to merge.  Returns false, queuing
+            // nothing, if the owner has exited.
+            auto queue_for_owner(MXObject *obj, std::uint32_t owner) -> bool {
+                Registry &r = registry();
+                std::lock_guard<std::mutex> lock(r.mtx);
+                auto it = r.owners.find(owner);
+                if (it == r.owners.end()) { return false; }
+                it->second->queue->push_back(obj);
+                it->second->pending.store(true, std::memory_order_release);
+                return true;
+            }
+        }// namespace
+
+        auto merge_pending() -> std::size_t {
+            if (!self.pending.load(std::memory_order_acquire)) { return 0; }
+            std::vector<MXObject *> objects;
+            {
+                std::lock_guard<std::mutex> lock(registry().mtx);
+                objects.swap(*self.queue);
+                self.pending.store(false, std::memory_order_relaxed);
+            }
+            return merge_all(objects);
+        }
+    }// namespace refcount
+
+    void MXObject::init_owner() {
+        std::uint32_t id = is_static() ? refcount::NO_OWNER : refcount::current_thread();
+        if (id == refcount::EXITED) {
+            id = refcount::NO_OWNER;
+            shared.store(refcount::MERGED, std::memory_order_relaxed);
+        }
+        owner.store(id, std::memory_order_relaxed);
+        // Objects other threads handed back are merged as the owner allocates
+        if (refcount::self.pending.load(std::memory_order_relaxed)) {
+            refcount::merge_pending();
+        }
+    }
+
+    auto MXObject::increase_ref() -> refer_count_type {
+        if (is_static()) { return IMMORTAL_REF_COUNT; }
+        if (owner.load(std::memory_order_relaxed) == refcount::current_thread()) {
+            return ++ref_cnt;
+        }
+        std::int32_t old = shared.fetch_add(refcount::SHARED_ONE, std::memory_order_relaxed);
+        return static_cast<refer_count_type>((old >> 2) + 1);
+    }
+
+    auto MXObject::decrease_ref() -> refer_count_type {
+        if (is_static()) { return IMMORTAL_REF_COUNT; }
+        if (owner.load(std::memory_order_relaxed) == refcount::current_thread()) {
+            if (ref_cnt > 0) { --ref_cnt; }
+            if (ref_cnt > 0) { return ref_cnt; }
+            // The owner dropped its last reference: free the object unless
+            // other threads hold some, in which case they take it over
+            std::int32_t old = shared.load(std::memory_order_acquire);
+            while (true) {
+                if (old == refcount::DEFAULT) { return 0; }
+                // Merged when the owner works through its queue
+                if ((old & refcount::STATE_MASK) == refcount::QUEUED) { return 1; }
+                std::int32_t merged = (old & ~refcount::STATE_MASK) | refcount::MERGED;
+                if (shared.compare_exchange_weak(old, merged, std::memory_order_acq_rel,
+                                                 std::memory_order_acquire)) {
+                    owner.store(refcount::NO_OWNER, std::memory_order_relaxed);
+                    return static_cast<refer_count_type>(old >> 2);
+                }
+            }
+        }
+
+        std::int32_t old = shared.load(std::memory_order_relaxed);
+        std::int32_t desired;
+        bool queue;
+        do {
+            std::int32_t count = (old >> 2) - 1;
+            std::int32_t state = old & refcount::STATE_MASK;
+            // The owner's references are unknown here, so it decides
+            queue = state == refcount::DEFAULT && count <= 0;
+            desired = count * refcount::SHARED_ONE | (queue ? refcount::QUEUED : state);
+        } while (!shared.compare_exchange_weak(old, desired, std::memory_order_acq_rel,
+                                               std::memory_order_relaxed));
+        std::int32_t count = desired >> 2;
+        if (queue) {
+            if (refcount::queue_for_owner(this, owner.load(std::memory_order_relaxed))) {
+                return 1;
+            }
+            return merge_into_shared() ? 0 : 1;
+        }
+        if ((desired & refcount::STATE_MASK) == refcount::MERGED && count <= 0) { return 0; }
+        return count > 0 ? static_cast<refer_count_type>(count) : 1;
+    }
+
+    auto MXObject::merge_into_shared() -> bool {
+        auto local = static_cast<std::int32_t>(ref_cnt);
+        ref_cnt = 0;
+        owner.store(refcount::NO_OWNER, std::memory_order_relaxed);
+        std::int32_t old = shared.load(std::memory_order_relaxed);
+        std::int32_t desired;
+        do {
+            desired = ((old >> 2) + local) * refcount::SHARED_ONE | refcount::MERGED;
+        } while (!shared.compare_exchange_weak(old, desired, std::memory_order_acq_rel,
+                                               std::memory_order_relaxed));
+        return (desired >> 2) <= 0;
+    }
+
+    auto MXObject::get_ref_count() const -> refer_count_type {
+        if (is_static()) { return IMMORTAL_REF_COUNT; }
+        std::int32_t others = shared.load(std::memory_order_relaxed) >> 2;
+        return ref_cnt + static_cast<refer_count_type>(others > 0 ? others : 0);
+    }
+
+#elif MXS_REFCOUNT_MODE == MXS_REFCOUNT_ATOMIC
+
+    auto refcount::merge_pending() -> std::size_t { return 0; }
+
+    auto MXObject::increase_ref() -> refer_count_type {
+        if (is_static()) { return IMMORTAL_REF_COUNT; }
+        return std::atomic_ref<std::uint32_t>(ref_cnt).fetch_add(1, std::memory_order_relaxed) + 1;
+    }
+
+    // A count of zero means the caller holds the only pointer to a new
+    // object, so no other thread can change it between the two steps
+    auto MXObject::decrease_ref() -> refer_count_type {
+        if (is_static()) { return IMMORTAL_REF_COUNT; }
+        std::atomic_ref<std::uint32_t> count(ref_cnt);
+        if (count.load(std::memory_order_relaxed) == 0) { return 0; }
+        return count.fetch_sub(1, std::memory_order_acq_rel) - 1;
+    }
+
+    auto MXObject::get_ref_count() const -> refer_count_type {
+        if (is_static()) { return IMMORTAL_REF_COUNT; }
+        return std::atomic_ref<std::uint32_t>(const_cast<std::uint32_t &>(ref_cnt))
+                .load(std::memory_order_relaxed);
+    }
+
+#else
+
+    auto refcount::merge_pending() -> std::size_t { return 0; }
+
+    auto MXObject::increase_ref() -> refer_count_type {
+        if (is_static()) { return IMMORTAL_REF_COUNT; }
+        return ++ref_cnt;
+    }
+
+    auto MXObject::decrease_ref() -> refer_count_type {
+        if (is_static()) { return IMMORTAL_REF_COUNT; }
+        if (ref_cnt > 0) { --ref_cnt; }
+        return ref_cnt;
+    }
+
+    auto MXObject::get_ref_count() const -> refer_count_type {
+        return is_static() ? IMMORTAL_REF_COUNT : ref_cnt;
+    }
+
+#endif
+
+}// namespace mxs_runtime
+
+extern "C" MXS_API const char *mxs_runtime_refcount_mode() {
+    switch (mxs_runtime::refcount::MODE) {
+        case MXS_REFCOUNT_ATOMIC:
+            return "atomic";
+        case MXS_REFCOUNT_BIASED:
+            return "biased";
+        default:
+            return "plain";
+    }
+}
+
+extern "C" MXS_API std::size_t mxs_refcount_merge() {
+    return mxs_runtime::refcount::merge_pending();
+}
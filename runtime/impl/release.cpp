@@ -0,0 +1,105 @@
+#include "release.hpp"
+#include "object.h"
+#include <atomic>
+#include <chrono>
+#include <pthread.h>
+#include <vector>
+
+namespace mxs_runtime::release {
+    namespace {
+        std::atomic<std::size_t> min_length{ DEFAULT_MIN_LENGTH };
+        std::atomic<std::uint64_t> budget{ DEFAULT_BUDGET_NS };
+
+        struct Queue {
+            std::vector<MXObject *> *pending;// created on first use
+            bool draining;
+        };
+        constinit thread_local Queue self{ nullptr, false };
+
+        void drain_on_exit(void *) {
+            drain(UINT64_MAX);
+            delete self.pending;
+            self.pending = nullptr;
+        }
+
+        // A pthread key rather than a thread_local with a destructor, for
+        // the reason given in allocator.cpp
+        auto exit_key() -> pthread_key_t {
+            static pthread_key_t key = [] {
+                pthread_key_t created;
+                pthread_key_create(&created, drain_on_exit);
+                return created;
+            }();
+            return key;
+        }
+
+        auto queue() -> std::vector<MXObject *> & {
+            if (!self.pending) [[unlikely]] {
+                self.pending = new std::vector<MXObject *>();
+                pthread_setspecific(exit_key(), &self);
+            }
+            return *self.pending;
+        }
+    }// namespace
+
+    auto should_defer(std::size_t count) -> bool {
+        std::size_t min = min_length.load(std::memory_order_relaxed);
+        return min != 0 && count >= min;
+    }
+
+    void defer(MXObject *const *first, MXObject *const *last) {
+        std::vector<MXObject *> &pending = queue();
+        pending.insert(pending.end(), first, last);
+        drain(budget.load(std::memory_order_relaxed));
+    }
+
+    void drain_pending() {
+        if (self.pending && !self.pending->empty()) {
+            drain(budget.load(std::memory_order_relaxed));
+        }
+    }
+
+    // Lists freed here queue their elements on the same vector, and the loop
+    // picks them up: the newest entries go first, so the queue grows with
+    // the depth of the graph rather than its size
+    auto drain(std::uint64_t budget_ns) -> std::size_t {
+        std::vector<MXObject *> *pending = self.pending;
+        if (!pending) { return 0; }
+        if (self.draining) { return pending->size(); }
+        self.draining = true;
+        auto start = std::chrono::steady_clock::now();
+        while (!pending->empty()) {
+            for (std::size_t i = 0; i < BATCH && !pending->empty(); ++i) {
+                MXObject *obj = pending->back();
+                pending->pop_back();
+                ::decrease_ref(obj);
+            }
+            auto elapsed = std::chrono::duration_cast<std::chrono::nanoseconds>(
+                    std::chrono::steady_clock::now() - start);
+            if (static_cast<std::uint64_t>(elapsed.count()) >= budget_ns) { break; }
+        }
+        self.draining = false;
+        return pending->size();
+    }
+
+}// namespace mxs_runtime::release
+
+extern "C" MXS_API void mxs_release_configure(std::size_t min_length,
+                                              std::uint64_t budget_ns) {
+    mxs_runtime::release::min_length.store(min_length, std::memory_order_relaxed);
+    mxs_runtime::release::budget.store(budget_ns, std::memory_order_relaxed);
+}
+
+extern "C" MXS_API void mxs_release_deferred(mxs_runtime::MXObject *obj) {
+    if (!obj) { return; }
+    mxs_runtime::release::queue().push_back(obj);
+}
+
+extern "C" MXS_API std::size_t mxs_release_drain(std::uint64_t budget_ns) {
+    return mxs_runtime::release::drain(budget_ns);
+}
+
+extern "C" MXS_API std::size_t mxs_release_pending() {
+    auto *pending = mxs_runtime::release::self.pending;
+    return pending ? pending->size() : 0;
+}
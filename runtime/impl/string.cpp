@@ -1,17 +1,37 @@
 #include "string.hpp"
 #include "allocator.hpp"
 #include "numeric.hpp"
+#include "tagged.hpp"
 #include "typeinfo.h"
+#include <functional>
 
 namespace mxs_runtime {
 
-    static const MXTypeInfo STRING_TYPE_INFO{ "String", nullptr };
+    const MXTypeInfo g_string_type_info{ "String", nullptr };
 
     MXString::MXString(inner_string v)
-        : MXObject(&STRING_TYPE_INFO, false), value(std::move(v)) { }
+        : MXObject(&g_string_type_info, false), value(std::move(v)) { }
 
     auto MXString::repr() const -> inner_string { return value; }
 
+    auto MXString::equals(const MXObject &other) -> inner_boolean {
+        if (this == &other) { return true; }
+        if (other.get_type_info() != &g_string_type_info) { return false; }
+        const auto &str = static_cast<const MXString &>(other);
+        // Cached hashes rule out most unequal strings without a comparison
+        if (hash != 0 && str.hash != 0 && hash != str.hash) { return false; }
+        return value == str.value;
+    }
+
+    auto MXString::hash_code() const -> hash_code_type {
+        if (hash == 0) [[unlikely]] {
+            hash = std::hash<inner_string>{}(value);
+            // 0 means not computed yet
+            if (hash == 0) { hash = 1; }
+        }
+        return hash;
+    }
+
 }// namespace mxs_runtime
 
 extern "C" MXS_API auto MXCreateString(const char *c_str) -> mxs_runtime::MXString * {
@@ -21,13 +41,14 @@ extern "C" MXS_API auto MXCreateString(const char *c_str) -> mxs_runtime::MXStri
     return obj;
 }
 
-extern "C" MXS_API auto mxs_string_from_integer(mxs_runtime::MXObject *integer_obj)
+extern "C" MXS_API auto mxs_string_from_integer(mxs_runtime::MXObject *value)
         -> mxs_runtime::MXObject * {
     using namespace mxs_runtime;
-    if (!integer_obj || integer_obj->type_info != &g_integer_type_info) {
+    tagged::Arg integer_obj(value);
+    if (!integer_obj || integer_obj->get_type_info() != &g_integer_type_info) {
         return new MXError("TypeError", "Argument must be an Integer.");
     }
-    auto val = static_cast<MXInteger *>(integer_obj)->value;
+    auto val = static_cast<MXInteger *>(integer_obj.get())->value;
     auto str = std::to_string(val);
-    return mxs_runtime::MXCreateString(str.c_str());
+    return ::MXCreateString(str.c_str());
 }
@@ -0,0 +1,52 @@
+#include "tagged.hpp"
+#include "boolean.hpp"
+#include "nil.hpp"
+#include "numeric.hpp"
+#include "object.h"
+
+namespace mxs_runtime::tagged {
+
+    auto make_int(inner_integer value) -> MXObject * {
+        if (ENABLED && fits(value)) { return from_int(value); }
+        return MXCreateInteger(value);
+    }
+
+    auto decode(MXObject *obj, bool &allocated) -> MXObject * {
+        if (!is_tagged(obj)) { return obj; }
+        if (is_int(obj)) {
+            MXObject *boxed = MXCreateInteger(int_value(obj));
+            allocated = !boxed->is_static();
+            return boxed;
+        }
+        switch (bits(obj)) {
+            case TRUE_BITS: return const_cast<MXBoolean *>(&MX_TRUE);
+            case FALSE_BITS: return const_cast<MXBoolean *>(&MX_FALSE);
+            default: return const_cast<MXNil *>(&MX_NIL);
+        }
+    }
+
+    auto encode(MXObject *obj) -> MXObject * {
+        if (!ENABLED || !obj || is_tagged(obj)) { return obj; }
+        if (obj == &MX_TRUE) { return from_bits(TRUE_BITS); }
+        if (obj == &MX_FALSE) { return from_bits(FALSE_BITS); }
+        if (obj == &MX_NIL) { return from_bits(NIL_BITS); }
+        if (obj->get_type_info() != &g_integer_type_info) { return obj; }
+        inner_integer value = static_cast<MXInteger *>(obj)->value;
+        if (!fits(value)) { return obj; }
+        if (obj->is_static()) { return from_int(value); }
+        // A fresh result nobody retained yet; one that is held elsewhere
+        // stays a real object
+        if (obj->get_ref_count() == 0) {
+            delete obj;
+            return from_int(value);
+        }
+        return obj;
+    }
+
+    void Arg::release() {
+        if (obj->get_ref_count() == 0) { delete obj; }
+    }
+
+}// namespace mxs_runtime::tagged
+
+extern "C" MXS_API bool mxs_runtime_tagged_values() { return mxs_runtime::tagged::ENABLED; }
@@ -0,0 +1,28 @@
+#include "typeinfo.h"
+#include <atomic>
+#include <cstdio>
+#include <cstdlib>
+#include <utility>
+
+namespace mxs_runtime {
+
+    // Both are constant-initialised, so type infos of any translation unit
+    // may register during static initialisation
+    MXS_API const MXTypeInfo *mxs_type_table[MXTypeInfo::MAX_TYPES] = {};
+
+    namespace {
+        constinit std::atomic<std::size_t> next_type_id{ 0 };
+    }
+
+    MXTypeInfo::MXTypeInfo(std::string name, const MXTypeInfo *parent)
+        : inner_string(std::move(name)), parent(parent) {
+        std::size_t slot = next_type_id.fetch_add(1, std::memory_order_relaxed);
+        if (slot >= MAX_TYPES) {
+            std::fprintf(stderr, "mxs: more than %zu runtime types\n", MAX_TYPES);
+            std::abort();
+        }
+        id = static_cast<std::uint16_t>(slot);
+        mxs_type_table[slot] = this;
+    }
+
+}// namespace mxs_runtime
@@ -3,21 +3,54 @@
 #define MXSCRIPT_ALLOCATOR_HPP
 
 #include "macro.hpp"
-#include <mutex>
-#include <unordered_set>
+#include <cstddef>
+
+// Object tracking keeps every live object in a registry so
+// mxs_allocator_dump_stats can list them.  It is a debug aid: release builds
+// only keep per-thread live counters.  Enable it with
+// cmake -DMXS_TRACK_OBJECTS=ON (the default for Debug builds).
+#ifndef MXS_TRACK_OBJECTS
+#define MXS_TRACK_OBJECTS 0
+#endif
 
 namespace mxs_runtime {
     class MXObject;// forward declaration
 
-    class Allocator {
-    private:
-        std::unordered_set<MXObject *> objects;
-        std::mutex mtx;
+    struct MXAllocatorStats {
+        std::size_t slabs;          // slabs carved out of the system heap
+        std::size_t bytes_reserved; // memory held by the slabs
+        std::size_t bytes_in_use;   // size-class blocks handed out
+        std::size_t bytes_requested;// bytes the objects in those blocks need
+        std::size_t large_objects;  // objects too large for a size class
+        std::size_t large_bytes;
+        // Share of slab memory not holding object bytes: free blocks plus
+        // the rounding up to a size class
+        double fragmentation;
+    };
 
+    class Allocator {
     public:
+        // Registry shards, selected by object address
+        static constexpr std::size_t SHARD_COUNT = 64;
+        // Size classes are multiples of SIZE_CLASS_STEP up to MAX_SMALL_SIZE;
+        // larger objects use the global operator new.  Objects need 8-byte
+        // alignment only, so a 24-byte boxed scalar gets a 24-byte block.
+        static constexpr std::size_t SIZE_CLASS_STEP = 8;
+        static constexpr std::size_t MAX_SMALL_SIZE = 256;
+        static constexpr std::size_t SIZE_CLASS_COUNT = MAX_SMALL_SIZE / SIZE_CLASS_STEP;
+        static constexpr std::size_t SLAB_SIZE = 64 * 1024;
+        // Blocks moved between a thread cache and the central pool at once
+        static constexpr std::size_t BATCH_SIZE = 32;
+
+        void *allocate(std::size_t size);
+        void deallocate(void *ptr, std::size_t size);
+        auto stats() -> MXAllocatorStats;
+
         void registerObject(MXObject *obj);
         void unregisterObject(MXObject *obj);
         void dump_stats();
+        auto live_count() -> std::size_t;
+        static constexpr auto tracks_objects() -> bool { return MXS_TRACK_OBJECTS; }
     };
 
     MXS_API extern Allocator &MX_ALLOCATOR;
@@ -25,6 +58,9 @@ namespace mxs_runtime {
 
 extern "C" {
 MXS_API void mxs_allocator_dump_stats();
+MXS_API std::size_t mxs_allocator_live_count();
+MXS_API bool mxs_allocator_tracks_objects();
+MXS_API void mxs_allocator_stats(mxs_runtime::MXAllocatorStats *out);
 }
 
 #endif// MXSCRIPT_ALLOCATOR_HPP
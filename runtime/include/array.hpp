@@ -0,0 +1,119 @@
+#pragma once
+#ifndef MXSCRIPT_ARRAY_HPP
+#define MXSCRIPT_ARRAY_HPP
+
+#include "_typedef.hpp"
+#include "macro.hpp"
+#include "object.h"
+#include "typeinfo.h"
+#include <cstddef>
+#include <cstdint>
+
+// Fixed-size arrays of unboxed Integers or Floats, the storage behind
+// std.array.  The elements sit in one buffer aligned to a cache line, and
+// compiled code that knows the element type loads and stores them directly:
+// it reads the buffer, the length and the element tag at the offsets exported
+// below (src/backend/llvm/arrays.py).
+
+namespace mxs_runtime {
+
+    extern MXS_API const MXTypeInfo g_array_type_info;
+
+    // The element type of an MXArray, as the tag byte compiled code compares
+    enum class ArrayElement : std::uint8_t {
+        Integer = 0,
+        Float = 1,
+    };
+
+    /**
+     * @brief A fixed-size, contiguous array of int64 or double values.
+     */
+    class MXArray : public MXObject {
+    public:
+        static constexpr std::size_t ALIGNMENT = 64;
+        // Byte offsets of ``data``, ``length`` and ``element``, which follow
+        // the object header
+        static constexpr std::size_t DATA_OFFSET = sizeof(MXObject);
+        static constexpr std::size_t LENGTH_OFFSET = DATA_OFFSET + sizeof(void *);
+        static constexpr std::size_t ELEMENT_OFFSET = LENGTH_OFFSET + sizeof(inner_integer);
+
+        void *const data;
+        const inner_integer length;
+        const ArrayElement element;
+
+        // Every element is zero
+        MXArray(ArrayElement element, inner_integer length);
+        ~MXArray();
+        MXArray(const MXArray &) = delete;
+        auto operator=(const MXArray &) -> MXArray & = delete;
+
+        auto integers() const -> inner_integer * { return static_cast<inner_integer *>(data); }
+        auto floats() const -> inner_float * { return static_cast<inner_float *>(data); }
+        auto repr() const -> inner_string override;
+
+        // --- Checked Access ---
+        // A new number, or an error for an index that is not an Integer in
+        // range
+        auto get(const MXObject &index) const -> MXObject *;
+        // Stores a number of the element type; Integers convert to Floats
+        auto set(const MXObject &index, const MXObject &value) -> MXObject *;
+        // Sets every element, as set() converts
+        auto fill(const MXObject &value) -> MXObject *;
+    };
+
+}// namespace mxs_runtime
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+// ``element`` is an ArrayElement; the caller owns the new array
+MXS_API mxs_runtime::MXArray *MXCreateArray(std::uint8_t element,
+                                            mxs_runtime::inner_integer length);
+
+// --- std.array ---
+// An array of ``length`` copies of ``fill``, of the element type of ``fill``
+MXS_API mxs_runtime::MXObject *array_make(mxs_runtime::MXObject *length,
+                                          mxs_runtime::MXObject *fill);
+MXS_API mxs_runtime::MXObject *array_length(mxs_runtime::MXObject *array);
+MXS_API mxs_runtime::MXObject *array_get(mxs_runtime::MXObject *array,
+                                         mxs_runtime::MXObject *index);
+MXS_API mxs_runtime::MXObject *array_set(mxs_runtime::MXObject *array,
+                                         mxs_runtime::MXObject *index,
+                                         mxs_runtime::MXObject *value);
+MXS_API mxs_runtime::MXObject *array_fill(mxs_runtime::MXObject *array,
+                                          mxs_runtime::MXObject *value);
+
+// Accessors for a known element type, which compiled code inlines.  The
+// checked ones also report an array of the other element type; the
+// unchecked ones trust the array, the index and the value.
+MXS_API mxs_runtime::MXObject *array_get_int(mxs_runtime::MXObject *array,
+                                             mxs_runtime::MXObject *index);
+MXS_API mxs_runtime::MXObject *array_get_float(mxs_runtime::MXObject *array,
+                                               mxs_runtime::MXObject *index);
+MXS_API mxs_runtime::MXObject *array_set_int(mxs_runtime::MXObject *array,
+                                             mxs_runtime::MXObject *index,
+                                             mxs_runtime::MXObject *value);
+MXS_API mxs_runtime::MXObject *array_set_float(mxs_runtime::MXObject *array,
+                                               mxs_runtime::MXObject *index,
+                                               mxs_runtime::MXObject *value);
+MXS_API mxs_runtime::MXObject *array_get_int_unchecked(mxs_runtime::MXObject *array,
+                                                       mxs_runtime::MXObject *index);
+MXS_API mxs_runtime::MXObject *array_get_float_unchecked(mxs_runtime::MXObject *array,
+                                                         mxs_runtime::MXObject *index);
+MXS_API mxs_runtime::MXObject *array_set_int_unchecked(mxs_runtime::MXObject *array,
+                                                       mxs_runtime::MXObject *index,
+                                                       mxs_runtime::MXObject *value);
+MXS_API mxs_runtime::MXObject *array_set_float_unchecked(mxs_runtime::MXObject *array,
+                                                         mxs_runtime::MXObject *index,
+                                                         mxs_runtime::MXObject *value);
+
+// Read by compiled code to inline element access
+MXS_API extern const std::uint16_t mxs_array_type_id;
+MXS_API extern const std::size_t mxs_array_data_offset;
+MXS_API extern const std::size_t mxs_array_length_offset;
+MXS_API extern const std::size_t mxs_array_element_offset;
+#ifdef __cplusplus
+}
+#endif
+
+#endif// MXSCRIPT_ARRAY_HPP
@@ -6,12 +6,14 @@
 #include "macro.hpp"
 #include "object.h"
 #include "typeinfo.h"
-#include <unordered_map>
-#include <unordered_set>
+#include <cstdint>
 #include <vector>
 
 namespace mxs_runtime {
 
+    extern MXS_API const MXTypeInfo g_list_type_info;
+    extern MXS_API const MXTypeInfo g_dict_type_info;
+
     //======================================================================
     // Base Class
     //======================================================================
@@ -31,17 +33,48 @@ namespace mxs_runtime {
     // Concrete Container Implementations
     //======================================================================
 
+    // How an MXList keeps its elements
+    enum class ListStorage : std::uint8_t {
+        Boxed,   // references to objects, in ``elements``
+        Integers,// raw values of Integers, in ``integers``
+        Floats,  // raw values of Floats, in ``floats``
+    };
+
     /**
      * @brief A mutable, ordered sequence of objects. Analogous to Python's list.
+     *
+     * A list of numbers of one type can keep their raw values in a contiguous
+     * buffer instead of references to boxed objects.  Lists enter that mode
+     * when they are built from raw values (MXCreateIntegerList,
+     * MXCreateFloatList), filled with a number, specialised explicitly, or
+     * produced by repeating a list of numbers or by the bulk operations; a
+     * list that is only appended to stays boxed.  Reading an element of a
+     * specialised list returns a new number, and values stored into it are
+     * copied rather than retained.  Storing anything else boxes the list for
+     * good.
      */
     class MXList : public MXContainer {
     public:
         std::vector<MXObject *> elements;
+        std::vector<inner_integer> integers;
+        std::vector<inner_float> floats;
+        ListStorage storage = ListStorage::Boxed;
 
         explicit MXList(bool is_static = false);
         ~MXList();
         auto length() const -> std::size_t override;
         auto contains(const MXObject &obj) const -> bool override;
+        void visit_references(const std::function<void(MXObject *)> &visit) override;
+        void clear_references() override;
+
+        // --- Storage ---
+        // Element ``i``: borrowed when boxed, a new unreferenced number otherwise
+        auto item(std::size_t i) const -> MXObject *;
+        // Moves the elements to boxed storage
+        void box();
+        // Moves a list of Integers only, or Floats only, to raw storage;
+        // false if the elements are of any other mix
+        auto specialize() -> bool;
 
         // --- List Methods ---
         auto append(MXObject &value) -> MXObject *;
@@ -51,30 +84,95 @@ namespace mxs_runtime {
         auto insert(inner_integer index, MXObject &value) -> MXObject *;
         auto remove(const MXObject &value) -> MXObject *;
 
+        // --- Bulk Operations ---
+        // These take lists of numbers only; they run over the raw buffer of a
+        // specialised list and over a converted copy of a boxed one.  Integers
+        // mixed with Floats are computed as Floats.
+        auto sum() const -> MXObject *;
+        auto min() const -> MXObject *;
+        auto max() const -> MXObject *;
+        // A new specialised list of the elementwise sums of two lists
+        auto add_elementwise(const MXList &other) const -> MXObject *;
+        // A new specialised list of the elements times ``factor``
+        auto scale(const MXObject &factor) const -> MXObject *;
+        // Sets every element to ``value``, specialising for a number
+        auto fill(MXObject &value) -> MXObject *;
+
         // --- VTable Operations ---
         auto op_getitem(const MXObject &key) const -> MXObject *;
         auto op_setitem(const MXObject &key, MXObject &value) -> MXObject *;
         auto op_append(MXObject &value) -> MXObject *;
         auto op_add(const MXObject &other) -> MXObject * override;
         auto op_mul(const MXObject &other) -> MXObject * override;
+
+    private:
+        // Whether ``value`` can be stored raw in the current storage
+        auto stores_raw(const MXObject &value) const -> bool;
+        // The index of the first raw element equal to ``value``, or length()
+        auto find_raw(const MXObject &value) const -> std::size_t;
+        // Element ``i`` as a reference owned by the caller
+        auto retain_item(std::size_t i) const -> MXObject *;
     };
 
     /**
      * @brief A mutable mapping of key-value pairs. Analogous to Python's dict.
-     * Note: Requires custom hash and equality functors for MXObject*.
+     *
+     * Keys are hashed with hash_code() and compared with equals().  The
+     * layout is CPython's compact one: ``items`` keeps the entries in
+     * insertion order, and ``slots`` is an open-addressing table of indices
+     * into it, probed with CPython's perturbation scheme.  Iteration walks
+     * the dense entries, and every slot costs four bytes.
      */
     class MXDict : public MXContainer {
     public:
-        // Placeholder for a map using a custom hash for MXObject*
-        std::unordered_map<MXObject *, MXObject *> elements;
+        struct Entry {
+            hash_code_type hash;
+            MXObject *key;// null once the entry is removed
+            MXObject *value;
+        };
 
         explicit MXDict(bool is_static = false);
+        ~MXDict();
         auto length() const -> std::size_t override;
         auto contains(const MXObject &key) const -> bool override;
+        void visit_references(const std::function<void(MXObject *)> &visit) override;
+        void clear_references() override;
+
+        // --- Dict Methods ---
+        // The value stored under ``key`` without adding a reference, or null
+        auto get(const MXObject &key) const -> MXObject *;
+        // Stores ``value`` under ``key``, retaining both
+        void set(MXObject &key, MXObject &value);
+        // Removes ``key``; false if it was not present
+        auto erase(const MXObject &key) -> bool;
+        // Entries in insertion order, including removed ones
+        auto entries() const -> const std::vector<Entry> & { return items; }
+        auto slot_count() const -> std::size_t { return slots.size(); }
 
         // --- VTable Operations ---
         auto op_getitem(const MXObject &key) const -> MXObject *;
-        auto op_setitem(const MXObject &key, MXObject &value) -> void;
+        auto op_setitem(MXObject &key, MXObject &value) -> MXObject *;
+        auto op_delitem(const MXObject &key) -> MXObject *;
+
+    private:
+        static constexpr std::int32_t EMPTY = -1;
+        static constexpr std::int32_t REMOVED = -2;
+        static constexpr std::size_t MIN_SLOTS = 8;
+        static constexpr std::size_t NO_SLOT = SIZE_MAX;
+        static constexpr unsigned PERTURB_SHIFT = 5;
+
+        std::vector<std::int32_t> slots;// EMPTY, REMOVED or an index into items
+        std::vector<Entry> items;
+        std::size_t used = 0;// entries that were not removed
+
+        // The slot referring to ``key``, or NO_SLOT; ``insert_at`` receives
+        // the first slot a new entry for it could take
+        auto lookup(const MXObject &key, hash_code_type hash, std::size_t &insert_at) const
+                -> std::size_t;
+        // Drops removed entries and rebuilds ``slots`` for ``min_used`` entries
+        void rebuild(std::size_t min_used);
+        // Empties the dict, returning every reference it held
+        auto take_references() -> std::vector<MXObject *>;
     };
 
     /**
@@ -103,6 +201,10 @@ extern "C" {
 // C API for Runtime Object Creation
 //======================================================================
 MXS_API mxs_runtime::MXList *MXCreateList();
+MXS_API mxs_runtime::MXList *MXCreateIntegerList(const mxs_runtime::inner_integer *values,
+                                                 std::size_t count);
+MXS_API mxs_runtime::MXList *MXCreateFloatList(const mxs_runtime::inner_float *values,
+                                               std::size_t count);
 MXS_API mxs_runtime::MXDict *MXCreateDict();
 MXS_API mxs_runtime::MXTuple *MXCreateTuple(mxs_runtime::MXObject **elements,
                                             std::size_t count);
@@ -125,15 +227,38 @@ mxs_op_getitem(mxs_runtime::MXObject *container,
 MXS_API mxs_runtime::MXObject *list_setitem(mxs_runtime::MXObject *list,
                                             mxs_runtime::MXObject *index,
                                             mxs_runtime::MXObject *value);// Fast path
-MXS_API void dict_setitem(mxs_runtime::MXObject *dict, mxs_runtime::MXObject *key,
-                          mxs_runtime::MXObject *value);// Fast path
+MXS_API mxs_runtime::MXObject *dict_setitem(mxs_runtime::MXObject *dict,
+                                            mxs_runtime::MXObject *key,
+                                            mxs_runtime::MXObject *value);// Fast path
 MXS_API mxs_runtime::MXObject *
 mxs_op_setitem(mxs_runtime::MXObject *container, mxs_runtime::MXObject *key,
                mxs_runtime::MXObject *value);// Polymorphic path
 
+// --- Dict specific ---
+MXS_API mxs_runtime::MXObject *dict_delitem(mxs_runtime::MXObject *dict,
+                                            mxs_runtime::MXObject *key);
+MXS_API mxs_runtime::MXObject *dict_contains(mxs_runtime::MXObject *dict,
+                                             mxs_runtime::MXObject *key);
+MXS_API std::size_t dict_length(mxs_runtime::MXObject *dict);
+
 // --- List specific ---
 MXS_API mxs_runtime::MXObject *list_append(mxs_runtime::MXObject *list,
                                            mxs_runtime::MXObject *value);
+MXS_API std::size_t list_length(mxs_runtime::MXObject *list);
+// "boxed", "int" or "float"
+MXS_API const char *list_storage(mxs_runtime::MXObject *list);
+MXS_API mxs_runtime::MXObject *list_specialize(mxs_runtime::MXObject *list);
+
+// --- List bulk operations ---
+MXS_API mxs_runtime::MXObject *list_sum(mxs_runtime::MXObject *list);
+MXS_API mxs_runtime::MXObject *list_min(mxs_runtime::MXObject *list);
+MXS_API mxs_runtime::MXObject *list_max(mxs_runtime::MXObject *list);
+MXS_API mxs_runtime::MXObject *list_add_elementwise(mxs_runtime::MXObject *left,
+                                                    mxs_runtime::MXObject *right);
+MXS_API mxs_runtime::MXObject *list_scale(mxs_runtime::MXObject *list,
+                                          mxs_runtime::MXObject *factor);
+MXS_API mxs_runtime::MXObject *list_fill(mxs_runtime::MXObject *list,
+                                         mxs_runtime::MXObject *value);
 
 #ifdef __cplusplus
 }
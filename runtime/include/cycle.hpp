@@ -0,0 +1,81 @@
+#pragma once
+#ifndef MXSCRIPT_CYCLE_HPP
+#define MXSCRIPT_CYCLE_HPP
+
+#include "macro.hpp"
+#include "refcount.hpp"
+#include <cstddef>
+#include <cstdint>
+
+// Reference counting never frees a cycle: a list that contains itself keeps
+// its own count above zero.  The cycle collector is a backup that finds
+// such garbage by trial deletion (Bacon and Rajan, "Concurrent Cycle
+// Collection in Reference Counted Systems", ECOOP 2001):
+//
+//   1. Objects that hold references (MXObject::holds_references) become
+//      candidates when a release leaves them alive, since only then can
+//      they be the last external link into a cycle.
+//   2. A collection takes a batch of candidates and the tracked objects
+//      reachable from them, and subtracts the references those objects hold
+//      on each other from their counts.
+//   3. Objects left with a positive count are referenced from outside the
+//      batch; they and everything they reach survive.  The rest is garbage:
+//      it drops the references it holds and is freed.
+//
+// Once the candidate buffer reaches the threshold (mxs_gc_set_threshold; 0
+// turns automatic collections off), the next object created that holds
+// references runs a collection.  It handles at most threshold candidates, so
+// the pause stays bounded and the remaining candidates wait for the next
+// one.  mxs_gc_collect() empties the buffer.
+//
+// The collector reads the counts of objects other threads might change, so
+// it is built only with plain reference counts (cmake -DMXS_CYCLE_COLLECTOR,
+// on by default).  It walks every buffered object, whichever thread released
+// it: programs that use the runtime from several threads at once should turn
+// automatic collections off and collect while the other threads are idle.
+#ifndef MXS_CYCLE_COLLECTOR
+#define MXS_CYCLE_COLLECTOR 0
+#endif
+
+namespace mxs_runtime {
+    class MXObject;
+
+    struct MXCycleStats {
+        std::size_t collections;
+        std::size_t candidates;     // candidates examined
+        std::size_t objects_freed;  // garbage objects, not counting what they held
+        std::size_t bytes_freed;    // allocator bytes returned by collections
+        std::uint64_t total_ns;     // time spent collecting
+        std::uint64_t last_ns;      // duration of the latest collection
+        std::size_t buffered;       // candidates waiting for the next one
+        std::size_t threshold;
+    };
+
+    namespace cycle {
+        inline constexpr bool ENABLED = MXS_CYCLE_COLLECTOR != 0;
+        inline constexpr std::size_t DEFAULT_THRESHOLD = 10000;
+
+        // Called when a release leaves ``obj``, which holds references, alive
+        void possible_root(MXObject *obj);
+        // Called before such an object is freed
+        void forget(MXObject *obj);
+        // Called when an object that holds references is created: collects
+        // if the buffer has reached the threshold
+        void maybe_collect();
+        // Collects at most ``limit`` candidates; returns the objects freed
+        auto collect(std::size_t limit) -> std::size_t;
+    }// namespace cycle
+
+}// namespace mxs_runtime
+
+extern "C" {
+// Whether the runtime was built with the cycle collector
+MXS_API bool mxs_gc_enabled();
+// Collects every buffered candidate; returns the garbage objects freed
+MXS_API std::size_t mxs_gc_collect();
+MXS_API void mxs_gc_set_threshold(std::size_t threshold);
+MXS_API void mxs_gc_stats(mxs_runtime::MXCycleStats *out);
+MXS_API void mxs_gc_dump_stats();
+}
+
+#endif// MXSCRIPT_CYCLE_HPP
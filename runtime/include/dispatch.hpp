@@ -0,0 +1,95 @@
+#pragma once
+#ifndef MXSCRIPT_DISPATCH_HPP
+#define MXSCRIPT_DISPATCH_HPP
+
+#include "macro.hpp"
+#include "object.h"
+#include "typeinfo.h"
+#include <cstddef>
+#include <cstdint>
+#include <string>
+
+// Binary operators are looked up in a [operator][left type id][right type id]
+// table before falling back to the virtual MXObject::op_* methods.  Types
+// register implementations for the operand pairs they handle; only the first
+// DISPATCH_TYPES type ids get table slots, so later types use the virtual path.
+namespace mxs_runtime {
+
+    enum class BinaryOp : std::uint8_t { Add, Sub, Mul, Div, Eq, Ne, Lt, Le, Gt, Ge };
+
+    inline constexpr std::size_t BINARY_OP_COUNT = 10;
+    inline constexpr std::size_t DISPATCH_TYPES = 32;
+
+    using BinaryOpFn = MXObject *(*) (MXObject &left, const MXObject &right);
+
+    // Key of an operand pair: left type id << 16 | right type id
+    constexpr auto binary_op_key(std::uint16_t left, std::uint16_t right) -> std::uint32_t {
+        return static_cast<std::uint32_t>(left) << 16 | right;
+    }
+
+    // A table slot.  Slots are only written during static initialisation,
+    // so inline caches in compiled code may point at them.
+    struct BinaryOpEntry {
+        std::uint32_t key;
+        BinaryOpFn fn;
+    };
+
+    MXS_API extern BinaryOpEntry
+            mxs_binary_op_table[BINARY_OP_COUNT][DISPATCH_TYPES][DISPATCH_TYPES];
+
+    // Installs ``fn`` for ``left op right``; returns false when a type id has
+    // no table slot
+    MXS_API auto register_binary_op(BinaryOp op, const MXTypeInfo &left,
+                                    const MXTypeInfo &right, BinaryOpFn fn) -> bool;
+
+    // The registered implementation, or nullptr
+    inline auto find_binary_op(BinaryOp op, const MXObject &left, const MXObject &right)
+            -> BinaryOpFn {
+        std::size_t l = left.get_type_id();
+        std::size_t r = right.get_type_id();
+        if (l >= DISPATCH_TYPES || r >= DISPATCH_TYPES) [[unlikely]] { return nullptr; }
+        return mxs_binary_op_table[static_cast<std::size_t>(op)][l][r].fn;
+    }
+
+    // Applies ``op`` through the table, falling back to left.op_*(right)
+    MXS_API auto apply_binary_op(BinaryOp op, MXObject &left, const MXObject &right)
+            -> MXObject *;
+
+    // Hit and miss counts of one instrumented call site; never freed
+    struct InlineCacheSite {
+        std::uint64_t hits;// incremented by compiled code
+        std::uint64_t misses;
+        std::string name;
+    };
+
+    // Inline cache of one dynamic binary operator in compiled code, which
+    // declares the same layout (src/backend/llvm/inline_cache.py).  Compiled
+    // code compares the operands' type ids with entry->key and calls
+    // entry->fn on a match; otherwise it calls mxs_op_* and then
+    // mxs_inline_cache_update.
+    struct BinaryOpCache {
+        const BinaryOpEntry *entry;// nullptr until an operand pair has one
+        InlineCacheSite *site;     // set on the first miss when instrumented
+    };
+
+    struct MXInlineCacheStats {
+        const char *site;
+        std::uint64_t hits;
+        std::uint64_t misses;
+    };
+
+}// namespace mxs_runtime
+
+extern "C" {
+// Points ``cache`` at the table entry for the operands, if there is one.
+// ``site`` names the call site of instrumented code and is nullptr otherwise.
+MXS_API void mxs_inline_cache_update(mxs_runtime::BinaryOpCache *cache, std::uint32_t op,
+                                     mxs_runtime::MXObject *left,
+                                     mxs_runtime::MXObject *right, const char *site);
+// Copies up to ``capacity`` instrumented sites to ``out``; returns how many
+// sites there are
+MXS_API std::size_t mxs_inline_cache_stats(mxs_runtime::MXInlineCacheStats *out,
+                                           std::size_t capacity);
+}
+
+#endif// MXSCRIPT_DISPATCH_HPP
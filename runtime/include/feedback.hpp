@@ -0,0 +1,51 @@
+#pragma once
+#ifndef MXSCRIPT_FEEDBACK_HPP
+#define MXSCRIPT_FEEDBACK_HPP
+
+#include "macro.hpp"
+#include "object.h"
+#include "typeinfo.h"
+#include <cstddef>
+#include <cstdint>
+#include <string>
+
+// Type feedback of profiling builds.  Compiled code instrumented for
+// profiling reports every function argument and binary-operator operand to
+// mxs_type_feedback_record; the compiler reads the records back with
+// mxs_type_feedback, saves them as a profile and uses the profile to emit
+// specialised code (src/backend/llvm/feedback.py).
+namespace mxs_runtime {
+
+    // The types one profiled value has had; never freed
+    struct TypeFeedbackRecord {
+        std::string name;
+        const MXTypeInfo *type;// the first type seen
+        bool polymorphic;      // a value of another type followed
+        std::uint64_t samples;
+    };
+
+    // Slot of one profiled value in compiled code, which declares the same
+    // layout
+    struct TypeFeedbackSlot {
+        TypeFeedbackRecord *record;// set by the first sample
+    };
+
+    struct MXTypeFeedback {
+        const char *name;
+        const char *type;// nullptr when polymorphic
+        std::uint64_t samples;
+    };
+
+}// namespace mxs_runtime
+
+extern "C" {
+// Adds the type of ``value`` to the record of ``slot``, registering the
+// record under ``name`` on the first call.  Null values are ignored.
+MXS_API void mxs_type_feedback_record(mxs_runtime::TypeFeedbackSlot *slot,
+                                      mxs_runtime::MXObject *value, const char *name);
+// Copies up to ``capacity`` records to ``out``; returns how many records
+// there are
+MXS_API std::size_t mxs_type_feedback(mxs_runtime::MXTypeFeedback *out, std::size_t capacity);
+}
+
+#endif// MXSCRIPT_FEEDBACK_HPP
@@ -9,6 +9,17 @@
 #include "string.hpp"
 #include "typeinfo.h"
 
+// MXCreateInteger returns preallocated immortal objects for integers in
+// [MXS_SMALL_INT_MIN, MXS_SMALL_INT_MAX].  Configure the range with
+// cmake -DMXS_SMALL_INT_MIN=... -DMXS_SMALL_INT_MAX=...; an empty range
+// (MAX < MIN) disables the cache.
+#ifndef MXS_SMALL_INT_MIN
+#define MXS_SMALL_INT_MIN -256
+#endif
+#ifndef MXS_SMALL_INT_MAX
+#define MXS_SMALL_INT_MAX 4096
+#endif
+
 namespace mxs_runtime {
 
     // Forward declarations
@@ -17,12 +28,17 @@ namespace mxs_runtime {
     class MXBoolean;
 
     extern MXS_API const MXTypeInfo g_integer_type_info;
+    extern MXS_API const MXTypeInfo g_float_type_info;
 
     /**
      * @brief Base class for all numeric types.
      */
     class MXNumeric : public MXObject {
     public:
+        // Byte offset of MXInteger::value and MXFloat::value, read directly
+        // by specialised compiled code: the value follows the object header
+        static constexpr std::size_t VALUE_OFFSET = sizeof(MXObject);
+
         explicit MXNumeric(const MXTypeInfo *info, bool is_static = false);
         virtual auto to_string() const -> std::string = 0;
         auto repr() const -> inner_string override { return to_string(); }
@@ -34,9 +50,13 @@ namespace mxs_runtime {
     class MXInteger : public MXNumeric {
     public:
         const inner_integer value;
-        explicit MXInteger(inner_integer v);
+        explicit MXInteger(inner_integer v, bool is_static = false);
         auto to_string() const -> std::string override;
         auto get_value() const -> inner_integer { return value; }
+        // Equal to Integers and Floats of the same value
+        using MXObject::equals;
+        auto equals(const MXObject &other) -> inner_boolean override;
+        auto hash_code() const -> hash_code_type override;
 
         // --- Operator Overrides ---
         auto op_add(const MXObject &other) -> MXObject * override;
@@ -61,6 +81,10 @@ namespace mxs_runtime {
         const inner_float value;
         explicit MXFloat(inner_float v);
         auto to_string() const -> std::string override;
+        // Integral Floats hash like the equal Integer
+        using MXObject::equals;
+        auto equals(const MXObject &other) -> inner_boolean override;
+        auto hash_code() const -> hash_code_type override;
 
         // --- Operator Overrides ---
         auto op_add(const MXObject &other) -> MXObject * override;
@@ -132,6 +156,15 @@ MXS_API mxs_runtime::MXObject *
 mxs_op_not(mxs_runtime::MXObject *operand);// Unary operator
 
 MXS_API mxs_runtime::MXObject *mxs_int_absolute(mxs_runtime::MXObject *integer_obj);
+
+// Type ids of Integer and Float, compared by specialised compiled code
+MXS_API extern const std::uint16_t mxs_integer_type_id;
+MXS_API extern const std::uint16_t mxs_float_type_id;
+// MXNumeric::VALUE_OFFSET, which depends on the reference counting mode
+MXS_API extern const std::size_t mxs_numeric_value_offset;
+// The range of the small-integer cache, empty when min > max
+MXS_API extern const mxs_runtime::inner_integer mxs_small_int_min;
+MXS_API extern const mxs_runtime::inner_integer mxs_small_int_max;
 #ifdef __cplusplus
 }
 #endif
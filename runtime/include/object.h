@@ -4,31 +4,80 @@
 
 #include "_typedef.hpp"
 #include "macro.hpp"
+#include "refcount.hpp"
 #include "typeinfo.h"
+#include <atomic>
 #include <cstddef>
+#include <cstdint>
+#include <functional>
 #include <string>
 #include <vector>
 namespace mxs_runtime {
     class MXError;
     class MXObject {
-    public:
-        const MXTypeInfo *type_info;
+        // The header is the vtable pointer plus one word holding the
+        // reference count, the type id and the flags, 16 bytes in all.
+        // Biased builds add a second word (refcount.hpp); ref_cnt then only
+        // counts the owner thread's references.
+        std::uint32_t ref_cnt = 0;
+        std::uint16_t type_id;
+        std::uint8_t flags = 0;
+#if MXS_REFCOUNT_MODE == MXS_REFCOUNT_BIASED
+        // Other threads' references times SHARED_ONE, plus the state bits
+        std::atomic<std::int32_t> shared{ 0 };
+        std::atomic<std::uint32_t> owner;
+
+        // Makes the creating thread the owner
+        void init_owner();
+#endif
 
-    private:
-        refer_count_type ref_cnt = 0;
-        bool _is_static = false;
+        static constexpr std::uint8_t STATIC_FLAG = 0x1;
+        static constexpr std::uint8_t HOLDS_REFERENCES_FLAG = 0x2;
+
+    protected:
+        // Constructors of objects that keep references to other objects call
+        // this so the cycle collector (cycle.hpp) tracks them
+        void hold_references();
 
     public:
+        // Reference count reported for immortal (static) objects.  Retain and
+        // release leave them alone, so they are never freed.
+        static constexpr refer_count_type IMMORTAL_REF_COUNT = refer_count_type{ 1 } << 62;
+        // Byte offset of the type id, read directly by inline caches in
+        // compiled code
+        static constexpr std::size_t TYPE_ID_OFFSET = 12;
+
+        // Objects live in the runtime allocator's size-class slabs
+        static auto operator new(std::size_t size) -> void *;
+        static void operator delete(void *ptr, std::size_t size);
+
         explicit MXObject(const MXTypeInfo *info, bool is_static = false);
         MXObject(const MXObject &other);
         virtual ~MXObject();
 
         auto increase_ref() -> refer_count_type;
+        // Returns 0 when the caller must free the object
         auto decrease_ref() -> refer_count_type;
+        auto get_ref_count() const -> refer_count_type;
+#if MXS_REFCOUNT_MODE == MXS_REFCOUNT_BIASED
+        // Moves the owner's references into the shared counter and gives up
+        // the bias.  Only the owner, or any thread once the owner has exited,
+        // may call it.  Returns true when no references are left.
+        auto merge_into_shared() -> bool;
+#endif
+        auto is_static() const -> bool { return (flags & STATIC_FLAG) != 0; }
+        auto holds_references() const -> bool { return (flags & HOLDS_REFERENCES_FLAG) != 0; }
+        // Calls ``visit`` on every object this one holds a reference to
+        virtual void visit_references(const std::function<void(MXObject *)> &visit);
+        // Drops every reference this object holds; the cycle collector uses
+        // it to break garbage cycles
+        virtual void clear_references();
         auto get_type_name() const -> const char *;
+        // Value equality, identity unless overridden; objects that are equal
+        // must have the same hash_code()
         virtual auto equals(const MXObject &other) -> inner_boolean;
-        virtual auto equals(const MXObject *other) -> inner_boolean;
-        virtual auto hash_code() -> hash_code_type;
+        auto equals(const MXObject *other) -> inner_boolean { return other && equals(*other); }
+        virtual auto hash_code() const -> hash_code_type;
         virtual auto repr() const -> inner_string;// representation
 
         // --- VTable Operations via virtual functions ---
@@ -45,7 +94,8 @@ namespace mxs_runtime {
         virtual auto op_ge(const MXObject &other) -> MXObject *;
         virtual auto op_is(const MXObject &other) -> MXObject *;
 
-        const MXTypeInfo *get_type_info() const { return type_info; }
+        auto get_type_id() const -> std::uint16_t { return type_id; }
+        auto get_type_info() const -> const MXTypeInfo * { return mxs_type_table[type_id]; }
     };
 
     class MXError : public MXObject {
@@ -100,6 +150,8 @@ namespace mxs_runtime {
 
         explicit MXFFICallArgv(std::vector<MXObject *> &&arg_list);
         ~MXFFICallArgv() override;
+        void visit_references(const std::function<void(MXObject *)> &visit) override;
+        void clear_references() override;
     };
 
 }// namespace mxs_runtime
@@ -111,6 +163,11 @@ mxs_runtime::MXObject *new_mx_object();
 void delete_mx_object(mxs_runtime::MXObject *obj);
 std::size_t increase_ref(mxs_runtime::MXObject *obj);
 std::size_t decrease_ref(mxs_runtime::MXObject *obj);
+/**
+     * @brief Drops the reference a compiler-generated temporary holds at the end
+     * of its full expression. Static objects are ignored.
+     */
+MXS_API void mxs_release_temp(mxs_runtime::MXObject *obj);
 const char *mxs_get_object_type_name(mxs_runtime::MXObject *obj);
 mxs_runtime::inner_boolean mx_object_equals(mxs_runtime::MXObject *obj1,
                                             mxs_runtime::MXObject *obj2);
@@ -0,0 +1,67 @@
+#pragma once
+#ifndef MXSCRIPT_REFCOUNT_HPP
+#define MXSCRIPT_REFCOUNT_HPP
+
+#include "macro.hpp"
+#include <cstddef>
+#include <cstdint>
+
+// Reference counting modes, chosen with cmake -DMXS_REFCOUNT=plain|atomic|biased:
+//
+//   plain   non-atomic ++/--; objects must not be shared between threads
+//   atomic  every retain and release is an atomic read-modify-write
+//   biased  the thread that created an object counts its own references
+//           without atomics; other threads count theirs in a second, atomic
+//           counter (MXObject::shared)
+//
+// Biased counting follows Choi et al., "Biased Reference Counting" (PACT
+// 2018).  The shared counter keeps its state in the low two bits:
+//
+//   DEFAULT  the owner's count and the shared count are separate
+//   QUEUED   the shared count dropped to zero or below; the object waits in
+//            its owner's queue until the owner adds the two counts up
+//   MERGED   the owner gave up its bias; all references are in the shared
+//            counter and whoever drops it to zero frees the object
+//
+// An owner merges its queue when it allocates, when it calls
+// mxs_refcount_merge() and when it exits.  Objects of exited owners are
+// merged by the thread that queues them.
+#define MXS_REFCOUNT_PLAIN 0
+#define MXS_REFCOUNT_ATOMIC 1
+#define MXS_REFCOUNT_BIASED 2
+#ifndef MXS_REFCOUNT_MODE
+#define MXS_REFCOUNT_MODE MXS_REFCOUNT_PLAIN
+#endif
+
+namespace mxs_runtime {
+
+    namespace refcount {
+        inline constexpr int MODE = MXS_REFCOUNT_MODE;
+        inline constexpr bool BIASED = MODE == MXS_REFCOUNT_BIASED;
+
+        // Owner id of objects that no thread owns
+        inline constexpr std::uint32_t NO_OWNER = 0;
+
+        inline constexpr std::int32_t STATE_MASK = 0b11;
+        inline constexpr std::int32_t DEFAULT = 0b00;
+        inline constexpr std::int32_t QUEUED = 0b01;
+        inline constexpr std::int32_t MERGED = 0b10;
+        // One reference in the shared counter
+        inline constexpr std::int32_t SHARED_ONE = 1 << 2;
+
+        // Merges the objects other threads queued for the calling thread and
+        // frees those without references; returns how many it freed (always
+        // 0 unless biased)
+        auto merge_pending() -> std::size_t;
+    }// namespace refcount
+
+}// namespace mxs_runtime
+
+extern "C" {
+// "plain", "atomic" or "biased"
+MXS_API const char *mxs_runtime_refcount_mode();
+// refcount::merge_pending() for the calling thread
+MXS_API std::size_t mxs_refcount_merge();
+}
+
+#endif// MXSCRIPT_REFCOUNT_HPP
@@ -0,0 +1,59 @@
+#pragma once
+#ifndef MXSCRIPT_RELEASE_HPP
+#define MXSCRIPT_RELEASE_HPP
+
+#include "macro.hpp"
+#include <cstddef>
+#include <cstdint>
+
+// Deferred releases.  Dropping the last reference to a large list frees its
+// elements, their elements and so on in one go, a pause proportional to the
+// whole graph.  Lists of at least min_length elements instead move their
+// references to a per-thread queue of pending decrements, which is worked
+// off in batches under a time budget:
+//
+//   - right after the list is queued, for up to budget_ns
+//   - when a list or another object that holds references is created, for
+//     up to budget_ns
+//   - at safe points chosen by the program, mxs_release_drain(budget_ns)
+//   - when the thread exits, completely
+//
+// Lists freed while the queue drains queue their elements in turn, so a
+// deep graph is freed a budget at a time.  Each drain performs at least one
+// batch, so repeated drains always finish.
+namespace mxs_runtime {
+    class MXObject;
+
+    namespace release {
+        inline constexpr std::size_t DEFAULT_MIN_LENGTH = 4096;
+        inline constexpr std::uint64_t DEFAULT_BUDGET_NS = 100000;
+        // Decrements performed between two looks at the clock
+        inline constexpr std::size_t BATCH = 64;
+
+        // Whether a container dropping ``count`` references should queue them
+        auto should_defer(std::size_t count) -> bool;
+        // Queues one decrement of every object in [first, last), then drains
+        // for the configured budget
+        void defer(MXObject *const *first, MXObject *const *last);
+        // Drains for the configured budget if decrements are pending
+        void drain_pending();
+        // Performs queued decrements until none are left or ``budget_ns`` has
+        // passed; returns how many are left
+        auto drain(std::uint64_t budget_ns) -> std::size_t;
+    }// namespace release
+
+}// namespace mxs_runtime
+
+extern "C" {
+// Lists of at least ``min_length`` elements defer releasing them (0 turns
+// deferral off); each automatic drain runs for up to ``budget_ns``
+MXS_API void mxs_release_configure(std::size_t min_length, std::uint64_t budget_ns);
+// Queues one decrement of ``obj`` instead of performing it now
+MXS_API void mxs_release_deferred(mxs_runtime::MXObject *obj);
+// release::drain() for the calling thread
+MXS_API std::size_t mxs_release_drain(std::uint64_t budget_ns);
+// Decrements queued by the calling thread
+MXS_API std::size_t mxs_release_pending();
+}
+
+#endif// MXSCRIPT_RELEASE_HPP
@@ -9,20 +9,28 @@
 
 namespace mxs_runtime {
 
+    extern MXS_API const MXTypeInfo g_string_type_info;
+
     class MXString : public MXObject {
     public:
         inner_string value;
         explicit MXString(inner_string v);
         auto repr() const -> inner_string override;
-    };
+        using MXObject::equals;
+        auto equals(const MXObject &other) -> inner_boolean override;
+        // Computed on first use: strings are often looked up many times
+        auto hash_code() const -> hash_code_type override;
 
-    MXS_API MXString *MXCreateString(const char *c_str);
+    private:
+        mutable hash_code_type hash = 0;// 0 until computed
+    };
 
 }// namespace mxs_runtime
 
 #ifdef __cplusplus
 extern "C" {
 #endif
+MXS_API mxs_runtime::MXString *MXCreateString(const char *c_str);
 MXS_API mxs_runtime::MXObject *
 mxs_string_from_integer(mxs_runtime::MXObject *integer_obj);
 #ifdef __cplusplus
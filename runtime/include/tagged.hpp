@@ -0,0 +1,111 @@
+#pragma once
+#ifndef MXSCRIPT_TAGGED_HPP
+#define MXSCRIPT_TAGGED_HPP
+
+#include "_typedef.hpp"
+#include "macro.hpp"
+#include <cstdint>
+
+// Tagged values store 63-bit integers, booleans and nil in the bits of an
+// MXObject * instead of pointing at a heap object.  Objects are at least
+// 8-byte aligned, so the low bits of a real pointer are clear:
+//
+//   ...xxxxxxx1  integer, value << 1 | 1
+//   ...00000010  nil
+//   ...00001010  false
+//   ...00010010  true
+//
+// Tagged values only cross the C entry points that compiled code calls; those
+// decode their arguments into real objects and encode their results, and the
+// rest of the runtime never sees a tag.  Enable with
+// cmake -DMXS_TAGGED_VALUES=ON; the compiler asks mxs_runtime_tagged_values()
+// which representation to emit.
+#ifndef MXS_TAGGED_VALUES
+#define MXS_TAGGED_VALUES 0
+#endif
+
+namespace mxs_runtime {
+    class MXObject;
+
+    namespace tagged {
+        inline constexpr bool ENABLED = MXS_TAGGED_VALUES;
+
+        inline constexpr std::uintptr_t INT_TAG = 0b1;
+        inline constexpr std::uintptr_t NIL_BITS = 0b00010;
+        inline constexpr std::uintptr_t FALSE_BITS = 0b01010;
+        inline constexpr std::uintptr_t TRUE_BITS = 0b10010;
+
+        inline constexpr inner_integer MIN_INT = -(inner_integer{ 1 } << 62);
+        inline constexpr inner_integer MAX_INT = (inner_integer{ 1 } << 62) - 1;
+
+        inline auto bits(const MXObject *obj) -> std::uintptr_t {
+            return reinterpret_cast<std::uintptr_t>(obj);
+        }
+
+        inline auto is_tagged(const MXObject *obj) -> bool {
+            return ENABLED && (bits(obj) & 0b11) != 0;
+        }
+
+        inline auto is_int(const MXObject *obj) -> bool {
+            return ENABLED && (bits(obj) & INT_TAG) != 0;
+        }
+
+        inline auto int_value(const MXObject *obj) -> inner_integer {
+            return static_cast<inner_integer>(bits(obj)) >> 1;
+        }
+
+        inline auto fits(inner_integer value) -> bool {
+            return value >= MIN_INT && value <= MAX_INT;
+        }
+
+        inline auto from_bits(std::uintptr_t value) -> MXObject * {
+            return reinterpret_cast<MXObject *>(value);
+        }
+
+        inline auto from_int(inner_integer value) -> MXObject * {
+            return from_bits((static_cast<std::uintptr_t>(value) << 1) | INT_TAG);
+        }
+
+        inline auto from_bool(bool value) -> MXObject * {
+            return from_bits(value ? TRUE_BITS : FALSE_BITS);
+        }
+
+        // An integer result: tagged when it fits, boxed otherwise
+        auto make_int(inner_integer value) -> MXObject *;
+        // The real object a tagged value stands for; sets ``allocated`` when
+        // an integer outside the small-integer cache had to be boxed
+        auto decode(MXObject *obj, bool &allocated) -> MXObject *;
+        // Converts a result for compiled code: booleans, nil and integers
+        // nobody else holds become tags
+        auto encode(MXObject *obj) -> MXObject *;
+
+        // An argument of a C entry point as a real object.  An integer boxed
+        // for the call is freed with the holder unless it was retained, for
+        // example by being stored in a list.
+        class Arg {
+        public:
+            explicit Arg(MXObject *value) : obj(value) {
+                if (is_tagged(value)) [[unlikely]] { obj = decode(value, allocated); }
+            }
+            ~Arg() {
+                if (allocated) [[unlikely]] { release(); }
+            }
+            Arg(const Arg &) = delete;
+            auto operator=(const Arg &) -> Arg & = delete;
+
+            auto get() const -> MXObject * { return obj; }
+            operator MXObject *() const { return obj; }
+            auto operator->() const -> MXObject * { return obj; }
+
+        private:
+            void release();
+
+            MXObject *obj;
+            bool allocated = false;
+        };
+    }// namespace tagged
+}// namespace mxs_runtime
+
+extern "C" MXS_API bool mxs_runtime_tagged_values();
+
+#endif// MXSCRIPT_TAGGED_HPP
@@ -4,15 +4,29 @@
 
 #include "_typedef.hpp"
 #include "macro.hpp"
+#include <cstddef>
+#include <cstdint>
 #include <string>
 
 namespace mxs_runtime {
     class MXObject;
 
     struct MXTypeInfo {
+        // Types registered at most; object headers store a 16-bit index
+        static constexpr std::size_t MAX_TYPES = 4096;
+
         std::string inner_string;
         const MXTypeInfo *parent;
+        // Index in mxs_type_table, assigned on construction
+        std::uint16_t id;
+
+        MXTypeInfo(std::string name, const MXTypeInfo *parent);
+        MXTypeInfo(const MXTypeInfo &) = delete;
+        auto operator=(const MXTypeInfo &) -> MXTypeInfo & = delete;
     };
+
+    // Every type info, indexed by id
+    MXS_API extern const MXTypeInfo *mxs_type_table[MXTypeInfo::MAX_TYPES];
 }
 
 #ifdef __cplusplus
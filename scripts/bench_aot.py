@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Compare start-to-exit latency of JIT execution and AOT binaries.
+
+Usage: ``python scripts/bench_aot.py [--opt-level N] [--repeat N]``
+
+Both modes are timed as separate processes: the JIT process parses,
+compiles and runs the program, the AOT binary only runs it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from bench_opt_levels import WORKLOAD, compile_source
+from src.backend.aot import build_binary
+
+PROGRAMS = {
+    "hello": 'func main() -> int {\n    print("hello");\n    return 0;\n}\n',
+    "loop": WORKLOAD,
+}
+
+JIT_RUNNER = """
+import sys
+sys.path.insert(0, {root!r})
+sys.path.insert(0, {scripts!r})
+from bench_opt_levels import compile_source
+from src.backend import execute_llvm
+execute_llvm(compile_source(open({path!r}).read()), {level!r})
+"""
+
+
+def timed(cmd: List[str], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--opt-level", default="2")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print("| program | JIT (ms) | AOT (ms) |")
+    print("|---------|---------:|---------:|")
+    with tempfile.TemporaryDirectory(prefix="mxs-bench-") as tmp:
+        for name, src in PROGRAMS.items():
+            source = Path(tmp) / f"{name}.mxs"
+            source.write_text(src)
+            binary = Path(tmp) / name
+            build_binary(compile_source(src), binary, args.opt_level)
+            runner = JIT_RUNNER.format(
+                root=str(ROOT),
+                scripts=str(ROOT / "scripts"),
+                path=str(source),
+                level=args.opt_level,
+            )
+            jit = timed([sys.executable, "-c", runner], args.repeat)
+            aot = timed([str(binary)], args.repeat)
+            print(f"| {name:7} | {jit:8.1f} | {aot:8.1f} |")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Compare startup latency of the eager (MCJIT) and lazy (ORC) engines.
+
+Usage: ``python scripts/bench_jit_startup.py [--functions N] [--repeat N]``
+
+The workload imitates a short script importing a large module: ``N``
+functions are defined but only one of them is called.  Startup is measured
+from LLVM code generation to the return of ``__start``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from ctypes import CFUNCTYPE, c_longlong
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, jit_compile, lazy_compile
+
+HELPER = """
+func helper{n}(x: int) -> int {{
+    let mut i: int = 0;
+    let mut acc: int = x;
+    until (i >= 10) {{
+        acc = acc + i;
+        i = i + 1;
+    }}
+    return acc;
+}}
+"""
+
+
+def workload(functions: int) -> str:
+    helpers = "".join(HELPER.format(n=n) for n in range(functions))
+    return helpers + (
+        "func main() -> int {\n"
+        "    let a: int = helper0(1);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    ast = Parser(TokenStream(tokens)).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+def startup(src: str, lazy: bool) -> float:
+    program = compile_source(src)
+    start = time.perf_counter()
+    if lazy:
+        lljit, tracker = lazy_compile(program)
+        address = tracker["__start"]
+    else:
+        engine = jit_compile(program)
+        address = engine.get_function_address("__start")
+    CFUNCTYPE(c_longlong)(address)()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--functions", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print("| functions | eager (ms) | lazy (ms) |")
+    print("|----------:|-----------:|----------:|")
+    for count in (10, args.functions // 4, args.functions):
+        src = workload(count)
+        eager = statistics.median(startup(src, False) for _ in range(args.repeat))
+        lazy = statistics.median(startup(src, True) for _ in range(args.repeat))
+        print(f"| {count:9d} | {eager:10.1f} | {lazy:9.1f} |")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
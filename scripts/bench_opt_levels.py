@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Compare JIT compile time and run time across LLVM optimisation levels.
+
+Usage: ``python scripts/bench_opt_levels.py [--cpu native] [--repeat N]``
+
+Prints a Markdown table with the median of ``N`` runs per level.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from ctypes import CFUNCTYPE, c_longlong
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, jit_compile
+from src.backend.llvm import OPT_LEVELS
+
+WORKLOAD = """
+func step(x: int) -> int {
+    let y: int = x * 31;
+    let z: int = y + 7;
+    let q: int = z / 1000003;
+    let r: int = q * 1000003;
+    return z - r;
+}
+func main() -> int {
+    let mut i: int = 0;
+    let mut acc: int = 0;
+    until (i >= 50000) {
+        let next: int = acc + i;
+        acc = step(next);
+        i = i + 1;
+    }
+    return 0;
+}
+"""
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    ast = Parser(TokenStream(tokens)).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+def measure(level: str, cpu: str | None) -> Tuple[float, float]:
+    program = compile_source(WORKLOAD)
+    start = time.perf_counter()
+    engine = jit_compile(program, level, cpu)
+    compiled = time.perf_counter()
+    entry = CFUNCTYPE(c_longlong)(engine.get_function_address("__start"))
+    entry()
+    finished = time.perf_counter()
+    return (compiled - start) * 1000, (finished - compiled) * 1000
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cpu", help="target CPU ('native' for the host)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print("| level | compile (ms) | run (ms) | total (ms) |")
+    print("|-------|-------------:|---------:|-----------:|")
+    for level in OPT_LEVELS:
+        samples = [measure(level, args.cpu) for _ in range(args.repeat)]
+        compile_ms = statistics.median(s[0] for s in samples)
+        run_ms = statistics.median(s[1] for s in samples)
+        print(
+            f"| -O{level} | {compile_ms:12.1f} | {run_ms:8.1f} "
+            f"| {compile_ms + run_ms:10.1f} |"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Compare generic, profiling and type-specialised code on numeric loops.
+
+Usage: ``python scripts/bench_type_feedback.py [--opt-level N] [--repeat N]``
+
+Every workload runs once instrumented to collect type feedback, and is then
+recompiled with the collected profile.  Prints a Markdown table with the
+best of ``N`` runs of each tier, excluding compile time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from ctypes import CFUNCTYPE, c_longlong
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, jit_compile
+from src.backend.llvm import TypeProfile
+
+WORKLOADS = {
+    "int loop": """
+func step(x: int, n: int) -> int {
+    let mut i: int = 0;
+    let mut acc: int = x;
+    until (i >= n) {
+        let t: int = i * 3;
+        acc = acc + t;
+        i = i + 1;
+    }
+    return acc;
+}
+func main() -> int {
+    let r: int = step(5, 200000);
+    return 0;
+}
+""",
+    "int calls": """
+func poly(x: int) -> int {
+    let a: int = x * x;
+    let b: int = a + x;
+    return b - 7;
+}
+func main() -> int {
+    let mut i: int = 0;
+    let mut acc: int = 0;
+    until (i >= 200000) {
+        let v: int = poly(i);
+        acc = acc + v;
+        i = i + 1;
+    }
+    return 0;
+}
+""",
+    "float calls": """
+func norm(x: float, y: float) -> float {
+    let xx: float = x * x;
+    let yy: float = y * y;
+    return xx + yy;
+}
+func main() -> int {
+    let mut i: int = 0;
+    let mut x: float = 0.5;
+    let mut acc: float = 0.0;
+    until (i >= 200000) {
+        let v: float = norm(x, 0.25);
+        acc = acc + v;
+        x = x + 0.125;
+        i = i + 1;
+    }
+    return 0;
+}
+""",
+}
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    ast = Parser(TokenStream(tokens)).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+def measure(src: str, level: str, repeat: int, **options) -> float:
+    engine = jit_compile(compile_source(src), level, **options)
+    entry = CFUNCTYPE(c_longlong)(engine.get_function_address("__start"))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entry()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--opt-level", default="2")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print("| workload | generic (ms) | profiling (ms) | specialised (ms) | speed-up |")
+    print("|----------|-------------:|---------------:|-----------------:|---------:|")
+    for name, src in WORKLOADS.items():
+        generic = measure(src, args.opt_level, args.repeat)
+        profiling = measure(
+            src, args.opt_level, args.repeat, collect_type_feedback=True
+        )
+        profile = TypeProfile.collect()
+        specialised = measure(src, args.opt_level, args.repeat, type_profile=profile)
+        print(
+            f"| {name} | {generic:12.1f} | {profiling:14.1f} | {specialised:16.1f} "
+            f"| {generic / specialised:7.2f}x |"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
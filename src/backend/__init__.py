@@ -9,6 +9,8 @@ from .llir import (
     DestructorCall,
     ScopeEnter,
     ScopeExit,
+    TempScopeEnter,
+    TempScopeExit,
     ProgramIR,
     Instr,
     ErrorValue,
@@ -18,10 +20,16 @@ from .llir import (
     compile_program,
     to_llvm_ir,
     execute_llvm,
+    jit_compile,
+    lazy_compile,
     build_search_paths,
     load_module_ast,
 )
 from .llvm import compile_to_llvm
+from .inliner import InlineReport, inline_program
+from .static_eval import StaticEvalReport, evaluate_static_calls
+from .licm import PureCallReport, optimize_pure_calls
+from .purity import PurityInfo, infer_purity
 
 __all__ = [
     "Const",
@@ -37,6 +45,8 @@ __all__ = [
     "DestructorCall",
     "ScopeEnter",
     "ScopeExit",
+    "TempScopeEnter",
+    "TempScopeExit",
     "ProgramIR",
     "Instr",
     "ErrorValue",
@@ -44,7 +54,17 @@ __all__ = [
     "execute",
     "to_llvm_ir",
     "execute_llvm",
+    "jit_compile",
+    "lazy_compile",
     "build_search_paths",
     "load_module_ast",
     "compile_to_llvm",
+    "InlineReport",
+    "inline_program",
+    "StaticEvalReport",
+    "evaluate_static_calls",
+    "PureCallReport",
+    "optimize_pure_calls",
+    "PurityInfo",
+    "infer_purity",
 ]
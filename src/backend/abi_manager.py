@@ -34,6 +34,7 @@ if "ffi_functions" in _RAW_MAP:
         "mxs_get_nil": {"ret": char_ptr, "args": []},
         "increase_ref": {"ret": int64, "args": [char_ptr]},
         "decrease_ref": {"ret": int64, "args": [char_ptr]},
+        "mxs_release_temp": {"ret": ir.VoidType(), "args": [char_ptr]},
         "new_mx_object": {"ret": char_ptr, "args": []},
         "mxs_print_object_ext": {"ret": char_ptr, "args": [char_ptr, char_ptr]},
         "mxs_string_from_integer": {"ret": char_ptr, "args": [char_ptr]},
@@ -53,6 +54,42 @@ else:
             entry["var_arg"] = info["var_arg"]
         _TYPED_MAP[name] = entry
 
+# Side effects of runtime entry points, used by the purity analysis and to
+# annotate LLVM declarations:
+#   "const" - reads and writes no memory, so LLVM may treat it as readnone
+#   "pure"  - the result depends only on the argument values; it may allocate
+#             a fresh object but has no other observable effect
+#   "io"    - performs I/O but never mutates MxScript objects
+# Symbols missing from the table may have arbitrary side effects.
+_PURITY_MAP: Dict[str, str] = {
+    "mxs_get_true": "const",
+    "mxs_get_false": "const",
+    "mxs_get_nil": "const",
+    "MXCreateInteger": "pure",
+    "MXCreateFloat": "pure",
+    "MXCreateString": "pure",
+    "mxs_string_from_integer": "pure",
+    "mxs_int_absolute": "pure",
+    "mxs_get_object_type_name": "pure",
+    "mxs_is_instance": "pure",
+    "mxs_op_add": "pure",
+    "mxs_op_sub": "pure",
+    "mxs_op_mul": "pure",
+    "mxs_op_div": "pure",
+    "mxs_op_eq": "pure",
+    "mxs_op_ne": "pure",
+    "mxs_op_lt": "pure",
+    "mxs_op_le": "pure",
+    "mxs_op_gt": "pure",
+    "mxs_op_ge": "pure",
+    "mxs_op_is": "pure",
+    "mxs_op_and": "pure",
+    "mxs_op_or": "pure",
+    "mxs_print_object_ext": "io",
+    "printf_wrapper": "io",
+    "modern_print_wrapper": "io",
+}
+
 
 def get_function_signature(name: str) -> Tuple[ir.Type, List[ir.Type]]:
     info = _TYPED_MAP[name]
@@ -61,3 +98,8 @@ def get_function_signature(name: str) -> Tuple[ir.Type, List[ir.Type]]:
 
 def get_abi_entry(name: str) -> dict:
     return _TYPED_MAP[name]
+
+
+def get_purity(name: str) -> str | None:
+    """Return the side-effect class of runtime symbol ``name``, if known."""
+    return _PURITY_MAP.get(name)
@@ -0,0 +1,128 @@
+"""Ahead-of-time compilation of MxScript programs to native binaries.
+
+The program is lowered with the same :class:`LLVMGenerator` and
+optimisation pipeline as the JIT, emitted as a position independent object
+file and linked against the runtime with the system C compiler, or the C++
+compiler when the runtime is linked statically.  Executables
+get a small C ``main`` that runs ``__start``; shared objects export
+``__start`` and every MxScript function under its own name, except that
+MxScript ``main`` becomes ``__mxs_main``.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import List
+
+from llvmlite import binding
+
+from .ir import ProgramIR
+
+RUNTIME_DIR = Path(__file__).resolve().parents[2] / "bin"
+# MxScript ``main`` is renamed so it does not clash with the C entry point
+MAIN_SYMBOL = "__mxs_main"
+
+ENTRY_STUB = """\
+#include <stdint.h>
+#include <stdio.h>
+
+extern int64_t __start(void);
+
+int main(void) {
+    int64_t result = __start();
+    fflush(NULL);
+    return (int)result;
+}
+"""
+
+
+def emit_object(
+    program: ProgramIR, path: str | Path, opt_level: int | str = 0, cpu: str | None = None
+) -> None:
+    """Optimise ``program`` and write it to ``path`` as an object file."""
+    from .llvm import build_llvm, create_target_machine, optimize_module
+    from .llvm.optimizer import pipeline_levels
+    from .llvm.runtime_link import link_runtime
+    from .llir import _load_runtime
+
+    # The generator asks the runtime whether it takes tagged values
+    _load_runtime()
+    binding.initialize()
+    binding.initialize_native_target()
+    binding.initialize_native_asmprinter()
+
+    llvm_ir, opt_levels = build_llvm(program)
+    mod = binding.parse_assembly(llvm_ir)
+    mod.verify()
+    target_machine = create_target_machine(opt_level, cpu, jit=False)
+    mod.triple = target_machine.triple
+    mod.data_layout = str(target_machine.target_data)
+    if pipeline_levels(opt_level)[0] > 0:
+        link_runtime(mod, target_machine)
+    optimize_module(mod, target_machine, opt_level, opt_levels)
+    try:
+        mod.get_function("main").name = MAIN_SYMBOL
+    except NameError:
+        pass
+    Path(path).write_bytes(target_machine.emit_object(mod))
+
+
+def runtime_link_args(static: bool = False) -> List[str]:
+    """Linker arguments for the MxScript runtime in ``bin/``."""
+    if static:
+        # Linking the whole archive keeps its members in source order, so the
+        # allocator's static instance is constructed before the static
+        # objects of other translation units that allocate through it.  The
+        # runtime is C++; build_binary links with the C++ driver, which adds
+        # the standard library of its toolchain (libstdc++ or libc++).
+        return [
+            "-Wl,--whole-archive",
+            str(RUNTIME_DIR / "libruntime.a"),
+            "-Wl,--no-whole-archive",
+            "-lm",
+        ]
+    return [
+        f"-L{RUNTIME_DIR}",
+        "-lruntime",
+        f"-Wl,-rpath,{RUNTIME_DIR}",
+    ]
+
+
+def build_binary(
+    program: ProgramIR,
+    output: str | Path,
+    opt_level: int | str = 0,
+    cpu: str | None = None,
+    shared: bool = False,
+    static_runtime: bool = False,
+) -> Path:
+    """Compile ``program`` to an executable, or a shared object if ``shared``.
+
+    The C compiler is taken from ``$CC`` and defaults to ``cc``.  With
+    ``static_runtime`` the C++ compiler from ``$CXX``, by default ``c++``,
+    links instead; it should be the one the runtime was built with.  Raises
+    :class:`subprocess.CalledProcessError` if compiling or linking fails.
+    """
+    output = Path(output)
+    compiler = os.environ.get("CC", "cc")
+    linker = os.environ.get("CXX", "c++") if static_runtime else compiler
+    with tempfile.TemporaryDirectory(prefix="mxs-build-") as tmp:
+        obj = Path(tmp) / "program.o"
+        emit_object(program, obj, opt_level, cpu)
+        cmd = [linker, "-o", str(output), str(obj)]
+        if shared:
+            cmd.insert(1, "-shared")
+        else:
+            # Compiled as C on its own, since a C++ driver would treat
+            # entry.c as C++
+            stub = Path(tmp) / "entry.c"
+            stub.write_text(ENTRY_STUB)
+            stub_obj = Path(tmp) / "entry.o"
+            subprocess.run([compiler, "-c", "-o", str(stub_obj), str(stub)], check=True)
+            cmd.append(str(stub_obj))
+        cmd += runtime_link_args(static_runtime)
+        subprocess.run(cmd, check=True)
+    return output
@@ -60,6 +60,8 @@ from .ir import (
     DestructorCall,
     ScopeEnter,
     ScopeExit,
+    TempScopeEnter,
+    TempScopeExit,
 )
 from typing import TYPE_CHECKING
 
@@ -69,7 +71,8 @@ if TYPE_CHECKING:  # pragma: no cover - only for type hints
 STD_LIB_DIR = Path(__file__).resolve().parents[2] / "stdlib"
 ENV_VAR = "MXSCRIPT_PATH"
 
-# Global counters for generating unique labels and temporaries
+# Counters for generating unique labels and temporaries, reset for every
+# top-level compilation so identical programs produce identical IR
 _label_counter = 0
 _temp_counter = 0
 
@@ -91,6 +94,12 @@ def _new_temp() -> str:
     return f"__tmp_{_temp_counter}"
 
 
+def _reset_counters() -> None:
+    global _label_counter, _temp_counter
+    _label_counter = 0
+    _temp_counter = 0
+
+
 def build_search_paths(extra_paths: List[str | Path] | None = None) -> List[Path]:
     """Return module search paths including stdlib and user overrides."""
     paths: List[Path] = [STD_LIB_DIR]
@@ -144,6 +153,9 @@ def compile_program(
     alias_map: Dict[str, str] = {}
     symtab = ScopedSymbolTable()
     if module_cache is None:
+        # Imported modules share the counters of the program importing them
+        # because their initialisation code is spliced into ``__start``
+        _reset_counters()
         module_cache = {}
     if search_paths is None:
         search_paths = build_search_paths()
@@ -193,7 +205,7 @@ def compile_program(
                 if mod_name not in module_cache:
                     mod_ast = load_module_ast(mod_name, search_paths)
                     module_cache[mod_name] = compile_program(
-                        mod_ast, module_cache, search_paths
+                        mod_ast, module_cache=module_cache, search_paths=search_paths
                     )
                 mod_ir = module_cache[mod_name]
             except FileNotFoundError:
@@ -211,7 +223,13 @@ def compile_program(
                         new_code.append(Call(rename_map[instr.name], instr.argc))
                     else:
                         new_code.append(instr)
-                functions[new_name] = Function(new_name, func.params, new_code)
+                functions[new_name] = Function(
+                    new_name,
+                    func.params,
+                    new_code,
+                    func.opt_level,
+                    func.is_deterministic,
+                )
             for name, info in mod_ir.foreign_functions.items():
                 foreign_functions[prefix + name] = info
             for instr in mod_ir.code:
@@ -229,7 +247,11 @@ def compile_program(
             if target in functions:
                 target_func = functions[target]
                 functions[stmt.name] = Function(
-                    stmt.name, target_func.params, target_func.code
+                    stmt.name,
+                    target_func.params,
+                    target_func.code,
+                    target_func.opt_level,
+                    target_func.is_deterministic,
                 )
                 continue
             if target in foreign_functions:
@@ -256,22 +278,10 @@ def _compile_stmt(
     break_targets: List[tuple[str, str]],
 ) -> List[Instr]:
     if isinstance(stmt, LetStmt):
-        code: List[Instr] = []
+        code: List[Instr] = [TempScopeEnter()]
         if stmt.value is not None:
             code.extend(_compile_expr(stmt.value, alias_map, symtab, type_registry))
 
-        # If assigning from another ARC-managed variable, retain the value
-        if isinstance(stmt.value, Identifier) and type_registry is not None:
-            sym = symtab.lookup(stmt.value.name)
-            if (
-                sym is not None
-                and sym.type_name is not None
-                and sym.type_name in type_registry
-            ):
-                code.append(Dup())
-                code.append(Call("increase_ref", 1))
-                code.append(Pop())
-
         resolved_type = stmt.type_name
         needs_destruction = False
 
@@ -294,6 +304,7 @@ def _compile_stmt(
         for name in stmt.names:
             code.append(Store(name, resolved_type, stmt.is_mut))
             symtab.add_symbol(Symbol(name, resolved_type, needs_destruction))
+        code.append(TempScopeExit())
         return code
     if isinstance(stmt, BindingStmt):
         if stmt.is_static and isinstance(stmt.value, (Identifier, MemberAccess)):
@@ -329,9 +340,11 @@ def _compile_stmt(
         end_label = _new_label("if_end")
         else_label = _new_label("if_else") if stmt.else_block is not None else None
 
+        code.append(TempScopeEnter())
         code.extend(_compile_expr(stmt.condition, alias_map, symtab, type_registry))
         cond_var = _new_temp()
         code.append(Store(cond_var))
+        code.append(TempScopeExit())
 
         if stmt.else_block is not None:
             code.append(
@@ -373,8 +386,10 @@ def _compile_stmt(
         code.append(Label(name=end_label))
         return code
     if isinstance(stmt, ExprStmt):
-        code = _compile_expr(stmt.expr, alias_map, symtab, type_registry)
+        code = [TempScopeEnter()]
+        code.extend(_compile_expr(stmt.expr, alias_map, symtab, type_registry))
         code.append(Pop())
+        code.append(TempScopeExit())
         return code
     if isinstance(stmt, LoopStmt):
         from .llir import Label, Br
@@ -402,9 +417,11 @@ def _compile_stmt(
         code.append(Label(name=cond_label))
         code.append(ScopeEnter())
         symtab.enter_scope()
+        code.append(TempScopeEnter())
         code.extend(_compile_expr(stmt.condition, alias_map, symtab, type_registry))
         cond_var = _new_temp()
         code.append(Store(cond_var))
+        code.append(TempScopeExit())
         code.append(CondBr(cond=cond_var, then_label=end_label, else_label=body_label))
         symtab.leave_scope()
         code.append(ScopeExit())
@@ -431,9 +448,11 @@ def _compile_stmt(
         break_targets.pop()
         code.append(ScopeEnter())
         symtab.enter_scope()
+        code.append(TempScopeEnter())
         code.extend(_compile_expr(stmt.condition, alias_map, symtab, type_registry))
         cond_var = _new_temp()
         code.append(Store(cond_var))
+        code.append(TempScopeExit())
         code.append(CondBr(cond=cond_var, then_label=end_label, else_label=body_label))
         symtab.leave_scope()
         code.append(ScopeExit())
@@ -493,25 +512,26 @@ def _compile_stmt(
         target = break_targets[-1][1]
         return [Br(label=target)]
     if isinstance(stmt, RaiseStmt):
-        code = _compile_expr(stmt.expr, alias_map, symtab, type_registry)
+        code = [TempScopeEnter()]
+        code.extend(_compile_expr(stmt.expr, alias_map, symtab, type_registry))
         for scope in reversed(symtab.scopes):
             for sym in reversed(list(scope.values())):
                 if sym.needs_destruction:
                     code.append(DestructorCall(sym.name))
         code.append(Return())
+        code.append(TempScopeExit())
         return code
     if isinstance(stmt, ReturnStmt):
-        code = (
-            _compile_expr(stmt.value, alias_map, symtab, type_registry)
-            if stmt.value is not None
-            else []
-        )
+        code = [TempScopeEnter()]
+        if stmt.value is not None:
+            code.extend(_compile_expr(stmt.value, alias_map, symtab, type_registry))
         # emit destructor calls for all active scopes
         for scope in reversed(symtab.scopes):
             for sym in reversed(list(scope.values())):
                 if sym.needs_destruction:
                     code.append(DestructorCall(sym.name))
         code.append(Return())
+        code.append(TempScopeExit())
         return code
     raise NotImplementedError(f"Unsupported stmt {type(stmt).__name__}")
 
@@ -555,17 +575,6 @@ def _compile_expr(
     if isinstance(expr, MemberAssign):
         code = _compile_expr(expr.value, alias_map, symtab, type_registry)
 
-        if isinstance(expr.value, Identifier) and type_registry is not None:
-            sym = symtab.lookup(expr.value.name)
-            if (
-                sym is not None
-                and sym.type_name is not None
-                and sym.type_name in type_registry
-            ):
-                code.append(Dup())
-                code.append(Call("increase_ref", 1))
-                code.append(Pop())
-
         name = _flatten_member(MemberAccess(expr.object, expr.member))
         resolved_type = None
         if isinstance(expr.object, Identifier) and type_registry is not None:
@@ -584,17 +593,6 @@ def _compile_expr(
     if isinstance(expr, AssignExpr):
         code = _compile_expr(expr.value, alias_map, symtab, type_registry)
 
-        if isinstance(expr.value, Identifier) and type_registry is not None:
-            sym = symtab.lookup(expr.value.name)
-            if (
-                sym is not None
-                and sym.type_name is not None
-                and sym.type_name in type_registry
-            ):
-                code.append(Dup())
-                code.append(Call("increase_ref", 1))
-                code.append(Pop())
-
         if not isinstance(expr.target, Identifier):
             raise NotImplementedError("Invalid assignment target")
 
@@ -632,16 +630,6 @@ def _compile_expr(
             code.append(Dup())
             for arg in expr.args:
                 code.extend(_compile_expr(arg, alias_map, symtab, type_registry))
-                if isinstance(arg, Identifier) and type_registry is not None:
-                    sym = symtab.lookup(arg.name)
-                    if (
-                        sym is not None
-                        and sym.type_name is not None
-                        and sym.type_name in type_registry
-                    ):
-                        code.append(Dup())
-                        code.append(Call("increase_ref", 1))
-                        code.append(Pop())
             code.append(Call(f"{expr.name}_constructor", len(expr.args) + 1))
             code.append(Pop())
             return code
@@ -665,16 +653,6 @@ def _compile_expr(
                     code.append(Call("mxs_get_nil", 0))
             else:
                 code.extend(_compile_expr(arg, alias_map, symtab, type_registry))
-            if isinstance(arg, Identifier) and type_registry is not None:
-                sym = symtab.lookup(arg.name)
-                if (
-                    sym is not None
-                    and sym.type_name is not None
-                    and sym.type_name in type_registry
-                ):
-                    code.append(Dup())
-                    code.append(Call("increase_ref", 1))
-                    code.append(Pop())
         name = expr.name
         while name in alias_map:
             name = alias_map[name]
@@ -705,6 +683,10 @@ def _compile_function(
     for sym in reversed(list(symtab.scopes[-1].values())):
         if sym.needs_destruction:
             body_code.append(DestructorCall(sym.name))
+    if isinstance(func, FuncDef):
+        return Function(
+            func.name, params, body_code, func.opt_level, func.is_deterministic
+        )
     return Function(func.name, params, body_code)
 
 
@@ -0,0 +1,302 @@
+"""LLIR-level inliner for small MxScript functions.
+
+The pass works on the stack-machine code stored in :class:`Function.code`
+before it is lowered to LLVM.  A call site ``Call(f, n)`` is replaced by the
+body of ``f`` when the callee is cheap enough for the caller's optimisation
+level (``@@manual_optimize_level``).  Callee locals and labels are renamed per
+call site so the inlined body never clashes with the caller.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from .ir import (
+    Alloc,
+    BinOpInstr,
+    Call,
+    Const,
+    DestructorCall,
+    Dup,
+    Function,
+    Instr,
+    Load,
+    Pop,
+    ProgramIR,
+    Return,
+    ScopeEnter,
+    ScopeExit,
+    Store,
+    TempScopeEnter,
+    TempScopeExit,
+)
+from .llir import Br, CondBr, Label
+
+DEFAULT_OPT_LEVEL = 2
+# Maximum body cost that may be inlined at each optimisation level
+INLINE_THRESHOLDS: Dict[int, int] = {0: 0, 1: 8, 2: 24, 3: 64}
+MAX_INLINE_DEPTH = 3
+
+_ARC_CALLS = {"increase_ref", "decrease_ref", "mxs_release_temp"}
+_FREE_INSTRS = (
+    Label,
+    ScopeEnter,
+    ScopeExit,
+    TempScopeEnter,
+    TempScopeExit,
+)
+
+
+@dataclass
+class InlineDecision:
+    caller: str
+    callee: str
+    cost: int
+    inlined: bool
+    reason: str = ""
+
+
+@dataclass
+class InlineReport:
+    decisions: List[InlineDecision] = field(default_factory=list)
+
+    @property
+    def inlined(self) -> List[InlineDecision]:
+        return [d for d in self.decisions if d.inlined]
+
+    def render(self) -> str:
+        lines = [
+            f"inlined {len(self.inlined)} of {len(self.decisions)} call sites"
+        ]
+        for d in self.decisions:
+            status = "inlined" if d.inlined else f"kept ({d.reason})"
+            lines.append(f"  {d.caller} -> {d.callee} [cost {d.cost}]: {status}")
+        return "\n".join(lines)
+
+
+def instr_cost(instr: Instr) -> int:
+    """Estimated size of ``instr`` once lowered to LLVM.
+
+    Reference counting operations are weighted above ordinary calls since
+    duplicating them multiplies refcount traffic in the caller.
+    """
+    if isinstance(instr, _FREE_INSTRS):
+        return 0
+    if isinstance(instr, DestructorCall):
+        return 4
+    if isinstance(instr, Call):
+        return 4 if instr.name in _ARC_CALLS else 3
+    if isinstance(instr, (BinOpInstr, Alloc)):
+        return 2
+    return 1
+
+
+def code_cost(code: List[Instr]) -> int:
+    return sum(instr_cost(instr) for instr in code)
+
+
+def _stack_effect(instr: Instr) -> int | None:
+    if isinstance(instr, (Const, Load, Alloc, Dup)):
+        return 1
+    if isinstance(instr, (Store, Pop, BinOpInstr)):
+        return -1
+    if isinstance(instr, Call):
+        return 1 - instr.argc
+    if isinstance(instr, (DestructorCall, Br, CondBr) + _FREE_INSTRS):
+        return 0
+    return None
+
+
+def _extract_body(func: Function) -> Tuple[List[Instr] | None, int, str]:
+    """Return ``(body, results, reason)`` for an inlinable ``func``.
+
+    ``body`` is the callee code without its terminating ``Return`` and
+    ``results`` the number of values it leaves on the stack (0 or 1).  When
+    the function cannot be inlined ``body`` is ``None`` and ``reason`` says why.
+    """
+    code = func.code
+    returns = [i for i, instr in enumerate(code) if isinstance(instr, Return)]
+    if len(returns) > 1:
+        return None, 0, "multiple returns"
+    if returns:
+        end = returns[0]
+        tail = code[end + 1 :]
+        if any(
+            not isinstance(i, (DestructorCall, ScopeExit, TempScopeExit)) for i in tail
+        ):
+            return None, 0, "early return"
+        # Destructor calls after the final return are unreachable
+        body = code[:end]
+        if any(isinstance(i, TempScopeExit) for i in tail):
+            # Inlined, the temporaries of the returned expression belong to
+            # the full expression of the caller
+            opened = [
+                i for i, instr in enumerate(body) if isinstance(instr, TempScopeEnter)
+            ]
+            del body[opened[-1]]
+        scope_exits = [i for i in tail if isinstance(i, ScopeExit)]
+    else:
+        body = list(code)
+        scope_exits = []
+    kept: List[Instr] = []
+    depth = 0
+    for instr in body:
+        effect = _stack_effect(instr)
+        if effect is None:
+            return None, 0, f"unsupported {type(instr).__name__}"
+        if isinstance(instr, Pop) and depth == 0:
+            # Popping an empty stack is a no-op inside a function, but
+            # inlined it would discard a value belonging to the caller.
+            continue
+        depth += effect
+        if depth < 0:
+            return None, 0, "unbalanced stack"
+        kept.append(instr)
+    if depth > 1:
+        return None, 0, "unbalanced stack"
+    return kept + scope_exits, depth, ""
+
+
+def _local_names(func: Function, body: List[Instr]) -> Set[str]:
+    names: Set[str] = set(func.params)
+    for instr in body:
+        if isinstance(instr, (Store, DestructorCall)):
+            names.add(instr.name.split(".", 1)[0])
+        elif isinstance(instr, CondBr):
+            names.add(instr.cond.split(".", 1)[0])
+    return names
+
+
+def _rename(instr: Instr, local_names: Set[str], prefix: str, suffix: str) -> Instr:
+    def name(n: str) -> str:
+        return prefix + n if n.split(".", 1)[0] in local_names else n
+
+    if isinstance(instr, Load):
+        return Load(name(instr.name))
+    if isinstance(instr, Store):
+        return Store(name(instr.name), instr.type_name, instr.is_mut)
+    if isinstance(instr, DestructorCall):
+        return DestructorCall(name(instr.name))
+    if isinstance(instr, Label):
+        return Label(instr.name + suffix)
+    if isinstance(instr, Br):
+        return Br(instr.label + suffix)
+    if isinstance(instr, CondBr):
+        return CondBr(
+            name(instr.cond), instr.then_label + suffix, instr.else_label + suffix
+        )
+    return instr
+
+
+class Inliner:
+    """Substitute small callees into their callers across a program."""
+
+    def __init__(
+        self, program: ProgramIR, default_level: int = DEFAULT_OPT_LEVEL
+    ) -> None:
+        self.program = program
+        self.default_level = default_level
+        self.report = InlineReport()
+        self.site_counter = 0
+        # Bodies are taken from the original program so every caller sees
+        # the same callee code regardless of processing order.
+        self.originals: Dict[str, Function] = {
+            name: Function(
+                f.name, f.params, list(f.code), f.opt_level, f.is_deterministic
+            )
+            for name, f in program.functions.items()
+        }
+
+    def level_of(self, func: Function) -> int:
+        return self.default_level if func.opt_level is None else func.opt_level
+
+    def run(self) -> InlineReport:
+        for name, func in self.program.functions.items():
+            threshold = INLINE_THRESHOLDS.get(self.level_of(func), 0)
+            if threshold <= 0:
+                continue
+            func.code = self._expand(func.code, [name], threshold)
+        return self.report
+
+    # ------------------------------------------------------------------
+    def _reject_reason(self, callee: Function, chain: List[str]) -> str:
+        if callee.name in chain:
+            return "recursive"
+        if callee.name.endswith(("_constructor", "_destructor")):
+            return "special calling convention"
+        if callee.name in self.program.foreign_functions:
+            return "foreign function"
+        if self.level_of(callee) == 0:
+            return "callee opts out"
+        if any(
+            isinstance(i, Call) and i.name == callee.name for i in callee.code
+        ):
+            return "recursive"
+        if len(chain) > MAX_INLINE_DEPTH:
+            return "inline depth limit"
+        return ""
+
+    def _expand(
+        self, code: List[Instr], chain: List[str], threshold: int
+    ) -> List[Instr]:
+        out: List[Instr] = []
+        i = 0
+        while i < len(code):
+            instr = code[i]
+            callee = (
+                self.originals.get(instr.name) if isinstance(instr, Call) else None
+            )
+            if callee is None:
+                out.append(instr)
+                i += 1
+                continue
+            body, results, reason = _extract_body(callee)
+            cost = code_cost(callee.code)
+            discarded = i + 1 < len(code) and isinstance(code[i + 1], Pop)
+            if not reason:
+                reason = self._reject_reason(callee, chain)
+            if not reason and instr.argc != len(callee.params):
+                reason = "arity mismatch"
+            if not reason and results == 0 and not discarded:
+                reason = "result is used but callee yields none"
+            if not reason and cost > threshold:
+                reason = f"cost exceeds threshold {threshold}"
+            self.report.decisions.append(
+                InlineDecision(chain[-1], callee.name, cost, not reason, reason)
+            )
+            if reason:
+                out.append(instr)
+                i += 1
+                continue
+            out.extend(
+                self._expand(
+                    self._instantiate(callee, body),
+                    chain + [callee.name],
+                    threshold,
+                )
+            )
+            # A callee without a result already leaves nothing to discard
+            i += 2 if results == 0 else 1
+        return out
+
+    def _instantiate(self, callee: Function, body: List[Instr]) -> List[Instr]:
+        self.site_counter += 1
+        prefix = f"__inl{self.site_counter}_"
+        suffix = f".inl{self.site_counter}"
+        local_names = _local_names(callee, body)
+        code: List[Instr] = [ScopeEnter()]
+        # Arguments are on the stack in order, so bind the last one first.
+        # Parameters hold objects, exactly as in a real call.
+        for param in reversed(callee.params):
+            code.append(Store(prefix + param, "object"))
+        code.extend(_rename(instr, local_names, prefix, suffix) for instr in body)
+        code.append(ScopeExit())
+        return code
+
+
+def inline_program(
+    program: ProgramIR, default_level: int = DEFAULT_OPT_LEVEL
+) -> InlineReport:
+    """Inline small functions of ``program`` in place and report decisions."""
+    return Inliner(program, default_level).run()
@@ -59,6 +59,8 @@ class Function:
     name: str
     params: List[str]
     code: List[Instr]
+    opt_level: int | None = None
+    is_deterministic: bool = False
 
 
 @dataclass
@@ -85,6 +87,16 @@ class ScopeExit(Instr):
     """Marks leaving a lexical scope."""
 
 
+@dataclass
+class TempScopeEnter(Instr):
+    """Marks the start of a full expression owning its boxed temporaries."""
+
+
+@dataclass
+class TempScopeExit(Instr):
+    """Releases temporaries of the full expression that were not consumed."""
+
+
 @dataclass
 class ProgramIR:
     code: List[Instr]
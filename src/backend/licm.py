@@ -0,0 +1,282 @@
+"""Loop-invariant code motion and redundant-call elimination on LLIR.
+
+Both transforms only touch calls that :mod:`purity` classifies as movable
+(pure and known to return) and whose arguments are computed from ``Const``
+and ``Load`` instructions with operators.  A reused result is retained again at
+each use with ``increase_ref``, exactly like the fresh object the original
+call would have produced, so typed slots that release their previous value
+stay balanced.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+from .ir import (
+    Alloc,
+    BinOpInstr,
+    Call,
+    Const,
+    DestructorCall,
+    Dup,
+    Instr,
+    Load,
+    Pop,
+    ProgramIR,
+    Return,
+    ScopeEnter,
+    ScopeExit,
+    Store,
+)
+from .llir import Br, CondBr, Label
+from .purity import IMPURE, PurityInfo, infer_purity
+
+# Variables with these declared types hold immutable objects
+_IMMUTABLE_TYPES = {"int", "float", "bool", "string"}
+_TERMINATORS = (Br, CondBr, Return)
+
+
+@dataclass
+class PureCallReport:
+    hoisted: int = 0
+    reused: int = 0
+    removed: int = 0
+
+    def render(self) -> str:
+        return (
+            f"pure calls: {self.hoisted} hoisted, {self.reused} reused, "
+            f"{self.removed} removed"
+        )
+
+
+def _root(name: str) -> str:
+    return name.split(".", 1)[0]
+
+
+def _reuse(name: str) -> List[Instr]:
+    return [Load(name), Dup(), Call("increase_ref", 1), Pop()]
+
+
+class PureCallOptimizer:
+    def __init__(self, program: ProgramIR, purity: PurityInfo) -> None:
+        self.program = program
+        self.purity = purity
+        self.report = PureCallReport()
+        self.temp_counter = 0
+
+    def run(self) -> PureCallReport:
+        self.program.code = self.optimize(self.program.code)
+        for func in self.program.functions.values():
+            func.code = self.optimize(func.code)
+        return self.report
+
+    def optimize(self, code: List[Instr]) -> List[Instr]:
+        immutable = {
+            i.name
+            for i in code
+            if isinstance(i, Store) and i.type_name in _IMMUTABLE_TYPES
+        }
+        code = self._remove_dead_calls(code)
+        code = self._hoist_invariant_calls(code, immutable)
+        return self._reuse_redundant_calls(code)
+
+    # ------------------------------------------------------------------
+    def _new_temp(self, prefix: str) -> str:
+        self.temp_counter += 1
+        return f"__{prefix}_{self.temp_counter}"
+
+    def _args(
+        self, code: List[Instr], index: int, start: int = 0
+    ) -> List[Instr] | None:
+        """Argument code of the movable call at ``index``, if side-effect free.
+
+        Arguments qualify when they are computed from constants and variables
+        with operators only, so they can move together with the call.
+        """
+        instr = code[index]
+        if not isinstance(instr, Call) or not self.purity.is_movable(instr.name):
+            return None
+        needed = instr.argc
+        first = index
+        while needed > 0:
+            first -= 1
+            if first < start:
+                return None
+            arg = code[first]
+            if isinstance(arg, (Const, Load)):
+                needed -= 1
+            elif isinstance(arg, BinOpInstr):
+                needed += 1
+            else:
+                return None
+        return code[first:index]
+
+    def _mutates(self, instr: Instr) -> bool:
+        """Whether ``instr`` may change an object behind a variable."""
+        if isinstance(instr, (Alloc, DestructorCall)):
+            return True
+        if isinstance(instr, Store):
+            return "." in instr.name
+        if isinstance(instr, Call) and instr.name != "increase_ref":
+            # Retaining only touches the reference count
+            return self.purity.call_effect(instr.name) == IMPURE
+        return False
+
+    def _remove_dead_calls(self, code: List[Instr]) -> List[Instr]:
+        out: List[Instr] = []
+        i = 0
+        while i < len(code):
+            args = self._args(code, i)
+            # A pure call whose argument pushes were emitted just before it
+            # is still at the end of ``out`` and can be dropped with them.
+            if (
+                args is not None
+                and i + 1 < len(code)
+                and isinstance(code[i + 1], Pop)
+                and out[len(out) - len(args) :] == args
+            ):
+                del out[len(out) - len(args) :]
+                self.report.removed += 1
+                i += 2
+                continue
+            out.append(code[i])
+            i += 1
+        return out
+
+    # ------------------------------------------------------------------
+    def _loops(self, code: List[Instr]) -> List[Tuple[int, int]]:
+        labels = {i.name: idx for idx, i in enumerate(code) if isinstance(i, Label)}
+        # ``continue`` adds extra back edges, so a loop ends at its last one
+        loops: Dict[int, int] = {}
+        for idx, instr in enumerate(code):
+            if isinstance(instr, Br):
+                targets = [instr.label]
+            elif isinstance(instr, CondBr):
+                targets = [instr.then_label, instr.else_label]
+            else:
+                continue
+            for target in targets:
+                head = labels.get(target)
+                if head is not None and head < idx:
+                    loops[head] = idx
+        # Innermost loops first so their hoisted code can move further out
+        return sorted(loops.items(), key=lambda loop: loop[1] - loop[0])
+
+    def _hoist_invariant_calls(
+        self, code: List[Instr], immutable: Set[str]
+    ) -> List[Instr]:
+        changed = True
+        while changed:
+            changed = False
+            for head, back in self._loops(code):
+                new_code = self._hoist_one(code, head, back, immutable)
+                if new_code is not None:
+                    code = new_code
+                    changed = True
+                    break
+        return code
+
+    def _hoist_one(
+        self, code: List[Instr], head: int, back: int, immutable: Set[str]
+    ) -> List[Instr] | None:
+        insert_at = head
+        prev = code[head - 1] if head > 0 else None
+        if isinstance(prev, Br) and prev.label == code[head].name:
+            insert_at = head - 1
+            prev = code[head - 2] if head > 1 else None
+        if isinstance(prev, _TERMINATORS):
+            # The preheader would be unreachable
+            return None
+        region = code[head : back + 1]
+        stored = {_root(i.name) for i in region if isinstance(i, Store)}
+        stored |= {_root(i.cond) for i in region if isinstance(i, CondBr)}
+        mutates = any(self._mutates(i) for i in region)
+
+        def invariant(arg: Instr) -> bool:
+            if isinstance(arg, (Const, BinOpInstr)):
+                return True
+            name = _root(arg.name)
+            if name in stored:
+                return False
+            # Objects behind other variables may be mutated inside the loop
+            return not mutates or arg.name in immutable
+
+        for k in range(head + 1, back):
+            args = self._args(code, k, head + 1)
+            if args is None or not all(invariant(a) for a in args):
+                continue
+            temp = self._new_temp("licm")
+            hoisted = list(args) + [code[k], Store(temp)]
+            self.report.hoisted += 1
+            return (
+                code[:insert_at]
+                + hoisted
+                + code[insert_at : k - len(args)]
+                + _reuse(temp)
+                + code[k + 1 :]
+            )
+        return None
+
+    # ------------------------------------------------------------------
+    def _redundant_calls(self, code: List[Instr]) -> Dict[int, int]:
+        """Map each redundant call index to the index of its first occurrence."""
+        available: Dict[tuple, Tuple[int, int]] = {}
+        redundant: Dict[int, int] = {}
+        depth = 0
+        for idx, instr in enumerate(code):
+            if isinstance(instr, (Label,) + _TERMINATORS):
+                available.clear()
+            elif isinstance(instr, ScopeEnter):
+                depth += 1
+            elif isinstance(instr, ScopeExit):
+                depth -= 1
+                available = {k: v for k, v in available.items() if v[1] <= depth}
+            elif isinstance(instr, Store) and "." not in instr.name:
+                name = _root(instr.name)
+                available = {
+                    k: v for k, v in available.items() if name not in k[1]
+                }
+            elif isinstance(instr, Call):
+                args = self._args(code, idx)
+                if args is not None:
+                    key = (
+                        instr.name,
+                        tuple(_root(a.name) for a in args if isinstance(a, Load)),
+                        repr(args),
+                    )
+                    if key in available:
+                        redundant[idx] = available[key][0]
+                    else:
+                        available[key] = (idx, depth)
+                elif self._mutates(instr):
+                    available.clear()
+            elif self._mutates(instr):
+                available.clear()
+        return redundant
+
+    def _reuse_redundant_calls(self, code: List[Instr]) -> List[Instr]:
+        redundant = self._redundant_calls(code)
+        if not redundant:
+            return code
+        temps = {first: self._new_temp("cse") for first in sorted(set(redundant.values()))}
+        drop: Set[int] = set()
+        for idx in redundant:
+            drop.update(range(idx - code[idx].argc, idx + 1))
+        out: List[Instr] = []
+        for idx, instr in enumerate(code):
+            if idx in redundant:
+                out.extend(_reuse(temps[redundant[idx]]))
+                self.report.reused += 1
+                continue
+            if idx in drop:
+                continue
+            out.append(instr)
+            if idx in temps:
+                out.extend([Dup(), Store(temps[idx])])
+        return out
+
+
+def optimize_pure_calls(program: ProgramIR) -> PureCallReport:
+    """Hoist, merge and drop pure calls throughout ``program`` in place."""
+    return PureCallOptimizer(program, infer_purity(program)).run()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Union
+from typing import Any, Tuple, Union
 import subprocess
 from pathlib import Path
 import os
@@ -30,8 +30,14 @@ from .ir import (
     DestructorCall,
     ScopeEnter,
     ScopeExit,
+    TempScopeEnter,
+    TempScopeExit,
     ErrorValue,
 )
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover - only for type hints
+    from .llvm import ObjectCache, TypeProfile
 
 _RUNTIME_LOADED = False
 
@@ -121,6 +127,8 @@ LLIRInstr = Union[
     DestructorCall,
     ScopeEnter,
     ScopeExit,
+    TempScopeEnter,
+    TempScopeExit,
     Label,
     Br,
     CondBr,
@@ -140,6 +148,8 @@ __all__ = [
     "DestructorCall",
     "ScopeEnter",
     "ScopeExit",
+    "TempScopeEnter",
+    "TempScopeExit",
     "Label",
     "Br",
     "CondBr",
@@ -152,35 +162,186 @@ __all__ = [
     "load_module_ast",
     "to_llvm_ir",
     "execute_llvm",
+    "jit_compile",
+    "lazy_compile",
 ]
 
 
-def to_llvm_ir(program: ProgramIR) -> str:
-    """Convert :class:`ProgramIR` to LLVM IR string using the new LLVM backend."""
+def to_llvm_ir(
+    program: ProgramIR,
+    tagged_values: bool | None = None,
+    inline_cache_stats: bool = False,
+    collect_type_feedback: bool = False,
+    type_profile: TypeProfile | None = None,
+) -> str:
+    """Convert :class:`ProgramIR` to LLVM IR string using the new LLVM backend.
+
+    ``tagged_values`` selects the value representation; by default it follows
+    the loaded runtime.  ``inline_cache_stats`` instruments the inline caches
+    of dynamic binary operators.  ``collect_type_feedback`` and
+    ``type_profile`` select the profiling and the specialising tier (see
+    :class:`src.backend.llvm.TypeProfile`).
+    """
     from .llvm import compile_to_llvm
 
-    return compile_to_llvm(program)
-
+    return compile_to_llvm(
+        program, tagged_values, inline_cache_stats, collect_type_feedback, type_profile
+    )
+
+
+def jit_compile(
+    program: ProgramIR,
+    opt_level: int | str = 0,
+    cpu: str | None = None,
+    cache: ObjectCache | None = None,
+    inline_cache_stats: bool = False,
+    collect_type_feedback: bool = False,
+    type_profile: TypeProfile | None = None,
+) -> binding.ExecutionEngine:
+    """Optimise ``program`` and compile it to machine code with MCJIT.
+
+    ``opt_level`` selects the LLVM pipeline (``0``-``3`` or ``"s"``) and
+    ``cpu="native"`` tunes code generation for the host.  Functions annotated
+    with ``@@manual_optimize_level`` are optimised with the pipeline of their
+    own level.  With a ``cache``, a previously compiled object for the same
+    IR and target is loaded instead of optimising and compiling again.  When
+    the runtime was built as bitcode, optimised programs are linked against
+    it so runtime fast paths can be inlined.  ``inline_cache_stats`` counts
+    the hits and misses of every inline cache (see
+    :func:`src.backend.llvm.inline_cache_stats`).  ``collect_type_feedback``
+    reports argument and operand types for :meth:`TypeProfile.collect`, and
+    ``type_profile`` specialises the program for a collected profile.
+    """
+    from .llvm import build_llvm, create_target_machine, optimize_module, resolve_cpu
+    from .llvm.optimizer import pipeline_levels
+    from .llvm.runtime_link import link_runtime, runtime_bitcode_files, runtime_digest
 
-def execute_llvm(program: ProgramIR) -> int:
-    """JIT compile and execute program via LLVM."""
     _load_runtime()
 
     binding.initialize()
     binding.initialize_native_target()
     binding.initialize_native_asmprinter()
 
-    llvm_ir = to_llvm_ir(program)
+    llvm_ir, opt_levels = build_llvm(
+        program,
+        inline_cache_stats=inline_cache_stats,
+        collect_type_feedback=collect_type_feedback,
+        type_profile=type_profile,
+    )
     mod = binding.parse_assembly(llvm_ir)
     mod.verify()
-    target = binding.Target.from_default_triple()
-    target_machine = target.create_target_machine()
+    target_machine = create_target_machine(opt_level, cpu)
+    runtime = runtime_bitcode_files() if pipeline_levels(opt_level)[0] > 0 else []
+    cached = None
+    if cache is not None:
+        key = cache.key(
+            llvm_ir,
+            target_machine.triple,
+            *resolve_cpu(cpu),
+            opt_level,
+            runtime_digest(runtime) if runtime else "",
+            opt_levels,
+        )
+        cached = cache.load(key)
+    if cached is None:
+        link_runtime(mod, target_machine, runtime)
+        optimize_module(mod, target_machine, opt_level, opt_levels)
     engine = binding.create_mcjit_compiler(mod, target_machine)
+    if cache is not None:
+        cache.attach(engine, key, cached)
+    engine.finalize_object()
+    return engine
+
+
+def lazy_compile(
+    program: ProgramIR,
+    opt_level: int | str = 0,
+    cpu: str | None = None,
+    inline_cache_stats: bool = False,
+    collect_type_feedback: bool = False,
+    type_profile: TypeProfile | None = None,
+) -> Tuple[binding.LLJIT, Any]:
+    """Add ``program`` to an ORC LLJIT instance with one module per function.
+
+    LLJIT only compiles a module once a symbol it defines is looked up, so
+    functions that cannot be reached from ``__start`` are never compiled.
+    The module pipeline is skipped to keep startup short; ``opt_level`` and
+    ``cpu`` still tune code generation and ``@@manual_optimize_level``
+    functions get the pipeline of their level.  Returns the JIT together
+    with the resource tracker that keeps the code alive.
+    """
+    from .llvm import (
+        create_target_machine,
+        generate_module,
+        optimize_functions,
+        split_module,
+    )
+
+    _load_runtime()
 
+    binding.initialize()
+    binding.initialize_native_target()
+    binding.initialize_native_asmprinter()
+
+    module, opt_levels = generate_module(
+        program,
+        inline_cache_stats=inline_cache_stats,
+        collect_type_feedback=collect_type_feedback,
+        type_profile=type_profile,
+    )
+    target_machine = create_target_machine(opt_level, cpu)
+    builder = binding.JITLibraryBuilder().add_current_process()
+    for name, unit in split_module(module).items():
+        if opt_levels.get(name, 0) > 0:
+            mod = binding.parse_assembly(unit)
+            optimize_functions(mod, target_machine, opt_levels)
+            unit = str(mod)
+        builder.add_ir(unit)
+    builder.export_symbol("__start")
+    lljit = binding.create_lljit_compiler(target_machine)
+    return lljit, builder.link(lljit, "mxscript")
+
+
+def execute_llvm(
+    program: ProgramIR,
+    opt_level: int | str = 0,
+    cpu: str | None = None,
+    lazy: bool = False,
+    cache: ObjectCache | None = None,
+    inline_cache_stats: bool = False,
+    collect_type_feedback: bool = False,
+    type_profile: TypeProfile | None = None,
+) -> int:
+    """JIT compile and execute program via LLVM.
+
+    ``lazy`` selects the ORC engine of :func:`lazy_compile` instead of MCJIT;
+    ``cache`` only applies to MCJIT.  ``inline_cache_stats`` instruments the
+    inline caches of dynamic binary operators.  ``collect_type_feedback`` and
+    ``type_profile`` select the type-feedback tier (see :func:`jit_compile`).
+    """
     from ctypes import CFUNCTYPE, c_longlong
 
-    engine.finalize_object()
-    func_ptr = engine.get_function_address("__start")
+    if lazy:
+        _, tracker = lazy_compile(
+            program,
+            opt_level,
+            cpu,
+            inline_cache_stats,
+            collect_type_feedback,
+            type_profile,
+        )
+        func_ptr = tracker["__start"]
+    else:
+        engine = jit_compile(
+            program,
+            opt_level,
+            cpu,
+            cache,
+            inline_cache_stats,
+            collect_type_feedback,
+            type_profile,
+        )
+        func_ptr = engine.get_function_address("__start")
 
     cfunc = CFUNCTYPE(c_longlong)(func_ptr)
     result = cfunc()
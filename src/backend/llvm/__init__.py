@@ -1,17 +1,106 @@
 from __future__ import annotations
 
+from typing import Dict, Tuple
+
+from llvmlite import ir
+
+from .cache import ObjectCache
 from .context import LLVMContext
 from .generator import LLVMGenerator
+from .lazy import split_module
+from .runtime_link import link_runtime, runtime_bitcode_files
+from .inline_cache import inline_cache_stats
+from .feedback import TypeProfile, type_feedback
+from .tagging import runtime_tags_values
+from .optimizer import (
+    OPT_LEVELS,
+    create_target_machine,
+    optimize_functions,
+    resolve_cpu,
+    optimize_module,
+)
 
 
-def compile_to_llvm(program_ir) -> str:
-    """Generate LLVM IR text for a :class:`ProgramIR`."""
+def generate_module(
+    program_ir,
+    tagged_values: bool | None = None,
+    inline_cache_stats: bool = False,
+    collect_type_feedback: bool = False,
+    type_profile: TypeProfile | None = None,
+) -> Tuple[ir.Module, Dict[str, int]]:
+    """Generate an LLVM module and the optimisation level of each function.
+
+    ``tagged_values`` defaults to the representation of the loaded runtime.
+    ``inline_cache_stats`` instruments the inline cache of every dynamic
+    binary operator.  ``collect_type_feedback`` reports argument and operand
+    types to the runtime; ``type_profile`` specialises the code for the types
+    such a run reported.
+    """
+    if tagged_values is None:
+        tagged_values = runtime_tags_values()
     ctx = LLVMContext()
-    gen = LLVMGenerator(ctx)
+    gen = LLVMGenerator(
+        ctx, tagged_values, inline_cache_stats, collect_type_feedback, type_profile
+    )
     gen.declare_functions(program_ir)
     gen.build_start(program_ir.code)
     for func in program_ir.functions.values():
         gen.build_function(func)
-    return str(ctx.module)
+    gen.annotate_declarations()
+    return ctx.module, gen.opt_levels
+
+
+def build_llvm(
+    program_ir,
+    tagged_values: bool | None = None,
+    inline_cache_stats: bool = False,
+    collect_type_feedback: bool = False,
+    type_profile: TypeProfile | None = None,
+) -> Tuple[str, Dict[str, int]]:
+    """Generate LLVM IR text and the optimisation level of each function."""
+    module, opt_levels = generate_module(
+        program_ir,
+        tagged_values,
+        inline_cache_stats,
+        collect_type_feedback,
+        type_profile,
+    )
+    return str(module), opt_levels
+
+
+def compile_to_llvm(
+    program_ir,
+    tagged_values: bool | None = None,
+    inline_cache_stats: bool = False,
+    collect_type_feedback: bool = False,
+    type_profile: TypeProfile | None = None,
+) -> str:
+    """Generate LLVM IR text for a :class:`ProgramIR`."""
+    return build_llvm(
+        program_ir,
+        tagged_values,
+        inline_cache_stats,
+        collect_type_feedback,
+        type_profile,
+    )[0]
 
-__all__ = ["compile_to_llvm", "LLVMContext", "LLVMGenerator"]
+__all__ = [
+    "build_llvm",
+    "generate_module",
+    "split_module",
+    "link_runtime",
+    "runtime_bitcode_files",
+    "runtime_tags_values",
+    "inline_cache_stats",
+    "type_feedback",
+    "TypeProfile",
+    "compile_to_llvm",
+    "optimize_functions",
+    "optimize_module",
+    "create_target_machine",
+    "OPT_LEVELS",
+    "ObjectCache",
+    "resolve_cpu",
+    "LLVMContext",
+    "LLVMGenerator",
+]
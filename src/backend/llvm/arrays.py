@@ -0,0 +1,76 @@
+"""Inline element access of ``std.array`` shared with ``runtime/include/array.hpp``.
+
+``MXArray`` keeps its elements unboxed in one buffer, so compiled code reads
+and writes them without calling the runtime.  The typed accessors of
+``std.array`` are lowered that way:
+
+* the checked ones (``get_float``, ``set_int``, ...) guard that the first
+  argument is an array of their element type and that the index is an
+  Integer in range, then load or store the element; any other arguments take
+  the runtime call, which raises the error;
+* the unchecked ones (``*_unchecked``) trust their arguments and become a
+  bare load or store.
+
+Element values and indices that are already unboxed, such as constants and
+the results of specialised operators, are used as they are; a loaded element
+is itself an unboxed number that is only boxed when generic code needs it.
+"""
+
+from __future__ import annotations
+
+import ctypes
+from dataclasses import dataclass
+from typing import Dict
+
+from llvmlite import binding
+
+
+@dataclass(frozen=True)
+class Accessor:
+    """What an array accessor does: its element type and whether it stores."""
+
+    kind: str
+    store: bool
+    checked: bool
+
+
+# Runtime symbols of the accessors that are lowered
+ACCESSORS: Dict[str, Accessor] = {
+    "array_get_int": Accessor("Integer", False, True),
+    "array_get_float": Accessor("Float", False, True),
+    "array_set_int": Accessor("Integer", True, True),
+    "array_set_float": Accessor("Float", True, True),
+    "array_get_int_unchecked": Accessor("Integer", False, False),
+    "array_get_float_unchecked": Accessor("Float", False, False),
+    "array_set_int_unchecked": Accessor("Integer", True, False),
+    "array_set_float_unchecked": Accessor("Float", True, False),
+}
+
+# ``mxs_runtime::ArrayElement`` of each element type
+ELEMENT_TAGS = {"Integer": 0, "Float": 1}
+
+
+@dataclass(frozen=True)
+class ArrayLayout:
+    """Byte offsets of ``MXArray::data``, ``length`` and ``element``."""
+
+    data: int
+    length: int
+    element: int
+
+
+# The fields follow the vtable pointer and the one-word object header, 16
+# bytes in all; biased reference counting adds a second header word (see
+# feedback.VALUE_OFFSET)
+DEFAULT_LAYOUT = ArrayLayout(16, 24, 32)
+
+
+def runtime_array_layout() -> ArrayLayout:
+    """The :class:`ArrayLayout` of the runtime loaded into this process."""
+    offsets = []
+    for name in ("data", "length", "element"):
+        address = binding.address_of_symbol(f"mxs_array_{name}_offset")
+        if not address:
+            return DEFAULT_LAYOUT
+        offsets.append(ctypes.c_size_t.from_address(address).value)
+    return ArrayLayout(*offsets)
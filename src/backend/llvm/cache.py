@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from llvmlite import binding
+
+ENV_VAR = "MXSCRIPT_CACHE_DIR"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "mxscript" / "objects"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    env = os.environ.get(ENV_VAR)
+    return Path(env) if env else DEFAULT_CACHE_DIR
+
+
+class ObjectCache:
+    """On-disk cache of JIT-compiled object files.
+
+    Entries are keyed by a hash of the LLVM IR before optimisation together
+    with the target triple, CPU, CPU features, optimisation level, the levels
+    of ``@@manual_optimize_level`` functions and LLVM version.  When the cache grows beyond ``max_bytes`` the least recently
+    used entries are evicted.
+    """
+
+    def __init__(
+        self, directory: str | Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def key(
+        llvm_ir: str,
+        triple: str,
+        cpu: str,
+        features: str,
+        opt_level: str | int,
+        runtime: str = "",
+        opt_levels: Dict[str, int] | None = None,
+    ) -> str:
+        digest = hashlib.sha256()
+        llvm_version = ".".join(str(v) for v in binding.llvm_version_info)
+        # Only level 0 shows in the IR, so every function's level is keyed
+        levels = str(sorted((opt_levels or {}).items()))
+        parts = (llvm_version, triple, cpu, features, str(opt_level), levels, runtime, llvm_ir)
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.o"
+
+    def load(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+        # Reading an entry marks it as recently used
+        os.utime(path)
+        self.hits += 1
+        return data
+
+    def store(self, key: str, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        # Write under a temporary name so readers never see partial objects
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self.evict()
+
+    def entries(self) -> List[Tuple[float, int, Path]]:
+        """Return ``(mtime, size, path)`` of every entry, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        result = []
+        for path in self.directory.glob("*.o"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            result.append((stat.st_mtime, stat.st_size, path))
+        return sorted(result)
+
+    def evict(self) -> None:
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    # ------------------------------------------------------------------
+    def attach(
+        self, engine: binding.ExecutionEngine, key: str, cached: bytes | None
+    ) -> None:
+        """Serve ``cached`` to ``engine`` or store the object it compiles."""
+
+        def notify(module: binding.ModuleRef, data: bytes) -> None:
+            self.store(key, data)
+
+        def get_buffer(module: binding.ModuleRef) -> bytes | None:
+            return cached
+
+        engine.set_object_cache(notify, get_buffer)
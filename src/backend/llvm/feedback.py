@@ -0,0 +1,181 @@
+"""Type feedback shared with ``runtime/include/feedback.hpp``.
+
+Compiling with ``collect_type_feedback`` makes every function report the type
+of each argument and binary-operator operand to the runtime.  After a run,
+:meth:`TypeProfile.collect` turns those records into a profile that can be
+saved as JSON and passed back to the compiler as ``type_profile``, which then
+specialises the code for the types seen:
+
+* a function whose arguments always had the same types gets a clone,
+  ``<name>.specialised``, that the generic version calls while its
+  arguments still have those types;
+* operators whose operands were always Integers or Floats compute on the
+  unboxed values behind a type-id guard and take the generic path
+  otherwise.
+
+Operators are identified by their position among the ``BinOpInstr`` of their
+function, so a profile only applies to the program it was collected from.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from llvmlite import binding, ir
+
+PROFILE_VERSION = 1
+
+# Types whose operators have unboxed fast paths
+NUMERIC_TYPES = ("Integer", "Float")
+
+# ``MXNumeric::VALUE_OFFSET``: the value follows the vtable pointer and the
+# object header, which is one word unless the runtime uses biased reference
+# counting
+VALUE_OFFSET = 16
+
+# struct TypeFeedbackSlot { TypeFeedbackRecord *record; }
+SLOT_TYPE = ir.LiteralStructType([ir.IntType(8).as_pointer()])
+
+
+def arg_record(function: str, index: int) -> str:
+    return f"{function}:arg{index}"
+
+
+def operand_record(function: str, op_index: int, side: str) -> str:
+    return f"{function}:op{op_index}:{side}"
+
+
+def runtime_value_offset() -> int:
+    """``MXNumeric::VALUE_OFFSET`` of the runtime loaded into this process."""
+    address = binding.address_of_symbol("mxs_numeric_value_offset")
+    if not address:
+        return VALUE_OFFSET
+    return ctypes.c_size_t.from_address(address).value
+
+
+class TypeFeedback(ctypes.Structure):
+    """Mirror of ``mxs_runtime::MXTypeFeedback``."""
+
+    _fields_ = [
+        ("name", ctypes.c_char_p),
+        ("type", ctypes.c_char_p),
+        ("samples", ctypes.c_uint64),
+    ]
+
+
+def type_feedback() -> List[Tuple[str, str | None, int]]:
+    """``(record, type, samples)`` of every profiled value run so far.
+
+    ``type`` is ``None`` for values that had more than one type.
+    """
+    address = binding.address_of_symbol("mxs_type_feedback")
+    if not address:
+        return []
+    fn = ctypes.CFUNCTYPE(
+        ctypes.c_size_t, ctypes.POINTER(TypeFeedback), ctypes.c_size_t
+    )(address)
+    count = fn(None, 0)
+    records = (TypeFeedback * count)()
+    count = min(count, fn(records, count))
+    return [
+        (r.name.decode(), r.type.decode() if r.type else None, r.samples)
+        for r in records[:count]
+    ]
+
+
+@dataclass
+class FunctionFeedback:
+    """Types seen in one function; ``None`` marks polymorphic values."""
+
+    args: List[str | None] = field(default_factory=list)
+    ops: Dict[int, Tuple[str | None, str | None]] = field(default_factory=dict)
+
+    def monomorphic_args(self, count: int) -> List[str] | None:
+        """The argument types if all ``count`` arguments had a single type."""
+        if len(self.args) != count or any(t is None for t in self.args):
+            return None
+        return list(self.args)
+
+    def numeric_op(self, index: int) -> Tuple[str, str] | None:
+        """The operand types of operator ``index`` if it has a fast path."""
+        left, right = self.ops.get(index, (None, None))
+        if left in NUMERIC_TYPES and right in NUMERIC_TYPES:
+            return left, right
+        return None
+
+
+@dataclass
+class TypeProfile:
+    """Type feedback of every profiled function, by function name."""
+
+    functions: Dict[str, FunctionFeedback] = field(default_factory=dict)
+
+    @classmethod
+    def collect(cls) -> "TypeProfile":
+        """Build a profile from the runtime's records.
+
+        Records of the same value collected by several compilations are
+        merged; a value is only monomorphic if they all agree.
+        """
+        seen: Dict[str, str | None] = {}
+        for name, type_name, _ in type_feedback():
+            if name in seen and seen[name] != type_name:
+                type_name = None
+            seen[name] = type_name
+
+        profile = cls()
+        for name, type_name in seen.items():
+            function, _, slot = name.partition(":")
+            feedback = profile.functions.setdefault(function, FunctionFeedback())
+            if slot.startswith("arg"):
+                index = int(slot[3:])
+                while len(feedback.args) <= index:
+                    feedback.args.append(None)
+                feedback.args[index] = type_name
+            elif slot.startswith("op"):
+                op, _, side = slot.partition(":")
+                left, right = feedback.ops.get(int(op[2:]), (None, None))
+                if side == "left":
+                    left = type_name
+                else:
+                    right = type_name
+                feedback.ops[int(op[2:])] = (left, right)
+        return profile
+
+    def to_json(self) -> dict:
+        return {
+            "version": PROFILE_VERSION,
+            "functions": {
+                name: {
+                    "args": f.args,
+                    "ops": {str(k): list(v) for k, v in sorted(f.ops.items())},
+                }
+                for name, f in sorted(self.functions.items())
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "TypeProfile":
+        if data.get("version") != PROFILE_VERSION:
+            raise ValueError(f"Unsupported type profile version {data.get('version')}")
+        return cls(
+            {
+                name: FunctionFeedback(
+                    list(f.get("args", [])),
+                    {int(k): (v[0], v[1]) for k, v in f.get("ops", {}).items()},
+                )
+                for name, f in data.get("functions", {}).items()
+            }
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_json(), fh, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "TypeProfile":
+        with open(path, "r", encoding="utf-8") as fh:
+            return cls.from_json(json.load(fh))
@@ -19,13 +19,26 @@ from ..llir import (
     Function,
     ScopeEnter,
     ScopeExit,
+    TempScopeEnter,
+    TempScopeExit,
     Label,
     Br,
     CondBr,
 )
 from .context import LLVMContext
+from . import inline_cache, tagging
+from .arrays import ACCESSORS, ELEMENT_TAGS, Accessor, runtime_array_layout
+from .feedback import (
+    NUMERIC_TYPES,
+    SLOT_TYPE,
+    FunctionFeedback,
+    TypeProfile,
+    arg_record,
+    operand_record,
+    runtime_value_offset,
+)
 from ..ffi import FFIManager
-from ..abi_manager import get_function_signature
+from ..abi_manager import get_function_signature, get_purity
 
 DYNAMIC_DISPATCH_MAP = {
     "+": "mxs_op_add",
@@ -43,12 +56,67 @@ DYNAMIC_DISPATCH_MAP = {
     "or": "mxs_op_or",
 }
 
+# Operators whose specialised results stay unboxed
+ARITHMETIC_OPS = ("+", "-", "*", "/")
+
+
+class _Number:
+    """An Integer or Float of specialised code that may have no object yet.
+
+    ``raw`` is the value.  When ``guarded``, ``obj`` is null while ``raw`` is
+    current and otherwise holds the object, of any type, that the generic
+    path produced instead; when not guarded, ``obj`` is ``None`` or an
+    existing object of ``raw``.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        raw: ir.Value,
+        obj: ir.Value | None = None,
+        guarded: bool = False,
+    ) -> None:
+        self.kind = kind
+        self.raw = raw
+        self.obj = obj
+        self.guarded = guarded
+
 
 class LLVMGenerator:
     """Generate LLVM IR from :class:`ProgramIR`."""
 
-    def __init__(self, context: LLVMContext) -> None:
+    def __init__(
+        self,
+        context: LLVMContext,
+        tagged_values: bool = False,
+        inline_cache_stats: bool = False,
+        collect_type_feedback: bool = False,
+        type_profile: TypeProfile | None = None,
+    ) -> None:
         self.ctx = context
+        # Emit integers, booleans and nil as tagged pointers (see tagging.py)
+        self.tagged_values = tagged_values
+        # Count hits and misses of every inline cache (see inline_cache.py)
+        self.inline_cache_stats = inline_cache_stats
+        self.inline_cache_count = 0
+        # Report argument and operand types, or specialise for the types
+        # reported by an earlier run (see feedback.py)
+        self.collect_type_feedback = collect_type_feedback
+        self.type_profile = type_profile
+        self.type_feedback_count = 0
+        # Where unboxed values are read, which the runtime's header decides
+        self.value_offset = runtime_value_offset()
+        self.array_layout = runtime_array_layout()
+        # Position of the next BinOpInstr in the function being built and
+        # the feedback its operators are specialised for
+        self.op_index = 0
+        self.op_feedback: FunctionFeedback | None = None
+        # Function whose feedback records the code being built reports to
+        self.feedback_name = "__start"
+        # ``(raw, object)`` slots and type of the unboxed locals and the
+        # unboxed arguments of the specialised function being built
+        self.number_slots: Dict[str, tuple] = {}
+        self.number_params: Dict[str, _Number] = {}
         self.ffi = FFIManager(self.ctx.module)
         self.functions: Dict[str, ir.Function] = {}
         self.string_idx = 0
@@ -56,6 +124,12 @@ class LLVMGenerator:
         # Mapping of label names to LLVM basic blocks for the current function
         self.blocks: Dict[str, ir.Block] = {}
         self.foreign_functions: Dict[str, Dict[str, str]] = {}
+        # Boxed temporaries owned by the enclosing full expressions
+        self.temp_scopes: List[List[ir.Value]] = []
+        # Index in ``var_info_stack`` of the outermost scope of the function
+        self.locals_base = 0
+        # ``@@manual_optimize_level`` of each annotated function
+        self.opt_levels: Dict[str, int] = {}
 
     # ------------------------------------------------------------------
     def _create_global_string(self, value: str) -> ir.Value:
@@ -85,7 +159,14 @@ class LLVMGenerator:
                     len(func.params) - 1
                 )
             ty = ir.FunctionType(self.ctx.obj_ptr_t, arg_types)
-            self.functions[func.name] = ir.Function(self.ctx.module, ty, name=func.name)
+            fn = ir.Function(self.ctx.module, ty, name=func.name)
+            if func.opt_level is not None:
+                self.opt_levels[func.name] = func.opt_level
+                if func.opt_level == 0:
+                    # Keep level-0 functions out of every LLVM pipeline
+                    fn.attributes.add("noinline")
+                    fn.attributes.add("optnone")
+            self.functions[func.name] = fn
         self.foreign_functions = program.foreign_functions
 
     # Symbol table helpers ---------------------------------------------
@@ -108,7 +189,16 @@ class LLVMGenerator:
             return g
 
         assert self.ctx.entry_builder is not None
-        ptr = self.ctx.entry_builder.alloca(ty, name=name)
+        # Slots go at the top of the entry block so that a local bound in a
+        # loop, like the parameters of an inlined call, has one slot per
+        # call instead of one per iteration
+        entry_builder = self.ctx.entry_builder
+        entry = entry_builder.function.entry_basic_block
+        entry_builder.position_at_start(entry)
+        ptr = entry_builder.alloca(ty, name=name)
+        if self.ctx.builder.block is entry:
+            # Code is only ever appended, so keep appending after the slot
+            self.ctx.builder.position_at_end(entry)
         current_scope[name] = ptr
         return ptr
 
@@ -141,10 +231,143 @@ class LLVMGenerator:
                 del scope[instr.name]
                 break
 
+    # Temporary lifetimes ---------------------------------------------
+    def _track_temp(self, val: ir.Value, owned: bool = False) -> ir.Value:
+        """Record ``val`` as a temporary of the innermost full expression.
+
+        Objects that are not ``owned`` on creation are retained so that a
+        callee adopting and dropping them cannot free them mid-expression.
+        """
+        if self.temp_scopes:
+            if not owned:
+                retain = self.ffi.get_or_declare_function("increase_ref")
+                self._call_unless_tagged(retain, val)
+            self.temp_scopes[-1].append(val)
+        return val
+
+    def _consume_temp(self, val: ir.Value) -> bool:
+        """Transfer ownership of ``val`` so it is not released as a temporary.
+
+        Returns whether ``val`` was a temporary.
+        """
+        for scope in reversed(self.temp_scopes):
+            for idx, tmp in enumerate(scope):
+                if tmp is val:
+                    del scope[idx]
+                    return True
+        return False
+
+    def _is_object(self, val: ir.Value) -> bool:
+        return val.type == self.ctx.obj_ptr_t and not isinstance(val, ir.Constant)
+
+    def _take_ownership(self, val: ir.Value) -> None:
+        """Own a reference to ``val``, adopting it if it is a temporary."""
+        if not self._consume_temp(val) and self._is_object(val):
+            retain = self.ffi.get_or_declare_function("increase_ref")
+            self._call_unless_tagged(retain, val)
+
+    def _release_temps(self, temps: List[ir.Value]) -> None:
+        if not temps or self.ctx.builder.block.is_terminated:
+            return
+        release = self.ffi.get_or_declare_function("mxs_release_temp")
+        for val in reversed(temps):
+            self._call_unless_tagged(release, val)
+
+    def _release_locals(self, scopes: List[Dict[str, Dict]]) -> None:
+        """Release the objects owned by the locals declared in ``scopes``."""
+        if self.ctx.builder.block.is_terminated:
+            return
+        release = self.ffi.get_or_declare_function("mxs_release_temp")
+        for scope in reversed(scopes):
+            for info in reversed(list(scope.values())):
+                if not info.get("owner"):
+                    continue
+                val = info.get("value")
+                if val is None:
+                    val = self.ctx.builder.load(info["ptr"])
+                self._call_unless_tagged(release, val)
+
+    def _return(self, val: ir.Value) -> None:
+        """Return ``val`` with a reference that the caller owns.
+
+        The locals and pending temporaries of the function are released
+        first.  Only ``main`` returns raw numbers, as the exit status.
+        """
+        builder = self.ctx.builder
+        return_type = builder.function.function_type.return_type
+        if (
+            return_type is self.ctx.obj_ptr_t
+            and builder.function.name != "main"
+            and isinstance(val.type, (ir.IntType, ir.DoubleType, ir.FloatType))
+        ):
+            val = self._to_obj(val)
+        self._take_ownership(val)
+        self._release_locals(self.var_info_stack[self.locals_base :])
+        for temps in reversed(self.temp_scopes):
+            self._release_temps(temps)
+        if return_type is self.ctx.int_t and isinstance(val.type, ir.PointerType):
+            val = builder.ptrtoint(val, self.ctx.int_t)
+        elif return_type is self.ctx.obj_ptr_t and isinstance(val.type, ir.IntType):
+            val = builder.inttoptr(val, self.ctx.obj_ptr_t)
+        builder.ret(val)
+
+    # Tagged values ----------------------------------------------------
+    def _tagged_constant(self, bits: int) -> ir.Value:
+        return ir.Constant(self.ctx.int_t, bits).inttoptr(self.ctx.obj_ptr_t)
+
+    def _call_unless_tagged(self, fn: ir.Function, val: ir.Value) -> None:
+        """Call ``fn(val)``, skipping the call when ``val`` is a tag."""
+        builder = self.ctx.builder
+        if not self.tagged_values:
+            builder.call(fn, [val])
+            return
+        if isinstance(val, ir.Constant):
+            return
+        bits = builder.ptrtoint(val, self.ctx.int_t)
+        tag = builder.and_(bits, ir.Constant(self.ctx.int_t, tagging.TAG_MASK))
+        is_object = builder.icmp_unsigned("==", tag, ir.Constant(self.ctx.int_t, 0))
+        with builder.if_then(is_object):
+            builder.call(fn, [val])
+
+    def _tag_int(self, val: ir.Value) -> ir.Value:
+        """Box the i64 ``val`` as a tagged integer.
+
+        Values outside the 63-bit range are boxed by ``MXCreateInteger``.
+        """
+        builder = self.ctx.builder
+        if isinstance(val, ir.Constant) and isinstance(val.constant, int):
+            if tagging.fits(val.constant):
+                return self._tagged_constant(tagging.tag_int(val.constant))
+        one = ir.Constant(self.ctx.int_t, 1)
+        shifted = builder.shl(val, one)
+        fits = builder.icmp_signed("==", builder.ashr(shifted, one), val)
+        tagged = builder.inttoptr(
+            builder.or_(shifted, ir.Constant(self.ctx.int_t, tagging.INT_TAG)),
+            self.ctx.obj_ptr_t,
+        )
+        tag_block = builder.block
+        with builder.if_then(builder.not_(fits), likely=False):
+            create_int = self.ffi.get_or_declare_function("MXCreateInteger")
+            boxed = builder.call(create_int, [val])
+            retain = self.ffi.get_or_declare_function("increase_ref")
+            builder.call(retain, [boxed])
+            box_block = builder.block
+        result = builder.phi(self.ctx.obj_ptr_t)
+        result.add_incoming(tagged, tag_block)
+        result.add_incoming(boxed, box_block)
+        # Retained above when boxed, so the temporary is owned either way
+        return self._track_temp(result, owned=True)
+
     def _to_obj(self, val: ir.Value) -> ir.Value:
         if val.type == self.ctx.obj_ptr_t:
             return val
         if isinstance(val.type, ir.IntType):
+            if val.type.width == 1 and self.tagged_values:
+                return self.ctx.builder.select(
+                    val,
+                    self._tagged_constant(tagging.TRUE_BITS),
+                    self._tagged_constant(tagging.FALSE_BITS),
+                )
             if val.type.width == 1:
                 true_fn = self.ffi.get_or_declare_function("mxs_get_true")
                 false_fn = self.ffi.get_or_declare_function("mxs_get_false")
@@ -155,47 +378,709 @@ class LLVMGenerator:
                 val = self.ctx.builder.sext(val, self.ctx.int_t)
             elif val.type.width > self.ctx.int_t.width:
                 val = self.ctx.builder.trunc(val, self.ctx.int_t)
+            if self.tagged_values:
+                return self._tag_int(val)
             create_int = self.ffi.get_or_declare_function("MXCreateInteger")
-            return self.ctx.builder.call(create_int, [val])
+            return self._track_temp(self.ctx.builder.call(create_int, [val]))
         if isinstance(val.type, ir.DoubleType) or isinstance(val.type, ir.FloatType):
             if isinstance(val.type, ir.FloatType):
                 val = self.ctx.builder.fpext(val, ir.DoubleType())
             create_float = self.ffi.get_or_declare_function("MXCreateFloat")
-            return self.ctx.builder.call(create_float, [val])
+            return self._track_temp(self.ctx.builder.call(create_float, [val]))
         if isinstance(val.type, ir.PointerType):
             return self.ctx.builder.bitcast(val, self.ctx.obj_ptr_t)
         return self.ctx.builder.bitcast(val, self.ctx.obj_ptr_t)
 
+    # Inline caches ----------------------------------------------------
+    def _cached_binary_op(
+        self, op: str, callee: ir.Function, left: ir.Value, right: ir.Value
+    ) -> ir.Value:
+        """Apply ``op`` through a call-site inline cache.
+
+        The site calls the operator-table function cached for the type ids of
+        its last operands and falls back to ``callee`` (``mxs_op_*``) followed
+        by ``mxs_inline_cache_update`` when they differ.
+        """
+        builder = self.ctx.builder
+        obj_t = self.ctx.obj_ptr_t
+        i32 = ir.IntType(32)
+        zero = ir.Constant(i32, 0)
+        null = ir.Constant(obj_t, None)
+
+        index = self.inline_cache_count
+        self.inline_cache_count += 1
+        cache = ir.GlobalVariable(
+            self.ctx.module, inline_cache.CACHE_TYPE, name=f"mxs.ic.{index}"
+        )
+        cache.linkage = "internal"
+        cache.initializer = ir.Constant(inline_cache.CACHE_TYPE, None)
+
+        fn = builder.function
+        check_block = fn.append_basic_block("ic.check")
+        hit_block = fn.append_basic_block("ic.hit")
+        miss_block = fn.append_basic_block("ic.miss")
+        done_block = fn.append_basic_block("ic.done")
+
+        entry = builder.load_atomic(builder.gep(cache, [zero, zero]), "acquire", 8)
+        usable = builder.and_(
+            builder.and_(
+                builder.icmp_unsigned("!=", left, null),
+                builder.icmp_unsigned("!=", right, null),
+            ),
+            builder.icmp_unsigned("!=", entry, ir.Constant(entry.type, None)),
+        )
+        builder.cbranch(usable, check_block, miss_block)
+
+        builder.position_at_end(check_block)
+        key = builder.or_(
+            builder.shl(builder.zext(self._type_id(left), i32), ir.Constant(i32, 16)),
+            builder.zext(self._type_id(right), i32),
+        )
+        cached_key = builder.load(builder.gep(entry, [zero, zero]))
+        branch = builder.cbranch(
+            builder.icmp_unsigned("==", key, cached_key), hit_block, miss_block
+        )
+        branch.set_weights([99, 1])
+
+        builder.position_at_end(hit_block)
+        fn_ty = ir.FunctionType(obj_t, [obj_t, obj_t])
+        target = builder.bitcast(
+            builder.load(builder.gep(entry, [zero, ir.Constant(i32, 1)])),
+            fn_ty.as_pointer(),
+        )
+        if self.inline_cache_stats:
+            # The first miss registered the site, so it is set on every hit
+            site = builder.load(builder.gep(cache, [zero, ir.Constant(i32, 1)]))
+            hits = builder.load(site)
+            builder.store(builder.add(hits, ir.Constant(hits.type, 1)), site)
+        fast = builder.call(target, [left, right])
+        builder.branch(done_block)
+
+        builder.position_at_end(miss_block)
+        slow = builder.call(callee, [left, right])
+        update = self.ctx.module.globals.get("mxs_inline_cache_update")
+        if update is None:
+            update_ty = ir.FunctionType(
+                ir.VoidType(), [obj_t, i32, obj_t, obj_t, obj_t]
+            )
+            update = ir.Function(
+                self.ctx.module, update_ty, name="mxs_inline_cache_update"
+            )
+        site_name = (
+            self._create_global_string(f"{fn.name} #{index} ({op})")
+            if self.inline_cache_stats
+            else null
+        )
+        builder.call(
+            update,
+            [
+                builder.bitcast(cache, obj_t),
+                ir.Constant(i32, inline_cache.BINARY_OPS[op]),
+                left,
+                right,
+                site_name,
+            ],
+        )
+        builder.branch(done_block)
+
+        builder.position_at_end(done_block)
+        result = builder.phi(obj_t)
+        result.add_incoming(fast, hit_block)
+        result.add_incoming(slow, miss_block)
+        return result
+
+    def _type_id(self, obj: ir.Value) -> ir.Value:
+        """Load the 16-bit type id from the header of the object ``obj``."""
+        builder = self.ctx.builder
+        offset = ir.Constant(self.ctx.int_t, inline_cache.TYPE_ID_OFFSET)
+        slot = builder.bitcast(builder.gep(obj, [offset]), ir.IntType(16).as_pointer())
+        return builder.load(slot)
+
+    def _dynamic_binary_op(
+        self, op: str, callee: ir.Function, left: ir.Value, right: ir.Value
+    ) -> ir.Value:
+        # Tagged operands have no header to read a type id from
+        if op in inline_cache.BINARY_OPS and not self.tagged_values:
+            return self._cached_binary_op(op, callee, left, right)
+        return self.ctx.builder.call(callee, [left, right])
+
+    # Type feedback ----------------------------------------------------
+    def _record_type(self, name: str, value: ir.Value) -> None:
+        """Report the type of ``value`` to the feedback record ``name``."""
+        index = self.type_feedback_count
+        self.type_feedback_count += 1
+        slot = ir.GlobalVariable(self.ctx.module, SLOT_TYPE, name=f"mxs.tf.{index}")
+        slot.linkage = "internal"
+        slot.initializer = ir.Constant(SLOT_TYPE, None)
+        obj_t = self.ctx.obj_ptr_t
+        record = self.ctx.module.globals.get("mxs_type_feedback_record")
+        if record is None:
+            record_ty = ir.FunctionType(ir.VoidType(), [obj_t, obj_t, obj_t])
+            record = ir.Function(
+                self.ctx.module, record_ty, name="mxs_type_feedback_record"
+            )
+        builder = self.ctx.builder
+        builder.call(
+            record,
+            [builder.bitcast(slot, obj_t), value, self._create_global_string(name)],
+        )
+
+    def _function_feedback(self, name: str) -> FunctionFeedback | None:
+        # Type ids are read from object headers, which tags do not have
+        if self.type_profile is None or self.tagged_values:
+            return None
+        return self.type_profile.functions.get(name)
+
+    def _numeric_type_id(self, type_name: str) -> ir.Value:
+        """Load the runtime's type id of ``Integer``, ``Float`` or ``Array``."""
+        name = f"mxs_{type_name.lower()}_type_id"
+        gvar = self.ctx.module.globals.get(name)
+        if gvar is None:
+            gvar = ir.GlobalVariable(self.ctx.module, ir.IntType(16), name=name)
+            # Set once while the runtime loads, so LLVM may hoist the loads
+            gvar.global_constant = True
+        return self.ctx.builder.load(gvar)
+
+    def _guard_types(
+        self,
+        values: List[ir.Value],
+        type_names: List[str],
+        match_block: ir.Block,
+        miss_block: ir.Block,
+        conditions: List[ir.Value] | None = None,
+    ) -> None:
+        """Branch to ``match_block`` if every value has its numeric type.
+
+        ``conditions`` must hold as well; they are checked together with the
+        null checks, before any header is read.
+        """
+        builder = self.ctx.builder
+        null = ir.Constant(self.ctx.obj_ptr_t, None)
+        present = None
+        for cond in list(conditions or []) + [
+            builder.icmp_unsigned("!=", val, null) for val in values
+        ]:
+            present = cond if present is None else builder.and_(present, cond)
+        if not values:
+            if present is None:
+                builder.branch(match_block)
+            else:
+                branch = builder.cbranch(present, match_block, miss_block)
+                branch.set_weights([99, 1])
+            return
+        check_block = builder.function.append_basic_block("spec.check")
+        builder.cbranch(present, check_block, miss_block)
+
+        builder.position_at_end(check_block)
+        matches = None
+        for val, type_name in zip(values, type_names):
+            same = builder.icmp_unsigned(
+                "==", self._type_id(val), self._numeric_type_id(type_name)
+            )
+            matches = same if matches is None else builder.and_(matches, same)
+        branch = builder.cbranch(matches, match_block, miss_block)
+        branch.set_weights([99, 1])
+
+    def _unboxed(self, obj: ir.Value, type_name: str) -> ir.Value:
+        """Load the value of the Integer or Float ``obj``."""
+        builder = self.ctx.builder
+        offset = ir.Constant(self.ctx.int_t, self.value_offset)
+        value_t = self._number_type(type_name)
+        return builder.load(
+            builder.bitcast(builder.gep(obj, [offset]), value_t.as_pointer())
+        )
+
+    def _number_type(self, kind: str) -> ir.Type:
+        return self.ctx.int_t if kind == "Integer" else ir.DoubleType()
+
+    def _constant_kind(self, val: ir.Value) -> str | None:
+        """The numeric type of a ``Const`` left on the stack, if any."""
+        if isinstance(val, ir.Constant) and val.type == self.ctx.int_t:
+            return "Integer"
+        if isinstance(val, ir.Constant) and isinstance(val.type, ir.DoubleType):
+            return "Float"
+        return None
+
+    def _box_number(self, num: _Number) -> ir.Value:
+        """The object of ``num``, boxing its value if there is none.
+
+        The result is not tracked as a temporary.
+        """
+        builder = self.ctx.builder
+        create = self.ffi.get_or_declare_function(
+            "MXCreateInteger" if num.kind == "Integer" else "MXCreateFloat"
+        )
+        if not num.guarded:
+            if num.obj is not None:
+                return num.obj
+            return builder.call(create, [num.raw])
+        start = builder.block
+        null = ir.Constant(self.ctx.obj_ptr_t, None)
+        with builder.if_then(builder.icmp_unsigned("==", num.obj, null)):
+            fresh = builder.call(create, [num.raw])
+            box_block = builder.block
+        boxed = builder.phi(self.ctx.obj_ptr_t)
+        boxed.add_incoming(num.obj, start)
+        boxed.add_incoming(fresh, box_block)
+        return boxed
+
+    def _materialise(self, val) -> ir.Value:
+        """Turn a :class:`_Number` into an object for generic code."""
+        if isinstance(val, _Number):
+            return self._track_temp(self._box_number(val))
+        return val
+
+    def _specialised_binary_op(
+        self,
+        op: str,
+        types: tuple,
+        callee: ir.Function,
+        left,
+        right,
+    ):
+        """Apply ``op`` to operands profiled as the numeric ``types``.
+
+        While the operands have those types the values are unboxed and
+        computed inline; otherwise, and for divisions by zero, the operator
+        takes the generic path.  Mixed operands are computed as floats, like
+        the runtime's operator table does.  Operands may be unboxed
+        :class:`_Number` values, which need no header check.  Arithmetic
+        returns a :class:`_Number` that is only boxed when generic code
+        needs the object; comparisons return a boolean object.
+        """
+        builder = self.ctx.builder
+        fn = builder.function
+        obj_t = self.ctx.obj_ptr_t
+        null = ir.Constant(obj_t, None)
+
+        operands = []
+        checked: List[ir.Value] = []
+        checked_types: List[str] = []
+        conditions: List[ir.Value] = []
+        for val, kind in zip((left, right), types):
+            if isinstance(val, _Number) and val.kind == kind:
+                if val.guarded:
+                    conditions.append(builder.icmp_unsigned("==", val.obj, null))
+            elif self._constant_kind(val) != kind:
+                val = self._to_obj(self._materialise(val))
+                checked.append(val)
+                checked_types.append(kind)
+            operands.append((val, kind))
+
+        fast_block = fn.append_basic_block("spec.fast")
+        slow_block = fn.append_basic_block("spec.slow")
+        done_block = fn.append_basic_block("spec.done")
+        self._guard_types(checked, checked_types, fast_block, slow_block, conditions)
+
+        builder.position_at_end(fast_block)
+        as_int = types == ("Integer", "Integer")
+        raws = []
+        for val, kind in operands:
+            if isinstance(val, _Number):
+                raw = val.raw
+            elif isinstance(val, ir.Constant):
+                raw = val
+            else:
+                raw = self._unboxed(val, kind)
+            if not as_int and kind == "Integer":
+                raw = builder.sitofp(raw, ir.DoubleType())
+            raws.append(raw)
+        a, b = raws
+        if op == "/":
+            # The runtime reports division by zero
+            if as_int:
+                nonzero = builder.icmp_signed("!=", b, ir.Constant(b.type, 0))
+            else:
+                nonzero = builder.fcmp_unordered("!=", b, ir.Constant(b.type, 0.0))
+            div_block = fn.append_basic_block("spec.div")
+            builder.cbranch(nonzero, div_block, slow_block)
+            builder.position_at_end(div_block)
+
+        arith = {
+            "+": (builder.add, builder.fadd),
+            "-": (builder.sub, builder.fsub),
+            "*": (builder.mul, builder.fmul),
+            "/": (builder.sdiv, builder.fdiv),
+        }
+        if op in arith:
+            fast = arith[op][0 if as_int else 1](a, b)
+        else:
+            if as_int:
+                flag = builder.icmp_signed(op, a, b)
+            elif op == "!=":
+                flag = builder.fcmp_unordered(op, a, b)
+            else:
+                flag = builder.fcmp_ordered(op, a, b)
+            true_fn = self.ffi.get_or_declare_function("mxs_get_true")
+            false_fn = self.ffi.get_or_declare_function("mxs_get_false")
+            fast = builder.select(
+                flag, builder.call(true_fn, []), builder.call(false_fn, [])
+            )
+        fast_end = builder.block
+        builder.branch(done_block)
+
+        builder.position_at_end(slow_block)
+        retain = self.ffi.get_or_declare_function("increase_ref")
+        release = self.ffi.get_or_declare_function("mxs_release_temp")
+        objects = []
+        for val, kind in operands:
+            if isinstance(val, _Number):
+                obj = self._box_number(val)
+            elif isinstance(val, ir.Constant):
+                obj = self._box_number(_Number(kind, val))
+            else:
+                objects.append(val)
+                continue
+            # Held for the call only; fresh boxes are freed afterwards
+            builder.call(retain, [obj])
+            objects.append(obj)
+        slow = self._dynamic_binary_op(op, callee, objects[0], objects[1])
+        for obj, (val, _) in zip(objects, operands):
+            if obj is not val:
+                builder.call(release, [obj])
+        if op in arith and self.temp_scopes:
+            # Owned by the temporary tracked below
+            builder.call(retain, [slow])
+        slow_end = builder.block
+        builder.branch(done_block)
+
+        builder.position_at_end(done_block)
+        if op not in arith:
+            result = builder.phi(obj_t)
+            result.add_incoming(fast, fast_end)
+            result.add_incoming(slow, slow_end)
+            return self._track_temp(result)
+        kind = "Integer" if as_int else "Float"
+        raw = builder.phi(fast.type)
+        raw.add_incoming(fast, fast_end)
+        raw.add_incoming(ir.Constant(fast.type, 0), slow_end)
+        obj = builder.phi(obj_t)
+        obj.add_incoming(null, fast_end)
+        obj.add_incoming(slow, slow_end)
+        return _Number(kind, raw, self._track_temp(obj, owned=True), guarded=True)
+
+    # Arrays -------------------------------------------------------------
+    def _array_accessor(self, name: str) -> Accessor | None:
+        """The inlined array accessor (see arrays.py) that ``name`` calls."""
+        # Tagged values have no header to check the array type in
+        if self.tagged_values or name not in self.foreign_functions:
+            return None
+        return ACCESSORS.get(self.foreign_functions[name].get("symbol_name", name))
+
+    def _array_field(self, array: ir.Value, offset: int, field_t: ir.Type) -> ir.Value:
+        builder = self.ctx.builder
+        slot = builder.gep(array, [ir.Constant(self.ctx.int_t, offset)])
+        return builder.load(builder.bitcast(slot, field_t.as_pointer()))
+
+    def _array_element(self, array: ir.Value, index: ir.Value, kind: str) -> ir.Value:
+        """Pointer to element ``index`` of ``array``, whose elements are ``kind``."""
+        value_t = self._number_type(kind)
+        data = self._array_field(array, self.array_layout.data, value_t.as_pointer())
+        return self.ctx.builder.gep(data, [index])
+
+    def _raw_argument(self, val, kind: str, trusted: bool = False) -> ir.Value:
+        """The value of an accessor argument as a raw ``kind``.
+
+        Objects must be Integers or, for ``Float``, Integers or Floats.  A
+        guarded :class:`_Number` must be current unless ``trusted``: then an
+        object left by the generic path is read instead.
+        """
+        builder = self.ctx.builder
+        if isinstance(val, _Number) and val.guarded and trusted:
+            raw = self._raw_argument(_Number(val.kind, val.raw), kind)
+            start = builder.block
+            null = ir.Constant(self.ctx.obj_ptr_t, None)
+            present = builder.icmp_unsigned("!=", val.obj, null)
+            with builder.if_then(present, likely=False):
+                other = self._raw_argument(val.obj, kind)
+                other_block = builder.block
+            merged = builder.phi(raw.type)
+            merged.add_incoming(raw, start)
+            merged.add_incoming(other, other_block)
+            return merged
+        if isinstance(val, _Number):
+            raw, val_kind = val.raw, val.kind
+        elif isinstance(val, ir.Constant):
+            raw, val_kind = val, self._constant_kind(val)
+        elif kind == "Integer":
+            return self._unboxed(val, "Integer")
+        else:
+            is_int = builder.icmp_unsigned(
+                "==", self._type_id(val), self._numeric_type_id("Integer")
+            )
+            as_float = builder.sitofp(self._unboxed(val, "Integer"), ir.DoubleType())
+            return builder.select(is_int, as_float, self._unboxed(val, "Float"))
+        if val_kind != kind:
+            raw = builder.sitofp(raw, ir.DoubleType())
+        return raw
+
+    def _array_access(self, name: str, args: list):
+        """Inline the ``std.array`` accessor ``name`` applied to ``args``.
+
+        Checked accessors load or store the element while the arguments are
+        an array of their element type and an Integer index in range, and
+        call the runtime otherwise; unchecked ones always load or store.
+        Loads return a :class:`_Number`; stores return nil.
+        """
+        accessor = ACCESSORS[self.foreign_functions[name].get("symbol_name", name)]
+        builder = self.ctx.builder
+        fn = builder.function
+        obj_t = self.ctx.obj_ptr_t
+        null = ir.Constant(obj_t, None)
+        kind = accessor.kind
+        nil_fn = self.ffi.get_or_declare_function("mxs_get_nil")
+
+        array = self._to_obj(self._materialise(args[0]))
+        # The index is an Integer; Integers also fit elements of Float arrays
+        wanted = [("Integer", ("Integer",))]
+        if accessor.store:
+            wanted.append((kind, (kind, "Integer") if kind == "Float" else (kind,)))
+        operands = []
+        checked: List[ir.Value] = []
+        checked_types: List[str] = []
+        conditions = [builder.icmp_unsigned("!=", array, null)]
+        for val, (val_kind, accepted) in zip(args[1:], wanted):
+            if isinstance(val, _Number) and val.kind in accepted:
+                if val.guarded and accessor.checked:
+                    conditions.append(builder.icmp_unsigned("==", val.obj, null))
+            elif self._constant_kind(val) not in accepted:
+                val = self._to_obj(self._materialise(val))
+                checked.append(val)
+                checked_types.append(val_kind)
+            operands.append((val, val_kind))
+
+        if not accessor.checked:
+            index = self._raw_argument(operands[0][0], "Integer", trusted=True)
+            if accessor.store:
+                value = self._raw_argument(operands[1][0], kind, trusted=True)
+                builder.store(value, self._array_element(array, index, kind))
+                return builder.call(nil_fn, [])
+            return _Number(kind, builder.load(self._array_element(array, index, kind)))
+
+        type_block = fn.append_basic_block("array.type")
+        bounds_block = fn.append_basic_block("array.bounds")
+        fast_block = fn.append_basic_block("array.fast")
+        slow_block = fn.append_basic_block("array.slow")
+        done_block = fn.append_basic_block("array.done")
+        self._guard_types(checked, checked_types, type_block, slow_block, conditions)
+
+        # The element tag and the length are only read from arrays
+        builder.position_at_end(type_block)
+        is_array = builder.icmp_unsigned(
+            "==", self._type_id(array), self._numeric_type_id("Array")
+        )
+        builder.cbranch(is_array, bounds_block, slow_block).set_weights([99, 1])
+
+        builder.position_at_end(bounds_block)
+        element = self._array_field(array, self.array_layout.element, ir.IntType(8))
+        length = self._array_field(array, self.array_layout.length, self.ctx.int_t)
+        index = self._raw_argument(operands[0][0], "Integer")
+        same = builder.icmp_unsigned(
+            "==", element, ir.Constant(ir.IntType(8), ELEMENT_TAGS[kind])
+        )
+        # Negative indices compare as large unsigned ones
+        in_range = builder.icmp_unsigned("<", index, length)
+        branch = builder.cbranch(builder.and_(same, in_range), fast_block, slow_block)
+        branch.set_weights([99, 1])
+
+        builder.position_at_end(fast_block)
+        slot = self._array_element(array, index, kind)
+        if accessor.store:
+            builder.store(self._raw_argument(operands[1][0], kind), slot)
+            fast = builder.call(nil_fn, [])
+        else:
+            fast = builder.load(slot)
+        fast_end = builder.block
+        builder.branch(done_block)
+
+        builder.position_at_end(slow_block)
+        retain = self.ffi.get_or_declare_function("increase_ref")
+        release = self.ffi.get_or_declare_function("mxs_release_temp")
+        objects = [array]
+        boxed = []
+        for val, _ in operands:
+            if isinstance(val, _Number):
+                obj = self._box_number(val)
+            elif isinstance(val, ir.Constant):
+                obj = self._box_number(_Number(self._constant_kind(val), val))
+            else:
+                objects.append(val)
+                continue
+            # Held for the call only, like the operands of operators
+            builder.call(retain, [obj])
+            objects.append(obj)
+            boxed.append(obj)
+        symbol = self.foreign_functions[name].get("symbol_name", name)
+        callee = self.ctx.module.globals.get(symbol)
+        if callee is None:
+            callee = ir.Function(
+                self.ctx.module,
+                ir.FunctionType(obj_t, [obj_t] * len(objects)),
+                name=symbol,
+            )
+        slow = builder.call(callee, objects)
+        for obj in boxed:
+            builder.call(release, [obj])
+        if not accessor.store and self.temp_scopes:
+            # Owned by the temporary tracked below
+            builder.call(retain, [slow])
+        slow_end = builder.block
+        builder.branch(done_block)
+
+        builder.position_at_end(done_block)
+        if accessor.store:
+            result = builder.phi(obj_t)
+            result.add_incoming(fast, fast_end)
+            result.add_incoming(slow, slow_end)
+            return result
+        raw = builder.phi(fast.type)
+        raw.add_incoming(fast, fast_end)
+        raw.add_incoming(ir.Constant(fast.type, 0), slow_end)
+        obj = builder.phi(obj_t)
+        obj.add_incoming(null, fast_end)
+        obj.add_incoming(slow, slow_end)
+        return _Number(kind, raw, self._track_temp(obj, owned=True), guarded=True)
+
+    # Unboxed locals ---------------------------------------------------
+    def _unboxable_locals(
+        self, func_ir: Function, feedback: FunctionFeedback
+    ) -> Dict[str, str]:
+        """Locals of ``func_ir`` that specialised code keeps unboxed.
+
+        A local qualifies when every store to it takes a numeric constant,
+        the result of a specialised arithmetic operator or an element loaded
+        by an inlined array accessor, all of the same type, so it only needs
+        an object when generic code reads it.
+        """
+        kinds: Dict[str, str | None] = {}
+        excluded = set(func_ir.params)
+        op_index = 0
+        produced: str | None = None
+        for instr in func_ir.code:
+            kind = None
+            if isinstance(instr, Store):
+                if instr.type_name is None:
+                    excluded.add(instr.name)
+                elif kinds.get(instr.name, produced) != produced:
+                    kinds[instr.name] = None
+                else:
+                    kinds[instr.name] = produced
+            elif isinstance(instr, BinOpInstr):
+                types = feedback.numeric_op(op_index)
+                op_index += 1
+                if types is not None and instr.op in ARITHMETIC_OPS:
+                    kind = "Integer" if types == ("Integer", "Integer") else "Float"
+            elif isinstance(instr, Const):
+                if isinstance(instr.value, float):
+                    kind = "Float"
+                elif isinstance(instr.value, int) and not isinstance(instr.value, bool):
+                    kind = "Integer"
+            elif isinstance(instr, Call):
+                accessor = self._array_accessor(instr.name)
+                if accessor is not None and not accessor.store:
+                    kind = accessor.kind
+            elif isinstance(instr, DestructorCall):
+                excluded.add(instr.name)
+            elif isinstance(instr, CondBr):
+                excluded.add(instr.cond)
+            produced = kind
+        return {
+            name: kind
+            for name, kind in kinds.items()
+            if kind is not None and name not in excluded
+        }
+
+    def _unbox_locals(
+        self,
+        func: ir.Function,
+        func_ir: Function,
+        feedback: FunctionFeedback,
+        arg_types: List[str] | None,
+    ) -> None:
+        """Set up the unboxed locals and arguments of a specialised body."""
+        builder = self.ctx.builder
+        for name, kind in self._unboxable_locals(func_ir, feedback).items():
+            raw_t = self._number_type(kind)
+            raw_ptr = builder.alloca(raw_t, name=f"{name}.raw")
+            obj_ptr = builder.alloca(self.ctx.obj_ptr_t, name=f"{name}.obj")
+            builder.store(ir.Constant(raw_t, 0), raw_ptr)
+            builder.store(ir.Constant(self.ctx.obj_ptr_t, None), obj_ptr)
+            self.number_slots[name] = (raw_ptr, obj_ptr, kind)
+        if arg_types is None:
+            return
+        stored = {instr.name for instr in func_ir.code if isinstance(instr, Store)}
+        for arg, name, kind in zip(func.args, func_ir.params, arg_types):
+            if name not in stored:
+                raw = self._unboxed(arg, kind)
+                self.number_params[name] = _Number(kind, raw, arg)
+
+    def _store_number(self, name: str, val) -> None:
+        raw_ptr, obj_ptr, kind = self.number_slots[name]
+        builder = self.ctx.builder
+        null = ir.Constant(self.ctx.obj_ptr_t, None)
+        if isinstance(val, _Number) and val.kind == kind:
+            raw = val.raw
+            obj = val.obj if val.guarded else null
+            if val.guarded:
+                self._consume_temp(obj)
+        elif self._constant_kind(val) == kind:
+            raw, obj = val, null
+        else:
+            # Another value than the profile promised; keep its object
+            obj = self._to_obj(self._materialise(val))
+            retain = self.ffi.get_or_declare_function("increase_ref")
+            builder.call(retain, [obj])
+            raw = ir.Constant(self._number_type(kind), 0)
+        old = builder.load(obj_ptr)
+        with builder.if_then(builder.icmp_unsigned("!=", old, null), likely=False):
+            builder.call(self.ffi.get_or_declare_function("decrease_ref"), [old])
+        builder.store(raw, raw_ptr)
+        builder.store(obj, obj_ptr)
+
+    def _load_number(self, name: str) -> _Number:
+        raw_ptr, obj_ptr, kind = self.number_slots[name]
+        builder = self.ctx.builder
+        return _Number(kind, builder.load(raw_ptr), builder.load(obj_ptr), guarded=True)
+
     # IR emission ------------------------------------------------------
     def _emit_code(self, code: List[Instr]) -> ir.Value | None:
         assert self.ctx.builder is not None
         stack: List[ir.Value] = []
         terminated = False
         for instr in code:
-            if (
-                terminated
-                and not isinstance(instr, Label)
-                and not isinstance(instr, ScopeExit)
+            if terminated and not isinstance(
+                instr, (Label, ScopeExit, TempScopeEnter, TempScopeExit)
             ):
                 continue
+            if not isinstance(
+                instr, (Const, Load, Dup, Pop, BinOpInstr, Store)
+            ) and not (isinstance(instr, Call) and self._array_accessor(instr.name)):
+                # Only these handle unboxed numbers
+                stack = [self._materialise(val) for val in stack]
             if isinstance(instr, Const):
                 if isinstance(instr.value, str):
                     cstr_ptr = self._create_global_string(instr.value)
                     create_fn = self.ffi.get_or_declare_function("MXCreateString")
                     obj = self.ctx.builder.call(create_fn, [cstr_ptr])
-                    stack.append(obj)
+                    stack.append(self._track_temp(obj, owned=True))
                 elif isinstance(instr.value, bool):
                     stack.append(ir.Constant(ir.IntType(1), int(instr.value)))
                 elif isinstance(instr.value, int):
                     stack.append(ir.Constant(self.ctx.int_t, instr.value))
                 elif isinstance(instr.value, float):
                     stack.append(ir.Constant(ir.DoubleType(), instr.value))
+                elif instr.value is None and self.tagged_values:
+                    stack.append(self._tagged_constant(tagging.NIL_BITS))
                 elif instr.value is None:
                     fn = self.ffi.get_or_declare_function("mxs_get_nil")
                     obj = self.ctx.builder.call(fn, [])
                     stack.append(obj)
                 else:
                     stack.append(ir.Constant(self.ctx.obj_ptr_t, None))
+            elif isinstance(instr, Load) and instr.name in self.number_slots:
+                stack.append(self._load_number(instr.name))
+            elif isinstance(instr, Load) and instr.name in self.number_params:
+                stack.append(self.number_params[instr.name])
             elif isinstance(instr, Load):
                 val = self.ctx.get_var(instr.name)
                 if (
@@ -208,20 +1093,37 @@ class LLVMGenerator:
             elif isinstance(instr, Alloc):
                 new_obj_fn = self.ffi.get_or_declare_function("new_mx_object")
                 ptr = self.ctx.builder.call(new_obj_fn, [])
-                stack.append(ptr)
+                stack.append(self._track_temp(ptr))
             elif isinstance(instr, Dup):
                 if stack:
                     stack.append(stack[-1])
+            elif isinstance(instr, Store) and instr.name in self.number_slots:
+                self._store_number(instr.name, stack.pop())
             elif isinstance(instr, Store):
-                val = stack.pop()
+                val = self._materialise(stack.pop())
                 target_ty = (
                     self.ctx.obj_ptr_t if instr.type_name is not None else val.type
                 )
+                if instr.type_name is not None and isinstance(
+                    val.type, (ir.IntType, ir.DoubleType, ir.FloatType)
+                ):
+                    # Typed slots hold objects, so scalars are boxed on entry
+                    val = self._to_obj(val)
+                in_start = self.ctx.builder.function.name == "__start"
+                current_scope = self.var_info_stack[-1]
                 if instr.is_mut or instr.type_name is not None:
                     ptr = self._get_or_alloc_mut(instr.name, target_ty)
 
-                    current_scope = self.var_info_stack[-1]
-                    info = current_scope.get(instr.name)
+                    try:
+                        info = self._lookup_var_info(instr.name)
+                    except KeyError:
+                        info = None
+
+                    if instr.type_name is not None:
+                        # Typed slots hold a reference of their own
+                        self._take_ownership(val)
+                    else:
+                        self._consume_temp(val)
 
                     # If the variable already holds an ARC-managed object,
                     # release the previous value before overwriting it.
@@ -259,12 +1161,16 @@ class LLVMGenerator:
 
                     self.ctx.builder.store(val, ptr)
 
-                    current_scope[instr.name] = {
-                        "type_name": instr.type_name,
-                        "ptr": ptr,
-                    }
+                    if info is None:
+                        current_scope[instr.name] = {
+                            "type_name": instr.type_name,
+                            "ptr": ptr,
+                            # Released when the scope of a local is left
+                            "owner": instr.type_name is not None and not in_start,
+                        }
                 else:
-                    if self.ctx.builder and self.ctx.builder.function.name == "__start":
+                    if in_start:
+                        self._consume_temp(val)
                         g = self.ctx.get_global(instr.name)
                         if g.type.pointee != val.type:
                             cast_val = val
@@ -306,6 +1212,14 @@ class LLVMGenerator:
                         self.ctx.set_var(instr.name, g)
                     else:
                         self.ctx.set_var(instr.name, val)
+                        if self._is_object(val):
+                            self._take_ownership(val)
+                            current_scope[instr.name] = {
+                                "type_name": None,
+                                "ptr": None,
+                                "value": val,
+                                "owner": True,
+                            }
             elif isinstance(instr, BinOpInstr):
                 b = stack.pop()
                 a = stack.pop()
@@ -320,12 +1234,29 @@ class LLVMGenerator:
                         [self.ctx.obj_ptr_t, self.ctx.obj_ptr_t],
                     )
                     callee = ir.Function(self.ctx.module, func_ty, name=callee_name)
-                obj_a = self._to_obj(a)
-                obj_b = self._to_obj(b)
-                result = self.ctx.builder.call(callee, [obj_a, obj_b])
-                stack.append(result)
+                op_index = self.op_index
+                self.op_index += 1
+                types = None
+                if self.op_feedback is not None and op in inline_cache.BINARY_OPS:
+                    types = self.op_feedback.numeric_op(op_index)
+                if self.collect_type_feedback or types is None:
+                    a = self._to_obj(self._materialise(a))
+                    b = self._to_obj(self._materialise(b))
+                if self.collect_type_feedback:
+                    name = self.feedback_name
+                    self._record_type(operand_record(name, op_index, "left"), a)
+                    self._record_type(operand_record(name, op_index, "right"), b)
+                if types is not None:
+                    stack.append(self._specialised_binary_op(op, types, callee, a, b))
+                else:
+                    result = self._dynamic_binary_op(op, callee, a, b)
+                    stack.append(self._track_temp(result))
             elif isinstance(instr, Call):
                 args = [stack.pop() for _ in range(instr.argc)][::-1]
+                accessor = self._array_accessor(instr.name)
+                if accessor is not None:
+                    stack.append(self._array_access(instr.name, args))
+                    continue
                 if instr.name in self.foreign_functions:
                     info = self.foreign_functions[instr.name]
                     sym_name = info.get("symbol_name", instr.name)
@@ -388,74 +1319,19 @@ class LLVMGenerator:
                     func_ty = ir.FunctionType(ret_ty, arg_tys)
                 except KeyError:
                     func_ty = callee.function_type
-                if instr.name == "mxs_print_object_ext" and args:
-                    obj_arg = args[0]
-                    if isinstance(obj_arg.type, ir.IntType):
-                        if obj_arg.type.width == 1:
-                            true_fn = self.ffi.get_or_declare_function("mxs_get_true")
-                            false_fn = self.ffi.get_or_declare_function("mxs_get_false")
-                            obj_true = self.ctx.builder.call(true_fn, [])
-                            obj_false = self.ctx.builder.call(false_fn, [])
-                            args[0] = self.ctx.builder.select(
-                                obj_arg, obj_true, obj_false
-                            )
-                        else:
-                            if obj_arg.type.width < self.ctx.int_t.width:
-                                obj_arg = self.ctx.builder.sext(obj_arg, self.ctx.int_t)
-                            elif obj_arg.type.width > self.ctx.int_t.width:
-                                obj_arg = self.ctx.builder.trunc(
-                                    obj_arg, self.ctx.int_t
-                                )
-                            create_int = self.ffi.get_or_declare_function(
-                                "MXCreateInteger"
-                            )
-                            args[0] = self.ctx.builder.call(create_int, [obj_arg])
-                    elif isinstance(obj_arg.type, ir.DoubleType) or isinstance(
-                        obj_arg.type, ir.FloatType
-                    ):
-                        if isinstance(obj_arg.type, ir.FloatType):
-                            obj_arg = self.ctx.builder.fpext(obj_arg, ir.DoubleType())
-                        create_float = self.ffi.get_or_declare_function("MXCreateFloat")
-                        args[0] = self.ctx.builder.call(create_float, [obj_arg])
+                if instr.name == "mxs_print_object_ext" and args and isinstance(
+                    args[0].type, (ir.IntType, ir.DoubleType, ir.FloatType)
+                ):
+                    args[0] = self._to_obj(args[0])
                 cast_args: List[ir.Value] = []
                 for i, arg in enumerate(args):
                     if i < len(func_ty.args):
                         target_ty = func_ty.args[i]
                         # Box primitive arguments when the callee expects an object pointer
-                        if target_ty is self.ctx.obj_ptr_t:
-                            if isinstance(arg.type, ir.IntType):
-                                if arg.type.width == 1:
-                                    true_fn = self.ffi.get_or_declare_function(
-                                        "mxs_get_true"
-                                    )
-                                    false_fn = self.ffi.get_or_declare_function(
-                                        "mxs_get_false"
-                                    )
-                                    obj_true = self.ctx.builder.call(true_fn, [])
-                                    obj_false = self.ctx.builder.call(false_fn, [])
-                                    arg = self.ctx.builder.select(
-                                        arg, obj_true, obj_false
-                                    )
-                                else:
-                                    if arg.type.width < self.ctx.int_t.width:
-                                        arg = self.ctx.builder.sext(arg, self.ctx.int_t)
-                                    elif arg.type.width > self.ctx.int_t.width:
-                                        arg = self.ctx.builder.trunc(
-                                            arg, self.ctx.int_t
-                                        )
-                                    create_int = self.ffi.get_or_declare_function(
-                                        "MXCreateInteger"
-                                    )
-                                    arg = self.ctx.builder.call(create_int, [arg])
-                            elif isinstance(arg.type, ir.DoubleType) or isinstance(
-                                arg.type, ir.FloatType
-                            ):
-                                if isinstance(arg.type, ir.FloatType):
-                                    arg = self.ctx.builder.fpext(arg, ir.DoubleType())
-                                create_float = self.ffi.get_or_declare_function(
-                                    "MXCreateFloat"
-                                )
-                                arg = self.ctx.builder.call(create_float, [arg])
+                        if target_ty is self.ctx.obj_ptr_t and isinstance(
+                            arg.type, (ir.IntType, ir.DoubleType, ir.FloatType)
+                        ):
+                            arg = self._to_obj(arg)
                         if arg.type != target_ty:
                             if isinstance(target_ty, ir.PointerType) and isinstance(
                                 arg.type, ir.IntType
@@ -475,7 +1351,11 @@ class LLVMGenerator:
                             else:
                                 arg = self.ctx.builder.bitcast(arg, target_ty)
                     cast_args.append(arg)
+                # MxScript callees borrow their arguments and return a
+                # reference that the caller owns
                 result = self.ctx.builder.call(callee, cast_args)
+                if instr.name in self.functions:
+                    result = self._track_temp(result, owned=True)
                 if result.type != self.ctx.int_t and not isinstance(
                     result.type, ir.PointerType
                 ):
@@ -496,20 +1376,7 @@ class LLVMGenerator:
                     is self.ctx.obj_ptr_t
                     else ir.Constant(self.ctx.int_t, 0)
                 )
-                ret_val = stack.pop() if stack else default
-                if (
-                    self.ctx.builder.function.function_type.return_type
-                    is self.ctx.int_t
-                    and isinstance(ret_val.type, ir.PointerType)
-                ):
-                    ret_val = self.ctx.builder.ptrtoint(ret_val, self.ctx.int_t)
-                elif (
-                    self.ctx.builder.function.function_type.return_type
-                    is self.ctx.obj_ptr_t
-                    and isinstance(ret_val.type, ir.IntType)
-                ):
-                    ret_val = self.ctx.builder.inttoptr(ret_val, self.ctx.obj_ptr_t)
-                self.ctx.builder.ret(ret_val)
+                self._return(stack.pop() if stack else default)
                 terminated = True
                 stack = []
                 continue
@@ -522,7 +1389,20 @@ class LLVMGenerator:
             elif isinstance(instr, ScopeExit):
                 self.ctx.pop_scope()
                 if self.var_info_stack:
-                    self.var_info_stack.pop()
+                    scope = self.var_info_stack.pop()
+                    if stack and self._is_object(stack[-1]):
+                        # The result of an inlined call outlives the locals
+                        # of the callee, which are kept when no temporary
+                        # can hold it
+                        if not self.temp_scopes:
+                            continue
+                        if not any(t is stack[-1] for t in self.temp_scopes[-1]):
+                            stack[-1] = self._track_temp(stack[-1])
+                    self._release_locals([scope])
+            elif isinstance(instr, TempScopeEnter):
+                self.temp_scopes.append([])
+            elif isinstance(instr, TempScopeExit):
+                self._release_temps(self.temp_scopes.pop())
             elif isinstance(instr, Label):
                 block = self.blocks.get(instr.name)
                 if block is None:
@@ -540,7 +1420,15 @@ class LLVMGenerator:
                 terminated = True
             elif isinstance(instr, CondBr):
                 cond_val = self.ctx.get_var(instr.cond)
-                if isinstance(cond_val.type, ir.PointerType):
+                if cond_val.type == self.ctx.obj_ptr_t:
+                    # Boxed conditions are true only for the shared ``true`` object
+                    if self.tagged_values:
+                        obj_true = self._tagged_constant(tagging.TRUE_BITS)
+                    else:
+                        true_fn = self.ffi.get_or_declare_function("mxs_get_true")
+                        obj_true = self.ctx.builder.call(true_fn, [])
+                    cond_val = self.ctx.builder.icmp_unsigned("==", cond_val, obj_true)
+                elif isinstance(cond_val.type, ir.PointerType):
                     cond_val = self.ctx.builder.load(cond_val)
                 # Ensure condition is i1 for LLVM branching
                 if cond_val.type != ir.IntType(1):
@@ -560,38 +1448,95 @@ class LLVMGenerator:
                 terminated = True
             else:
                 raise RuntimeError(f"Unknown instruction {instr}")
-        return stack[-1] if stack else None
+        return self._materialise(stack[-1]) if stack else None
 
     # ------------------------------------------------------------------
     def build_function(self, func_ir: Function) -> None:
         func = self.functions[func_ir.name]
+        feedback = self._function_feedback(func_ir.name)
+        arg_types = None
+        if feedback is not None and all(
+            arg.type is self.ctx.obj_ptr_t for arg in func.args
+        ):
+            arg_types = feedback.monomorphic_args(len(func.args))
+        if not func.args:
+            # Nothing to guard, so the operators are specialised in place
+            self._build_body(func, func_ir, feedback)
+        elif arg_types is not None and all(t in NUMERIC_TYPES for t in arg_types):
+            clone = ir.Function(
+                self.ctx.module, func.function_type, name=f"{func.name}.specialised"
+            )
+            if func.name in self.opt_levels:
+                self.opt_levels[clone.name] = self.opt_levels[func.name]
+                if "noinline" in func.attributes:
+                    clone.attributes.add("noinline")
+            self._build_body(clone, func_ir, feedback, arg_types)
+            self._build_body(func, func_ir, arg_types=arg_types, clone=clone)
+        else:
+            self._build_body(func, func_ir)
+
+    def _build_body(
+        self,
+        func: ir.Function,
+        func_ir: Function,
+        feedback: FunctionFeedback | None = None,
+        arg_types: List[str] | None = None,
+        clone: ir.Function | None = None,
+    ) -> None:
+        """Emit the code of ``func_ir`` into ``func``.
+
+        With numeric ``feedback``, operators get unboxed fast paths and
+        qualifying locals are kept unboxed; arguments are unboxed too when
+        the caller guarantees ``arg_types``.  With a ``clone``, ``func``
+        first calls it if the arguments have the ``arg_types``.
+        """
         entry = func.append_basic_block("entry")
         # reset blocks mapping for this function
         self.blocks = {}
+        if clone is not None:
+            call_block = func.append_basic_block("specialised")
+            body_block = func.append_basic_block("generic")
         # first pass: create blocks for all labels
         for instr in func_ir.code:
             if isinstance(instr, Label):
                 self.blocks[instr.name] = func.append_basic_block(instr.name)
 
         self.ctx.builder = ir.IRBuilder(entry)
-        self.ctx.entry_builder = self.ctx.builder
+        if clone is not None:
+            self._guard_types(list(func.args), arg_types, call_block, body_block)
+            self.ctx.builder.position_at_end(call_block)
+            call = self.ctx.builder.call(clone, list(func.args), tail=True)
+            self.ctx.builder.ret(call)
+            self.ctx.builder.position_at_end(body_block)
+        self.ctx.entry_builder = ir.IRBuilder(entry)
+        self.op_index = 0
+        self.op_feedback = feedback
+        self.feedback_name = func_ir.name
+        if feedback is not None and not self.collect_type_feedback:
+            self._unbox_locals(func, func_ir, feedback, arg_types)
         self.ctx.push_scope()
+        self.locals_base = len(self.var_info_stack)
         self.var_info_stack.append({})
-        for arg, name in zip(func.args, func_ir.params):
+        for index, (arg, name) in enumerate(zip(func.args, func_ir.params)):
             self.ctx.set_var(name, arg)
             self.var_info_stack[-1][name] = {"type_name": None, "ptr": arg}
+            if self.collect_type_feedback and arg.type is self.ctx.obj_ptr_t:
+                self._record_type(arg_record(func_ir.name, index), arg)
         ret = self._emit_code(func_ir.code)
         if ret is not None:
-            self.ctx.builder.ret(ret)
+            self._return(ret)
         if not self.ctx.builder.block.is_terminated:
             default = (
                 ir.Constant(self.ctx.obj_ptr_t, None)
                 if func.function_type.return_type is self.ctx.obj_ptr_t
                 else ir.Constant(self.ctx.int_t, 0)
             )
-            self.ctx.builder.ret(default)
+            self._return(default)
         self.ctx.pop_scope()
         self.var_info_stack.pop()
+        self.op_feedback = None
+        self.number_slots = {}
+        self.number_params = {}
         # clear label map after finishing this function
         self.blocks = {}
 
@@ -607,7 +1552,10 @@ class LLVMGenerator:
                 self.blocks[instr.name] = fn.append_basic_block(instr.name)
 
         self.ctx.builder = ir.IRBuilder(entry)
-        self.ctx.entry_builder = self.ctx.builder
+        self.ctx.entry_builder = ir.IRBuilder(entry)
+        self.op_index = 0
+        self.op_feedback = self._function_feedback("__start")
+        self.feedback_name = "__start"
         self.var_info_stack.append({})
         ret = self._emit_code(code)
         if ret is not None:
@@ -623,5 +1571,22 @@ class LLVMGenerator:
         if not self.ctx.builder.block.is_terminated:
             self.ctx.builder.ret(ir.Constant(self.ctx.int_t, 0))
         self.var_info_stack.pop()
+        self.op_feedback = None
         # clear label map
         self.blocks = {}
+
+    def annotate_declarations(self) -> None:
+        """Attach effect attributes to runtime declarations known to be pure."""
+        for fn in self.ctx.module.functions:
+            if not fn.is_declaration:
+                continue
+            purity = get_purity(fn.name)
+            if purity not in ("const", "pure"):
+                continue
+            fn.attributes.add("nounwind")
+            # llvmlite's attribute whitelist predates ``willreturn``
+            set.add(fn.attributes, "willreturn")
+            if purity == "const":
+                # Allocating functions must not be readnone, or LLVM could
+                # merge two allocations that are released separately.
+                fn.attributes.add("readnone")
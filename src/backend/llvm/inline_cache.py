@@ -0,0 +1,67 @@
+"""Call-site inline caches shared with ``runtime/include/dispatch.hpp``.
+
+Every dynamic binary operator gets a private ``BinaryOpCache`` global.  It
+points at the runtime's operator-table entry for the operand types last seen
+at that site; while the operands keep those types, compiled code calls the
+entry's function directly instead of going through ``mxs_op_*``.  A miss
+takes the generic ``mxs_op_*`` path and then lets the runtime update the
+cache.
+
+Instrumented code also counts hits and misses per site; read them with
+:func:`inline_cache_stats`.
+"""
+
+from __future__ import annotations
+
+import ctypes
+from typing import List, Tuple
+
+from llvmlite import binding, ir
+
+# ``mxs_runtime::BinaryOp`` of each operator that has table entries
+BINARY_OPS = {
+    "+": 0,
+    "-": 1,
+    "*": 2,
+    "/": 3,
+    "==": 4,
+    "!=": 5,
+    "<": 6,
+    "<=": 7,
+    ">": 8,
+    ">=": 9,
+}
+
+# ``MXObject::TYPE_ID_OFFSET``: the 16-bit type id follows the vtable pointer
+# and the 32-bit reference count
+TYPE_ID_OFFSET = 12
+
+_I8_PTR = ir.IntType(8).as_pointer()
+# struct BinaryOpEntry { uint32_t key; BinaryOpFn fn; }
+ENTRY_TYPE = ir.LiteralStructType([ir.IntType(32), _I8_PTR])
+# struct BinaryOpCache { const BinaryOpEntry *entry; InlineCacheSite *site; }
+CACHE_TYPE = ir.LiteralStructType([ENTRY_TYPE.as_pointer(), ir.IntType(64).as_pointer()])
+
+
+class InlineCacheStats(ctypes.Structure):
+    """Mirror of ``mxs_runtime::MXInlineCacheStats``."""
+
+    _fields_ = [
+        ("site", ctypes.c_char_p),
+        ("hits", ctypes.c_uint64),
+        ("misses", ctypes.c_uint64),
+    ]
+
+
+def inline_cache_stats() -> List[Tuple[str, int, int]]:
+    """``(site, hits, misses)`` of every instrumented site run so far."""
+    address = binding.address_of_symbol("mxs_inline_cache_stats")
+    if not address:
+        return []
+    fn = ctypes.CFUNCTYPE(
+        ctypes.c_size_t, ctypes.POINTER(InlineCacheStats), ctypes.c_size_t
+    )(address)
+    count = fn(None, 0)
+    stats = (InlineCacheStats * count)()
+    count = min(count, fn(stats, count))
+    return [(s.site.decode(), s.hits, s.misses) for s in stats[:count]]
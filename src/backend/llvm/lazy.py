@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Set
+
+from llvmlite import ir
+
+# The module that owns module-level variables; it is always materialised
+OWNER = "__start"
+
+
+def _referenced(fn: ir.Function) -> Set[str]:
+    """Names of the global values used by the body of ``fn``."""
+    names: Set[str] = set()
+    for block in fn.blocks:
+        for instr in block.instructions:
+            for operand in instr.operands:
+                if isinstance(operand, ir.GlobalValue):
+                    names.add(operand.name)
+    return names
+
+
+def split_module(module: ir.Module) -> Dict[str, str]:
+    """Split ``module`` into one IR module per defined function.
+
+    Each unit only holds its function and declarations of the global values
+    that function uses.  Module-level variables are defined by the
+    ``__start`` unit with external linkage and declared by the rest; string
+    constants stay internal to the unit that uses them.  ``module`` is
+    restored before returning.
+    """
+    functions = [f for f in module.functions if f.blocks]
+    variables = [
+        g
+        for g in module.global_values
+        if isinstance(g, ir.GlobalVariable) and not g.global_constant
+    ]
+    blocks = {f.name: f.blocks for f in functions}
+    state = {g.name: (g.linkage, g.initializer) for g in variables}
+    uses = {f.name: _referenced(f) for f in functions}
+    all_globals = module.globals
+    units: Dict[str, str] = {}
+
+    def render(owner: ir.Function, keep: Set[str]) -> str:
+        # llvmlite caches the text of every global value
+        for value in [owner] + variables:
+            value._clear_string_cache()
+        module.globals = OrderedDict(
+            (name, value) for name, value in all_globals.items() if name in keep
+        )
+        return str(module)
+
+    try:
+        for fn in functions:
+            fn.blocks = []
+            fn._clear_string_cache()
+        for var in variables:
+            var.linkage = ""
+            var.initializer = None
+        for owner in functions:
+            keep = uses[owner.name] | {owner.name}
+            owner.blocks = blocks[owner.name]
+            if owner.name == OWNER:
+                for var in variables:
+                    var.initializer = state[var.name][1]
+                keep |= {var.name for var in variables}
+            units[owner.name] = render(owner, keep)
+            owner.blocks = []
+            if owner.name == OWNER:
+                for var in variables:
+                    var.initializer = None
+    finally:
+        module.globals = all_globals
+        for fn in functions:
+            fn.blocks = blocks[fn.name]
+            fn._clear_string_cache()
+        for var in variables:
+            var.linkage, var.initializer = state[var.name]
+            var._clear_string_cache()
+    return units
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple, Union
+
+from llvmlite import binding
+
+OptLevel = Union[int, str]
+
+# Accepted ``--opt-level`` values
+OPT_LEVELS = ("0", "1", "2", "3", "s")
+
+
+def pipeline_levels(opt_level: OptLevel) -> Tuple[int, int]:
+    """Return the ``(speed_level, size_level)`` pair of ``opt_level``."""
+    level = str(opt_level)
+    if level not in OPT_LEVELS:
+        raise ValueError(f"Unknown optimisation level: {opt_level!r}")
+    if level == "s":
+        # llvmlite 0.44 aborts while building the Os pipeline, so use Oz
+        return 2, 2
+    return int(level), 0
+
+
+def resolve_cpu(cpu: str | None = None) -> Tuple[str, str]:
+    """Return the ``(cpu_name, features)`` pair code is generated for.
+
+    ``"native"`` selects the host CPU with all of its features; any other
+    name is passed to LLVM unchanged.
+    """
+    if cpu == "native":
+        return binding.get_host_cpu_name(), binding.get_host_cpu_features().flatten()
+    return cpu or "", ""
+
+
+def create_target_machine(
+    opt_level: OptLevel = 0, cpu: str | None = None, jit: bool = True
+) -> binding.TargetMachine:
+    """Create a target machine for the host tuned for ``cpu``.
+
+    With ``jit=False`` the machine emits position independent code with the
+    default code model, as needed for executables and shared objects.
+    """
+    target = binding.Target.from_default_triple()
+    cpu_name, features = resolve_cpu(cpu)
+    options = {} if jit else {"reloc": "pic", "codemodel": "default"}
+    return target.create_target_machine(
+        cpu=cpu_name,
+        features=features,
+        opt=pipeline_levels(opt_level)[0],
+        **options,
+    )
+
+
+def group_by_level(
+    module: binding.ModuleRef, levels: Dict[str, int], default_level: int = 0
+) -> Dict[int, List[str]]:
+    """Group the functions defined in ``module`` by optimisation level."""
+    groups: Dict[int, List[str]] = {}
+    for fn in module.functions:
+        if fn.is_declaration:
+            continue
+        level = levels.get(fn.name, default_level)
+        groups.setdefault(level, []).append(fn.name)
+    return groups
+
+
+def optimize_functions(
+    module: binding.ModuleRef,
+    target_machine: binding.TargetMachine,
+    levels: Dict[str, int],
+    default_level: int = 0,
+) -> Dict[int, List[str]]:
+    """Run the function pipeline of each level over its group of functions.
+
+    Functions missing from ``levels`` use ``default_level``.  Level 0 groups
+    are left untouched so glue code compiles as fast as possible.
+    """
+    groups = group_by_level(module, levels, default_level)
+    for level, names in sorted(groups.items()):
+        if level == 0:
+            continue
+        pto = binding.create_pipeline_tuning_options(speed_level=level, size_level=0)
+        pb = binding.create_pass_builder(target_machine, pto)
+        fpm = pb.getFunctionPassManager()
+        for name in names:
+            fpm.run(module.get_function(name), pb)
+    return groups
+
+
+def optimize_module(
+    module: binding.ModuleRef,
+    target_machine: binding.TargetMachine,
+    opt_level: OptLevel = 0,
+    levels: Dict[str, int] | None = None,
+) -> None:
+    """Optimise ``module`` with the standard pipeline of ``opt_level``.
+
+    The module pipeline inlines, runs SROA, GVN and LICM and vectorises
+    loops.  Functions annotated in ``levels`` with a different level then
+    get the function pipeline of their own level; level-0 functions carry
+    ``optnone`` and are skipped by every pass.
+    """
+    speed, size = pipeline_levels(opt_level)
+    if speed > 0:
+        pto = binding.create_pipeline_tuning_options(
+            speed_level=speed, size_level=size
+        )
+        pto.loop_vectorization = size == 0
+        pto.slp_vectorization = size == 0
+        pb = binding.create_pass_builder(target_machine, pto)
+        pb.getModulePassManager().run(module, pb)
+    annotated = {
+        name: level for name, level in (levels or {}).items() if level != speed
+    }
+    if annotated:
+        # Unannotated functions were handled above, so group them at level 0
+        optimize_functions(module, target_machine, annotated)
@@ -0,0 +1,276 @@
+"""Link the runtime's LLVM bitcode into program modules.
+
+With the runtime available as bitcode (``cmake -DMXS_RUNTIME_BITCODE=ON``
+writes it to ``bin/runtime-bc``) the optimiser can inline runtime fast paths
+such as ``increase_ref`` into MxScript code.  The shared library stays the
+single home of all runtime code and state:
+
+* exported functions that only use exported state become
+  ``available_externally``, so LLVM may inline them but never emits a copy;
+* exported functions that touch runtime-private state or code outside the
+  runtime become plain declarations and are called in the shared library;
+* static constructors are dropped, the shared library already ran them.
+
+llvmlite cannot change declarations or aliases, so the runtime is prepared
+as IR text.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Set
+
+from llvmlite import binding
+
+ENV_VAR = "MXSCRIPT_RUNTIME_BITCODE"
+RUNTIME_BITCODE_DIR = Path(__file__).resolve().parents[3] / "bin" / "runtime-bc"
+
+_LINKAGES = {
+    "private",
+    "internal",
+    "available_externally",
+    "linkonce",
+    "weak",
+    "common",
+    "appending",
+    "extern_weak",
+    "linkonce_odr",
+    "weak_odr",
+    "external",
+}
+_CTOR_LISTS = {"llvm.global_ctors", "llvm.global_dtors"}
+_NAME = r'@("(?:[^"\\]|\\.)*"|[-a-zA-Z$._0-9]+)'
+_REFERENCE = re.compile(_NAME)
+_GLOBAL = re.compile(_NAME + r" = (.*)$")
+_FUNCTION = re.compile(r"^define (.*?)" + _NAME + r"\(")
+_COMDAT = re.compile(r",? comdat(\([^)]*\))?")
+
+# Prepared runtime bitcode by digest of the input files
+_PREPARED: Dict[str, bytes] = {}
+
+
+@dataclass
+class _Symbol:
+    name: str
+    exported: bool
+    refs: Set[str] = field(default_factory=set)
+    constant: bool = False
+    thread_local: bool = False
+
+
+def runtime_bitcode_files(directory: str | Path | None = None) -> List[Path]:
+    """Return the runtime bitcode files, or an empty list if not built."""
+    if directory is None:
+        env = os.environ.get(ENV_VAR)
+        directory = Path(env) if env else RUNTIME_BITCODE_DIR
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if p.suffix == ".bc")
+
+
+def runtime_digest(files: List[Path]) -> str:
+    """Hash of the runtime bitcode, for keying compiled code."""
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _unquote(name: str) -> str:
+    return name[1:-1] if name.startswith('"') else name
+
+
+def _references(text: str) -> Set[str]:
+    return {_unquote(name) for name in _REFERENCE.findall(text)}
+
+
+def _linkage(words: List[str]) -> str:
+    return next((word for word in words if word in _LINKAGES), "external")
+
+
+def _global_words(rest: str) -> List[str]:
+    """Keywords in front of the type of a global variable or alias."""
+    words = []
+    for word in rest.split():
+        words.append(word)
+        if word in ("global", "constant", "alias", "ifunc"):
+            break
+    return words
+
+
+def _param_end(line: str, start: int) -> int:
+    """Index of the parenthesis closing the parameter list at ``start``."""
+    depth = 0
+    for index in range(start, len(line)):
+        if line[index] == "(":
+            depth += 1
+        elif line[index] == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    raise ValueError(f"Unbalanced function header: {line[:80]}")
+
+
+def _alias_declaration(name: str, rest: str) -> str | None:
+    """Turn a function alias into a declaration of the same symbol."""
+    body = rest.split("alias ", 1)[1]
+    target = _REFERENCE.search(body)
+    if target is None:
+        return None
+    # ``alias <fnty>, <fnty>* @target``
+    types = body[: target.start()].rstrip()
+    size = (len(types) - 3) // 2
+    fnty = types[:size]
+    if types != f"{fnty}, {fnty}*" or " (" not in fnty:
+        return None
+    ret, params = fnty.split(" (", 1)
+    return f"declare {ret} @{name}({params[:-1]})"
+
+
+def _inlinable(
+    functions: Dict[str, _Symbol], variables: Dict[str, _Symbol], callable_: Set[str]
+) -> Set[str]:
+    """Names of the functions whose bodies may be copied into programs."""
+    allowed = set(callable_)
+    for var in variables.values():
+        if var.exported and not var.thread_local:
+            allowed.add(var.name)
+        elif var.constant and not var.thread_local and not var.refs:
+            allowed.add(var.name)
+    inlinable = set(functions)
+    changed = True
+    while changed:
+        changed = False
+        for name in list(inlinable):
+            for ref in functions[name].refs:
+                if ref.startswith("llvm.") or ref in allowed:
+                    continue
+                if ref in inlinable and not functions[ref].exported:
+                    continue
+                inlinable.discard(name)
+                changed = True
+                break
+    return inlinable
+
+
+def prepare_runtime(llvm_ir: str) -> str:
+    """Rewrite runtime IR so linking it only adds inlinable definitions."""
+    lines = llvm_ir.splitlines()
+    functions: Dict[str, _Symbol] = {}
+    variables: Dict[str, _Symbol] = {}
+    callable_: Set[str] = set()
+    spans: Dict[str, range] = {}
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        match = _FUNCTION.match(line)
+        if match:
+            name = _unquote(match.group(2))
+            end = index
+            while lines[end] != "}":
+                end += 1
+            spans[name] = range(index, end + 1)
+            exported = _linkage(match.group(1).split()) == "external"
+            header = line[_param_end(line, match.end() - 1) :]
+            body = "\n".join(lines[index + 1 : end]) + header
+            functions[name] = _Symbol(name, exported, _references(body))
+            if exported:
+                callable_.add(name)
+            index = end + 1
+            continue
+        match = _GLOBAL.match(line)
+        if match:
+            name, rest = _unquote(match.group(1)), match.group(2)
+            words = _global_words(rest)
+            exported = _linkage(words) == "external"
+            if words[-1] == "alias":
+                if exported:
+                    callable_.add(name)
+            elif words[-1] in ("global", "constant"):
+                variables[name] = _Symbol(
+                    name,
+                    exported and "external" not in words,
+                    _references(rest),
+                    constant=words[-1] == "constant",
+                    thread_local=any(w.startswith("thread_local") for w in words),
+                )
+        index += 1
+
+    inlinable = _inlinable(functions, variables, callable_)
+    out: List[str] = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        match = _FUNCTION.match(line)
+        if match:
+            name = _unquote(match.group(2))
+            span = spans[name]
+            if not functions[name].exported:
+                out.extend(lines[span.start : span.stop])
+            elif name in inlinable:
+                out.append(_COMDAT.sub("", "define available_externally " + line[7:]))
+                out.extend(lines[span.start + 1 : span.stop])
+            else:
+                end = _param_end(line, match.end() - 1)
+                groups = [w for w in line[end + 1 :].split() if w.startswith("#")]
+                out.append(" ".join(["declare " + line[7 : end + 1]] + groups))
+            index = span.stop
+            continue
+        match = _GLOBAL.match(line)
+        if match:
+            name, rest = _unquote(match.group(1)), match.group(2)
+            words = _global_words(rest)
+            if name in _CTOR_LISTS:
+                line = ""
+            elif words[-1] == "alias":
+                declaration = _alias_declaration(match.group(1), rest)
+                if declaration is not None and _linkage(words) == "external":
+                    line = declaration
+            elif name in variables and variables[name].exported:
+                line = _COMDAT.sub(
+                    "", f"@{match.group(1)} = available_externally {rest}"
+                )
+        out.append(line)
+        index += 1
+    return "\n".join(out) + "\n"
+
+
+def load_runtime(files: List[Path]) -> binding.ModuleRef:
+    """Parse the runtime bitcode, prepared for linking into programs."""
+    digest = runtime_digest(files)
+    if digest not in _PREPARED:
+        runtime = binding.parse_bitcode(files[0].read_bytes())
+        for path in files[1:]:
+            runtime.link_in(binding.parse_bitcode(path.read_bytes()))
+        prepared = binding.parse_assembly(prepare_runtime(str(runtime)))
+        prepared.verify()
+        _PREPARED[digest] = prepared.as_bitcode()
+    return binding.parse_bitcode(_PREPARED[digest])
+
+
+def link_runtime(
+    module: binding.ModuleRef,
+    target_machine: binding.TargetMachine,
+    files: List[Path] | None = None,
+) -> bool:
+    """Link the runtime bitcode into ``module`` for cross-language inlining.
+
+    Returns whether any bitcode was linked.  The module pipeline must run
+    afterwards so the ``available_externally`` bodies are dropped again.
+    """
+    if files is None:
+        files = runtime_bitcode_files()
+    if not files:
+        return False
+    runtime = load_runtime(files)
+    module.triple = target_machine.triple
+    module.data_layout = str(target_machine.target_data)
+    runtime.triple = module.triple
+    runtime.data_layout = module.data_layout
+    module.link_in(runtime)
+    return True
@@ -0,0 +1,45 @@
+"""Tagged value representation shared with ``runtime/include/tagged.hpp``.
+
+A runtime built with ``cmake -DMXS_TAGGED_VALUES=ON`` accepts 63-bit
+integers, booleans and nil encoded in the bits of an object pointer.  Real
+objects are at least 8-byte aligned, so their low two bits are clear:
+
+* ``value << 1 | 1`` is an integer;
+* ``NIL_BITS``, ``FALSE_BITS`` and ``TRUE_BITS`` are the singletons.
+
+The generator only emits tags when the loaded runtime reports that it
+understands them.
+"""
+
+from __future__ import annotations
+
+import ctypes
+
+from llvmlite import binding
+
+INT_TAG = 0b1
+TAG_MASK = 0b11
+NIL_BITS = 0b00010
+FALSE_BITS = 0b01010
+TRUE_BITS = 0b10010
+
+MIN_INT = -(1 << 62)
+MAX_INT = (1 << 62) - 1
+
+
+def fits(value: int) -> bool:
+    """Whether ``value`` can be stored as a tagged integer."""
+    return MIN_INT <= value <= MAX_INT
+
+
+def tag_int(value: int) -> int:
+    """Pointer bits of the tagged integer ``value``."""
+    return ((value << 1) | INT_TAG) & ((1 << 64) - 1)
+
+
+def runtime_tags_values() -> bool:
+    """Whether the runtime loaded into this process was built with tags."""
+    address = binding.address_of_symbol("mxs_runtime_tagged_values")
+    if not address:
+        return False
+    return bool(ctypes.CFUNCTYPE(ctypes.c_bool)(address)())
@@ -0,0 +1,133 @@
+"""Purity inference for MxScript functions.
+
+Every user function is classified with the same effect classes that
+:mod:`abi_manager` uses for runtime symbols:
+
+``pure``
+    the result depends only on the argument values
+``io``
+    has effects outside the object heap (printing) or reads global state,
+    but never mutates MxScript objects or variables
+``impure``
+    anything else
+
+The analysis is optimistic: all functions start out pure and are demoted
+until a fixed point is reached, so (mutually) recursive pure functions stay
+pure.  Termination is tracked separately and pessimistically, since only
+calls that are known to return may be executed speculatively.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+from .abi_manager import get_purity
+from .ir import Alloc, Call, DestructorCall, Instr, Load, ProgramIR, Store
+from .llir import Br, CondBr, Label
+
+PURE = "pure"
+IO = "io"
+IMPURE = "impure"
+
+_RANK = {PURE: 0, IO: 1, IMPURE: 2}
+
+
+def _join(a: str, b: str) -> str:
+    return a if _RANK[a] >= _RANK[b] else b
+
+
+def _root(name: str) -> str:
+    return name.split(".", 1)[0]
+
+
+def has_back_edge(code: List[Instr]) -> bool:
+    """Return ``True`` if ``code`` branches backwards, i.e. contains a loop."""
+    seen: Set[str] = set()
+    for instr in code:
+        if isinstance(instr, Label):
+            seen.add(instr.name)
+        elif isinstance(instr, Br) and instr.label in seen:
+            return True
+        elif isinstance(instr, CondBr) and (
+            instr.then_label in seen or instr.else_label in seen
+        ):
+            return True
+    return False
+
+
+@dataclass
+class PurityInfo:
+    program: ProgramIR
+    effects: Dict[str, str] = field(default_factory=dict)
+    terminating: Set[str] = field(default_factory=set)
+
+    def call_effect(self, name: str) -> str:
+        """Effect class of calling ``name`` from LLIR."""
+        if name in self.effects:
+            return self.effects[name]
+        info = self.program.foreign_functions.get(name)
+        symbol = info.get("symbol_name", name) if info is not None else name
+        purity = get_purity(symbol)
+        if purity == "const":
+            return PURE
+        if purity in (PURE, IO):
+            return purity
+        return IMPURE
+
+    def terminates(self, name: str) -> bool:
+        if name in self.effects:
+            return name in self.terminating
+        return self.call_effect(name) != IMPURE
+
+    def is_movable(self, name: str) -> bool:
+        """Whether calls to ``name`` may be hoisted, merged or dropped."""
+        return self.call_effect(name) == PURE and self.terminates(name)
+
+
+def _body_effect(info: PurityInfo, params: List[str], code: List[Instr]) -> str:
+    local_names = set(params) | {
+        _root(i.name) for i in code if isinstance(i, Store)
+    }
+    effect = PURE
+    for instr in code:
+        if isinstance(instr, (Alloc, DestructorCall)):
+            return IMPURE
+        if isinstance(instr, Store) and "." in instr.name:
+            return IMPURE
+        if isinstance(instr, Load) and _root(instr.name) not in local_names:
+            effect = _join(effect, IO)
+        elif isinstance(instr, Call):
+            effect = _join(effect, info.call_effect(instr.name))
+            if effect == IMPURE:
+                return IMPURE
+    return effect
+
+
+def infer_purity(program: ProgramIR) -> PurityInfo:
+    """Classify every function of ``program``."""
+    info = PurityInfo(program)
+    functions = program.functions
+    for name in functions:
+        info.effects[name] = PURE
+    changed = True
+    while changed:
+        changed = False
+        for name, func in functions.items():
+            effect = _body_effect(info, func.params, func.code)
+            if effect != info.effects[name]:
+                info.effects[name] = _join(effect, info.effects[name])
+                changed = True
+    # Functions without loops terminate once all of their callees do
+    changed = True
+    while changed:
+        changed = False
+        for name, func in functions.items():
+            if name in info.terminating or has_back_edge(func.code):
+                continue
+            if all(
+                info.terminates(i.name) for i in func.code if isinstance(i, Call)
+            ):
+                info.terminating.add(name)
+                changed = True
+    return info
@@ -0,0 +1,323 @@
+"""Compile-time evaluation of ``@@static_deterministic`` functions.
+
+Calls to deterministic functions whose arguments are all constants are
+executed by a small interpreter over the stack-machine LLIR and replaced by
+the resulting constant.  Only a pure subset is evaluated: scalar constants,
+locals, arithmetic and comparisons, control flow and calls to other
+deterministic functions.  Anything else aborts the evaluation and the call
+is left for the runtime.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from .ir import (
+    Alloc,
+    BinOpInstr,
+    Call,
+    Const,
+    DestructorCall,
+    Dup,
+    Function,
+    Instr,
+    Load,
+    Pop,
+    ProgramIR,
+    Return,
+    ScopeEnter,
+    ScopeExit,
+    Store,
+    TempScopeEnter,
+    TempScopeExit,
+)
+from .llir import Br, CondBr, Label
+
+DEFAULT_STEP_BUDGET = 1_000_000
+DEFAULT_TIME_BUDGET = 0.5
+MAX_CALL_DEPTH = 256
+
+_INT_MAX = (1 << 63) - 1
+
+Value = int | float | bool | str
+
+
+class EvalAbort(Exception):
+    """Raised when a call cannot be evaluated at compile time."""
+
+
+@dataclass
+class StaticEvalReport:
+    folded: List[Tuple[str, Tuple[Value, ...], Value]] = field(default_factory=list)
+    diagnostics: List[str] = field(default_factory=list)
+
+    def render(self) -> str:
+        lines = [f"folded {len(self.folded)} deterministic calls"]
+        for name, args, result in self.folded:
+            arg_text = ", ".join(repr(a) for a in args)
+            lines.append(f"  {name}({arg_text}) = {result!r}")
+        return "\n".join(lines)
+
+
+def _wrap_int(value: int) -> int:
+    """Match the runtime's 64-bit two's complement integers."""
+    value &= (1 << 64) - 1
+    return value - (1 << 64) if value > _INT_MAX else value
+
+
+def _binop(op: str, left: Value, right: Value) -> Value:
+    if isinstance(left, str) or isinstance(right, str):
+        raise EvalAbort("string operands")
+    if op in ("and", "or"):
+        if not isinstance(left, bool) or not isinstance(right, bool):
+            raise EvalAbort(f"non-boolean '{op}' operands")
+        return (left and right) if op == "and" else (left or right)
+    if isinstance(left, bool) or isinstance(right, bool):
+        if op == "==":
+            return left is right
+        if op == "!=":
+            return left is not right
+        raise EvalAbort(f"boolean '{op}' operands")
+    if op == "+":
+        result = left + right
+    elif op == "-":
+        result = left - right
+    elif op == "*":
+        result = left * right
+    elif op == "/":
+        if right == 0:
+            # Leave the ZeroDivisionError to the runtime
+            raise EvalAbort("division by zero")
+        if isinstance(left, int) and isinstance(right, int):
+            quotient = abs(left) // abs(right)
+            result = quotient if (left < 0) == (right < 0) else -quotient
+        else:
+            result = left / right
+    elif op == "==":
+        return left == right
+    elif op == "!=":
+        return left != right
+    elif op == "<":
+        return left < right
+    elif op == "<=":
+        return left <= right
+    elif op == ">":
+        return left > right
+    elif op == ">=":
+        return left >= right
+    else:
+        raise EvalAbort(f"unsupported operator '{op}'")
+    return _wrap_int(result) if isinstance(result, int) else result
+
+
+def _memo_key(name: str, args: Tuple[Value, ...]) -> tuple:
+    # ``1 == True`` in Python, so the argument types are part of the key
+    return (name,) + tuple((type(a).__name__, a) for a in args)
+
+
+class StaticEvaluator:
+    """Interpret deterministic functions and fold their constant calls.
+
+    The memo table is shared by every call site, so repeated or recursive
+    calls with the same arguments are evaluated once per compilation.
+    """
+
+    def __init__(
+        self,
+        program: ProgramIR,
+        *,
+        step_budget: int = DEFAULT_STEP_BUDGET,
+        time_budget: float = DEFAULT_TIME_BUDGET,
+    ) -> None:
+        self.program = program
+        self.step_budget = step_budget
+        self.time_budget = time_budget
+        self.memo: Dict[tuple, Value] = {}
+        self.report = StaticEvalReport()
+        self.evaluable: Set[str] = set()
+        self._steps = 0
+        self._deadline = 0.0
+        self._depth = 0
+
+    # ------------------------------------------------------------------
+    def check_purity(self) -> None:
+        """Record diagnostics for deterministic functions using impure code.
+
+        Functions that pass the check, directly and through their callees,
+        become eligible for compile-time evaluation.
+        """
+        functions = self.program.functions
+        deterministic = {n for n, f in functions.items() if f.is_deterministic}
+        impure: Set[str] = set()
+        for name in sorted(deterministic):
+            func = functions[name]
+            local_names = set(func.params) | {
+                i.name for i in func.code if isinstance(i, Store)
+            }
+            for instr in func.code:
+                problem = None
+                if isinstance(instr, Call) and instr.name not in deterministic:
+                    problem = f"calls impure function '{instr.name}'"
+                elif isinstance(instr, Alloc):
+                    problem = "allocates an object"
+                elif isinstance(instr, Load) and instr.name not in local_names:
+                    problem = f"reads non-local '{instr.name}'"
+                if problem is not None:
+                    self.report.diagnostics.append(
+                        f"deterministic function '{name}' {problem}"
+                    )
+                    impure.add(name)
+        # Callers of impure deterministic functions cannot be evaluated either
+        changed = True
+        while changed:
+            changed = False
+            for name in deterministic - impure:
+                if any(
+                    isinstance(i, Call) and i.name in impure
+                    for i in functions[name].code
+                ):
+                    impure.add(name)
+                    changed = True
+        self.evaluable = deterministic - impure
+
+    def evaluate(self, name: str, args: Tuple[Value, ...]) -> Value:
+        """Evaluate ``name(*args)`` within a fresh step and time budget."""
+        self._steps = 0
+        self._deadline = time.perf_counter() + self.time_budget
+        self._depth = 0
+        return self._call(name, args)
+
+    def fold(self, code: List[Instr]) -> List[Instr]:
+        """Replace constant-argument deterministic calls in ``code``."""
+        out: List[Instr] = []
+        for instr in code:
+            start = len(out) - instr.argc if isinstance(instr, Call) else -1
+            if (
+                start >= 0
+                and instr.name in self.evaluable
+                and all(isinstance(i, Const) for i in out[start:])
+            ):
+                args = tuple(i.value for i in out[start:])
+                try:
+                    result = self.evaluate(instr.name, args)
+                except EvalAbort:
+                    result = None
+                if result is not None:
+                    del out[start:]
+                    out.append(Const(result))
+                    self.report.folded.append((instr.name, args, result))
+                    continue
+            out.append(instr)
+        return out
+
+    def run(self) -> StaticEvalReport:
+        self.check_purity()
+        if self.evaluable:
+            self.program.code = self.fold(self.program.code)
+            for func in self.program.functions.values():
+                func.code = self.fold(func.code)
+        return self.report
+
+    # ------------------------------------------------------------------
+    def _tick(self) -> None:
+        self._steps += 1
+        if self._steps > self.step_budget:
+            raise EvalAbort("step budget exhausted")
+        if self._steps % 1024 == 0 and time.perf_counter() > self._deadline:
+            raise EvalAbort("time budget exhausted")
+
+    def _call(self, name: str, args: Tuple[Value, ...]) -> Value:
+        if name not in self.evaluable:
+            raise EvalAbort(f"'{name}' is not evaluable")
+        if any(a is None for a in args):
+            raise EvalAbort("nil argument")
+        key = _memo_key(name, args)
+        if key in self.memo:
+            return self.memo[key]
+        if self._depth >= MAX_CALL_DEPTH:
+            raise EvalAbort("call depth exhausted")
+        func = self.program.functions[name]
+        if len(args) != len(func.params):
+            raise EvalAbort("arity mismatch")
+        self._depth += 1
+        try:
+            result = self._run(func, args)
+        finally:
+            self._depth -= 1
+        if result is None:
+            raise EvalAbort(f"'{name}' yields no value")
+        self.memo[key] = result
+        return result
+
+    def _run(self, func: Function, args: Tuple[Value, ...]) -> Value | None:
+        code = func.code
+        labels = {i.name: pc for pc, i in enumerate(code) if isinstance(i, Label)}
+        env: Dict[str, Value] = dict(zip(func.params, args))
+        stack: List[Value] = []
+        pc = 0
+        while pc < len(code):
+            self._tick()
+            instr = code[pc]
+            pc += 1
+            if isinstance(instr, Const):
+                if instr.value is None:
+                    raise EvalAbort("nil constant")
+                stack.append(instr.value)
+            elif isinstance(instr, Load):
+                if instr.name not in env:
+                    raise EvalAbort(f"unknown local '{instr.name}'")
+                stack.append(env[instr.name])
+            elif isinstance(instr, Store):
+                env[instr.name] = stack.pop()
+            elif isinstance(instr, Dup):
+                stack.append(stack[-1])
+            elif isinstance(instr, Pop):
+                if stack:
+                    stack.pop()
+            elif isinstance(instr, BinOpInstr):
+                right = stack.pop()
+                left = stack.pop()
+                stack.append(_binop(instr.op, left, right))
+            elif isinstance(instr, Call):
+                call_args = tuple(stack[len(stack) - instr.argc :])
+                del stack[len(stack) - instr.argc :]
+                stack.append(self._call(instr.name, call_args))
+            elif isinstance(instr, Return):
+                return stack.pop() if stack else None
+            elif isinstance(instr, Br):
+                pc = labels[instr.label]
+            elif isinstance(instr, CondBr):
+                cond = env.get(instr.cond)
+                if not isinstance(cond, (bool, int)):
+                    raise EvalAbort("non-scalar condition")
+                pc = labels[instr.then_label if cond else instr.else_label]
+            elif isinstance(
+                instr,
+                (
+                    Label,
+                    ScopeEnter,
+                    ScopeExit,
+                    TempScopeEnter,
+                    TempScopeExit,
+                    DestructorCall,
+                ),
+            ):
+                continue
+            else:
+                raise EvalAbort(f"unsupported {type(instr).__name__}")
+        return stack[-1] if stack else None
+
+
+def evaluate_static_calls(
+    program: ProgramIR,
+    *,
+    step_budget: int = DEFAULT_STEP_BUDGET,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+) -> StaticEvalReport:
+    """Fold constant calls to ``@@static_deterministic`` functions in place."""
+    evaluator = StaticEvaluator(
+        program, step_budget=step_budget, time_budget=time_budget
+    )
+    return evaluator.run()
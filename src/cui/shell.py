@@ -47,6 +47,7 @@ def run_shell() -> int:
                 runtime = _load_runtime_lib()
             try:
                 runtime.mxs_allocator_dump_stats()
+                runtime.mxs_gc_dump_stats()
             except Exception as exc:  # pragma: no cover - debug helper
                 print(f"Error calling dump_stats: {exc}")
             continue
@@ -159,6 +159,10 @@ class SemanticAnalyzer:
             var = self._lookup_var(expr.name)
             if var is not None:
                 return var.type_name
+        if isinstance(expr, FunctionCall) and self.function_signatures:
+            sig = self.function_signatures.get(expr.name)
+            if sig is not None and sig.return_type and len(sig.return_type) == 1:
+                return sig.return_type[0]
         return None
 
     def _flatten_member_expr(self, expr: Expression) -> str:
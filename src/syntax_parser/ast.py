@@ -180,6 +180,8 @@ class FuncDef(Statement):
     body: Block
     template_params: list[str] | None = None
     ffi_info: Dict[str, object] | None = None
+    opt_level: int | None = None
+    is_deterministic: bool = False
 
 
 @dataclass
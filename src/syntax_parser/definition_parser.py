@@ -27,6 +27,9 @@ class DefinitionParserMixin:
         template_params = None
         ffi_info = None
         if annotation and annotation.get("name") == "foreign":
+            if any(isinstance(v, int) for v in annotation.values()):
+                loc = self._get_location(start)
+                raise SyntaxError("@@foreign arguments must be strings", loc)
             self._expect(TokenType.SEMICOLON)
             ffi_info = {k: v for k, v in annotation.items() if k != "name"}
             body = Block([], loc=start)
@@ -38,8 +41,18 @@ class DefinitionParserMixin:
                 ffi_info=ffi_info,
                 loc=start,
             )
+        opt_level = None
         if annotation and annotation.get("name") == "template":
             template_params = annotation.get("params")
+        if annotation and annotation.get("name") == "manual_optimize_level":
+            level = annotation.get("level", 2)
+            if not isinstance(level, int) or not 0 <= level <= 3:
+                loc = self._get_location(start)
+                raise SyntaxError("@@manual_optimize_level expects level=0..3", loc)
+            opt_level = level
+        is_deterministic = bool(
+            annotation and annotation.get("name") == "static_deterministic"
+        )
         body = self.parse_block()
         return FuncDef(
             name,
@@ -47,6 +60,8 @@ class DefinitionParserMixin:
             body,
             template_params=template_params,
             ffi_info=ffi_info,
+            opt_level=opt_level,
+            is_deterministic=is_deterministic,
             loc=start,
         )
 
@@ -205,6 +220,9 @@ class DefinitionParserMixin:
         template_params = None
         ffi_info = None
         if annotation and annotation.get("name") == "foreign":
+            if any(isinstance(v, int) for v in annotation.values()):
+                loc = self._get_location(start)
+                raise SyntaxError("@@foreign arguments must be strings", loc)
             self._expect(TokenType.SEMICOLON)
             ffi_info = {k: v for k, v in annotation.items() if k != "name"}
             body = Block([], loc=start)
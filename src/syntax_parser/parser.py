@@ -156,6 +156,8 @@ class Parser(ExpressionParserMixin, DefinitionParserMixin):
                         self._expect(TokenType.ELLIPSIS)
                     self._expect(TokenType.RBRACKET)
                     args["argv"] = {"pack_args_from": start_idx}
+                elif self.stream.peek().type == TokenType.INTEGER:
+                    args[key] = int(self.stream.next().value)
                 else:
                     val_tok = self._expect(TokenType.STRING)
                     args[key] = val_tok.value
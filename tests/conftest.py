@@ -0,0 +1,168 @@
+"""Helpers for the tests that call the runtime through ctypes."""
+
+import ctypes
+import functools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# The semantic analyzer imports the backend in the order it needs, which
+# importing src.backend.llir first would break
+import src.semantic_analyzer  # noqa: F401
+from src.backend.llir import _load_runtime
+from src.backend.llvm import runtime_tags_values
+
+# Objects are passed and returned as untyped pointers
+OBJECT = ctypes.c_void_p
+
+# restype and argtypes of the runtime functions the tests call
+SIGNATURES = {
+    "MXCreateInteger": (OBJECT, [ctypes.c_int64]),
+    "MXCreateList": (OBJECT, []),
+    "MXCreateFloat": (OBJECT, [ctypes.c_double]),
+    "increase_ref": (ctypes.c_size_t, [OBJECT]),
+    "decrease_ref": (ctypes.c_size_t, [OBJECT]),
+    "list_append": (OBJECT, [OBJECT, OBJECT]),
+    "mxs_get_nil": (OBJECT, []),
+    "mxs_get_true": (OBJECT, []),
+    "mxs_get_false": (OBJECT, []),
+    "MXCreateString": (OBJECT, [ctypes.c_char_p]),
+    "mxs_op_getitem": (OBJECT, [OBJECT, OBJECT]),
+    "mxs_op_add": (OBJECT, [OBJECT, OBJECT]),
+    "mxs_op_sub": (OBJECT, [OBJECT, OBJECT]),
+    "mxs_op_mul": (OBJECT, [OBJECT, OBJECT]),
+    "mxs_op_div": (OBJECT, [OBJECT, OBJECT]),
+    "mxs_op_lt": (OBJECT, [OBJECT, OBJECT]),
+    "mxs_op_ne": (OBJECT, [OBJECT, OBJECT]),
+    "mx_object_repr": (None, [OBJECT, ctypes.c_char_p, ctypes.c_size_t]),
+    "mxs_get_object_type_name": (ctypes.c_char_p, [OBJECT]),
+    "mxs_allocator_live_count": (ctypes.c_size_t, []),
+    "mxs_runtime_refcount_mode": (ctypes.c_char_p, []),
+    "mxs_refcount_merge": (ctypes.c_size_t, []),
+    # Cycle collector
+    "mxs_gc_enabled": (ctypes.c_bool, []),
+    "mxs_gc_collect": (ctypes.c_size_t, []),
+    "mxs_gc_set_threshold": (None, [ctypes.c_size_t]),
+    # Deferred release
+    "mxs_release_configure": (None, [ctypes.c_size_t, ctypes.c_uint64]),
+    "mxs_release_deferred": (None, [OBJECT]),
+    "mxs_release_drain": (ctypes.c_size_t, [ctypes.c_uint64]),
+    "mxs_release_pending": (ctypes.c_size_t, []),
+    # Dicts
+    "MXCreateDict": (OBJECT, []),
+    "dict_getitem": (OBJECT, [OBJECT, OBJECT]),
+    "dict_setitem": (OBJECT, [OBJECT, OBJECT, OBJECT]),
+    "dict_delitem": (OBJECT, [OBJECT, OBJECT]),
+    "dict_contains": (OBJECT, [OBJECT, OBJECT]),
+    "dict_length": (ctypes.c_size_t, [OBJECT]),
+    # Lists of raw numbers and their kernels
+    "MXCreateIntegerList": (OBJECT, [ctypes.POINTER(ctypes.c_int64), ctypes.c_size_t]),
+    "MXCreateFloatList": (OBJECT, [ctypes.POINTER(ctypes.c_double), ctypes.c_size_t]),
+    "list_getitem": (OBJECT, [OBJECT, OBJECT]),
+    "list_setitem": (OBJECT, [OBJECT, OBJECT, OBJECT]),
+    "list_length": (ctypes.c_size_t, [OBJECT]),
+    "list_storage": (ctypes.c_char_p, [OBJECT]),
+    "list_specialize": (OBJECT, [OBJECT]),
+    "list_sum": (OBJECT, [OBJECT]),
+    "list_min": (OBJECT, [OBJECT]),
+    "list_max": (OBJECT, [OBJECT]),
+    "list_add_elementwise": (OBJECT, [OBJECT, OBJECT]),
+    "list_scale": (OBJECT, [OBJECT, OBJECT]),
+    "list_fill": (OBJECT, [OBJECT, OBJECT]),
+    # Arrays
+    "MXCreateArray": (OBJECT, [ctypes.c_uint8, ctypes.c_int64]),
+    "array_make": (OBJECT, [OBJECT, OBJECT]),
+    "array_length": (OBJECT, [OBJECT]),
+    "array_get": (OBJECT, [OBJECT, OBJECT]),
+    "array_set": (OBJECT, [OBJECT, OBJECT, OBJECT]),
+    "array_get_int": (OBJECT, [OBJECT, OBJECT]),
+    "array_get_float": (OBJECT, [OBJECT, OBJECT]),
+    "array_set_int": (OBJECT, [OBJECT, OBJECT, OBJECT]),
+    "array_set_float": (OBJECT, [OBJECT, OBJECT, OBJECT]),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def load_runtime() -> ctypes.CDLL:
+    """The runtime loaded into this process, with :data:`SIGNATURES` set."""
+    _load_runtime()
+    runtime = ctypes.CDLL(None)
+    for name, (restype, argtypes) in SIGNATURES.items():
+        function = getattr(runtime, name)
+        function.restype = restype
+        function.argtypes = argtypes
+    return runtime
+
+
+def live_object_count() -> int:
+    return load_runtime().mxs_allocator_live_count()
+
+
+def owned_integer(runtime: ctypes.CDLL, value: int) -> int:
+    """A new Integer with a reference held by the caller."""
+    obj = runtime.MXCreateInteger(value)
+    runtime.increase_ref(obj)
+    return obj
+
+
+def list_of_integers(runtime: ctypes.CDLL, count: int, base: int) -> int:
+    """A new list of the Integers ``base`` up to ``base + count``."""
+    lst = runtime.MXCreateList()
+    for i in range(count):
+        item = runtime.MXCreateInteger(base + i)
+        runtime.list_append(lst, item)
+    return lst
+
+
+def number(runtime: ctypes.CDLL, obj: int):
+    """The value of an Integer or Float, releasing it if unreferenced."""
+    offset = ctypes.c_size_t.in_dll(runtime, "mxs_numeric_value_offset").value
+    name = runtime.mxs_get_object_type_name(obj)
+    value_type = ctypes.c_int64 if name == b"Integer" else ctypes.c_double
+    assert name in (b"Integer", b"Float")
+    value = value_type.from_address(obj + offset).value
+    runtime.increase_ref(obj)
+    runtime.decrease_ref(obj)
+    return value
+
+
+def is_error(runtime: ctypes.CDLL, obj: int) -> bool:
+    """Whether ``obj`` is an Error, releasing it if it is."""
+    if runtime.mxs_get_object_type_name(obj) != b"Error":
+        return False
+    runtime.increase_ref(obj)
+    runtime.decrease_ref(obj)
+    return True
+
+
+def small_int_range() -> tuple:
+    """The bounds of the small-integer cache, empty when low > high."""
+    runtime = load_runtime()
+    low = ctypes.c_int64.in_dll(runtime, "mxs_small_int_min").value
+    high = ctypes.c_int64.in_dll(runtime, "mxs_small_int_max").value
+    return low, high
+
+
+def tagged_runtime() -> bool:
+    """Whether the runtime was built with ``-DMXS_TAGGED_VALUES=ON``."""
+    _load_runtime()
+    return runtime_tags_values()
+
+
+# For tests that count allocations or read the values of results, which a
+# tagged runtime returns as tags
+requires_untagged_runtime = pytest.mark.skipif(
+    tagged_runtime(), reason="runtime built with -DMXS_TAGGED_VALUES=ON"
+)
+
+requires_tagged_runtime = pytest.mark.skipif(
+    not tagged_runtime(), reason="runtime built without -DMXS_TAGGED_VALUES=ON"
+)
+
+requires_small_int_cache = pytest.mark.skipif(
+    small_int_range()[0] > small_int_range()[1],
+    reason="runtime built with an empty MXS_SMALL_INT_MIN..MXS_SMALL_INT_MAX",
+)
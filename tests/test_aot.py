@@ -0,0 +1,69 @@
+import ctypes
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program
+from src.backend.aot import MAIN_SYMBOL, RUNTIME_DIR, build_binary
+
+if shutil.which(os.environ.get("CC", "cc")) is None:
+    pytest.skip("No C compiler available", allow_module_level=True)
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+SRC = (
+    "let g: int = 5;\n"
+    "func twice(x: int) -> int {\n"
+    "    return x + x;\n"
+    "}\n"
+    "func main() -> int {\n"
+    "    print(g);\n"
+    "    print(twice(21));\n"
+    '    print("hi");\n'
+    "    return 3;\n"
+    "}\n"
+)
+
+
+@pytest.mark.parametrize("level", ["0", "2"])
+def test_executable(tmp_path, level):
+    app = build_binary(compile_source(SRC), tmp_path / "app", level)
+    result = subprocess.run([str(app)], capture_output=True, text=True)
+    assert result.stdout == "5\n42\nhi\n"
+    assert result.returncode == 3
+
+
+def test_shared_object_exports_functions(tmp_path):
+    lib_path = build_binary(compile_source(SRC), tmp_path / "libapp.so", shared=True)
+    lib = ctypes.CDLL(str(lib_path))
+    for name in ("twice", "__start", MAIN_SYMBOL):
+        assert hasattr(lib, name)
+
+
+@pytest.mark.skipif(
+    not (RUNTIME_DIR / "libruntime.a").exists(),
+    reason="static runtime not built (-DMXS_STATIC_RUNTIME=ON)",
+)
+def test_static_runtime(tmp_path):
+    app = build_binary(compile_source(SRC), tmp_path / "app", static_runtime=True)
+    result = subprocess.run([str(app)], capture_output=True, text=True)
+    assert result.stdout == "5\n42\nhi\n"
+    assert "libruntime" not in subprocess.run(
+        ["ldd", str(app)], capture_output=True, text=True
+    ).stdout
@@ -1,5 +1,9 @@
+import ctypes
 import os
 import sys
+import threading
+import time
+
 import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -9,6 +13,13 @@ from src.syntax_parser import Parser
 from src.semantic_analyzer import SemanticAnalyzer
 from src.backend import compile_program, execute_llvm
 
+from conftest import (
+    live_object_count,
+    load_runtime,
+    requires_small_int_cache,
+    small_int_range,
+)
+
 
 def compile_and_run(source: str) -> int:
     tokens = tokenize(source)
@@ -96,3 +107,209 @@ def test_allocation_in_loop():
     result = compile_and_run(src)
     assert result == 0
 
+
+
+class AllocatorStats(ctypes.Structure):
+    _fields_ = [
+        ("slabs", ctypes.c_size_t),
+        ("bytes_reserved", ctypes.c_size_t),
+        ("bytes_in_use", ctypes.c_size_t),
+        ("bytes_requested", ctypes.c_size_t),
+        ("large_objects", ctypes.c_size_t),
+        ("large_bytes", ctypes.c_size_t),
+        ("fragmentation", ctypes.c_double),
+    ]
+
+
+def _refcount_mode() -> str:
+    return load_runtime().mxs_runtime_refcount_mode().decode()
+
+
+def test_expression_temporaries_stay_flat_in_loop():
+    src = (
+        'import std.io as io;\n'
+        'func f(x: int) -> int {\n'
+        '    return x;\n'
+        '}\n'
+        'func main() -> int {\n'
+        '    let mut i: int = 0;\n'
+        '    until (i >= 1000000) {\n'
+        '        i * 3;\n'
+        '        "temporary";\n'
+        '        f(i * 5000);\n'
+        '        io.print(i * 5000);\n'
+        '        i = i + 1;\n'
+        '    }\n'
+        '    return 0;\n'
+        '}\n'
+    )
+    compile_and_run("0;")
+    before = live_object_count()
+    result = compile_and_run(src)
+    assert result == 0
+    # Call results and arguments are released like the other temporaries,
+    # and the loop counter when main returns
+    assert live_object_count() - before == 0
+
+
+def test_live_count_follows_objects_across_threads():
+    runtime = load_runtime()
+    before = live_object_count()
+    objects = []
+    creator = threading.Thread(
+        target=lambda: objects.extend(
+            runtime.MXCreateInteger(10_000 + i) for i in range(100)
+        )
+    )
+    creator.start()
+    creator.join()
+    for obj in objects:
+        runtime.increase_ref(obj)
+    assert live_object_count() - before == 100
+    # Objects released by another thread than the one that created them.
+    # With biased counting the creator frees them when it exits, which can
+    # happen just after join() returns.
+    for obj in objects:
+        runtime.decrease_ref(obj)
+    deadline = time.monotonic() + 5
+    while live_object_count() != before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert live_object_count() == before
+
+
+def test_refcount_mode_is_reported():
+    assert _refcount_mode() in ("plain", "atomic", "biased")
+
+
+@pytest.mark.skipif(
+    _refcount_mode() == "plain", reason="runtime built with -DMXS_REFCOUNT=plain"
+)
+def test_shared_objects_survive_concurrent_retain_and_release():
+    runtime = load_runtime()
+    before = live_object_count()
+    objects = [runtime.MXCreateInteger(40_000 + i) for i in range(50)]
+    for obj in objects:
+        runtime.increase_ref(obj)
+
+    def churn():
+        for _ in range(200):
+            for obj in objects:
+                runtime.increase_ref(obj)
+            for obj in objects:
+                runtime.decrease_ref(obj)
+
+    workers = [threading.Thread(target=churn) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    runtime.mxs_refcount_merge()
+    # Only the creating thread's reference is left
+    assert live_object_count() - before == 50
+    assert all(runtime.mxs_get_object_type_name(obj) == b"Integer" for obj in objects)
+    for obj in objects:
+        runtime.decrease_ref(obj)
+    runtime.mxs_refcount_merge()
+    assert live_object_count() == before
+
+
+@pytest.mark.skipif(
+    _refcount_mode() == "plain", reason="runtime built with -DMXS_REFCOUNT=plain"
+)
+def test_objects_dropped_by_another_thread_are_freed():
+    runtime = load_runtime()
+    before = live_object_count()
+    objects = [runtime.MXCreateInteger(50_000 + i) for i in range(100)]
+
+    def borrow():
+        for obj in objects:
+            runtime.increase_ref(obj)
+        for obj in objects:
+            runtime.decrease_ref(obj)
+
+    # The creating thread never retains them, so the last release is the
+    # borrower's; biased builds free them when their owner merges
+    borrower = threading.Thread(target=borrow)
+    borrower.start()
+    borrower.join()
+    runtime.mxs_refcount_merge()
+    assert live_object_count() == before
+
+
+def _allocator_stats() -> AllocatorStats:
+    stats = AllocatorStats()
+    load_runtime().mxs_allocator_stats(ctypes.byref(stats))
+    return stats
+
+
+def test_objects_come_from_slabs():
+    runtime = load_runtime()
+    before = _allocator_stats()
+    objects = [runtime.MXCreateInteger(20_000 + i) for i in range(1000)]
+    for obj in objects:
+        runtime.increase_ref(obj)
+    during = _allocator_stats()
+    assert during.slabs >= 1
+    assert during.bytes_reserved >= during.bytes_in_use
+    assert during.large_objects == before.large_objects
+    # Each integer takes one block, rounded up to its size class
+    requested = during.bytes_requested - before.bytes_requested
+    in_use = during.bytes_in_use - before.bytes_in_use
+    assert requested % 1000 == 0 and in_use % 1000 == 0
+    assert requested <= in_use < requested + 16 * 1000
+    assert 0.0 <= during.fragmentation < 1.0
+    for obj in objects:
+        runtime.decrease_ref(obj)
+    after = _allocator_stats()
+    assert after.bytes_in_use == before.bytes_in_use
+    assert after.bytes_requested == before.bytes_requested
+
+
+def test_boxed_integers_use_a_compact_header():
+    runtime = load_runtime()
+    before = _allocator_stats()
+    obj = runtime.MXCreateInteger(30_000)
+    runtime.increase_ref(obj)
+    during = _allocator_stats()
+    # vtable pointer, one header word and the value; biased reference
+    # counting adds a second header word
+    size = 32 if _refcount_mode() == "biased" else 24
+    assert ctypes.c_size_t.in_dll(runtime, "mxs_numeric_value_offset").value == size - 8
+    assert during.bytes_requested - before.bytes_requested == size
+    assert during.bytes_in_use - before.bytes_in_use == size
+    runtime.decrease_ref(obj)
+
+
+@requires_small_int_cache
+def test_small_integers_are_shared_and_immortal():
+    runtime = load_runtime()
+    low, high = small_int_range()
+    before = live_object_count()
+    first = runtime.MXCreateInteger(low)
+    assert runtime.MXCreateInteger(low) == first
+    for bound in (low, high):
+        assert runtime.MXCreateInteger(bound) == runtime.MXCreateInteger(bound)
+    # Releasing more often than retaining must not free a cached integer
+    for _ in range(3):
+        runtime.decrease_ref(first)
+    assert runtime.MXCreateInteger(low) == first
+    assert live_object_count() == before
+
+
+def test_static_singletons_survive_release():
+    runtime = load_runtime()
+    nil = runtime.mxs_get_nil()
+    runtime.increase_ref(nil)
+    for _ in range(3):
+        runtime.decrease_ref(nil)
+    assert runtime.mxs_get_object_type_name(nil) == b"Nil"
+
+
+def test_large_integers_are_allocated_per_call():
+    runtime = load_runtime()
+    first = runtime.MXCreateInteger(1 << 40)
+    second = runtime.MXCreateInteger(1 << 40)
+    assert first != second
+    for obj in (first, second):
+        runtime.increase_ref(obj)
+        runtime.decrease_ref(obj)
@@ -18,7 +18,7 @@ def compile_to_ir(src: str) -> str:
     analyzer = SemanticAnalyzer()
     analyzer.analyze(ast)
     ir_prog = compile_program(ast, analyzer.type_registry)
-    return to_llvm_ir(ir_prog)
+    return to_llvm_ir(ir_prog, tagged_values=False)
 
 
 def test_ffi_registry_contains_arc_functions():
@@ -110,8 +110,9 @@ def test_arc_retain_for_function_args():
         "}\n"
     )
     ir = compile_to_ir(src)
-    # Function argument retain calls now appear twice in the IR
-    assert ir.count("increase_ref") == 2
+    # Callees borrow their arguments, so only the new Token is retained by
+    # main and the returned argument by process_token
+    assert ir.count('call i64 @"increase_ref"') == 2
 
 
 def test_arc_release_on_member_assignment():
@@ -132,3 +133,30 @@ def test_arc_release_on_member_assignment():
     ir = compile_to_ir(src)
     # Member reassignment triggers two release operations
     assert ir.count("decrease_ref") == 2
+
+
+def test_expression_temporaries_are_released():
+    src = (
+        "func main() -> int {\n"
+        "    1 + 2;\n"
+        '    "temporary";\n'
+        "    return 0;\n"
+        "}\n"
+    )
+    ir = compile_to_ir(src)
+    # Both boxed operands, the sum and the string literal are released
+    assert ir.count('call void @"mxs_release_temp"') == 4
+    # The string literal is created owned, everything else is retained
+    assert ir.count('call i64 @"increase_ref"') == 3
+
+
+def test_stored_temporaries_are_not_released():
+    src = (
+        "func main() -> int {\n"
+        "    let x = 1 + 2;\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    ir = compile_to_ir(src)
+    # The operands are released at once, the sum owned by ``x`` on return
+    assert ir.count('call void @"mxs_release_temp"') == 3
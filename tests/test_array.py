@@ -0,0 +1,199 @@
+import ctypes
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, execute_llvm, to_llvm_ir
+from src.backend.llvm import TypeProfile
+
+from conftest import (
+    is_error,
+    live_object_count,
+    load_runtime,
+    number,
+    owned_integer,
+    requires_small_int_cache,
+    requires_untagged_runtime,
+)
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+# Returns 0 when the accessors read back what was stored
+SRC = (
+    "import std.array as array;\n"
+    "func main() -> int {\n"
+    "    let a = array.make_array(8, 0.5);\n"
+    "    let b = array.make_array(4, 3);\n"
+    "    array.set_float(a, 2, 1.25);\n"
+    "    array.set_int(b, 1, 7);\n"
+    "    array.set_float_unchecked(a, 3, 2.5);\n"
+    "    let x: float = array.get_float(a, 2);\n"
+    "    let y: int = array.get_int(b, 1);\n"
+    "    let z: float = array.get_float_unchecked(a, 3);\n"
+    "    let w: int = array.get_int_unchecked(b, 0);\n"
+    "    let n: int = array.length(a);\n"
+    "    let s: float = x + z;\n"
+    "    let t: int = y + w;\n"
+    "    let ok_s: bool = s == 3.75;\n"
+    "    let ok_t: bool = t == 10;\n"
+    "    let ok_n: bool = n == 8;\n"
+    "    if ok_s {\n"
+    "        if ok_t {\n"
+    "            if ok_n {\n"
+    "                return 0;\n"
+    "            }\n"
+    "        }\n"
+    "    }\n"
+    "    return 1;\n"
+    "}\n"
+)
+
+
+# Stores Integers into a Float array and sums it; returns 0 when the sum is
+# right.  ``GET`` and ``SET`` name the accessors.
+LOOP_SRC = (
+    "import std.array as array;\n"
+    "func ar_fill(n: int) -> float {\n"
+    "    let a = array.make_array(n, 0.0);\n"
+    "    let mut i: int = 0;\n"
+    "    until (i >= n) {\n"
+    "        array.SET(a, i, i);\n"
+    "        i = i + 1;\n"
+    "    }\n"
+    "    let mut j: int = 0;\n"
+    "    let mut acc: float = 0.0;\n"
+    "    until (j >= n) {\n"
+    "        let v: float = array.GET(a, j);\n"
+    "        acc = acc + v;\n"
+    "        j = j + 1;\n"
+    "    }\n"
+    "    return acc;\n"
+    "}\n"
+    "func main() -> int {\n"
+    "    let r: float = ar_fill(1000);\n"
+    "    let ok: bool = r == 499500.0;\n"
+    "    if ok {\n"
+    "        return 0;\n"
+    "    }\n"
+    "    return 1;\n"
+    "}\n"
+)
+
+
+def loop_program(get: str, set_: str):
+    return compile_source(LOOP_SRC.replace("GET", get).replace("SET", set_))
+
+
+def test_typed_accessors_are_inlined():
+    ir = to_llvm_ir(compile_source(SRC), tagged_values=False)
+    # Checked accessors guard the type and the bounds and only call the
+    # runtime when the guards fail
+    assert '@"mxs_array_type_id"' in ir
+    assert ir.count('call i8* @"array_get_float"') == 1
+    assert "icmp ult i64" in ir
+    assert "load double" in ir and "store double" in ir
+    # Unchecked ones never call it
+    assert 'call i8* @"array_get_float_unchecked"' not in ir
+    assert 'call i8* @"array_set_float_unchecked"' not in ir
+    assert execute_llvm(compile_source(SRC)) == 0
+
+
+def test_tagged_values_keep_the_runtime_calls():
+    ir = to_llvm_ir(compile_source(SRC), tagged_values=True)
+    assert 'call i8* @"array_get_float_unchecked"' in ir
+    assert '@"mxs_array_type_id"' not in ir
+
+
+def test_checked_accessors_fall_back_to_the_runtime():
+    # Integer objects are stored through the runtime, which converts them
+    assert execute_llvm(loop_program("get_float", "set_float")) == 0
+    assert execute_llvm(loop_program("get", "set")) == 0
+
+
+def test_specialised_code_keeps_elements_unboxed():
+    for get, set_ in (("get_float", "set_float"), ("get_float_unchecked", "set_float_unchecked")):
+        execute_llvm(loop_program(get, set_), collect_type_feedback=True)
+        profile = TypeProfile.collect()
+        prog = loop_program(get, set_)
+        ir = to_llvm_ir(prog, tagged_values=False, type_profile=profile)
+        clone = ir.split('define i8* @"ar_fill.specialised"')[1].split("\n}")[0]
+        # The loaded element is added as a double without being boxed
+        assert "load double" in clone and "fadd double" in clone
+        assert "sitofp i64" in clone
+        for lazy in (False, True):
+            assert execute_llvm(loop_program(get, set_), lazy=lazy, type_profile=profile) == 0
+
+
+@requires_untagged_runtime
+@requires_small_int_cache
+def test_array_buffer_is_aligned_and_unboxed():
+    runtime = load_runtime()
+    before = live_object_count()
+    length = owned_integer(runtime, 1000)
+    fill = runtime.MXCreateFloat(0.25)
+    runtime.increase_ref(fill)
+    array = runtime.array_make(length, fill)
+    runtime.decrease_ref(fill)
+    # One object: the elements are stored raw
+    assert live_object_count() - before == 1
+    data_offset = ctypes.c_size_t.in_dll(runtime, "mxs_array_data_offset").value
+    data = ctypes.c_void_p.from_address(array + data_offset).value
+    assert data % 64 == 0
+    assert (ctypes.c_double * 1000).from_address(data)[999] == 0.25
+    assert number(runtime, runtime.array_length(array)) == 1000
+    index = owned_integer(runtime, 3)
+    value = runtime.MXCreateFloat(1.5)
+    runtime.increase_ref(value)
+    assert runtime.array_set_float(array, index, value) == runtime.mxs_get_nil()
+    runtime.decrease_ref(value)
+    assert (ctypes.c_double * 1000).from_address(data)[3] == 1.5
+    assert number(runtime, runtime.array_get_float(array, index)) == 1.5
+    # Integers convert to the element type
+    seven = owned_integer(runtime, 7)
+    runtime.array_set(array, index, seven)
+    assert number(runtime, runtime.array_get(array, index)) == 7.0
+    for obj in (seven, index, length, array):
+        runtime.decrease_ref(obj)
+    assert live_object_count() == before
+
+
+def test_array_access_is_bounds_checked():
+    runtime = load_runtime()
+    array = runtime.MXCreateArray(0, 4)
+    for position in (4, -1):
+        index = owned_integer(runtime, position)
+        assert is_error(runtime, runtime.array_get_int(array, index))
+        value = owned_integer(runtime, 1)
+        assert is_error(runtime, runtime.array_set_int(array, index, value))
+        runtime.decrease_ref(value)
+        runtime.decrease_ref(index)
+    runtime.decrease_ref(array)
+
+
+def test_array_accessors_check_the_element_type():
+    runtime = load_runtime()
+    array = runtime.MXCreateArray(0, 4)
+    index = owned_integer(runtime, 0)
+    assert is_error(runtime, runtime.array_get_float(array, index))
+    value = runtime.MXCreateFloat(1.5)
+    runtime.increase_ref(value)
+    # Floats do not fit Integer elements
+    assert is_error(runtime, runtime.array_set(array, index, value))
+    text = runtime.MXCreateString(b"text")
+    assert is_error(runtime, runtime.array_make(index, text))
+    lst = runtime.MXCreateList()
+    assert is_error(runtime, runtime.array_get(lst, index))
+    for obj in (lst, text, value, index, array):
+        runtime.decrease_ref(obj)
@@ -0,0 +1,94 @@
+import ctypes
+
+import pytest
+
+from conftest import live_object_count, load_runtime
+
+
+class CycleStats(ctypes.Structure):
+    _fields_ = [
+        ("collections", ctypes.c_size_t),
+        ("candidates", ctypes.c_size_t),
+        ("objects_freed", ctypes.c_size_t),
+        ("bytes_freed", ctypes.c_size_t),
+        ("total_ns", ctypes.c_uint64),
+        ("last_ns", ctypes.c_uint64),
+        ("buffered", ctypes.c_size_t),
+        ("threshold", ctypes.c_size_t),
+    ]
+
+
+def _cycle_stats() -> CycleStats:
+    stats = CycleStats()
+    load_runtime().mxs_gc_stats(ctypes.byref(stats))
+    return stats
+
+
+requires_cycle_collector = pytest.mark.skipif(
+    not load_runtime().mxs_gc_enabled(),
+    reason="runtime built without the cycle collector",
+)
+
+
+@requires_cycle_collector
+def test_list_containing_itself_is_collected():
+    runtime = load_runtime()
+    runtime.mxs_gc_collect()
+    before = live_object_count()
+    stats_before = _cycle_stats()
+    lst = runtime.MXCreateList()
+    runtime.list_append(lst, lst)
+    runtime.list_append(lst, runtime.MXCreateInteger(60_000))
+    runtime.decrease_ref(lst)
+    # Reference counting alone leaks the list and what it holds
+    assert live_object_count() - before == 2
+    assert runtime.mxs_gc_collect() == 1
+    assert live_object_count() == before
+    stats = _cycle_stats()
+    assert stats.collections == stats_before.collections + 1
+    assert stats.objects_freed == stats_before.objects_freed + 1
+    # The list and the integer it held went back to the allocator
+    assert stats.bytes_freed - stats_before.bytes_freed >= 2 * 24
+    assert stats.total_ns > stats_before.total_ns
+
+
+@requires_cycle_collector
+def test_cycle_between_lists_survives_while_referenced():
+    runtime = load_runtime()
+    runtime.mxs_gc_collect()
+    before = live_object_count()
+    first = runtime.MXCreateList()
+    second = runtime.MXCreateList()
+    runtime.list_append(first, second)
+    runtime.list_append(second, first)
+    holder = runtime.MXCreateList()
+    runtime.list_append(holder, first)
+    runtime.decrease_ref(first)
+    runtime.decrease_ref(second)
+    # ``holder`` still reaches the cycle
+    assert runtime.mxs_gc_collect() == 0
+    assert live_object_count() - before == 3
+    runtime.decrease_ref(holder)
+    assert runtime.mxs_gc_collect() == 2
+    assert live_object_count() == before
+
+
+@requires_cycle_collector
+def test_collection_runs_when_the_buffer_fills():
+    runtime = load_runtime()
+    runtime.mxs_gc_collect()
+    before = live_object_count()
+    runtime.mxs_gc_set_threshold(8)
+    try:
+        for _ in range(20):
+            lst = runtime.MXCreateList()
+            runtime.list_append(lst, lst)
+            runtime.decrease_ref(lst)
+        # Each collection handles at most the threshold
+        stats = _cycle_stats()
+        assert stats.buffered < 8
+        assert live_object_count() - before == stats.buffered
+    finally:
+        runtime.mxs_gc_set_threshold(10000)
+    runtime.mxs_gc_collect()
+    assert live_object_count() == before
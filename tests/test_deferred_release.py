@@ -0,0 +1,58 @@
+from conftest import list_of_integers, live_object_count, load_runtime
+
+
+def test_large_list_defers_releasing_its_elements():
+    runtime = load_runtime()
+    before = live_object_count()
+    # A zero budget only queues: everything waits for the explicit drain
+    runtime.mxs_release_configure(100, 0)
+    try:
+        lst = list_of_integers(runtime, 1000, 70_000)
+        runtime.decrease_ref(lst)
+        assert runtime.mxs_release_pending() >= 1000 - 64
+        assert live_object_count() - before == runtime.mxs_release_pending()
+        assert runtime.mxs_release_drain(2**64 - 1) == 0
+        assert live_object_count() == before
+    finally:
+        runtime.mxs_release_configure(4096, 100_000)
+
+
+def test_small_lists_release_their_elements_at_once():
+    runtime = load_runtime()
+    before = live_object_count()
+    lst = list_of_integers(runtime, 100, 80_000)
+    runtime.decrease_ref(lst)
+    assert runtime.mxs_release_pending() == 0
+    assert live_object_count() == before
+
+
+def test_nested_lists_are_freed_a_budget_at_a_time():
+    runtime = load_runtime()
+    before = live_object_count()
+    runtime.mxs_release_configure(10, 0)
+    try:
+        outer = runtime.MXCreateList()
+        for i in range(50):
+            inner = list_of_integers(runtime, 20, 90_000 + 20 * i)
+            runtime.list_append(outer, inner)
+            runtime.decrease_ref(inner)
+        runtime.decrease_ref(outer)
+        # Every drain makes progress, however small the budget
+        drains = 0
+        while runtime.mxs_release_drain(1):
+            drains += 1
+        assert drains > 1
+        assert live_object_count() == before
+    finally:
+        runtime.mxs_release_configure(4096, 100_000)
+
+
+def test_deferred_decrements_are_applied_by_drain():
+    runtime = load_runtime()
+    before = live_object_count()
+    obj = runtime.MXCreateInteger(95_000)
+    runtime.increase_ref(obj)
+    runtime.mxs_release_deferred(obj)
+    assert live_object_count() - before == 1
+    assert runtime.mxs_release_drain(2**64 - 1) == 0
+    assert live_object_count() == before
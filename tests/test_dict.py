@@ -0,0 +1,88 @@
+from conftest import (
+    live_object_count,
+    load_runtime,
+    owned_integer,
+    requires_untagged_runtime,
+)
+
+
+def test_dict_finds_keys_through_equal_objects():
+    runtime = load_runtime()
+    before = live_object_count()
+    d = runtime.MXCreateDict()
+    values = []
+    for i in range(100):
+        key = owned_integer(runtime, 140_000 + i)
+        value = runtime.MXCreateString(f"value-{i}".encode())
+        runtime.dict_setitem(d, key, value)
+        runtime.decrease_ref(key)
+        values.append(value)
+    name = runtime.MXCreateString(b"name")
+    runtime.dict_setitem(d, name, values[0])
+    runtime.decrease_ref(name)
+    assert runtime.dict_length(d) == 101
+    for i, value in enumerate(values):
+        probe = owned_integer(runtime, 140_000 + i)
+        assert runtime.dict_getitem(d, probe) == value
+        assert runtime.mxs_op_getitem(d, probe) == value
+        runtime.decrease_ref(probe)
+    probe = runtime.MXCreateString(b"name")
+    assert runtime.dict_getitem(d, probe) == values[0]
+    runtime.decrease_ref(probe)
+    for value in values:
+        runtime.decrease_ref(value)
+    runtime.decrease_ref(d)
+    assert live_object_count() == before
+
+
+@requires_untagged_runtime
+def test_dict_overwrites_and_deletes_entries():
+    runtime = load_runtime()
+    before = live_object_count()
+    d = runtime.MXCreateDict()
+    keys = [runtime.MXCreateString(f"key-{i}".encode()) for i in range(1000)]
+    for i, key in enumerate(keys):
+        value = owned_integer(runtime, 150_000 + i)
+        runtime.dict_setitem(d, key, value)
+        runtime.decrease_ref(value)
+    # Overwriting releases the old value, deleting releases the entry
+    for key in keys[:500]:
+        runtime.dict_setitem(d, key, key)
+    for key in keys[::2]:
+        assert runtime.mxs_get_object_type_name(runtime.dict_delitem(d, key)) == b"Nil"
+    assert runtime.dict_length(d) == 500
+    for i, key in enumerate(keys):
+        found = runtime.dict_contains(d, key)
+        value = runtime.dict_getitem(d, key)
+        if i % 2 == 0:
+            assert found == runtime.mxs_get_false()
+            assert runtime.mxs_get_object_type_name(value) == b"Error"
+            runtime.increase_ref(value)
+            runtime.decrease_ref(value)
+            continue
+        assert found == runtime.mxs_get_true()
+        if i < 500:
+            assert value == key
+        else:
+            assert runtime.mxs_get_object_type_name(value) == b"Integer"
+    # Removed slots are reused once the table is rebuilt
+    for key in keys[::2]:
+        runtime.dict_setitem(d, key, key)
+    assert runtime.dict_length(d) == 1000
+    for key in keys:
+        runtime.decrease_ref(key)
+    runtime.decrease_ref(d)
+    assert live_object_count() == before
+
+
+def test_dict_rejects_other_containers():
+    runtime = load_runtime()
+    lst = runtime.MXCreateList()
+    key = owned_integer(runtime, 160_000)
+    err = runtime.dict_getitem(lst, key)
+    assert runtime.mxs_get_object_type_name(err) == b"Error"
+    runtime.increase_ref(err)
+    runtime.decrease_ref(err)
+    assert runtime.dict_length(lst) == 0
+    runtime.decrease_ref(key)
+    runtime.decrease_ref(lst)
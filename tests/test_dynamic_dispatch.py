@@ -1,9 +1,36 @@
+import ctypes
+
 from src.backend.ir import ProgramIR, Const, BinOpInstr
 from src.backend import to_llvm_ir
 
+from conftest import load_runtime
+
 
 def test_dynamic_add():
     prog = ProgramIR(code=[Const(1), Const(2), BinOpInstr('+', 'object', 'object', 'object')],
                      functions={}, foreign_functions={})
     ir = to_llvm_ir(prog)
     assert 'call i8* @\"mxs_op_add\"' in ir
+
+
+def _repr(runtime, obj) -> str:
+    buffer = ctypes.create_string_buffer(64)
+    runtime.mx_object_repr(obj, buffer, len(buffer))
+    return buffer.value.decode()
+
+
+def test_mixed_numeric_operands_use_the_operator_table():
+    runtime = load_runtime()
+    two = runtime.MXCreateInteger(2)
+    half = runtime.MXCreateFloat(0.5)
+    total = runtime.mxs_op_add(two, half)
+    assert runtime.mxs_get_object_type_name(total) == b"Float"
+    assert _repr(runtime, total) == "2.5"
+    assert _repr(runtime, runtime.mxs_op_add(two, two)) == "4"
+    assert _repr(runtime, runtime.mxs_op_lt(half, two)) == "true"
+    assert _repr(runtime, runtime.mxs_op_ne(two, runtime.MXCreateFloat(2.0))) == "false"
+    zero = runtime.MXCreateInteger(0)
+    assert runtime.mxs_get_object_type_name(runtime.mxs_op_div(half, zero)) == b"Error"
+    # Pairs without a table entry fall back to the virtual operators
+    text = runtime.MXCreateString(b"a")
+    assert runtime.mxs_get_object_type_name(runtime.mxs_op_add(two, text)) == b"Error"
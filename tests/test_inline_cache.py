@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, execute_llvm, to_llvm_ir
+from src.backend.ir import BinOpInstr, Const, ProgramIR
+from src.backend.llvm import inline_cache_stats
+
+from conftest import requires_untagged_runtime
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+def _add_program() -> ProgramIR:
+    return ProgramIR(
+        code=[Const(1), Const(2), BinOpInstr("+", "object", "object", "object")],
+        functions={},
+        foreign_functions={},
+    )
+
+
+def test_dynamic_operators_get_an_inline_cache():
+    ir = to_llvm_ir(_add_program(), tagged_values=False)
+    assert "@\"mxs.ic.0\" = internal global" in ir
+    assert "load atomic" in ir
+    # The miss path still takes the generic entry point
+    assert 'call i8* @"mxs_op_add"' in ir
+    assert 'call void @"mxs_inline_cache_update"' in ir
+    # Hits are only counted when instrumented
+    assert "ic.hit" in ir and ".str" not in ir
+
+
+def test_instrumented_caches_name_their_sites():
+    ir = to_llvm_ir(_add_program(), tagged_values=False, inline_cache_stats=True)
+    assert "__start #0 (+)" in ir
+
+
+def test_tagged_values_skip_inline_caches():
+    ir = to_llvm_ir(_add_program(), tagged_values=True)
+    assert "mxs.ic" not in ir
+
+
+@requires_untagged_runtime
+@pytest.mark.parametrize("lazy", [False, True])
+def test_monomorphic_sites_hit_their_cache(lazy):
+    src = (
+        "func main() -> int {\n"
+        "    let mut i: int = 0;\n"
+        "    let mut acc: int = 0;\n"
+        "    until (i >= 1000) {\n"
+        "        acc = acc + i;\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    let ok: bool = acc == 499500;\n"
+        "    if ok {\n"
+        "        return 0;\n"
+        "    }\n"
+        "    return 1;\n"
+        "}\n"
+    )
+    seen = len(inline_cache_stats())
+    assert execute_llvm(compile_source(src), lazy=lazy, inline_cache_stats=True) == 0
+    sites = inline_cache_stats()[seen:]
+    assert len(sites) == 4
+    loop_sites = [s for s in sites if s[0].endswith("(+)") or s[0].endswith("(>=)")]
+    # Each loop site misses once, on its first run
+    for _, hits, misses in loop_sites:
+        assert misses == 1 and hits >= 999
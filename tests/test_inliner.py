@@ -0,0 +1,156 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import Call, Store, compile_program, execute_llvm, inline_program
+from src.backend.llir import Label
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+def called(program, func_name: str) -> list[str]:
+    return [
+        i.name for i in program.functions[func_name].code if isinstance(i, Call)
+    ]
+
+
+CLAMP_SRC = (
+    "func clamp(x: int) -> int {\n"
+    "    let mut r: int = x;\n"
+    "    if (r > 10) {\n"
+    "        r = 10;\n"
+    "    }\n"
+    "    return r;\n"
+    "}\n"
+)
+
+
+def test_small_function_is_inlined():
+    src = (
+        "func square(x: int) -> int {\n"
+        "    return x * x;\n"
+        "}\n"
+        "func main() -> int {\n"
+        "    let a = square(7);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    report = inline_program(program)
+    assert "square" not in called(program, "main")
+    assert [(d.caller, d.callee, d.inlined) for d in report.decisions] == [
+        ("main", "square", True)
+    ]
+    assert execute_llvm(program) == 0
+
+
+def test_inlined_labels_and_locals_are_renamed():
+    src = CLAMP_SRC + (
+        "func main() -> int {\n"
+        "    let a: int = clamp(3);\n"
+        "    let b: int = clamp(30);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    inline_program(program)
+    code = program.functions["main"].code
+    labels = [i.name for i in code if isinstance(i, Label)]
+    assert len(labels) == len(set(labels)) == 4
+    stores = {i.name for i in code if isinstance(i, Store)}
+    assert {"__inl1_r", "__inl2_r"} <= stores
+    assert execute_llvm(program) == 0
+
+
+def test_recursive_function_is_kept():
+    src = (
+        "func fib(n: int) -> int {\n"
+        "    if n < 2 {\n"
+        "        return n;\n"
+        "    }\n"
+        "    let a: int = fib(n - 1);\n"
+        "    let b: int = fib(n - 2);\n"
+        "    return a + b;\n"
+        "}\n"
+        "func main() -> int {\n"
+        "    let r: int = fib(10);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    report = inline_program(program)
+    assert called(program, "main") == ["fib"]
+    assert not report.inlined
+
+
+def test_manual_optimize_level_controls_inlining():
+    src = CLAMP_SRC + (
+        "@@manual_optimize_level(level=0)\n"
+        "func cold() -> int {\n"
+        "    let a: int = clamp(1);\n"
+        "    return 0;\n"
+        "}\n"
+        "func main() -> int {\n"
+        "    let a: int = clamp(2);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    assert program.functions["cold"].opt_level == 0
+    inline_program(program)
+    assert called(program, "cold") == ["clamp"]
+    assert "clamp" not in called(program, "main")
+
+
+def test_cost_threshold_follows_level():
+    src = CLAMP_SRC + (
+        "@@manual_optimize_level(level=1)\n"
+        "func main() -> int {\n"
+        "    let a: int = clamp(2);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    report = inline_program(program)
+    assert called(program, "main") == ["clamp"]
+    assert report.decisions[0].reason.startswith("cost exceeds threshold")
+    assert "main -> clamp" in report.render()
+
+
+def test_inlined_call_in_a_long_loop_reuses_its_slots():
+    # Every iteration binds the parameter of ``step``; its stack slot is
+    # allocated once per call of main, not once per iteration
+    src = (
+        "func step(x: int) -> int {\n"
+        "    let y: int = x + 3;\n"
+        "    return y;\n"
+        "}\n"
+        "func main() -> int {\n"
+        "    let mut i: int = 0;\n"
+        "    let mut n: int = 0;\n"
+        "    until (i >= 1000000) {\n"
+        "        n = step(n);\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    let ok: bool = n == 3000000;\n"
+        "    if ok {\n"
+        "        return 0;\n"
+        "    }\n"
+        "    return 1;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    inline_program(program)
+    assert "step" not in called(program, "main")
+    assert execute_llvm(program) == 0
@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, execute_llvm
+from src.backend.llvm import generate_module, split_module
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+SRC = (
+    "let g: int = 5;\n"
+    "func unused(n: int) -> int {\n"
+    "    return n + 1;\n"
+    "}\n"
+    "func used(n: int) -> int {\n"
+    "    print(g);\n"
+    '    print("hi");\n'
+    "    return n;\n"
+    "}\n"
+    "func main() -> int {\n"
+    "    let a: int = used(3);\n"
+    "    print(a);\n"
+    "    return 0;\n"
+    "}\n"
+)
+
+
+def test_split_module_units():
+    module, _ = generate_module(compile_source(SRC))
+    before = str(module)
+    units = split_module(module)
+    assert str(module) == before
+    assert set(units) == {"unused", "used", "main", "__start"}
+    for name, unit in units.items():
+        defines = [line for line in unit.splitlines() if line.startswith("define")]
+        assert len(defines) == 1 and f'@"{name}"' in defines[0]
+    assert '@"g" = global' in units["__start"]
+    assert '@"g" = external global' in units["used"]
+    # Units only carry what their function refers to
+    assert '@"g"' not in units["unused"]
+    assert '@"used"' not in units["unused"]
+
+
+def test_lazy_and_eager_output_match(capfd):
+    assert execute_llvm(compile_source(SRC)) == 0
+    eager = capfd.readouterr().out
+    assert execute_llvm(compile_source(SRC), lazy=True) == 0
+    assert capfd.readouterr().out == eager == "5\nhi\n3\n"
+
+
+def test_unreachable_functions_are_never_compiled(capfd):
+    src = (
+        '@@foreign(c_name="mxs_no_such_symbol")\n'
+        "func missing(x: int) -> int;\n"
+        "func never_called() -> int {\n"
+        "    return missing(1);\n"
+        "}\n"
+        "func main() -> int {\n"
+        "    print(7);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    assert execute_llvm(compile_source(src), lazy=True) == 0
+    assert capfd.readouterr().out == "7\n"
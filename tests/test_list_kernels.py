@@ -0,0 +1,124 @@
+import ctypes
+
+from conftest import (
+    list_of_integers,
+    live_object_count,
+    load_runtime,
+    number,
+    owned_integer,
+    requires_untagged_runtime,
+)
+
+
+def _integer_list(runtime: ctypes.CDLL, values) -> int:
+    buffer = (ctypes.c_int64 * len(values))(*values)
+    return runtime.MXCreateIntegerList(buffer, len(values))
+
+
+@requires_untagged_runtime
+def test_integer_list_stores_raw_values():
+    runtime = load_runtime()
+    before = live_object_count()
+    values = [200_000 + 7 * i for i in range(10_000)]
+    lst = _integer_list(runtime, values)
+    # One object for the list: the integers are not boxed
+    assert live_object_count() - before == 1
+    assert runtime.list_storage(lst) == b"int"
+    assert runtime.list_length(lst) == 10_000
+    index = owned_integer(runtime, 9_999)
+    assert number(runtime, runtime.list_getitem(lst, index)) == values[-1]
+    runtime.decrease_ref(index)
+    assert number(runtime, runtime.list_sum(lst)) == sum(values)
+    assert number(runtime, runtime.list_min(lst)) == min(values)
+    assert number(runtime, runtime.list_max(lst)) == max(values)
+    runtime.decrease_ref(lst)
+    assert live_object_count() == before
+
+
+def test_heterogeneous_insert_boxes_the_list():
+    runtime = load_runtime()
+    before = live_object_count()
+    lst = _integer_list(runtime, [210_000, 210_001, 210_002])
+    value = owned_integer(runtime, 210_003)
+    runtime.list_append(lst, value)
+    runtime.decrease_ref(value)
+    assert runtime.list_storage(lst) == b"int"
+    text = runtime.MXCreateString(b"text")
+    runtime.list_append(lst, text)
+    runtime.decrease_ref(text)
+    assert runtime.list_storage(lst) == b"boxed"
+    assert runtime.list_length(lst) == 5
+    index = owned_integer(runtime, 3)
+    item = runtime.list_getitem(lst, index)
+    runtime.decrease_ref(index)
+    assert number(runtime, item) == 210_003
+    # The list keeps its references to the boxed integers
+    assert live_object_count() - before == 6
+    runtime.decrease_ref(lst)
+    assert live_object_count() == before
+
+
+@requires_untagged_runtime
+def test_list_of_numbers_specializes():
+    runtime = load_runtime()
+    before = live_object_count()
+    lst = list_of_integers(runtime, 100, 220_000)
+    assert runtime.list_storage(lst) == b"boxed"
+    assert runtime.list_specialize(lst) == runtime.mxs_get_true()
+    assert runtime.list_storage(lst) == b"int"
+    assert live_object_count() - before == 1
+    # Repeating gives raw storage too
+    count = owned_integer(runtime, 3)
+    repeated = runtime.mxs_op_mul(lst, count)
+    runtime.decrease_ref(count)
+    runtime.increase_ref(repeated)
+    assert runtime.list_storage(repeated) == b"int"
+    assert runtime.list_length(repeated) == 300
+    for obj in (repeated, lst):
+        runtime.decrease_ref(obj)
+    mixed = list_of_integers(runtime, 3, 230_000)
+    text = runtime.MXCreateString(b"text")
+    runtime.list_append(mixed, text)
+    runtime.decrease_ref(text)
+    assert runtime.list_specialize(mixed) == runtime.mxs_get_false()
+    err = runtime.list_sum(mixed)
+    assert runtime.mxs_get_object_type_name(err) == b"Error"
+    runtime.increase_ref(err)
+    runtime.decrease_ref(err)
+    runtime.decrease_ref(mixed)
+    assert live_object_count() == before
+
+
+@requires_untagged_runtime
+def test_bulk_operations_mix_integers_and_floats():
+    runtime = load_runtime()
+    before = live_object_count()
+    ints = _integer_list(runtime, list(range(1, 101)))
+    floats_buffer = (ctypes.c_double * 100)(*[0.5] * 100)
+    floats = runtime.MXCreateFloatList(floats_buffer, 100)
+    assert runtime.list_storage(floats) == b"float"
+    total = runtime.list_add_elementwise(ints, floats)
+    runtime.increase_ref(total)
+    assert runtime.list_storage(total) == b"float"
+    assert number(runtime, runtime.list_sum(total)) == 5050 + 50.0
+    factor = owned_integer(runtime, 3)
+    tripled = runtime.list_scale(ints, factor)
+    runtime.increase_ref(tripled)
+    runtime.decrease_ref(factor)
+    assert runtime.list_storage(tripled) == b"int"
+    assert number(runtime, runtime.list_max(tripled)) == 300
+    short = _integer_list(runtime, [1, 2])
+    err = runtime.list_add_elementwise(ints, short)
+    assert runtime.mxs_get_object_type_name(err) == b"Error"
+    runtime.increase_ref(err)
+    runtime.decrease_ref(err)
+    # Filling with a float switches the storage in place
+    value = runtime.MXCreateFloat(2.5)
+    runtime.list_fill(ints, value)
+    runtime.increase_ref(value)
+    runtime.decrease_ref(value)
+    assert runtime.list_storage(ints) == b"float"
+    assert number(runtime, runtime.list_sum(ints)) == 250.0
+    for obj in (ints, floats, total, tripled, short):
+        runtime.decrease_ref(obj)
+    assert live_object_count() == before
@@ -0,0 +1,124 @@
+import os
+import sys
+
+import pytest
+from llvmlite import binding
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, execute_llvm
+from src.backend.llvm import (
+    OPT_LEVELS,
+    build_llvm,
+    create_target_machine,
+    optimize_functions,
+    optimize_module,
+)
+from src.backend.llvm.optimizer import pipeline_levels
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+def counting_loop(name: str, level: int) -> str:
+    return (
+        f"@@manual_optimize_level(level={level})\n"
+        f"func {name}(n: int) -> int {{\n"
+        "    let mut i: int = 0;\n"
+        "    until (i >= n) {\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    return i;\n"
+        "}\n"
+    )
+
+
+SRC = (
+    counting_loop("hot", 3)
+    + counting_loop("cold", 0)
+    + "func main() -> int {\n"
+    "    let a: int = hot(10);\n"
+    "    let b: int = cold(10);\n"
+    "    return 0;\n"
+    "}\n"
+)
+
+
+def test_levels_reach_the_generator():
+    llvm_ir, levels = build_llvm(compile_source(SRC))
+    assert levels == {"hot": 3, "cold": 0}
+    cold_def = next(line for line in llvm_ir.splitlines() if '@"cold"' in line)
+    assert "optnone" in cold_def and "noinline" in cold_def
+
+
+def test_functions_are_optimised_per_level():
+    llvm_ir, levels = build_llvm(compile_source(SRC))
+    binding.initialize()
+    binding.initialize_native_target()
+    binding.initialize_native_asmprinter()
+    mod = binding.parse_assembly(llvm_ir)
+    target_machine = binding.Target.from_default_triple().create_target_machine()
+    groups = optimize_functions(mod, target_machine, levels)
+    assert groups[3] == ["hot"]
+    assert {"cold", "main", "__start"} <= set(groups[0])
+    assert "alloca" not in str(mod.get_function("hot"))
+    assert "alloca" in str(mod.get_function("cold"))
+
+
+def test_annotated_program_runs():
+    assert execute_llvm(compile_source(SRC)) == 0
+
+
+def test_pipeline_levels():
+    assert pipeline_levels(0) == (0, 0)
+    assert pipeline_levels("3") == (3, 0)
+    assert pipeline_levels("s")[0] == 2 and pipeline_levels("s")[1] > 0
+    with pytest.raises(ValueError):
+        pipeline_levels("fast")
+
+
+def test_module_pipeline_inlines_small_functions():
+    src = (
+        "func twice(x: int) -> int {\n"
+        "    return x + x;\n"
+        "}\n"
+        "func main() -> int {\n"
+        "    let a: int = twice(21);\n"
+        "    print(a);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    llvm_ir, levels = build_llvm(compile_source(src))
+    binding.initialize()
+    binding.initialize_native_target()
+    binding.initialize_native_asmprinter()
+    mod = binding.parse_assembly(llvm_ir)
+    assert "@twice(" in str(mod.get_function("main"))
+    optimize_module(mod, create_target_machine(2, "native"), 2, levels)
+    assert "@twice(" not in str(mod.get_function("main"))
+
+
+@pytest.mark.parametrize("level", OPT_LEVELS)
+def test_program_output_is_identical_at_every_level(level, capfd):
+    assert execute_llvm(compile_source(SRC), level, "native") == 0
+    src = (
+        "func main() -> int {\n"
+        "    let mut i: int = 0;\n"
+        "    until (i >= 3) {\n"
+        "        print(i);\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    assert execute_llvm(compile_source(src), level, "native") == 0
+    assert capfd.readouterr().out == "0\n1\n2\n"
@@ -0,0 +1,98 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, execute_llvm, to_llvm_ir
+from src.backend.llvm import ObjectCache
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+SRC = (
+    "func count(n: int) -> int {\n"
+    "    let mut i: int = 0;\n"
+    "    until (i >= n) {\n"
+    "        i = i + 1;\n"
+    "    }\n"
+    "    return i;\n"
+    "}\n"
+    "func main() -> int {\n"
+    "    let b: bool = 1 < 2;\n"
+    "    if b {\n"
+    "        print(count(4));\n"
+    "    }\n"
+    "    return 0;\n"
+    "}\n"
+)
+
+
+def test_ir_generation_is_deterministic():
+    first = to_llvm_ir(compile_source(SRC))
+    # Compiling something else in between must not shift label names
+    compile_source(SRC)
+    assert to_llvm_ir(compile_source(SRC)) == first
+
+
+def test_cached_object_is_reused(tmp_path, capfd):
+    cache = ObjectCache(tmp_path)
+    assert execute_llvm(compile_source(SRC), 2, cache=cache) == 0
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert len(cache.entries()) == 1
+    assert execute_llvm(compile_source(SRC), 2, cache=cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert capfd.readouterr().out == "4\n4\n"
+    # A different optimisation level is a different entry
+    execute_llvm(compile_source(SRC), 0, cache=cache)
+    assert cache.misses == 2 and len(cache.entries()) == 2
+
+
+def test_key_covers_target_and_level():
+    base = ObjectCache.key("ir", "x86_64-unknown-linux-gnu", "", "", 0)
+    assert base == ObjectCache.key("ir", "x86_64-unknown-linux-gnu", "", "", 0)
+    assert base != ObjectCache.key("ir2", "x86_64-unknown-linux-gnu", "", "", 0)
+    assert base != ObjectCache.key("ir", "aarch64-unknown-linux-gnu", "", "", 0)
+    assert base != ObjectCache.key("ir", "x86_64-unknown-linux-gnu", "znver3", "", 0)
+    assert base != ObjectCache.key("ir", "x86_64-unknown-linux-gnu", "", "", "s")
+    assert base != ObjectCache.key(
+        "ir", "x86_64-unknown-linux-gnu", "", "", 0, runtime="digest"
+    )
+    assert base != ObjectCache.key(
+        "ir", "x86_64-unknown-linux-gnu", "", "", 0, opt_levels={"f": 3}
+    )
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ObjectCache(tmp_path, max_bytes=250)
+    for n, key in enumerate(("a", "b", "c")):
+        cache.store(key, b"x" * 100)
+        os.utime(tmp_path / f"{key}.o", (n, n))
+    assert sorted(p.name for _, _, p in cache.entries()) == ["b.o", "c.o"]
+    # Loading ``b`` makes ``c`` the oldest entry
+    assert cache.load("b") == b"x" * 100
+    cache.store("d", b"x" * 100)
+    assert sorted(p.name for _, _, p in cache.entries()) == ["b.o", "d.o"]
+
+
+def test_manual_optimize_level_is_a_different_entry(tmp_path):
+    def program(level: int):
+        return compile_source(f"@@manual_optimize_level(level={level})\n" + SRC)
+
+    cache = ObjectCache(tmp_path)
+    # Levels 1 and 3 emit the same IR and differ only in their pipeline
+    assert to_llvm_ir(program(1)) == to_llvm_ir(program(3))
+    assert execute_llvm(program(1), 2, cache=cache) == 0
+    assert execute_llvm(program(3), 2, cache=cache) == 0
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert execute_llvm(program(3), 2, cache=cache) == 0
+    assert (cache.hits, cache.misses) == (1, 2)
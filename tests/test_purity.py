@@ -0,0 +1,128 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import (
+    Call,
+    compile_program,
+    execute_llvm,
+    infer_purity,
+    optimize_pure_calls,
+    to_llvm_ir,
+)
+from src.backend.llir import Label
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+def calls_inside_loop(code, name: str) -> int:
+    first_label = next(i for i, instr in enumerate(code) if isinstance(instr, Label))
+    return sum(
+        1
+        for instr in code[first_label:]
+        if isinstance(instr, Call) and instr.name == name
+    )
+
+
+HELPERS = (
+    '@@foreign(c_name="mxs_int_absolute")\n'
+    "func abs(value: int) -> int;\n"
+    "func sq(x: int) -> int {\n"
+    "    return x * x;\n"
+    "}\n"
+)
+
+
+def test_purity_inference():
+    src = HELPERS + (
+        "func shout(x: int) {\n"
+        "    print(x);\n"
+        "}\n"
+        "func fact(n: int) -> int {\n"
+        "    if n <= 1 {\n"
+        "        return 1;\n"
+        "    }\n"
+        "    return n * fact(n - 1);\n"
+        "}\n"
+    )
+    info = infer_purity(compile_source(src))
+    assert info.effects["sq"] == "pure" and info.is_movable("sq")
+    assert info.effects["shout"] == "io"
+    # Recursion stays pure but is not known to terminate
+    assert info.effects["fact"] == "pure" and not info.is_movable("fact")
+    assert info.is_movable("abs")
+    assert not info.is_movable("increase_ref")
+
+
+def test_invariant_calls_are_hoisted_out_of_loops():
+    src = HELPERS + (
+        "func main() -> int {\n"
+        "    let mut i: int = 0;\n"
+        "    let mut s: int = 0;\n"
+        "    until (i >= 3) {\n"
+        "        s = sq(12);\n"
+        "        print(abs(-7));\n"
+        "        print(sq(i));\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    report = optimize_pure_calls(program)
+    code = program.functions["main"].code
+    assert report.hoisted == 2
+    assert calls_inside_loop(code, "abs") == 0
+    # sq(i) depends on the loop counter and must stay in the loop
+    assert calls_inside_loop(code, "sq") == 1
+    assert execute_llvm(program) == 0
+
+
+def test_redundant_and_dead_pure_calls():
+    src = HELPERS + (
+        "func main() -> int {\n"
+        "    let a: int = sq(5);\n"
+        "    let b: int = sq(5);\n"
+        "    sq(6);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    report = optimize_pure_calls(program)
+    code = program.functions["main"].code
+    assert (report.reused, report.removed) == (1, 1)
+    assert [i.name for i in code if isinstance(i, Call)].count("sq") == 1
+    assert execute_llvm(program) == 0
+
+
+def test_runtime_declarations_carry_effect_attributes():
+    src = HELPERS + (
+        "func main() -> int {\n"
+        "    let b: bool = 1 < 2;\n"
+        "    if b {\n"
+        "        print(abs(-1));\n"
+        "    }\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    llvm_ir = to_llvm_ir(compile_source(src), tagged_values=False)
+    decls = {
+        line.split('@"')[1].split('"')[0]: line
+        for line in llvm_ir.splitlines()
+        if line.startswith("declare")
+    }
+    assert "readnone" in decls["mxs_get_true"]
+    assert "willreturn" in decls["mxs_int_absolute"]
+    assert "readnone" not in decls["mxs_int_absolute"]
+    assert "nounwind" not in decls["mxs_print_object_ext"]
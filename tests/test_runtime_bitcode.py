@@ -0,0 +1,130 @@
+import os
+import sys
+
+import pytest
+from llvmlite import binding
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, execute_llvm
+from src.backend.llvm import (
+    create_target_machine,
+    link_runtime,
+    optimize_module,
+    runtime_bitcode_files,
+)
+from src.backend.llvm.runtime_link import RUNTIME_BITCODE_DIR, prepare_runtime
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+RUNTIME = """
+%obj = type { i64, i64 }
+
+@nil_instance = internal global %obj zeroinitializer
+@ctor_ran = global i32 0
+@llvm.global_ctors = appending global [1 x { i32, void ()*, i8* }] [{ i32, void ()*, i8* } { i32 65535, void ()* @init, i8* null }]
+
+@retain = alias %obj* (%obj*), %obj* (%obj*)* @increase_ref
+
+define internal void @init() {
+  store i32 1, i32* @ctor_ran
+  ret void
+}
+
+define internal void @bump(i64* %count) {
+  %old = load i64, i64* %count
+  %new = add i64 %old, 1
+  store i64 %new, i64* %count
+  ret void
+}
+
+define %obj* @increase_ref(%obj* %o) {
+  %count = getelementptr %obj, %obj* %o, i32 0, i32 0
+  call void @bump(i64* %count)
+  ret %obj* %o
+}
+
+define %obj* @mxs_get_nil() {
+  ret %obj* @nil_instance
+}
+"""
+
+PROGRAM = """
+declare i8* @increase_ref(i8*)
+declare i8* @mxs_get_nil()
+
+define i8* @entry(i8* %o) {
+  %a = call i8* @increase_ref(i8* %o)
+  %n = call i8* @mxs_get_nil()
+  ret i8* %n
+}
+"""
+
+
+def init_llvm():
+    binding.initialize()
+    binding.initialize_native_target()
+    binding.initialize_native_asmprinter()
+
+
+def test_prepare_runtime_keeps_only_inlinable_bodies():
+    prepared = prepare_runtime(RUNTIME)
+    assert "define available_externally %obj* @increase_ref(" in prepared
+    assert "declare %obj* @mxs_get_nil()" in prepared
+    assert "declare %obj* @retain(%obj*)" in prepared
+    assert "llvm.global_ctors" not in prepared
+    binding.parse_assembly(prepared).verify()
+
+
+def test_runtime_fast_paths_are_inlined(tmp_path):
+    init_llvm()
+    bitcode = tmp_path / "runtime.bc"
+    bitcode.write_bytes(binding.parse_assembly(RUNTIME).as_bitcode())
+    module = binding.parse_assembly(PROGRAM)
+    target_machine = create_target_machine(2)
+    assert link_runtime(module, target_machine, [bitcode])
+    optimize_module(module, target_machine, 2)
+    module.verify()
+    entry = str(module.get_function("entry"))
+    assert "@increase_ref(" not in entry
+    assert "@mxs_get_nil(" in entry
+    defined = {fn.name for fn in module.functions if not fn.is_declaration}
+    assert defined == {"entry"}
+    assert "nil_instance" not in str(module)
+
+
+def test_missing_bitcode_links_nothing(tmp_path):
+    init_llvm()
+    module = binding.parse_assembly(PROGRAM)
+    assert runtime_bitcode_files(tmp_path / "none") == []
+    assert not link_runtime(module, create_target_machine(2), [])
+
+
+@pytest.mark.skipif(
+    not runtime_bitcode_files(RUNTIME_BITCODE_DIR),
+    reason="runtime bitcode not built (cmake -DMXS_RUNTIME_BITCODE=ON)",
+)
+def test_program_runs_with_runtime_bitcode(capfd):
+    src = (
+        "func main() -> int {\n"
+        "    let mut i: int = 0;\n"
+        "    until (i >= 3) {\n"
+        "        print(i);\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    assert execute_llvm(compile_source(src), 2) == 0
+    assert capfd.readouterr().out == "0\n1\n2\n"
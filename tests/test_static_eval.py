@@ -0,0 +1,115 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import Call, Const, compile_program, execute_llvm
+from src.backend.static_eval import StaticEvaluator, evaluate_static_calls
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+FIB_SRC = (
+    "@@static_deterministic\n"
+    "func fib(n: int) -> int {\n"
+    "    if n <= 1 {\n"
+    "        return n;\n"
+    "    }\n"
+    "    return fib(n - 1) + fib(n - 2);\n"
+    "}\n"
+)
+
+
+def test_constant_call_is_folded():
+    src = FIB_SRC + (
+        "func main() -> int {\n"
+        "    let a = fib(10);\n"
+        "    let b = fib(fib(6));\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    assert program.functions["fib"].is_deterministic
+    report = evaluate_static_calls(program)
+    main_code = program.functions["main"].code
+    assert not any(isinstance(i, Call) and i.name == "fib" for i in main_code)
+    assert Const(55) in main_code and Const(21) in main_code
+    assert [r[2] for r in report.folded] == [55, 8, 21]
+    assert execute_llvm(program) == 0
+
+
+def test_memo_table_is_shared_between_call_sites():
+    src = FIB_SRC + (
+        "func main() -> int {\n"
+        "    let a = fib(90);\n"
+        "    let b = fib(89);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    evaluator = StaticEvaluator(program, step_budget=10_000)
+    report = evaluator.run()
+    assert [r[2] for r in report.folded] == [
+        2880067194370816120,
+        1779979416004714189,
+    ]
+    assert len(evaluator.memo) == 91
+
+
+def test_budget_leaves_call_for_runtime():
+    src = FIB_SRC + (
+        "func main() -> int {\n"
+        "    let a = fib(20);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    report = evaluate_static_calls(program, step_budget=50)
+    assert not report.folded
+    assert Call("fib", 1) in program.functions["main"].code
+
+
+def test_impure_deterministic_function_is_diagnosed():
+    src = (
+        "@@static_deterministic\n"
+        "func noisy(n: int) -> int {\n"
+        "    print(n);\n"
+        "    return n;\n"
+        "}\n"
+        "func main() -> int {\n"
+        "    let a = noisy(3);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    report = evaluate_static_calls(program)
+    assert not report.folded
+    assert len(report.diagnostics) == 1
+    assert "noisy" in report.diagnostics[0]
+    assert "calls impure function" in report.diagnostics[0]
+
+
+def test_unannotated_function_is_not_folded():
+    src = (
+        "func double(n: int) -> int {\n"
+        "    return n * 2;\n"
+        "}\n"
+        "func main() -> int {\n"
+        "    let a = double(4);\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    program = compile_source(src)
+    report = evaluate_static_calls(program)
+    assert not report.folded and not report.diagnostics
+    assert Call("double", 1) in program.functions["main"].code
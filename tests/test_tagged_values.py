@@ -0,0 +1,130 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, execute_llvm, to_llvm_ir
+from src.backend.ir import BinOpInstr, Const, Load, ProgramIR, Store
+from src.backend.llvm.tagging import TRUE_BITS, tag_int
+
+from conftest import is_error, load_runtime, requires_tagged_runtime
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+def test_constant_integers_are_tagged_at_compile_time():
+    prog = ProgramIR(
+        code=[Const(20), Const(1), BinOpInstr("+", "object", "object", "object")],
+        functions={},
+        foreign_functions={},
+    )
+    ir = to_llvm_ir(prog, tagged_values=True)
+    assert f"inttoptr (i64 {tag_int(20)} to i8*)" in ir
+    assert f"inttoptr (i64 {tag_int(1)} to i8*)" in ir
+    assert "MXCreateInteger" not in ir
+
+
+def test_dynamic_integers_are_shifted_and_tagged():
+    prog = ProgramIR(
+        code=[
+            Const(5),
+            Store("x", is_mut=True),
+            Load("x"),
+            Const(1),
+            BinOpInstr("+", "object", "object", "object"),
+        ],
+        functions={},
+        foreign_functions={},
+    )
+    ir = to_llvm_ir(prog, tagged_values=True)
+    assert "shl i64" in ir
+    assert "or i64" in ir
+    # Only values outside the 63-bit range still reach MXCreateInteger
+    assert ir.count('call i8* @"MXCreateInteger"') == 1
+
+
+def test_conditions_compare_against_the_true_tag():
+    src = (
+        "func main() -> int {\n"
+        "    let b: bool = 1 < 2;\n"
+        "    if b {\n"
+        "        return 1;\n"
+        "    }\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    ir = to_llvm_ir(compile_source(src), tagged_values=True)
+    assert f"inttoptr (i64 {TRUE_BITS} to i8*)" in ir
+    assert "mxs_get_true" not in ir
+
+
+@requires_tagged_runtime
+def test_tagged_runtime_operations():
+    runtime = load_runtime()
+    assert runtime.mxs_op_add(tag_int(3), tag_int(4)) == tag_int(7)
+    assert runtime.mxs_op_lt(tag_int(-3), tag_int(4)) == TRUE_BITS
+    # Products beyond 63 bits are boxed and remain usable as operands
+    big = runtime.mxs_op_mul(tag_int(1 << 31), tag_int(1 << 31))
+    assert big & 0b11 == 0
+    assert runtime.mxs_op_sub(big, tag_int(1)) == tag_int((1 << 62) - 1)
+    runtime.increase_ref(big)
+    runtime.decrease_ref(big)
+
+    src = (
+        "func main() -> int {\n"
+        "    let mut i: int = 0;\n"
+        "    let mut acc: int = 0;\n"
+        "    until (i >= 1000) {\n"
+        "        let sq: int = i * i;\n"
+        "        acc = acc + sq;\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    let ok: bool = acc == 332833500;\n"
+        "    if ok {\n"
+        "        return 0;\n"
+        "    }\n"
+        "    return 1;\n"
+        "}\n"
+    )
+    assert execute_llvm(compile_source(src)) == 0
+
+
+# Tagged values have no header, so the container entry points must reject
+# them before reading one
+@requires_tagged_runtime
+@pytest.mark.parametrize(
+    "function, argc",
+    [
+        ("list_getitem", 2),
+        ("list_setitem", 3),
+        ("list_append", 2),
+        ("dict_getitem", 2),
+        ("dict_contains", 2),
+        ("mxs_op_getitem", 2),
+        ("array_length", 1),
+        ("array_get", 2),
+        ("array_get_float", 2),
+    ],
+)
+def test_tagged_value_passed_as_a_container_is_a_type_error(function, argc):
+    runtime = load_runtime()
+    assert is_error(runtime, getattr(runtime, function)(*[tag_int(3)] * argc))
+
+
+@requires_tagged_runtime
+def test_tagged_value_has_no_container_length():
+    runtime = load_runtime()
+    assert runtime.dict_length(tag_int(3)) == 0
+    assert runtime.list_length(tag_int(3)) == 0
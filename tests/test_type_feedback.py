@@ -0,0 +1,154 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.frontend import TokenStream, tokenize
+from src.syntax_parser import Parser
+from src.semantic_analyzer import SemanticAnalyzer
+from src.backend import compile_program, execute_llvm, to_llvm_ir
+from src.backend.llvm import TypeProfile
+from src.backend.llvm.feedback import FunctionFeedback
+
+from conftest import live_object_count
+
+
+def compile_source(src: str):
+    tokens = tokenize(src)
+    stream = TokenStream(tokens)
+    ast = Parser(stream).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    return compile_program(ast, analyzer.type_registry)
+
+
+# Returns 0 when ``name`` computes what generic code computes
+def checked_program(name: str) -> str:
+    return (
+        f"func {name}(x: int, n: int) -> int {{\n"
+        "    let mut i: int = 0;\n"
+        "    let mut acc: int = x;\n"
+        "    until (i >= n) {\n"
+        "        let t: int = i * 3;\n"
+        "        acc = acc + t;\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    let half: int = acc / 2;\n"
+        "    return half - 1;\n"
+        "}\n"
+        "func main() -> int {\n"
+        f"    let r: int = {name}(5, 10000);\n"
+        "    let ok: bool = r == 74992501;\n"
+        "    if ok {\n"
+        "        return 0;\n"
+        "    }\n"
+        "    return 1;\n"
+        "}\n"
+    )
+
+
+def test_profiling_run_records_argument_and_operand_types():
+    prog = compile_source(checked_program("tf_record"))
+    assert execute_llvm(prog, collect_type_feedback=True) == 0
+    feedback = TypeProfile.collect().functions["tf_record"]
+    assert feedback.args == ["Integer", "Integer"]
+    assert len(feedback.ops) == 6
+    assert feedback.numeric_op(2) == ("Integer", "Integer")
+
+
+def test_profile_round_trips_through_json(tmp_path: Path):
+    feedback = FunctionFeedback(
+        ["Integer", None], {0: ("Float", "Integer"), 3: (None, "Float")}
+    )
+    profile = TypeProfile({"f": feedback})
+    path = tmp_path / "profile.json"
+    profile.save(str(path))
+    assert TypeProfile.load(str(path)) == profile
+
+
+def test_specialised_clone_is_entered_behind_an_argument_guard():
+    prog = compile_source(checked_program("tf_clone"))
+    feedback = FunctionFeedback(
+        ["Integer", "Integer"], {k: ("Integer", "Integer") for k in range(6)}
+    )
+    profile = TypeProfile({"tf_clone": feedback})
+    ir = to_llvm_ir(prog, tagged_values=False, type_profile=profile)
+    assert 'define i8* @"tf_clone.specialised"' in ir
+    assert 'tail call i8* @"tf_clone.specialised"' in ir
+    assert '@"mxs_integer_type_id"' in ir
+    clone = ir.split('define i8* @"tf_clone.specialised"')[1].split("\n}")[0]
+    # Unboxed locals: the loop adds and multiplies plain integers
+    assert "add i64" in clone and "mul i64" in clone
+    assert "sdiv i64" in clone
+    # The generic version keeps the dynamic operators
+    generic = ir.split('define i8* @"tf_clone"(')[1].split("\n}")[0]
+    assert "add i64" not in generic
+
+
+def test_specialised_program_computes_the_same_results():
+    execute_llvm(compile_source(checked_program("tf_same")), collect_type_feedback=True)
+    profile = TypeProfile.collect()
+    for lazy in (False, True):
+        prog = compile_source(checked_program("tf_same"))
+        assert execute_llvm(prog, lazy=lazy, type_profile=profile) == 0
+
+
+def test_wrong_profile_falls_back_to_generic_code():
+    # Every guard fails, so only the generic paths run
+    feedback = FunctionFeedback(
+        ["Float", "Float"], {k: ("Float", "Float") for k in range(6)}
+    )
+    main = FunctionFeedback([], {0: ("Float", "Float")})
+    profile = TypeProfile({"tf_wrong": feedback, "main": main})
+    prog = compile_source(checked_program("tf_wrong"))
+    assert execute_llvm(prog, type_profile=profile) == 0
+
+
+def test_specialised_division_by_zero_takes_the_generic_path():
+    src = (
+        "func tf_div(a: int, b: int) -> int {\n"
+        "    let q: int = a / b;\n"
+        "    return q;\n"
+        "}\n"
+        "func main() -> int {\n"
+        "    let ok: int = tf_div(7, 2);\n"
+        "    let bad: int = tf_div(7, 0);\n"
+        "    let same: bool = ok == 3;\n"
+        "    if same {\n"
+        "        return 0;\n"
+        "    }\n"
+        "    return 1;\n"
+        "}\n"
+    )
+    profile = TypeProfile(
+        {
+            "tf_div": FunctionFeedback(
+                ["Integer", "Integer"], {0: ("Integer", "Integer")}
+            ),
+            "main": FunctionFeedback([], {0: ("Integer", "Integer")}),
+        }
+    )
+    # An unchecked sdiv by zero would trap
+    assert execute_llvm(compile_source(src), type_profile=profile) == 0
+
+
+def test_unboxed_loop_leaves_no_integers_behind():
+    src = (
+        "func main() -> int {\n"
+        "    let mut i: int = 0;\n"
+        "    let mut acc: int = 0;\n"
+        "    until (i >= 100000) {\n"
+        "        acc = acc + i;\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    return 0;\n"
+        "}\n"
+    )
+    feedback = FunctionFeedback([], {k: ("Integer", "Integer") for k in range(3)})
+    prog = compile_source(src)
+    execute_llvm(compile_source("0;"))
+    before = live_object_count()
+    assert execute_llvm(prog, type_profile=TypeProfile({"main": feedback})) == 0
+    # Generic code keeps the final ``i`` and ``acc`` objects alive
+    assert live_object_count() == before